@@ -1,7 +1,174 @@
 """Common geocode definitions."""
 
+import re
+import unicodedata
+from typing import Iterable, NamedTuple, Optional
+
+_SEPARATORS = re.compile(r"[\s\-_'.,]+")
+
 
 class LocationInvalidError(Exception):
     """Raised if location in config is not valid or not found in goecode db."""
 
     pass
+
+
+class Place(NamedTuple):
+    """A place from the geocode database."""
+
+    name: str
+    country: str
+    lat: float
+    lng: float
+    timezone: str
+
+
+def place_key(name: str) -> str:
+    """Normalise a place name for lookups.
+
+    Accents are removed, case is folded and runs of spaces, hyphens and
+    other separators become a single space, so "Saint-Étienne",
+    "saint etienne" and "SAINT  ETIENNE" share a key.
+
+    Args
+    ----
+        name (str): Place name as written.
+
+    Returns
+    -------
+        str: The lookup key.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _SEPARATORS.sub(" ", stripped.casefold()).strip()
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Edit distance between two strings, counting transpositions.
+
+    Args
+    ----
+        a (str): First string.
+        b (str): Second string.
+        limit (int): Distances above this are not worked out exactly.
+
+    Returns
+    -------
+        int: Insertions, deletions, substitutions and adjacent swaps needed
+             to turn `a` into `b`, `limit` + 1 if more than `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1,
+                         prev[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and \
+                    a[i - 2] == cb:
+                cur[j] = min(cur[j], before[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        before, prev = prev, cur
+    return prev[-1]
+
+
+def max_edits(key: str) -> int:
+    """Edits allowed for a fuzzy match, one per four characters."""
+    return max(1, len(key) // 4)
+
+
+def closest_key(key: str, candidates: Iterable[str]) -> Optional[str]:
+    """Find the candidate key with the fewest edits from `key`.
+
+    Args
+    ----
+        key (str): Normalised key to match.
+        candidates (Iterable[str]): Normalised keys to choose from.
+
+    Returns
+    -------
+        str | None: The closest key within `max_edits`, the first of equally
+                    close keys. None if none is close enough.
+    """
+    limit = max_edits(key)
+    best, best_distance = None, limit + 1
+    for candidate in candidates:
+        distance = edit_distance(key, candidate, min(limit, best_distance))
+        if distance < best_distance:
+            best, best_distance = candidate, distance
+            if distance == 0:
+                break
+    return best
+
+
+class PlaceSource:
+    """Name lookups shared by the geocode databases.
+
+    Subclasses provide exact lookups, prefix searches, nearest place
+    searches and the keys of a country's places.
+    """
+
+    def find(self, iso_country: str, place_name: str) -> Optional[Place]:
+        """Find a place by country and exactly matching `place_key`."""
+        raise NotImplementedError
+
+    def prefix(self, iso_country: str, prefix: str,
+               limit: int = 10) -> list[Place]:
+        """Find places whose `place_key` starts with that of `prefix`."""
+        raise NotImplementedError
+
+    def _keys(self, iso_country: str) -> Iterable[str]:
+        """Return the keys of a country's places."""
+        raise NotImplementedError
+
+    def nearest(self, lat: float,
+                lng: float) -> Optional[tuple[Place, float]]:
+        """Find the place nearest to a location and its distance in km."""
+        raise NotImplementedError
+
+    def closest(self, iso_country: str, place_name: str) -> Optional[Place]:
+        """Find the place whose name is closest to a misspelt one.
+
+        Args
+        ----
+            iso_country (str): 2 letter ISO country code.
+            place_name (str): Place name, possibly misspelt.
+
+        Returns
+        -------
+            Place | None: The closest place within `max_edits` of the name.
+        """
+        key = closest_key(place_key(place_name),
+                          self._keys(iso_country.upper()))
+        return None if key is None else self.find(iso_country, key)
+
+    def resolve(self, iso_country: str,
+                place_name: str) -> Optional[tuple[Place, str]]:
+        """Resolve a place name, exactly if possible.
+
+        A name that is not found exactly resolves to the only place it is a
+        prefix of, otherwise to the closest misspelling.
+
+        Args
+        ----
+            iso_country (str): 2 letter ISO country code.
+            place_name (str): Place name as written in the config.
+
+        Returns
+        -------
+            tuple[Place, str] | None: The place and how it matched, "exact",
+                                      "prefix" or "fuzzy". None if no match.
+        """
+        place = self.find(iso_country, place_name)
+        if place is not None:
+            return place, "exact"
+        matches = self.prefix(iso_country, place_name, limit=2)
+        if len(matches) == 1:
+            return matches[0], "prefix"
+        place = self.closest(iso_country, place_name)
+        if place is not None:
+            return place, "fuzzy"
+        return None
@@ -0,0 +1,333 @@
+"""geocode.compact.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Compact, memory mapped geocode database. The GeoNames TSV is
+             streamed in chunks, each chunk sorted to a temporary run and
+             the runs merged into one file of fixed size records sorted by
+             country and place key. Lookups binary search the memory mapped
+             records, so only the pages touched are read and the database
+             costs almost no memory on the device.
+
+             File layout, little endian:
+                 header    magic, place count, strings offset, timezone
+                           table offset, timezone count
+                 records   one per place, see `_RECORD`
+                 strings   UTF-8 place keys and names
+                 timezones length prefixed UTF-8 names
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import bisect
+import heapq
+import logging
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Iterator, Optional
+from geocode.common import Place, PlaceSource, place_key
+
+MAGIC = b"GEOCMP1\0"
+_HEADER = struct.Struct("<8sIIIH")
+# Country, key offset, key length, name offset, name length, latitude,
+# longitude, timezone index
+_RECORD = struct.Struct("<2sIHIHffH")
+_TZ_LEN = struct.Struct("<B")
+# Places sorted in memory at a time while building
+CHUNK_ROWS = 20000
+# GeoNames columns used: name, latitude, longitude, country, timezone
+_NAME, _LAT, _LNG, _COUNTRY, _TZ = 1, 4, 5, 8, 17
+
+
+def _read_places(tsv_path: str) -> Iterator[tuple]:
+    """Yield (country, key, seq, name, lat, lng, timezone) from the TSV."""
+    with open(tsv_path, encoding="utf-8") as f:
+        for seq, line in enumerate(f):
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) <= _TZ:
+                continue
+            try:
+                lat, lng = float(cols[_LAT]), float(cols[_LNG])
+            except ValueError:
+                continue
+            key = place_key(cols[_NAME])
+            if key and len(cols[_COUNTRY]) == 2:
+                yield (cols[_COUNTRY].upper(), key, seq, cols[_NAME], lat,
+                       lng, cols[_TZ])
+
+
+def _write_run(places: list[tuple], directory: str) -> str:
+    """Sort a chunk of places and write it to a temporary run file."""
+    places.sort()
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.writelines("\t".join(map(str, place)) + "\n" for place in places)
+    return path
+
+
+def _read_run(f) -> Iterator[tuple]:
+    for line in f:
+        country, key, seq, name, lat, lng, tz = line.rstrip("\n").split("\t")
+        yield country, key, int(seq), name, float(lat), float(lng), tz
+
+
+def build_compact(tsv_path: str, out_path: str,
+                  chunk_rows: int = CHUNK_ROWS) -> dict:
+    """Build a compact geocode file from a GeoNames TSV dump.
+
+    Places with the same country and key as an earlier place in the TSV are
+    dropped, as the SQLite database drops repeated names.
+
+    Args
+    ----
+        tsv_path (str): GeoNames cities file, e.g. cities5000.txt.
+        out_path (str): Compact file to write, replaced atomically.
+        chunk_rows (int): Places sorted in memory at a time.
+
+    Returns
+    -------
+        dict: places, runs, file_bytes, peak_memory_bytes (Python
+              allocations during the build) and seconds.
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(out_path))
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        runs, chunk = [], []
+        for place in _read_places(tsv_path):
+            chunk.append(place)
+            if len(chunk) >= chunk_rows:
+                runs.append(_write_run(chunk, tmp))
+                chunk = []
+        if chunk or not runs:
+            runs.append(_write_run(chunk, tmp))
+        del chunk
+
+        files = [open(run, encoding="utf-8") for run in runs]
+        try:
+            count = _write_compact(
+                heapq.merge(*(_read_run(f) for f in files)), out_path)
+        finally:
+            for f in files:
+                f.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    if not tracing:
+        tracemalloc.stop()
+
+    report = {"places": count,
+              "runs": len(runs),
+              "file_bytes": os.path.getsize(out_path),
+              "peak_memory_bytes": peak,
+              "seconds": time.perf_counter() - start}
+    logging.info("GCODE: Built %s with %d places from %d runs, %d bytes, "
+                 "peak build memory %d bytes", out_path, count, len(runs),
+                 report["file_bytes"], peak)
+    return report
+
+
+def _write_compact(places: Iterator[tuple], out_path: str) -> int:
+    """Write sorted places to the compact file, returning the count."""
+    tmp_path = out_path + ".tmp"
+    timezones: dict[str, int] = {}
+    count = offset = 0
+    previous = None
+    with open(tmp_path, "wb") as f, tempfile.TemporaryFile() as strings:
+        f.write(bytes(_HEADER.size))
+        for country, key, _, name, lat, lng, tz in places:
+            if (country, key) == previous:
+                continue
+            previous = (country, key)
+            key_b, name_b = key.encode("utf-8"), name.encode("utf-8")
+            strings.write(key_b)
+            strings.write(name_b)
+            f.write(_RECORD.pack(
+                country.encode("ascii", "replace"), offset, len(key_b),
+                offset + len(key_b), len(name_b), lat, lng,
+                timezones.setdefault(tz, len(timezones))))
+            offset += len(key_b) + len(name_b)
+            count += 1
+
+        strings_offset = f.tell()
+        strings.seek(0)
+        shutil.copyfileobj(strings, f)
+        tz_offset = f.tell()
+        for tz in timezones:  # In index order
+            tz_b = tz.encode("utf-8")
+            f.write(_TZ_LEN.pack(len(tz_b)))
+            f.write(tz_b)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, count, strings_offset, tz_offset,
+                             len(timezones)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, out_path)
+    return count
+
+
+class _Entries:
+    """(country, key) of each record, a sequence for `bisect`."""
+
+    def __init__(self, geocode: "CompactGeocode"):
+        self._geocode = geocode
+
+    def __len__(self) -> int:
+        return len(self._geocode)
+
+    def __getitem__(self, i: int) -> tuple[str, str]:
+        return self._geocode._entry(i)
+
+
+class CompactGeocode(PlaceSource):
+    """Read only access to a compact geocode file.
+
+    Args
+    ----
+        path (str): File written by `build_compact`.
+
+    Raises
+    ------
+        ValueError: If the file is not a compact geocode file.
+    """
+
+    _files: dict[str, "CompactGeocode"] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: str) -> "CompactGeocode":
+        """Return the shared reader for a file."""
+        path = os.path.abspath(path)
+        with cls._lock:
+            if path not in cls._files:
+                cls._files[path] = cls(path)
+            return cls._files[path]
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"{path} is not a compact geocode file")
+        magic, self._count, self._strings, tz_offset, tz_count = \
+            _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compact geocode file")
+        self._timezones = []
+        for _ in range(tz_count):
+            size = _TZ_LEN.unpack_from(self._mm, tz_offset)[0]
+            tz_offset += _TZ_LEN.size
+            self._timezones.append(
+                self._mm[tz_offset:tz_offset + size].decode("utf-8"))
+            tz_offset += size
+        self._entries = _Entries(self)
+        self._index = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record(self, i: int) -> tuple:
+        return _RECORD.unpack_from(self._mm, _HEADER.size + i * _RECORD.size)
+
+    def _text(self, offset: int, size: int) -> str:
+        start = self._strings + offset
+        return self._mm[start:start + size].decode("utf-8")
+
+    def _entry(self, i: int) -> tuple[str, str]:
+        country, key_offset, key_len = _RECORD.unpack_from(
+            self._mm, _HEADER.size + i * _RECORD.size)[:3]
+        return country.decode("ascii"), self._text(key_offset, key_len)
+
+    def _place(self, i: int) -> Place:
+        country, _, _, name_offset, name_len, lat, lng, tz = self._record(i)
+        return Place(self._text(name_offset, name_len),
+                     country.decode("ascii"), lat, lng, self._timezones[tz])
+
+    def find(self, iso_country: str, place_name: str) -> Optional[Place]:
+        """Find a place by country and name.
+
+        Args
+        ----
+            iso_country (str): 2 letter ISO country code, any case.
+            place_name (str): Place name, matched on its `place_key`.
+
+        Returns
+        -------
+            Place | None: The place, None if it is not in the file.
+        """
+        target = ((iso_country or "").upper(), place_key(place_name or ""))
+        i = bisect.bisect_left(self._entries, target)
+        if i < self._count and self._entry(i) == target:
+            return self._place(i)
+        return None
+
+    def prefix(self, iso_country: str, prefix: str,
+               limit: int = 10) -> list[Place]:
+        """Find places whose key starts with that of `prefix`.
+
+        Args
+        ----
+            iso_country (str): 2 letter ISO country code, any case.
+            prefix (str): Start of a place name.
+            limit (int): Most places to return.
+
+        Returns
+        -------
+            list[Place]: Matching places in key order.
+        """
+        country, key = (iso_country or "").upper(), place_key(prefix)
+        i = bisect.bisect_left(self._entries, (country, key))
+        found = []
+        while i < self._count and len(found) < limit:
+            entry_country, entry_key = self._entry(i)
+            if entry_country != country or not entry_key.startswith(key):
+                break
+            found.append(self._place(i))
+            i += 1
+        return found
+
+    def _keys(self, iso_country: str) -> Iterator[str]:
+        i = bisect.bisect_left(self._entries, (iso_country, ""))
+        while i < self._count:
+            country, key = self._entry(i)
+            if country != iso_country:
+                break
+            yield key
+            i += 1
+
+    def nearest(self, lat: float,
+                lng: float) -> Optional[tuple[Place, float]]:
+        """Find the place nearest to a location, e.g. a GPS fix.
+
+        Args
+        ----
+            lat (float): Latitude in degrees.
+            lng (float): Longitude in degrees.
+
+        Returns
+        -------
+            tuple[Place, float] | None: The place and its distance in km,
+                                        None if the file is empty.
+        """
+        if self._index is None:
+            from geocode.spatial import NearestIndex
+            self._index = NearestIndex(
+                (self._record(i)[5:7] for i in range(self._count)),
+                range(self._count))
+        found = self._index.nearest(lat, lng)
+        if found is None:
+            return None
+        i, km = found
+        return self._place(i), km
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mm.close()
@@ -13,32 +13,25 @@ Data Used is the GeoNames Gazetteer cities5000.txt data dump
 Data set is freely available at https://www.geonames.org/ and licensed under
 a Creative Commons Attribution 4.0 License
 (https://creativecommons.org/licenses/by/4.0/))
+
+Run from the project root:
+    python -m geocode.create [cities5000.txt] [geocode/geocode.db]
+or, for the compact memory mapped file used in preference on the device:
+    python -m geocode.create --compact [cities5000.txt] [geocode/geocode.bin]
 """
 
+import argparse
 import pandas as pd
 import sqlite3
+from geocode.common import place_key
+from geocode.compact import build_compact
 
-# Load the Tab separated txt file with specified data types
-tsv_file_path = 'cities5000.txt'
-df = pd.read_csv(
-    tsv_file_path,
-    sep='\t',
-    usecols=[1, 4, 5, 8, 17],
-    dtype={8: str, 1: str, 4: float, 5: float, 17: str},
-    low_memory=False
-)
-
-# Rename columns to SQL-friendly names
-df.columns = ['Place_Name', 'Lat', 'Lng', 'ISO_Country', 'Timezone']
-
-# Connect to SQLite database (creates geocode.db if it doesn't exist)
-conn = sqlite3.connect('geocode.db')
-cursor = conn.cursor()
-
-# Define the SQL CREATE TABLE statement directly with known data types
-create_table_query = """
+# Define the SQL CREATE TABLE statement directly with known data types.
+# Place_Key is the normalised place name lookups are made on.
+CREATE_TABLE = """
 CREATE TABLE IF NOT EXISTS geocode_data (
     Place_Name TEXT,
+    Place_Key TEXT,
     Lat REAL,
     Lng REAL,
     ISO_Country TEXT,
@@ -46,16 +39,85 @@ CREATE TABLE IF NOT EXISTS geocode_data (
     UNIQUE (ISO_Country, Place_Name) ON CONFLICT IGNORE
 );
 """
-cursor.execute(create_table_query)
 
-# Write DataFrame to SQL table, enforcing uniqueness on the specified columns
-df.to_sql('geocode_data', conn, if_exists='append', index=False)
+# Covers the lookup, a place is found from the index without reading the
+# table
+CREATE_INDEX = """
+CREATE INDEX IF NOT EXISTS geocode_key_idx ON geocode_data (
+    ISO_Country, Place_Key, Place_Name, Lat, Lng, Timezone);
+"""
+
+
+def build(tsv_path: str, db_path: str) -> int:
+    """Build the geocode database from a GeoNames TSV dump.
+
+    Args
+    ----
+        tsv_path (str): GeoNames cities file, e.g. cities5000.txt.
+        db_path (str): SQLite database to create or add to.
+
+    Returns
+    -------
+        int: Places in the database.
+    """
+    # Load the Tab separated txt file with specified data types
+    df = pd.read_csv(
+        tsv_path,
+        sep='\t',
+        header=None,
+        usecols=[1, 4, 5, 8, 17],
+        dtype={8: str, 1: str, 4: float, 5: float, 17: str},
+        keep_default_na=False,
+        low_memory=False
+    )
+
+    # Rename columns to SQL-friendly names
+    df.columns = ['Place_Name', 'Lat', 'Lng', 'ISO_Country', 'Timezone']
+    df.insert(1, 'Place_Key', df['Place_Name'].map(place_key))
+
+    # Connect to SQLite database (creates it if it doesn't exist)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(CREATE_TABLE)
+        # Write DataFrame to SQL table, enforcing uniqueness on the
+        # specified columns
+        df.to_sql('geocode_data', conn, if_exists='append', index=False)
+        conn.execute(CREATE_INDEX)
+        conn.execute("ANALYZE")
+        conn.commit()
+        count = conn.execute(
+            "SELECT COUNT(*) FROM geocode_data").fetchone()[0]
+    finally:
+        conn.close()
+    return count
+
+
+def main() -> None:
+    """Build the database and show a random sample of it."""
+    parser = argparse.ArgumentParser(
+        description="Build the geocode database from GeoNames data")
+    parser.add_argument("tsv", nargs="?", default="cities5000.txt")
+    parser.add_argument("db", nargs="?", default=None)
+    parser.add_argument("--compact", action="store_true",
+                        help="Build the compact memory mapped file")
+    args = parser.parse_args()
+
+    if args.compact:
+        out = args.db or "geocode/geocode.bin"
+        report = build_compact(args.tsv, out)
+        print(f"{report['places']} places in {out}: "
+              f"{report['file_bytes'] / 1024:.0f}KiB on disk, "
+              f"{report['peak_memory_bytes'] / 1024:.0f}KiB peak build "
+              f"memory, {report['seconds']:.1f}s")
+        return
+
+    args.db = args.db or "geocode/geocode.db"
+    print(f"{build(args.tsv, args.db)} places in {args.db}")
+    # Select and display a random sample of 10 records
+    with sqlite3.connect(args.db) as conn:
+        query = "SELECT * FROM geocode_data ORDER BY RANDOM() LIMIT 10;"
+        print(pd.read_sql_query(query, conn))
 
-# Select and display a random sample of 10 records
-query = "SELECT * FROM geocode_data ORDER BY RANDOM() LIMIT 10;"
-random_records = pd.read_sql_query(query, conn)
-print(random_records)
 
-# Commit and close the database connection
-conn.commit()
-conn.close()
+if __name__ == "__main__":
+    main()
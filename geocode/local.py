@@ -10,14 +10,18 @@ Version: 0.1
 """
 
 from lightlib.config import ConfigLoader
+from geocode.common import Place, PlaceSource, place_key
 
-import pandas as pd
 import sqlite3
 import logging
 import os
+import threading
+from typing import Optional
 import pytz
 
+GEODIR = "geocode"
 GEODB = "geocode.db"
+GEOBIN = "geocode.bin"
 GEOTABLE = "geocode_data"
 
 
@@ -27,6 +31,186 @@ class InvalidLocationError(Exception):
     pass
 
 
+class GeocodeStore(PlaceSource):
+    """Read only access to a geocode database, shared by every lookup.
+
+    The connection is opened once and reused. Places are found through the
+    covering index on (ISO_Country, Place_Key) and remembered, repeated
+    lookups are a dict access. Databases built before `Place_Key` was added
+    are matched on the place name ignoring case.
+
+    Args
+    ----
+        path (str): The geocode SQLite database.
+    """
+
+    _stores: dict[str, "GeocodeStore"] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: str) -> "GeocodeStore":
+        """Return the shared store for a database."""
+        path = os.path.abspath(path)
+        with cls._lock:
+            if path not in cls._stores:
+                cls._stores[path] = cls(path)
+            return cls._stores[path]
+
+    def __init__(self, path: str):
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._has_key = False
+        self._found: dict[tuple[str, str], Optional[Place]] = {}
+        self._index = None
+        self._query_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if not os.path.isfile(self._path):
+                raise InvalidLocationError(
+                    f"Geocode database {self._path} not found")
+            self._conn = sqlite3.connect(f"file:{self._path}?mode=ro",
+                                         uri=True, check_same_thread=False)
+            columns = {row[1] for row in self._conn.execute(
+                f"PRAGMA table_info({GEOTABLE})")}
+            self._has_key = "Place_Key" in columns
+        return self._conn
+
+    def find(self, iso_country: str, place_name: str) -> Optional[Place]:
+        """Find a place by country and name.
+
+        Args
+        ----
+            iso_country (str): 2 letter ISO country code, any case.
+            place_name (str): Place name, matched on its `place_key`.
+
+        Returns
+        -------
+            Place | None: The place, None if it is not in the database.
+        """
+        key = ((iso_country or "").upper(), place_key(place_name or ""))
+        if key in self._found:
+            return self._found[key]
+        with self._query_lock:
+            conn = self._connect()
+            if self._has_key:
+                row = conn.execute(
+                    f"SELECT Place_Name, ISO_Country, Lat, Lng, Timezone "
+                    f"FROM {GEOTABLE} WHERE ISO_Country = ? AND "
+                    f"Place_Key = ? LIMIT 1", key).fetchone()
+            else:
+                row = conn.execute(
+                    f"SELECT Place_Name, ISO_Country, Lat, Lng, Timezone "
+                    f"FROM {GEOTABLE} WHERE ISO_Country = ? AND "
+                    f"Place_Name = ? COLLATE NOCASE LIMIT 1",
+                    (key[0], place_name)).fetchone()
+        place = Place(*row) if row else None
+        self._found[key] = place
+        logging.debug("GCODE: %s/%s found %s", place_name, iso_country, place)
+        return place
+
+    def prefix(self, iso_country: str, prefix: str,
+               limit: int = 10) -> list[Place]:
+        """Find places whose key starts with that of `prefix`.
+
+        Args
+        ----
+            iso_country (str): 2 letter ISO country code, any case.
+            prefix (str): Start of a place name.
+            limit (int): Most places to return.
+
+        Returns
+        -------
+            list[Place]: Matching places in key order. Always empty for
+                         databases built without `Place_Key`.
+        """
+        key = place_key(prefix)
+        with self._query_lock:
+            conn = self._connect()
+            if not self._has_key:
+                return []
+            rows = conn.execute(
+                f"SELECT Place_Name, ISO_Country, Lat, Lng, Timezone "
+                f"FROM {GEOTABLE} WHERE ISO_Country = ? AND Place_Key >= ? "
+                f"AND Place_Key < ? ORDER BY Place_Key LIMIT ?",
+                ((iso_country or "").upper(), key, key + "\U0010ffff",
+                 limit)).fetchall()
+        return [Place(*row) for row in rows]
+
+    def _keys(self, iso_country: str) -> list[str]:
+        with self._query_lock:
+            conn = self._connect()
+            if not self._has_key:
+                return []
+            return [row[0] for row in conn.execute(
+                f"SELECT DISTINCT Place_Key FROM {GEOTABLE} "
+                f"WHERE ISO_Country = ? ORDER BY Place_Key", (iso_country,))]
+
+    def nearest(self, lat: float,
+                lng: float) -> Optional[tuple[Place, float]]:
+        """Find the place nearest to a location, e.g. a GPS fix.
+
+        The spatial index is built from the database on first use.
+
+        Args
+        ----
+            lat (float): Latitude in degrees.
+            lng (float): Longitude in degrees.
+
+        Returns
+        -------
+            tuple[Place, float] | None: The place and its distance in km,
+                                        None if the database is empty.
+        """
+        with self._query_lock:
+            conn = self._connect()
+            if self._index is None:
+                from geocode.spatial import NearestIndex
+                rows = conn.execute(
+                    f"SELECT rowid, Lat, Lng FROM {GEOTABLE}").fetchall()
+                self._index = NearestIndex(
+                    ((lat, lng) for _, lat, lng in rows),
+                    (rowid for rowid, _, _ in rows))
+                logging.debug("GCODE: Spatial index of %d places built",
+                              len(self._index))
+            found = self._index.nearest(lat, lng)
+            if found is None:
+                return None
+            rowid, km = found
+            row = conn.execute(
+                f"SELECT Place_Name, ISO_Country, Lat, Lng, Timezone "
+                f"FROM {GEOTABLE} WHERE rowid = ?", (rowid,)).fetchone()
+        return Place(*row), km
+
+    def close(self) -> None:
+        """Close the connection, it is reopened when next needed."""
+        with self._query_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_geocode(directory: str = GEODIR) -> PlaceSource:
+    """Return the geocode database in a directory.
+
+    The compact file built by `geocode.compact` is used when present, the
+    SQLite database otherwise.
+
+    Args
+    ----
+        directory (str): Directory holding the geocode database.
+
+    Returns
+    -------
+        PlaceSource: The shared `CompactGeocode` or `GeocodeStore`.
+    """
+    compact = os.path.join(directory, GEOBIN)
+    if os.path.isfile(compact):
+        from geocode.compact import CompactGeocode
+        return CompactGeocode.open(compact)
+    return GeocodeStore.open(os.path.join(directory, GEODB))
+
+
 class Location():
     """Class to hold location information."""
 
@@ -36,7 +220,7 @@ class Location():
         self._latitude: float = None
         self._longitude: float = None
         self._tz: pytz.timezone = None
-        self._db = os.path.join("geocode", GEODB)
+        self._dir = GEODIR
         self._get_from_config()
 
     @property
@@ -83,52 +267,35 @@ class Location():
         iso = ConfigLoader().ISO_country2
         place = ConfigLoader().place_name
         logging.debug("GCODE: Retrieved Location %s, %s", iso, place)
-        # Query the geocode db
+        # Query the geocode db, a misspelt place resolves to its closest
+        # match
         try:
-            df = self._query_location_data(iso_country=iso,
-                                           place_name=place)
-
-            if df.empty or not ("Lat" in df and "Lng" in df):
-                raise InvalidLocationError(
-                    f"Location {place}({iso}) is either not in the database "
-                    "or the database does not provide lat or lng for "
-                    "the location")
-            # Populate attributes
-            self._place_name = place
-            self._country = iso
-            # iloc gets the first record returned.
-            # Latitude from the results,
-            self._latitude = df.get("Lat").iloc[0]
-            # Longitude from the results,
-            self._longitude = df.get("Lng").iloc[0]
-            # Timezone from the results, transformed into a timezone instance
-            # for use in datetime objects,
-            tz = df.get("Timezone").iloc[0] \
-                if not df.empty and "Timezone" in df else None
-            self._tz = pytz.timezone(tz)
-            logging.info("config location is: %s/%s. Timezone: %s",
-                         place, iso, self.timezone)
-            logging.info("Position of config location is: lat %s, lng %s",
-                         self.latitude, self.longitude)
-        except InvalidLocationError as e:
-            raise e
-
-    def _query_location_data(self, iso_country: str,
-                             place_name: str) -> pd.DataFrame:
-        # Connect to the SQLite database
-        conn = sqlite3.connect(self._db)
-
-        # Define the SQL query
-        query = f"""
-        SELECT * FROM {GEOTABLE}
-        WHERE ISO_Country = ? AND Place_Name = ?
-        LIMIT 1
-        """
-
-        # Execute the query and load the result into a DataFrame
-        df = pd.read_sql_query(query, conn, params=(iso_country, place_name))
-        logging.debug("LOC: %s", df)
-        # Close the database connection
-        conn.close()
+            resolved = open_geocode(self._dir).resolve(iso_country=iso,
+                                                       place_name=place)
+        except (sqlite3.Error, ValueError, OSError) as e:
+            raise InvalidLocationError(
+                f"Unable to read the geocode database: {e}") from e
 
-        return df
+        found = resolved[0] if resolved else None
+        if found is None or found.lat is None or found.lng is None:
+            raise InvalidLocationError(
+                f"Location {place}({iso}) is either not in the database "
+                "or the database does not provide lat or lng for "
+                "the location")
+        if resolved[1] != "exact":
+            logging.warning("GCODE: %s(%s) is not in the geocode database, "
+                            "using the %s match %s", place, iso, resolved[1],
+                            found.name)
+            place = found.name
+        # Populate attributes
+        self._place_name = place
+        self._country = iso
+        self._latitude = found.lat
+        self._longitude = found.lng
+        # Timezone transformed into a timezone instance for use in
+        # datetime objects
+        self._tz = pytz.timezone(found.timezone) if found.timezone else None
+        logging.info("config location is: %s/%s. Timezone: %s",
+                     place, iso, self.timezone)
+        logging.info("Position of config location is: lat %s, lng %s",
+                     self.latitude, self.longitude)
@@ -0,0 +1,134 @@
+"""geocode.spatial.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Nearest place search. Places are held as unit vectors in a
+             compact KD-tree, the straight line distance between unit
+             vectors orders places the same as the great circle distance,
+             so the search is exact at the poles and across the date line.
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import math
+from array import array
+from typing import Iterable, Optional
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_vector(lat: float, lng: float) -> tuple[float, float, float]:
+    """Return the unit vector of a latitude and longitude in degrees."""
+    phi, lam = math.radians(lat), math.radians(lng)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam),
+            math.sin(phi))
+
+
+def chord_to_km(chord_sq: float) -> float:
+    """Convert a squared unit vector distance to a great circle distance."""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_sq) / 2))
+
+
+class NearestIndex:
+    """KD-tree of places for nearest neighbour search.
+
+    The tree is implicit: points are reordered so the median of each range
+    is its node and only the split axis of each node is stored. Ranges of
+    `LEAF_SIZE` points or fewer are searched linearly. For the ~68,000
+    places in cities5000 it holds about 2MB.
+
+    Args
+    ----
+        coords (Iterable[tuple[float, float]]): (lat, lng) of each place.
+        ids (Iterable[int]): Identifier of each place, returned by
+            `nearest`.
+    """
+
+    LEAF_SIZE = 8
+
+    def __init__(self, coords: Iterable[tuple[float, float]],
+                 ids: Iterable[int]):
+        latlng = np.radians(np.asarray(list(coords), dtype=np.float64)
+                            .reshape(-1, 2))
+        points = np.column_stack((np.cos(latlng[:, 0]) * np.cos(latlng[:, 1]),
+                                  np.cos(latlng[:, 0]) * np.sin(latlng[:, 1]),
+                                  np.sin(latlng[:, 0])))
+        order = np.arange(len(points))
+        axes = np.zeros(len(points), dtype=np.int8)
+        self._build(points, order, axes, 0, len(points))
+        self._points = array("d", points[order].ravel().tolist())
+        self._axes = array("b", axes.tolist())
+        ids = np.asarray(list(ids), dtype=np.int64)
+        self._ids = array("q", ids[order].tolist())
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _build(self, points: np.ndarray, order: np.ndarray, axes: np.ndarray,
+               lo: int, hi: int) -> None:
+        """Arrange order[lo:hi] into a subtree, splitting the widest axis."""
+        stack = [(lo, hi)]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= self.LEAF_SIZE:
+                continue
+            block = points[order[lo:hi]]
+            axis = int(np.argmax(block.max(axis=0) - block.min(axis=0)))
+            mid = (lo + hi) // 2
+            part = np.argpartition(block[:, axis], mid - lo)
+            order[lo:hi] = order[lo:hi][part]
+            axes[mid] = axis
+            stack.append((lo, mid))
+            stack.append((mid + 1, hi))
+
+    def nearest(self, lat: float,
+                lng: float) -> Optional[tuple[int, float]]:
+        """Find the place nearest to a location.
+
+        Args
+        ----
+            lat (float): Latitude in degrees.
+            lng (float): Longitude in degrees.
+
+        Returns
+        -------
+            tuple[int, float] | None: The place's id and its great circle
+                                      distance in km, None if empty.
+        """
+        if not self._ids:
+            return None
+        q = unit_vector(lat, lng)
+        pts, axes, leaf = self._points, self._axes, self.LEAF_SIZE
+        best_d, best_i = math.inf, -1
+        stack = [(0, len(self._ids), 0.0)]
+        while stack:
+            lo, hi, bound = stack.pop()
+            if bound >= best_d:
+                continue
+            if hi - lo <= leaf:
+                for i in range(lo, hi):
+                    j = 3 * i
+                    dx, dy, dz = (q[0] - pts[j], q[1] - pts[j + 1],
+                                  q[2] - pts[j + 2])
+                    d = dx * dx + dy * dy + dz * dz
+                    if d < best_d:
+                        best_d, best_i = d, i
+                continue
+            mid = (lo + hi) // 2
+            j = 3 * mid
+            dx, dy, dz = q[0] - pts[j], q[1] - pts[j + 1], q[2] - pts[j + 2]
+            d = dx * dx + dy * dy + dz * dz
+            if d < best_d:
+                best_d, best_i = d, mid
+            diff = (dx, dy, dz)[axes[mid]]
+            # Points on the far side are at least diff away along the axis
+            if diff < 0:
+                stack.append((mid + 1, hi, diff * diff))
+                stack.append((lo, mid, 0.0))
+            else:
+                stack.append((lo, mid, diff * diff))
+                stack.append((mid + 1, hi, 0.0))
+        return self._ids[best_i], chord_to_km(best_d)
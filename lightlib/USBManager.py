@@ -9,7 +9,7 @@ Author: Will Bickerstaff
 Version: 0.1
 """
 
-from lightlib.config import ConfigLoader
+from lightlib.config import CompiledConfig, ConfigLoader
 from lightlib.smartlight import CANCEL_CONFIRM, warn_and_wait
 from lightlib.common import datetime_to_iso, ConfigReloaded, get_now
 
@@ -51,6 +51,9 @@ class USBFileManager:
         if not hasattr(self, "_initialized"):
             self.mount_point = mount_point or ConfigLoader().media_mount_point
             self._config_copied = False
+            # USB config compiled during validation, applied without
+            # reading it again
+            self._usb_config: Optional[CompiledConfig] = None
             self._backed_up = False
             self._initialized = True  # Prevent reinitialization in singleton
 
@@ -66,10 +69,16 @@ class USBFileManager:
             # Perform backup if USB is inserted
             self.backup_files_to_usb()
 
-            # Check if config needs to be replaced, raise ConfigReloaded
+            # Check if config needs to be replaced, apply the changes in place
+            # where possible, otherwise raise ConfigReloaded to restart
             if self.replace_config_with_usb():
                 logging.info("Configuration update detected")
-                raise ConfigReloaded  # Trigger reload for valid config change
+                config = ConfigLoader()
+                changes = config.reload(self._usb_config)
+                self._usb_config = None
+                if changes is None or config.needs_restart(changes):
+                    raise ConfigReloaded  # Trigger a full restart
+                logging.info("Configuration changes applied without restart")
         except FileNotFoundError as e:
             # Handle case when USB is not accessible or other IO issues
             logging.warning("USB not found or inaccessible: %s", e)
@@ -169,8 +178,10 @@ class USBFileManager:
                 "USB drive or config file not found at %s.", usb_config_path)
             return False
 
-        # Validate the configuration file format and content
-        if not ConfigLoader().validate_config_file(usb_config_path):
+        # Validate and convert the configuration file in one pass
+        compiled = ConfigLoader().compile_file(usb_config_path)
+        compiled.log_report()
+        if not compiled.valid:
             logging.error("USB config file validation failed.")
             return False
 
@@ -189,6 +200,7 @@ class USBFileManager:
                 "USB config from %s.",
                 usb_config_path)
             self._config_copied = True  # Mark as copied to avoid re-copying
+            self._usb_config = compiled
             return True
 
         # Operation was canceled by the user
@@ -0,0 +1,337 @@
+"""lightlib.activity_source.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Sources of activity input edges. `LgpioSource` reports edges
+             on the GPIO pins through lgpio callbacks. `SimulatedSource`
+             generates them, Poisson arrivals or a replay of logged
+             activity, with contact bounce, at any speed on any number of
+             pins, so the activity capture, debounce and database path can
+             be load tested without GPIO hardware.
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from typing import Callable, Iterable, Optional, Sequence
+
+# Called with (pin, level, tick), tick in nanoseconds as lgpio reports it
+EdgeCallback = Callable[[int, int, int], None]
+
+
+class ActivitySource:
+    """Edges on activity input pins.
+
+    Callbacks may be made from a thread owned by the source.
+    """
+
+    def claim(self, pins: Iterable[int], callback: EdgeCallback) -> None:
+        """Start reporting edges on pins to `callback`."""
+        raise NotImplementedError
+
+    def release(self, pins: Iterable[int]) -> None:
+        """Stop reporting edges on pins."""
+        raise NotImplementedError
+
+    def read(self, pin: int) -> int:
+        """Return the current level of a pin, 1 high 0 low."""
+        raise NotImplementedError
+
+    def tick(self) -> int:
+        """Return the current time in ns on the clock edges are timed by."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release every pin and any resources held."""
+        raise NotImplementedError
+
+
+class LgpioSource(ActivitySource):
+    """Activity inputs on the GPIO pins of gpiochip 0."""
+
+    def __init__(self):
+        import lgpio  # Only needed with GPIO hardware
+        self._lgpio = lgpio
+        self._handle = lgpio.gpiochip_open(0)
+        self._callbacks: dict[int, object] = {}
+
+    def claim(self, pins: Iterable[int], callback: EdgeCallback) -> None:
+        """Claim pins as pulled down inputs with callbacks on both edges."""
+        lgpio = self._lgpio
+        for pin in pins:
+            try:
+                lgpio.gpio_claim_input(self._handle, pin,
+                                       lgpio.SET_PULL_DOWN)
+                logging.debug("GPIO pin %s setup as INPUT, PULL DOWN", pin)
+                # Register callbacks for both rising and falling edges
+                self._callbacks[pin] = lgpio.callback(
+                    self._handle, pin, lgpio.BOTH_EDGES,
+                    lambda chip, gpio, level, tick:
+                        callback(gpio, level, tick))
+                logging.info(
+                    "Activity monitoring initialized on GPIO pin: %s", pin)
+            except RuntimeError as e:
+                logging.error("Failed to set edge detection for pin %s: %s",
+                              pin, e)
+
+    def release(self, pins: Iterable[int]) -> None:
+        """Cancel callbacks and return pins to the GPIO chip."""
+        for pin in pins:
+            try:
+                callback = self._callbacks.pop(pin, None)
+                if callback is not None:
+                    callback.cancel()
+                self._lgpio.gpio_free(self._handle, pin)
+                logging.info("Activity monitoring stopped on GPIO pin: %s",
+                             pin)
+            except (RuntimeError, self._lgpio.error) as e:
+                logging.error("Failed to release GPIO pin %s: %s", pin, e)
+
+    def read(self, pin: int) -> int:
+        """Read a pin's level."""
+        return self._lgpio.gpio_read(self._handle, pin)
+
+    def tick(self) -> int:
+        """Return lgpio's timestamp, the clock its edge ticks are from."""
+        return self._lgpio.timestamp()
+
+    def close(self) -> None:
+        """Close the GPIO chip, which frees every pin."""
+        if self._handle is None:
+            return
+        try:
+            self._lgpio.gpiochip_close(self._handle)
+            logging.info("Activity GPIO cleanup complete.")
+        except self._lgpio.error as e:
+            logging.warning("Activity GPIO cleanup failed: %s", e)
+        self._handle = None
+        self._callbacks.clear()
+
+
+class SimulatedSource(ActivitySource):
+    """Generated activity edges on any number of pins.
+
+    Each pin has activity arriving as a Poisson process with exponentially
+    distributed durations, or replays a list of logged activity. Every
+    transition bounces `bounce` times within `bounce_window` before it
+    settles. Simulated time runs `speed` times faster than real time, edge
+    ticks are on the simulated clock.
+
+    Args
+    ----
+        rate_per_hour (float): Mean activity arrivals per pin per hour.
+        mean_duration (float): Mean seconds an activity lasts.
+        speed (float): Simulated seconds per real second, 0 for as fast as
+            the callbacks run.
+        bounce (int): Extra edge pairs at each transition.
+        bounce_window (float): Seconds a transition bounces for.
+        replay (Sequence[tuple[float, int, float]] | None): (seconds from
+            the start, pin, duration) to replay instead of Poisson arrivals.
+        seed (int | None): Seed for repeatable runs.
+
+    Attributes
+    ----------
+        edges (int): Edges reported.
+        activities (int): Activities started.
+    """
+
+    MIN_DURATION = 0.5  # Shortest simulated activity in seconds
+
+    def __init__(self, rate_per_hour: float = 12.0,
+                 mean_duration: float = 30.0, speed: float = 1.0,
+                 bounce: int = 2, bounce_window: float = 0.01,
+                 replay: Optional[Sequence[tuple[float, int, float]]] = None,
+                 seed: Optional[int] = None):
+        self.rate_per_hour = rate_per_hour
+        self.mean_duration = mean_duration
+        self.speed = speed
+        self.bounce = bounce
+        self.bounce_window = bounce_window
+        self._replay = sorted(replay) if replay is not None else None
+        self._rng = random.Random(seed)
+        self._callback: Optional[EdgeCallback] = None
+        self._pins: set[int] = set()
+        self._levels: dict[int, int] = {}
+        # (simulated seconds, sequence, pin, level or None for an arrival)
+        self._heap: list[tuple[float, int, int, Optional[int]]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_real = time.monotonic()
+        self._start_ns = time.monotonic_ns()
+        self.edges = 0
+        self.activities = 0
+
+    @staticmethod
+    def replay_from_log(rows: Iterable[tuple]
+                        ) -> list[tuple[float, int, float]]:
+        """Convert activity_log rows into a replay.
+
+        Args
+        ----
+            rows (Iterable[tuple]): (timestamp, activity_pin, duration).
+
+        Returns
+        -------
+            list[tuple[float, int, float]]: (seconds after the first
+                                            activity, pin, duration).
+        """
+        rows = sorted(rows, key=lambda row: row[0])
+        if not rows:
+            return []
+        first = rows[0][0]
+        return [((ts - first).total_seconds(), pin, float(duration))
+                for ts, pin, duration in rows]
+
+    def now(self) -> float:
+        """Seconds on the simulated clock."""
+        if self.speed <= 0:
+            return self._heap[0][0] if self._heap else 0.0
+        return (time.monotonic() - self._start_real) * self.speed
+
+    def claim(self, pins: Iterable[int], callback: EdgeCallback) -> None:
+        """Start generating activity on pins."""
+        with self._lock:
+            self._callback = callback
+            now = self.now()
+            for pin in pins:
+                if pin in self._pins:
+                    continue
+                self._pins.add(pin)
+                self._levels.setdefault(pin, 0)
+                if self._replay is None:
+                    self._push(now + self._next_gap(), pin, None)
+                else:
+                    for offset, replay_pin, duration in self._replay:
+                        if replay_pin == pin:
+                            self._activity(pin, offset, duration)
+            logging.info("Simulating activity on pins %s", sorted(self._pins))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name="activity-simulator")
+            self._thread.start()
+        self._wake.set()
+
+    def release(self, pins: Iterable[int]) -> None:
+        """Stop generating activity on pins."""
+        with self._lock:
+            for pin in pins:
+                self._pins.discard(pin)
+                self._levels.pop(pin, None)
+
+    def read(self, pin: int) -> int:
+        """Return the simulated level of a pin."""
+        return self._levels.get(pin, 0)
+
+    def tick(self) -> int:
+        """Return the simulated clock in ns, as edge ticks are."""
+        return self._start_ns + int(self.now() * 1e9)
+
+    def close(self) -> None:
+        """Stop the generator thread."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and \
+                self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for a replay to run out of edges."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _push(self, at: float, pin: int, level: Optional[int]) -> None:
+        heapq.heappush(self._heap, (at, next(self._seq), pin, level))
+
+    def _next_gap(self) -> float:
+        if self.rate_per_hour <= 0:
+            return float("inf")
+        return self._rng.expovariate(self.rate_per_hour / 3600.0)
+
+    def _transition(self, pin: int, at: float, level: int) -> None:
+        """Queue a transition with its contact bounce."""
+        self._push(at, pin, level)
+        bounces = sorted(self._rng.uniform(0, self.bounce_window)
+                         for _ in range(2 * self.bounce))
+        for i, offset in enumerate(bounces):
+            self._push(at + offset, pin, level if i % 2 else 1 - level)
+
+    def _activity(self, pin: int, at: float, duration: float) -> None:
+        self._transition(pin, at, 1)
+        self._transition(pin, at + max(duration, self.MIN_DURATION), 0)
+
+    def _run(self) -> None:
+        """Report queued edges when they are due on the simulated clock."""
+        while not self._stop.is_set():
+            with self._lock:
+                if not self._heap or self._heap[0][0] == float("inf"):
+                    if self._replay is not None:
+                        break  # Replay finished
+                    due = None
+                else:
+                    at, _, pin, level = self._heap[0]
+                    delay = (0 if self.speed <= 0
+                             else (at - self.now()) / self.speed)
+                    due = delay <= 0
+                    if due:
+                        heapq.heappop(self._heap)
+            if due is None:
+                self._wake.wait(0.1)
+                self._wake.clear()
+                continue
+            if not due:
+                self._wake.wait(min(delay, 0.1))
+                self._wake.clear()
+                continue
+            self._emit(at, pin, level)
+
+    def _emit(self, at: float, pin: int, level: Optional[int]) -> None:
+        with self._lock:
+            if pin not in self._pins:
+                return
+            if level is None:
+                # An arrival, queue its edges and the next arrival
+                duration = self._rng.expovariate(1.0 / self.mean_duration)
+                self._activity(pin, at, duration)
+                self._push(at + max(duration, self.MIN_DURATION) +
+                           self.bounce_window + self._next_gap(), pin, None)
+                self.activities += 1
+                return
+            self._levels[pin] = level
+            self.edges += 1
+            callback = self._callback
+        if callback is not None:
+            callback(pin, level, self._start_ns + int(at * 1e9))
+
+
+def create_source(config) -> ActivitySource:
+    """Create the activity source named in the config.
+
+    Args
+    ----
+        config: ConfigLoader or its snapshot.
+
+    Returns
+    -------
+        ActivitySource: `SimulatedSource` for "simulated", otherwise
+                        `LgpioSource`.
+    """
+    if config.activity_source == "simulated":
+        logging.warning("Activity inputs are SIMULATED, GPIO is not read")
+        return SimulatedSource(
+            rate_per_hour=config.simulated_activity_rate,
+            speed=config.simulated_activity_speed)
+    if config.activity_source != "lgpio":
+        logging.error("Unknown activity_source %s, using lgpio",
+                      config.activity_source)
+    return LgpioSource()
@@ -13,15 +13,23 @@ import logging
 import datetime as dt
 import threading
 import time
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
 from enum import Enum
 
 import psycopg2
 from psycopg2 import sql
-import lgpio
 
 from lightlib.db import DB, ConfigLoader
+from lightlib.activity_source import ActivitySource, create_source
 from lightlib.common import valid_smallint, get_now
+from lightlib.tasks import TaskScheduler
+
+
+# Scheduler job checking for inputs stuck HIGH
+FAULT_CHECK_JOB = "activity-fault-check"
+
+# Counters reported by `Activity.stats`
+STAT_KEYS = ("edges", "activities", "db_writes", "db_write_seconds")
 
 
 class PinHealth(Enum):
@@ -50,6 +58,40 @@ class PinFaultHigh(Exception):
         )
 
 
+class PinState:
+    """Debounced state of one activity input.
+
+    Edges for a pin arrive on one callback thread, the fault check also
+    settles pins whose edges have stopped. Fields are replaced whole and
+    read without locking, which thread starts or ends an activity is
+    decided atomically through `Activity._high`.
+
+    Attributes
+    ----------
+        pin (int): GPIO pin number.
+        health (PinHealth): OK, or FAULT if HIGH for too long.
+        level (PinLevel): Debounced level.
+        changed_tick (int): Tick, in ns, `level` last changed at.
+        raw (int): Level of the last edge, 1 high 0 low.
+        raw_tick (int): Tick of the last edge.
+    """
+
+    __slots__ = ("pin", "health", "level", "changed_tick", "raw",
+                 "raw_tick")
+
+    def __init__(self, pin: int):
+        self.pin = pin
+        self.health = PinHealth.OK
+        self.level = PinLevel.LOW
+        self.changed_tick = 0
+        self.raw = 0
+        self.raw_tick = 0
+
+    def as_dict(self) -> Dict[str, Union[PinHealth, PinLevel]]:
+        """Return the pin's 'status' and 'state'."""
+        return {"status": self.health, "state": self.level}
+
+
 class Activity:
     """Class to monitor GPIO activity inputs.
 
@@ -57,6 +99,12 @@ class Activity:
     and detect excessive high duration for each input, updating pin statuses as
     OK or FAULT and current state as HIGH or LOW.
 
+    Edges are debounced as they arrive using their ticks: a change of level
+    is taken at once unless the last change was within the debounce time,
+    edges inside that time only update the raw level. A raw level left
+    different when the edges stop is taken once the debounce time has passed,
+    at the next edge or fault check. Nothing polls the inputs.
+
     Attributes
     ----------
         _db (DB): Database instance for logging activity events.
@@ -64,33 +112,45 @@ class Activity:
         _activity_inputs (List[int]): List of GPIO pins to
         monitor for activity.
 
-        _start_times (Dict[int, dt.datetime]): Dictionary to store start times
-                                               for each monitored GPIO pin.
+        _pins (Dict[int, PinState]): State of each monitored pin, the dict
+                                     is replaced, never changed, on reload.
 
-        _pin_status (Dict[int, Dict[str, Union[PinHealth, PinLevel]]]):
-            Dictionary mapping each GPIO pin to its current 'status'
-            (PinHealth.OK or .FAULT) and 'state' (PinLevel.HIGH or .LOW).
+        _high (Dict[PinState, tuple[int]]): Pins currently HIGH and the
+            tick they went HIGH at. `setdefault` and `pop` are atomic, so
+            one thread wins each start and end without a lock, and
+            `activity_detected` is a length check.
 
         _fault_threshold (float): Threshold in seconds for a high state
         duration considered faulty.
 
         _health_check_interval (float): Interval in seconds between each fault
                                         check cycle.
+
+        _source (ActivitySource): Where input edges come from, GPIO or a
+                                  simulator.
     """
 
     _instance = None
     _lock = threading.Lock()
 
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         """Ensure only one instance of Activity exists (Singleton pattern)."""
         with cls._lock:
             if cls._instance is None:
                 cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, source: Optional[ActivitySource] = None,
+                 pins: Optional[List[int]] = None):
         """Initialize class, set up db conn, GPIO & fault detection timer.
 
+        Args
+        ----
+            source (ActivitySource | None): Source of input edges, defaults
+                to the one named by `activity_source` in the config.
+            pins (List[int] | None): Pins to monitor, defaults to
+                `activity_digital_inputs`.
+
         Raises
         ------
             Exception: If GPIO setup or database connection fails.
@@ -100,155 +160,137 @@ class Activity:
         self._initialized = True
         # Load PostgreSQL connection settings
         self._db = DB("ACTIVITY_DB")
-        self._activity_inputs: List[int] = \
-            ConfigLoader().activity_digital_inputs
-        self._start_times: Dict[int, float] = {}
-        # Track status and state of each pin
-        self._pin_status: Dict[int, Dict[str, Union[PinHealth, PinLevel]]] = {
-            pin: {"status": PinHealth.OK, "state": PinLevel.LOW}
-            for pin in self._activity_inputs}
-        # Track current raw level and debounce timers
-        self._debounce_levels: Dict[int, int] = {
-            pin: 0 for pin in self._activity_inputs}
-        self._debounce_timers: Dict[int, float] = {
-            pin: get_now().timestamp()
-            for pin in self._activity_inputs}
-        self._gpio_handle = lgpio.gpiochip_open(0)
-        self._setup_activity_inputs()
-        self._fault_threshold = ConfigLoader().max_activity_time
-        self._health_check_interval = ConfigLoader().health_check_interval
+        # Held snapshot, read on every edge and replaced on [IO] reloads
+        self._config = ConfigLoader().snapshot
+        self._activity_inputs: List[int] = list(
+            self._config.activity_digital_inputs if pins is None else pins)
+        self._pins: Dict[int, PinState] = {
+            pin: PinState(pin) for pin in self._activity_inputs}
+        self._high: Dict[PinState, tuple[int]] = {}
+        self._debounce_ns = int(self._config.activity_debounce_s * 1e9)
+        # Counters for load tests by thread, each thread only updates its
+        # own and `stats` adds them up
+        self._stats: Dict[int, Dict[str, Union[int, float]]] = {}
+        self._fault_threshold = self._config.max_activity_time
+        self._health_check_interval = self._config.health_check_interval
+        self._source = source if source is not None \
+            else create_source(self._config)
         self._start_fault_detection()  # Start periodic fault checking
+        ConfigLoader().subscribe(self._on_io_config, sections=("IO",))
+        # Edges can arrive as soon as the pins are claimed, so everything
+        # the edge handlers use must be set up first
+        self._setup_activity_inputs()
 
-    def _setup_activity_inputs(self) -> None:
+    def _setup_activity_inputs(self, pins: List[int] = None) -> None:
         """
         Set up GPIO for monitoring activity on specified pins.
 
-        Configures each GPIO pin to trigger `_start_activity_event` on a
-        low-to-high transition (RISING edge) and `_end_activity_event` on a
-        high-to-low transition (FALLING edge).
+        Edges on each pin are debounced by `_on_edge`, which calls
+        `_start_activity_event` when the pin goes HIGH and
+        `_end_activity_event` when it goes LOW.
+
+        Args
+        ----
+            pins (List[int]): Pins to set up, defaults to all activity inputs.
         """
-        logging.info("Setting up activity monitoring on pins %s",
-                     self._activity_inputs)
-        for pin in self._activity_inputs:
-            try:
-                lgpio.gpio_claim_input(self._gpio_handle, pin,
-                                       lgpio.SET_PULL_DOWN)
-                logging.debug("GPIO pin %s setup as INPUT, PULL DOWN", pin)
-                # Detect rising edge to mark start of activity
-                logging.debug("Adding edge detection to pin %s", pin)
-                logging.debug("pin is type %s", type(pin))
-                # Register callbacks for both rising and falling edges
-                lgpio.callback(self._gpio_handle, pin, lgpio.BOTH_EDGES,
-                               self._activity_event_handler)
-                logging.info(
-                    "Activity monitoring initialized on GPIO pin: %s", pin)
-
-            except RuntimeError as e:
-                logging.error("Failed to set edge detection for pin %s: %s",
-                              pin, e)
-
-    def update(self):
-        """Poll GPIO inputs for changes if edge detection is unavailable.
-
-        Continuously poll inputs within this call to achieve debounce timing
-        independently of the outer light_loop() call rate. Exits early if all
-        inputs remain stable during a polling cycle.
+        pins = self._activity_inputs if pins is None else pins
+        logging.info("Setting up activity monitoring on pins %s", pins)
+        self._source.claim(pins, self._on_edge)
+
+    def _release_activity_inputs(self, pins: List[int]) -> None:
+        """Stop monitoring pins and return them to the source."""
+        self._source.release(pins)
+
+    def _on_io_config(self, changes: Dict[str, set]) -> None:
+        """Apply a reloaded [IO] configuration without stopping monitoring.
+
+        Pins that are still configured keep their state and callbacks, only
+        removed pins are released and added pins claimed.
         """
-        debounce_time = ConfigLoader().activity_debounce_s
-        debounce_interval = 0.005  # 5ms
-        start_time = time.monotonic()
-        end_time = start_time + debounce_time
-        loop_start = start_time
-
-        while True:
-            now = time.monotonic()
-            if now >= end_time:
-                break
-
-            any_unstable = False
-            for pin in self._activity_inputs:
-                try:
-                    current_level = lgpio.gpio_read(self._gpio_handle, pin)
-                    last_stable_level = self._pin_status[pin]["state"]
-
-                    current_level_enum = PinLevel.HIGH if current_level\
-                        else PinLevel.LOW
-
-                    if current_level_enum != last_stable_level:
-                        any_unstable = True
-
-                        if current_level != self._debounce_levels[pin]:
-                            # Level changed again, reset debounce timer
-                            self._debounce_timers[pin] = now
-                            self._debounce_levels[pin] = current_level
-                        else:
-                            if now - self._debounce_timers[pin] >= \
-                                    debounce_time:
-                                # Level has been stable (state is updated
-                                # by _activity_event_handler)
-                                self._activity_event_handler(
-                                    self._gpio_handle, pin, current_level, 0)
-                except Exception as e:
-                    logging.error("Polling error on GPIO pin %s: %s", pin, e)
-
-            if not any_unstable:
-                break  # Exit early if all pins are stable
-
-            if now - loop_start >= 3:
-                logging.error("Activity pin inputs unstable: "
-                              "Cannot accurately determine status")
-                break  # Optional: stop if bouncing too long
-
-            time.sleep(debounce_interval)
-
-    def _activity_event_handler(
-            self, chip: int, pin: int, level: int, tick: int) -> None:
-        """Direct Rising & Falling events to the correct method.
-
-        Each GPIO pin is only permitted to have one event handler registered
-        (GPIO Limitation). As both rising and falling events are required,
-        activity pins register both rising and falling edge callbacks using
-        lgpio.callback() in _setup_activity_inputs.
-
-        Either a rising or falling edge directs execution here where the
-        decision is made on what action to take.
+        self._config = ConfigLoader().snapshot
+        self._fault_threshold = self._config.max_activity_time
+        self._health_check_interval = self._config.health_check_interval
+        self._debounce_ns = int(self._config.activity_debounce_s * 1e9)
+        if "activity_digital_inputs" not in changes.get("IO", ()):
+            return
+
+        new_inputs = list(self._config.activity_digital_inputs)
+        removed = [p for p in self._activity_inputs if p not in new_inputs]
+        added = [p for p in new_inputs if p not in self._activity_inputs]
+        self._release_activity_inputs(removed)
+
+        # Build the new state before swapping it in, callbacks on the pins
+        # that are kept run throughout
+        old = self._pins
+        self._pins = {pin: old.get(pin) or PinState(pin)
+                      for pin in new_inputs}
+        for pin in removed:
+            self._high.pop(old[pin], None)
+        self._activity_inputs = new_inputs
+        if added:
+            self._setup_activity_inputs(added)
+
+    def _on_edge(self, pin: int, level: int, tick: int) -> None:
+        """Debounce an edge reported by the source.
+
+        Args
+        ----
+            pin (int): The GPIO pin number.
+            level (int): Level after the edge, 1 high 0 low.
+            tick (int): Time of the edge in nanoseconds.
+        """
+        state = self._pins.get(pin)
+        if state is None:
+            return  # Released while the edge was in flight
+        self._thread_stats()["edges"] += 1
+        self._settle(state, tick)  # The level up to this edge
+        state.raw, state.raw_tick = level, tick
+        self._settle(state, tick)
+
+    def _settle(self, state: PinState, tick: int) -> None:
+        """Take the raw level of a pin if it has held long enough.
+
+        A raw level different from the debounced level is taken once the
+        debounce time since the last change has passed, at the later of the
+        edge that set it and the end of the debounce time.
 
         Args
         ----
-            chip : int
-                The GPIO chip descriptor (usually 0).
-            gpio : int
-                The GPIO pin number.
-            level : int
-                Edge level: 1 = rising, 0 = falling.
-            tick : int
-                Timestamp in microseconds (unused).
+            state (PinState): The pin.
+            tick (int): Current time in nanoseconds.
         """
-        logging.debug("Activity detection state changed pin %i", pin)
-        if level == 1:    # High after Risng edge
-            self._start_activity_event(pin)
-        elif level == 0:  # Low after Falling edge
-            self._end_activity_event(pin)
+        if state.raw == (state in self._high):
+            return
+        at = max(state.raw_tick, state.changed_tick + self._debounce_ns)
+        if tick < at:
+            return
+        logging.debug("Activity detection state changed pin %i", state.pin)
+        if state.raw:
+            self._start_activity_event(state.pin, at)
+        else:
+            self._end_activity_event(state.pin, at)
 
-    def _start_activity_event(self, pin: int) -> None:
+    def _start_activity_event(self, pin: int, tick: int) -> None:
         """Record start time and set pin state HIGH for GPIO pin high.
 
         Args
         ----
-            pin (int): The GPIO pin that triggered the rising edge event.
+            pin (int): The GPIO pin that went high.
+            tick (int): Time it went high in nanoseconds.
         """
-        # Record start time
-        self._start_times[pin] = time.monotonic()
-        self._pin_status[pin]["status"] = PinHealth.OK  # Set status to OK
-        self._pin_status[pin]["state"] = PinLevel.HIGH  # Set state to HIGH
-        logging.info(
-            f"Activity started on pin {pin} at {self._start_times[pin]}"
-        )
+        state = self._pins[pin]
+        started = (tick,)
+        if self._high.setdefault(state, started) is not started:
+            return  # Started by another thread
+        state.changed_tick = tick
+        state.health = PinHealth.OK  # Set status to OK
+        state.level = PinLevel.HIGH  # Set state to HIGH
+        self._thread_stats()["activities"] += 1
+        logging.info("Activity started on pin %i at tick %i", pin, tick)
         logging.debug("Pin %i: Status = %s, State = %s", pin,
-                      self._pin_status[pin]["status"].name,
-                      self._pin_status[pin]["state"].name)
+                      state.health.name, state.level.name)
 
-    def _end_activity_event(self, pin: int) -> None:
+    def _end_activity_event(self, pin: int, tick: int) -> None:
         """Log activity to DB.
 
         Log an activity event to the database with date, time, and duration
@@ -257,25 +299,27 @@ class Activity:
 
         Args
         ----
-            pin (int): The GPIO pin that triggered the falling edge event.
+            pin (int): The GPIO pin that went low.
+            tick (int): Time it went low in nanoseconds.
 
         Raises
         ------
             psycopg2.DatabaseError: If there is an error executing the database
                                     query.
         """
-        if (self._pin_status[pin]["status"] == PinHealth.FAULT):
+        state = self._pins[pin]
+        if state.health is PinHealth.FAULT:
             logging.warning("Pin %i fault cleared", pin)
-        self._pin_status[pin]["status"] = PinHealth.OK  # Reset status to OK
-        self._pin_status[pin]["state"] = PinLevel.LOW  # Set state to LOW
-        start_time = self._start_times.pop(pin, None)  # Retrieve start time
-        if start_time is None:
+        started = self._high.pop(state, None)
+        state.changed_tick = tick
+        state.health = PinHealth.OK  # Reset status to OK
+        state.level = PinLevel.LOW  # Set state to LOW
+        if started is None:
             logging.warning(
                 f"No start time found for pin {pin}, skipping log.")
             return
         try:
-            end_time = time.monotonic()
-            duration = int(end_time - start_time)
+            duration = int((tick - started[0]) / 1e9)
             valid_smallint(duration)
             if duration > self._fault_threshold:
                 logging.warning(
@@ -302,43 +346,57 @@ class Activity:
         )
 
         try:
+            write_start = time.perf_counter()
             self._db.query(
                 query=insert_query,
                 params=(start_time, day_of_week, month, year, pin, duration)
             )
-            logging.info("Activity ended on pin %i, end tick:%.2f\n"
+            counters = self._thread_stats()
+            counters["db_write_seconds"] += time.perf_counter() - write_start
+            counters["db_writes"] += 1
+            logging.info("Activity ended on pin %i, end tick:%i\n"
                          "\tbeginning at\t%s\n\tduration of\t%i seconds",
-                         pin, end_time, start_time, duration)
+                         pin, tick, start_time, duration)
         except psycopg2.DatabaseError as e:
             logging.error(
                 "Failed to log activity event for pin %s: %s", pin, e)
 
     def _run_fault_check_cycle(self) -> None:
-        """Run one fault detection cycle."""
-        for pin, start_time in list(self._start_times.items()):
-            duration = time.monotonic() - start_time
-            if duration > self._fault_threshold and \
-                    self._pin_status[pin]["state"] == PinLevel.HIGH:
-                self._pin_status[pin]["status"] = PinHealth.FAULT
+        """Run one fault detection cycle.
+
+        Also takes raw levels left pending when a pin's edges stopped inside
+        the debounce time, and drops pins released mid edge from `_high`.
+        """
+        now = self._source.tick()
+        pins = self._pins
+        for state in pins.values():
+            if now - state.raw_tick >= self._debounce_ns:
+                self._settle(state, now)
+        for state, (start_tick,) in self._high.copy().items():
+            if pins.get(state.pin) is not state:
+                self._high.pop(state, None)
+                continue
+            duration = (now - start_tick) / 1e9
+            if duration > self._fault_threshold:
+                state.health = PinHealth.FAULT
                 logging.warning(
                     "Pin %i set to FAULT status, HIGH for %i seconds ",
-                    pin, duration)
+                    state.pin, duration)
             else:
-                self._pin_status[pin]["status"] = PinHealth.OK  # Set OK
+                state.health = PinHealth.OK  # Set OK
 
     def _start_fault_detection(self) -> None:
         """Periodic fault check.
 
         Start a periodic check to detect if any monitored input has remained
-        high beyond the fault threshold.
+        high beyond the fault threshold. The interval is read after each
+        check, so a reloaded `health_check_interval` applies to the next.
         """
-        def fault_check():
-            self._run_fault_check_cycle()
-            t = threading.Timer(self._health_check_interval, fault_check)
-            t.daemon = True
-            t.start()  # Re-run check
-
-        fault_check()
+        self._run_fault_check_cycle()
+        TaskScheduler().every(FAULT_CHECK_JOB,
+                              self._run_fault_check_cycle,
+                              lambda: self._health_check_interval,
+                              delay=self._health_check_interval)
 
     def get_pin_status(self, pin: int) -> Dict[str, PinHealth]:
         """Retrieve the current status and state of a specific GPIO pin.
@@ -351,9 +409,10 @@ class Activity:
         -------
             Dict[str, PinHealth]: The 'status' and 'state' of the pin.
         """
-        return self._pin_status.get(
-            pin, {"status": PinHealth.FAULT, "state": PinLevel.LOW}
-        )
+        state = self._pins.get(pin)
+        if state is None:
+            return {"status": PinHealth.FAULT, "state": PinLevel.LOW}
+        return state.as_dict()
 
     def get_all_pin_statuses(self) -> Dict[int, Dict[str, Union[PinHealth,
                                                                 PinLevel]]]:
@@ -365,7 +424,7 @@ class Activity:
                 Dictionary with pin numbers as keys and dictionaries containing
                 'status' and 'state' keys with PinHealth & PinLevel values.
         """
-        return self._pin_status
+        return {pin: state.as_dict() for pin, state in self._pins.items()}
 
     def activity_detected(self) -> bool:
         """Return True if any activity input is currently HIGH.
@@ -374,10 +433,25 @@ class Activity:
         -------
             Bool: True if activity is detected.
         """
-        return any(
-            status["state"] == PinLevel.HIGH
-            for status in self._pin_status.values()
-        )
+        return len(self._high) != 0
+
+    @property
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Dict: edges, activities, db_writes and db_write_seconds so far."""
+        totals = dict.fromkeys(STAT_KEYS, 0)
+        for counters in list(self._stats.values()):
+            for key in STAT_KEYS:
+                totals[key] += counters[key]
+        return totals
+
+    def _thread_stats(self) -> Dict[str, Union[int, float]]:
+        """Return the calling thread's counters, creating them if needed."""
+        ident = threading.get_ident()
+        counters = self._stats.get(ident)
+        if counters is None:
+            counters = self._stats.setdefault(ident,
+                                              dict.fromkeys(STAT_KEYS, 0))
+        return counters
 
     def should_lights_be_on(self) -> bool:
         """Return True if activity is current and lights should be on.
@@ -397,11 +471,7 @@ class Activity:
                 "Database connection closed and GPIO cleanup completed.")
 
     def cleanup(self):
-        """Clean up GPIO activity pins."""
-        try:
-            if hasattr(self, "_gpio_handle") and self._gpio_handle is not None:
-                lgpio.gpiochip_close(self._gpio_handle)
-                logging.info("Activity GPIO cleanup complete.")
-                self._gpio_handle = None
-        except lgpio.error as e:
-            logging.warning("Activity GPIO cleanup failed: %s", e)
+        """Stop the fault check and clean up GPIO activity pins."""
+        TaskScheduler().cancel(FAULT_CHECK_JOB)
+        if getattr(self, "_source", None) is not None:
+            self._source.close()
@@ -4,7 +4,9 @@ Copyright (c) 2025 Will Bickerstaff
 Licensed under the MIT License.
 See LICENSE file in the root directory of this project.
 
-Description: Command line option handling.
+Description: Command line option handling. Subcommands import what they
+             need when they run, so `--help` and the normal startup don't
+             pay for LightGBM, pandas etc. before they are used.
 Author: Will Bickerstaff
 Version: 0.1
 """
@@ -14,7 +16,6 @@ import logging
 import traceback
 import time
 import datetime as dt
-from scheduler.Schedule import LightScheduler
 from .exceptions import ExitAfter
 from .common import sec_to_hms_str
 
@@ -35,6 +36,53 @@ def parse_args():
                         help="Regenerate past schedules using all data upto"
                         "N days back. Default will back fill to the earliest"
                         "activity record")
+    parser.add_argument('--tune', nargs="?", const=0, type=int,
+                        default=None,
+                        help="Search for the best model hyperparameters and "
+                        "save them for training. Optionally evaluate N random"
+                        " samples of the grid instead of the full grid.")
+    parser.add_argument('--tune-workers', type=int, default=None,
+                        help="Worker processes used by --tune "
+                        "(default: all CPUs).")
+    parser.add_argument('--benchmark', nargs="?", const=7, type=int,
+                        default=None,
+                        help="Benchmark every feature set by replaying the "
+                        "last N days (default 7) and exit.")
+    parser.add_argument('--benchmark-report', type=str,
+                        default="feature_benchmark.json",
+                        help="JSON report file written by --benchmark.")
+    parser.add_argument('--benchmark-cache', type=str, default=None,
+                        help="Cache prepared feature data in this file so "
+                        "repeated benchmarks skip the DB queries.")
+    parser.add_argument('--gps-record', nargs="?", const=120, type=float,
+                        default=None,
+                        help="Power on the GPS, record N seconds (default "
+                        "120) of its output to --gps-capture and exit.")
+    parser.add_argument('--gps-replay', action="store_true",
+                        help="Replay --gps-capture through a GPS fix, report "
+                        "sentences/s, time to fix and CPU per fix and exit.")
+    parser.add_argument('--gps-capture', type=str,
+                        default="gps_capture.gz",
+                        help="NMEA capture file for --gps-record and "
+                        "--gps-replay.")
+    parser.add_argument('--replay-realtime', action="store_true",
+                        help="Replay at the recorded speed instead of as "
+                        "fast as possible.")
+    parser.add_argument('--replay-suntimes', action="store_true",
+                        help="Replay through the full SunTimes fix path, "
+                        "updating the persistent data from the capture.")
+    parser.add_argument('--simulate-activity', nargs="?", const=60,
+                        type=float, default=None,
+                        help="Drive activity capture from simulated inputs "
+                        "for N real seconds (default 60), report the load "
+                        "and exit. Activity is written to the configured "
+                        "activity database.")
+    parser.add_argument('--simulate-speed', type=float, default=100,
+                        help="Simulated seconds per real second for "
+                        "--simulate-activity (default 100).")
+    parser.add_argument('--simulate-pins', type=int, default=None,
+                        help="Simulate N inputs instead of the configured "
+                        "activity_digital_inputs.")
     return parser.parse_args()
 
 
@@ -42,6 +90,7 @@ def arg_handler(args: argparse.Namespace) -> None:
     """Handle passed cli options."""
     if args.retrain:
         logging.info("Manual model retraining triggered via CLI.")
+        from scheduler.Schedule import LightScheduler
         scheduler = LightScheduler()
         scheduler.update_daily_schedule()
         logging.info("Model retraining and schedule generation complete.")
@@ -55,6 +104,32 @@ def arg_handler(args: argparse.Namespace) -> None:
         backfill_schedules(backfill_days=args.backfill)
         raise ExitAfter()
 
+    if args.tune is not None:
+        tune_model(trials=args.tune, workers=args.tune_workers)
+        raise ExitAfter()
+
+    if args.benchmark is not None:
+        benchmark_feature_sets(replay_days=args.benchmark,
+                               report_path=args.benchmark_report,
+                               cache_path=args.benchmark_cache)
+        raise ExitAfter()
+
+    if args.gps_record is not None:
+        from shelterGPS import replay
+        replay.record_capture(args.gps_capture, args.gps_record)
+        print(f"GPS output recorded to {args.gps_capture}")
+        raise ExitAfter()
+
+    if args.gps_replay:
+        replay_gps_capture(args.gps_capture, realtime=args.replay_realtime,
+                           suntimes=args.replay_suntimes)
+        raise ExitAfter()
+
+    if args.simulate_activity is not None:
+        simulate_activity(args.simulate_activity, speed=args.simulate_speed,
+                          pin_count=args.simulate_pins)
+        raise ExitAfter()
+
 
 def re_eval_history(force: bool = False):
     """Re-evaluate schedules and exit."""
@@ -76,6 +151,7 @@ def re_eval_history(force: bool = False):
 def backfill_schedules(backfill_days=-1):
     """Backfill schedules using 30 days activity data."""
     from lightlib.db import DB
+    from scheduler.Schedule import LightScheduler
     db = DB()
     scheduler = LightScheduler()
     scheduler.set_db_connection(db)
@@ -131,6 +207,148 @@ def backfill_schedules(backfill_days=-1):
     print("Historic schedule generation complete")
 
 
+def tune_model(trials: int = 0, workers: int = None):
+    """Run the hyperparameter search and persist the best parameters."""
+    from lightlib.db import DB
+    from lightlib.config import ConfigLoader
+    from scheduler import tuning
+    from scheduler.Schedule import LightScheduler
+
+    db = DB()
+    scheduler = LightScheduler()
+    scheduler.set_db_connection(db)
+    model = scheduler.model_engine
+
+    print("Preparing training data...", flush=True)
+    prepared = tuning.prepare_training_matrix(
+        model, ConfigLoader().training_days_history)
+    if prepared is None:
+        print("No training data available, nothing to tune")
+        return
+    x, y, _ = prepared
+
+    candidates = tuning.sample_grid(tuning.DEFAULT_SEARCH_SPACE, trials)
+    print(f"Evaluating {len(candidates)} parameter sets on {len(y)} "
+          "intervals...", flush=True)
+    search = tuning.HyperparameterSearch(
+        x, y, model.training_params(),
+        boost_rounds=max(ConfigLoader().model_boost_rounds, 100),
+        early_stopping_rounds=ConfigLoader().early_stopping_rounds,
+        on_boost=model.on_boost)
+    best = search.run(candidates, workers=workers)
+    if best is None:
+        print("No parameter set could be scored, nothing saved")
+        return
+
+    tuning.save_tuned_params(ConfigLoader().tuned_params_file, best,
+                             model.feature_set)
+    print(f"Best AUC {best['score']:.4f} with {best['params']}, saved to "
+          f"{ConfigLoader().tuned_params_file}")
+
+
+def benchmark_feature_sets(replay_days: int = 7,
+                           report_path: str = "feature_benchmark.json",
+                           cache_path: str = None):
+    """Benchmark all feature sets over replayed history and write a report."""
+    from lightlib.db import DB
+    from lightlib.config import ConfigLoader
+    from scheduler import benchmark
+    from scheduler.feature_sets import FeatureSet
+    from scheduler.Schedule import LightScheduler
+
+    db = DB()
+    scheduler = LightScheduler()
+    scheduler.set_db_connection(db)
+    model = scheduler.model_engine
+
+    feature_sets = benchmark.BENCHMARK_SETS
+    if model.feature_set == FeatureSet.CUSTOM:
+        feature_sets += (FeatureSet.CUSTOM,)
+
+    print("Preparing feature data...", flush=True)
+    prepared = benchmark.prepare_feature_frame(
+        model, ConfigLoader().training_days_history, cache_path,
+        feature_sets)
+    if prepared is None:
+        print("No training data available, nothing to benchmark")
+        return
+    df, df_schedules = prepared
+
+    on_boost = ConfigLoader().ON_boost if ConfigLoader().boost_enable \
+        else None
+    bench = benchmark.FeatureSetBenchmark(
+        df, model.model_params, model.interval_minutes,
+        boost_rounds=ConfigLoader().model_boost_rounds,
+        threshold=model.min_confidence, on_boost=on_boost,
+        schedules=df_schedules)
+    report = bench.run(replay_days=replay_days, feature_sets=feature_sets)
+    benchmark.write_report(report, report_path)
+
+    print(f"{'Feature set':<15}{'Precision':>10}{'Recall':>8}"
+          f"{'On min/day':>12}{'Build s':>9}{'Train s':>9}{'Infer s':>9}")
+    for name, res in report["feature_sets"].items():
+        def fmt(v, spec):
+            return format(v, spec) if v is not None else "n/a"
+        print(f"{name:<15}{fmt(res['precision'], '.3f'):>10}"
+              f"{fmt(res['recall'], '.3f'):>8}"
+              f"{fmt(res['on_minutes_per_day'], '.0f'):>12}"
+              f"{fmt(res['build_seconds'], '.2f'):>9}"
+              f"{fmt(res['train_seconds_mean'], '.2f'):>9}"
+              f"{fmt(res['infer_seconds_mean'], '.4f'):>9}")
+    print(f"Report written to {report_path}")
+
+
+def replay_gps_capture(path: str, realtime: bool = False,
+                       suntimes: bool = False):
+    """Replay an NMEA capture through a GPS fix and print the report."""
+    from shelterGPS import replay
+
+    if suntimes:
+        report = replay.replay_sun_times(path, realtime=realtime)
+    else:
+        report = replay.replay_fix(path, realtime=realtime)
+    ttf = report["time_to_fix"]
+    rate = report["sentences_per_sec"]
+    print(f"Capture:        {path} ({report['mode']})")
+    print(f"Fixed:          {report['fixed']}")
+    print(f"Time to fix:    {f'{ttf:.1f}s' if ttf is not None else 'n/a'}")
+    print(f"Sentences:      {report['sentences']} "
+          f"({f'{rate:.0f}/s' if rate else 'n/a'})")
+    print(f"CPU per fix:    {report['cpu_seconds']:.3f}s")
+
+
+def simulate_activity(seconds: float, speed: float = 100,
+                      pin_count: int = None):
+    """Run activity capture on simulated inputs and print the load."""
+    from lightlib.activitydb import Activity
+    from lightlib.activity_source import SimulatedSource
+    from lightlib.config import ConfigLoader
+
+    config = ConfigLoader()
+    pins = None if pin_count is None else list(range(pin_count))
+    source = SimulatedSource(rate_per_hour=config.simulated_activity_rate,
+                             speed=speed)
+    activity = Activity(source=source, pins=pins)
+    start = time.monotonic()
+    cpu_start = time.process_time()
+    while time.monotonic() - start < seconds:
+        activity.activity_detected()
+        time.sleep(0.01)
+    activity.cleanup()
+    elapsed = time.monotonic() - start
+    cpu = time.process_time() - cpu_start
+    stats = activity.stats
+    writes = stats["db_writes"]
+    per_write = stats["db_write_seconds"] / writes * 1000 if writes else 0
+    print(f"Simulated:      {elapsed * speed / 3600:.1f}h on "
+          f"{len(activity.get_all_pin_statuses())} inputs in {elapsed:.0f}s")
+    print(f"Edges:          {stats['edges']} "
+          f"({stats['edges'] / elapsed:.0f}/s)")
+    print(f"Activities:     {stats['activities']}")
+    print(f"DB writes:      {writes} ({per_write:.1f}ms each)")
+    print(f"CPU:            {cpu:.2f}s ({cpu / elapsed:.0%})")
+
+
 def has_schedule_for_date(db, date):
     """Check for a schedule on a date."""
     with db.conn.cursor() as cur:
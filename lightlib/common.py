@@ -9,6 +9,8 @@ Author: Will Bickerstaff
 Version: 0.1
 """
 
+import os
+import resource
 import datetime as dt
 import RPi.GPIO as GPIO
 import logging
@@ -160,3 +162,35 @@ def valid_smallint(value):
         return True
     else:
         raise ValueError
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (0.0 if unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            rss_pages = int(f.read().split()[1])
+        return rss_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size in MB since start or `reset_peak_rss`."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    # ru_maxrss is reported in KB on Linux and can't be reset
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def reset_peak_rss() -> None:
+    """Reset the peak RSS high water mark (Linux only, best effort)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
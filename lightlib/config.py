@@ -10,7 +10,9 @@ Version: 0.1
 """
 
 import logging
+import threading
 import configparser
+from typing import Callable, Iterable, NamedTuple, Optional
 from lightlib.common import valid_smallint
 from scheduler.feature_sets import FeatureSet
 from shelterGPS.common import SolarEvent
@@ -22,6 +24,213 @@ class ConfigNotLoaded(Exception):
     pass
 
 
+def convert_value(raw_value, specified_type: type, accepts_list: bool):
+    """Convert a raw value to type, handling lists if needed.
+
+    Args
+    ----
+        raw_value (str): The raw value from the configuration file.
+        specified_type (type): The expected type of the value (int, float,
+                               str, bool).
+        accepts_list (bool): Whether the value should be parsed as a list.
+
+    Returns
+    -------
+        The converted value, either as a single value or a list.
+
+    Raises
+    ------
+        ValueError: If the value can't be converted to the type.
+    """
+    # If the value is expected to be a list and accepts_list is True
+    if accepts_list:
+        return [convert_value(item.strip(), specified_type, False)
+                for item in str(raw_value).strip('"').split(",")
+                if item.strip()]
+
+    # Apply type conversion based on specified type
+    if specified_type == int:
+        return int(raw_value)
+    elif specified_type == float:
+        return float(raw_value)
+    elif specified_type == str:
+        str_val = str(raw_value)
+        if str_val.startswith('"') and str_val.endswith('"'):
+            return str(raw_value[1:-1])
+        return str_val
+    elif specified_type == bool:
+        return str(raw_value).lower() in ("true", "1", "yes", "on")
+
+    return raw_value
+
+
+class OptionSpec(NamedTuple):
+    """One option of the config schema, with its default converted."""
+
+    section: str
+    option: str
+    type: type
+    accepts_list: bool
+    is_pin: bool
+    raw_default: object
+    default: object
+
+
+class CompiledConfig:
+    """Every option of a config file converted and validated in one pass.
+
+    Args
+    ----
+        parser (ConfigParser): The parsed file the values were read from.
+        source (str | None): Where the file came from, used in the report.
+    """
+
+    __slots__ = ("parser", "source", "values", "errors", "warnings")
+
+    def __init__(self, parser: configparser.ConfigParser,
+                 source: Optional[str] = None):
+        self.parser = parser
+        self.source = source
+        # Typed value of every schema option keyed by (section, option)
+        self.values: dict[tuple[str, str], object] = {}
+        # Problems that make the file unusable
+        self.errors: list[str] = []
+        # Problems the defaults were used for
+        self.warnings: list[str] = []
+
+    @property
+    def valid(self) -> bool:
+        """bool: True if the file can be used as the configuration."""
+        return not self.errors
+
+    def __getitem__(self, key: tuple[str, str]):
+        """Return the typed value of a (section, option)."""
+        return self.values[key]
+
+    def log_report(self) -> None:
+        """Log every warning and error found in one entry each."""
+        source = self.source or "config"
+        if self.warnings:
+            logging.warning("CONFIG: %s, defaults used for %d problem(s):"
+                            "\n\t%s", source, len(self.warnings),
+                            "\n\t".join(self.warnings))
+        if self.errors:
+            logging.error("CONFIG: %s is invalid, %d error(s):\n\t%s",
+                          source, len(self.errors),
+                          "\n\t".join(self.errors))
+
+
+class ConfigSchema:
+    """Option specifications compiled once from a `_FALLBACK_VALUES` dict.
+
+    Converting a parsed config file with `compile` validates the required
+    sections, converts every option and checks GPIO pins are unique in a
+    single pass, so values never have to be looked up or parsed again.
+
+    Args
+    ----
+        spec (dict): {section: {option: {"value", "type", "is_pin",
+                     "accepts_list"}}}.
+
+    Raises
+    ------
+        ValueError: If an option's spec has unknown keys or a default that
+                    can't be converted to its type.
+    """
+
+    _SPEC_KEYS = frozenset({"value", "type", "is_pin", "accepts_list"})
+
+    def __init__(self, spec: dict):
+        self.sections: tuple[str, ...] = tuple(spec)
+        self.options: dict[tuple[str, str], OptionSpec] = {}
+        for section, options in spec.items():
+            for option, details in options.items():
+                unknown = set(details) - self._SPEC_KEYS
+                if unknown:
+                    raise ValueError(f"Unknown keys {sorted(unknown)} in the "
+                                     f"spec of {section}.{option}")
+                specified_type = details.get("type", str)
+                accepts_list = details.get("accepts_list", False)
+                self.options[(section, option)] = OptionSpec(
+                    section, option, specified_type, accepts_list,
+                    details.get("is_pin", False), details["value"],
+                    convert_value(details["value"], specified_type,
+                                  accepts_list))
+
+    def defaults(self) -> CompiledConfig:
+        """Return the default configuration, with a matching parser."""
+        parser = configparser.ConfigParser()
+        parser.read_dict({section: {} for section in self.sections})
+        for (section, option), spec in self.options.items():
+            default = spec.default
+            parser.set(section, option, ", ".join(map(str, default))
+                       if spec.accepts_list else str(default))
+        return self.compile(parser, source="defaults")
+
+    def value(self, config: configparser.ConfigParser, section: str,
+              option: str):
+        """Convert one option of a config, the default if it's invalid."""
+        spec = self.options[(section, option)]
+        raw_value = config.get(section, option, fallback=None)
+        if raw_value is None:
+            return spec.default
+        try:
+            return convert_value(raw_value, spec.type, spec.accepts_list)
+        except ValueError:
+            return spec.default
+
+    def compile(self, config: configparser.ConfigParser,
+                source: Optional[str] = None) -> CompiledConfig:
+        """Validate and convert every option of a parsed config.
+
+        Missing sections and GPIO pins assigned more than once are errors.
+        Options that are missing or can't be converted use their default,
+        invalid ones are reported as warnings. Everything found is collected
+        rather than stopping at the first problem.
+
+        Args
+        ----
+            config (ConfigParser): The parsed config file.
+            source (str | None): Where the file came from, for the report.
+
+        Returns
+        -------
+            CompiledConfig: The typed values and the problems found.
+        """
+        compiled = CompiledConfig(config, source)
+        for section in self.sections:
+            if section not in config:
+                compiled.errors.append(
+                    f"required section is missing: [{section}]")
+            elif not config.items(section):
+                compiled.warnings.append(f"[{section}] contains no values")
+
+        pins_used: dict[int, str] = {}
+        for key, spec in self.options.items():
+            name = f"{spec.section}.{spec.option}"
+            raw_value = config.get(spec.section, spec.option, fallback=None)
+            value = spec.default
+            if raw_value is not None:
+                try:
+                    value = convert_value(raw_value, spec.type,
+                                          spec.accepts_list)
+                except ValueError as e:
+                    compiled.warnings.append(
+                        f"{name} = {raw_value!r} is invalid ({e}), using "
+                        f"{spec.default!r}")
+            compiled.values[key] = value
+
+            if spec.is_pin:
+                for pin in value if spec.accepts_list else (value,):
+                    if pin in pins_used:
+                        compiled.errors.append(
+                            f"pin {pin} is assigned to both "
+                            f"{pins_used[pin]} and {name}")
+                    else:
+                        pins_used[pin] = name
+        return compiled
+
+
 class ConfigLoader:
     """Singleton-based configuration loader for managing system configurations.
 
@@ -31,6 +240,9 @@ class ConfigLoader:
     """
 
     _instance = None
+    # Sections whose options are read from the config on every use, a change
+    # to them takes effect without any component being notified
+    _LIVE_SECTIONS = frozenset({"FIX_WINDOW", "SYNTHETIC_DAYS", "FALLBACK"})
     _FALLBACK_VALUES = {
         # ------------------------------------------------------------#
         "GENERAL": {
@@ -65,7 +277,17 @@ class ConfigLoader:
             "heartbeat_interval":       {"value": 300,
                                          "type": int,
                                          "is_pin": False,
-                                         "Accepts_list": False},
+                                         "accepts_list": False},
+
+            "profile_file":             {"value": "training_profile.jsonl",
+                                         "type": str,
+                                         "is_pin": False,
+                                         "accepts_list": False},
+
+            "profile_memory":           {"value": False,
+                                         "type": bool,
+                                         "is_pin": False,
+                                         "accepts_list": False},
         },
         # ------------------------------------------------------------#
         "LOCATION": {
@@ -122,6 +344,11 @@ class ConfigLoader:
                                          "accepts_list": False},
 
             "bypass_fix_window":        {"value": False,
+                                         "type": bool,
+                                         "is_pin": False,
+                                         "accepts_list": False},
+
+            "adaptive_fix_schedule":    {"value": True,
                                          "type": bool,
                                          "is_pin": False,
                                          "accepts_list": False}
@@ -136,12 +363,12 @@ class ConfigLoader:
             "activity_debounce_ms":     {"value": 25,
                                          "type": int,
                                          "is_pin": False,
-                                         "Accepts_list": False},
+                                         "accepts_list": False},
 
             "min_detect_on_dur":        {"value": 30,
                                          "type": int,
                                          "is_pin": False,
-                                         "Accepts_list": False},
+                                         "accepts_list": False},
 
             "max_activity_time":        {"value": 1800,
                                          "type": int,
@@ -168,6 +395,21 @@ class ConfigLoader:
                                          "is_pin": True,
                                          "accepts_list": False},
 
+            "activity_source":          {"value": "lgpio",
+                                         "type": str,
+                                         "is_pin": False,
+                                         "accepts_list": False},
+
+            "simulated_activity_rate":  {"value": 12.0,
+                                         "type": float,
+                                         "is_pin": False,
+                                         "accepts_list": False},
+
+            "simulated_activity_speed": {"value": 1.0,
+                                         "type": float,
+                                         "is_pin": False,
+                                         "accepts_list": False},
+
             "darkness_start":           {"value": "dusk",
                                          "type": str,
                                          "is_pin": False,
@@ -200,6 +442,11 @@ class ConfigLoader:
                                          "type": str,
                                          "is_pin": False,
                                          "accepts_list": False},
+
+            "flush_interval":           {"value": 60.0,
+                                         "type": float,
+                                         "is_pin": False,
+                                         "accepts_list": False},
         },
         # ------------------------------------------------------------#
         "ACTIVITY_DB": {
@@ -293,7 +540,24 @@ class ConfigLoader:
             "enable_validation":        {"value": True,
                                          "type": bool,
                                          "is_pin": False,
-                                         "accepts_list": False}
+                                         "accepts_list": False},
+
+            "tuned_params_file":        {"value": "tuned_params.json",
+                                         "type": str,
+                                         "is_pin": False,
+                                         "accepts_list": False},
+
+            "model_file":               {"value": "light_model.txt",
+                                         "type": str,
+                                         "is_pin": False,
+                                         "accepts_list": False},
+
+            "custom_features":          {"value": "hour_sin, hour_cos, "
+                                                  "day_sin, day_cos, "
+                                                  "interval_number",
+                                         "type": str,
+                                         "is_pin": False,
+                                         "accepts_list": True}
         },
         # ------------------------------------------------------------#
         "SYNTHETIC_DAYS": {
@@ -335,11 +599,23 @@ class ConfigLoader:
                                          "accepts_list": False},
 
             "min_coverage":             {"value": 0.2,
+                                         "type": float,
+                                         "is_pin": False,
+                                         "accepts_list": False},
+
+            "blend_decay":              {"value": 0.8,
+                                         "type": float,
+                                         "is_pin": False,
+                                         "accepts_list": False},
+
+            "blend_threshold":          {"value": 0.3,
                                          "type": float,
                                          "is_pin": False,
                                          "accepts_list": False}
         }
     }
+    # Compiled once, converts and validates whole config files
+    _SCHEMA = ConfigSchema(_FALLBACK_VALUES)
 
     def __new__(cls, *args, **kwargs):
         """Ensure only one instance of ConfigLoader is created.
@@ -379,6 +655,14 @@ class ConfigLoader:
             self.config = configparser.ConfigParser()
             # Flag for tracking if the loaded config is valid
             self._valid_config = False
+            # Typed values of the config in use
+            self._compiled: Optional[CompiledConfig] = None
+            # (sections, callback) pairs notified of reloaded changes
+            self._subscribers: list[tuple[Optional[frozenset],
+                                          Callable]] = []
+            self._subscriber_lock = threading.Lock()
+            # Typed copy of every property, replaced as a whole on reload
+            self.snapshot: Optional[ConfigSnapshot] = None
             # Attempt to load and validate the configuration file
             self.load_config()
             # Mark initialization as complete to prevent re-running setup
@@ -424,6 +708,18 @@ class ConfigLoader:
         return self.get_config_value(self.config, "FALLBACK",
                                      "min_coverage")
 
+    @property
+    def fallback_blend_decay(self) -> float:
+        """Weight of each week of history relative to the week after it."""
+        return self.get_config_value(self.config, "FALLBACK",
+                                     "blend_decay")
+
+    @property
+    def fallback_blend_threshold(self) -> float:
+        """Blended activity probability at which an interval is ON."""
+        return self.get_config_value(self.config, "FALLBACK",
+                                     "blend_threshold")
+
     @property
     def synth_days(self) -> bool:
         """Generate synthetic days for days without activity."""
@@ -466,11 +762,23 @@ class ConfigLoader:
         return self.get_config_value(self.config, "MODEL",
                                      "early_stopping_rounds")
 
+    @property
+    def tuned_params_file(self) -> str:
+        """File holding hyperparameters produced by `--tune`."""
+        return self.get_config_value(self.config, "MODEL",
+                                     "tuned_params_file")
+
+    @property
+    def model_file(self) -> str:
+        """File the trained model is saved to and restored from."""
+        return self.get_config_value(self.config, "MODEL",
+                                     "model_file")
+
     @property
     def boost_enable(self) -> bool:
         """Enable ON boosting."""
-        return self.get_config_value(self, "MODEL",
-                                    "enable_boost")
+        return self.get_config_value(self.config, "MODEL",
+                                     "boost_enable")
 
     @property
     def min_data_in_leaf(self) -> int:
@@ -517,6 +825,12 @@ class ConfigLoader:
                             "Using DEFAULT feature_set.", model_str)
             return FeatureSet.DEFAULT
 
+    @property
+    def custom_features(self) -> list[str]:
+        """Feature columns used when feature_set is CUSTOM."""
+        return self.get_config_value(config=self.config, section="MODEL",
+                                     option="custom_features")
+
     @property
     def darkness_start(self) -> SolarEvent:
         """When darkness starts and light schedule is applied."""
@@ -559,12 +873,30 @@ class ConfigLoader:
         return self.get_config_value(config=self.config, section="GENERAL",
                                      option="heartbeat_interval")
 
+    @property
+    def profile_file(self) -> str:
+        """str: JSONL file training run profiles are appended to."""
+        return self.get_config_value(config=self.config, section="GENERAL",
+                                     option="profile_file")
+
+    @property
+    def profile_memory(self) -> bool:
+        """bool: Record tracemalloc memory peaks in training profiles."""
+        return self.get_config_value(config=self.config, section="GENERAL",
+                                     option="profile_memory")
+
     @property
     def bypass_fix_window(self) -> bool:
         """bool: True if GPS fix can be attempted at any time."""
         return self.get_config_value(config=self.config, section="GPS",
                                      option="bypass_fix_window")
 
+    @property
+    def gps_adaptive_fix_schedule(self) -> bool:
+        """bool: True to time fix attempts from the fix history."""
+        return self.get_config_value(config=self.config, section="GPS",
+                                     option="adaptive_fix_schedule")
+
     @property
     def activity_debounce_ms(self) -> int:
         """Int: debounce time in milliseconds for activity inputs."""
@@ -717,6 +1049,27 @@ class ConfigLoader:
                                      section="IO",
                                      option="crit_fault_out")
 
+    @property
+    def activity_source(self) -> str:
+        """str: Source of activity inputs, "lgpio" or "simulated"."""
+        return self.get_config_value(config=self.config,
+                                     section="IO",
+                                     option="activity_source").lower()
+
+    @property
+    def simulated_activity_rate(self) -> float:
+        """float: Simulated activities per input per hour."""
+        return self.get_config_value(config=self.config,
+                                     section="IO",
+                                     option="simulated_activity_rate")
+
+    @property
+    def simulated_activity_speed(self) -> float:
+        """float: Simulated seconds per real second."""
+        return self.get_config_value(config=self.config,
+                                     section="IO",
+                                     option="simulated_activity_speed")
+
     @property
     def sunrise_offset(self) -> int:
         """int: Offset from sunrise in seconds for GPS fixing window."""
@@ -745,6 +1098,13 @@ class ConfigLoader:
                                      section="DATA_STORE",
                                      option="persistent_data_JSON")
 
+    @property
+    def persist_flush_interval(self) -> float:
+        """float: Minimum seconds between writes of persistent data."""
+        return self.get_config_value(config=self.config,
+                                     section="DATA_STORE",
+                                     option="flush_interval")
+
     @property
     def ISO_country2(self) -> str:
         """str: 2character ISO country code."""
@@ -769,37 +1129,53 @@ class ConfigLoader:
     def load_config(self) -> None:
         """Load and validate configuration values or fall back to defaults.
 
-        This method attempts to load the configuration file specified by
-        `config_path`. If validation fails, it reverts to predefined fallback
-        values. If loading fails due to file or parsing errors, it raises a
-        `ConfigNotLoaded` exception.
+        This method compiles the configuration file specified by
+        `config_path`, reporting every problem found. If the file is invalid
+        the predefined fallback values are used instead.
+        """
+        compiled = self.compile_file(self.config_path)
+        compiled.log_report()
+        if compiled.valid:
+            # Mark the configuration as valid upon successful loading and
+            # validation
+            self._valid_config = True
+        else:
+            logging.warning(
+                "CONFIG: Invalid configuration, using fallback values.")
+            compiled = self._SCHEMA.defaults()
+        self._use(compiled)
+
+    def compile_file(self, file_path: str) -> CompiledConfig:
+        """Parse, validate and convert a config file without using it.
 
-        Raises
-        ------
-            ConfigNotLoaded: If the configuration file cannot be loaded or
-                             parsed.
+        Args
+        ----
+            file_path (str): Path to the configuration file.
+
+        Returns
+        -------
+            CompiledConfig: The typed values, `valid` is False if the file
+                            can't be used. Pass it to `reload` to apply it
+                            without parsing the file again.
         """
+        config = configparser.ConfigParser()
         try:
-            # Attempt to load and validate the configuration file
-            if not self.__validate_and_load(self.config_path):
-                logging.warning(
-                    "CONFIG: Invalid configuration, using fallback values.")
-                # Load fallback configuration if validation fails
-                self.config.read_dict(self._FALLBACK_VALUES)
-            else:
-                # Mark the configuration as valid upon successful loading and
-                # validation
-                self._valid_config = True
-        except (FileNotFoundError, configparser.Error) as e:
-            # Log the error and raise an exception if loading fails
-            logging.error("CONFIG: Failed to load configuration file: %s", e)
-            raise ConfigNotLoaded("Configuration could not be loaded.")
+            if not config.read(file_path):
+                compiled = CompiledConfig(config, file_path)
+                compiled.errors.append("file not found or unreadable")
+                return compiled
+        except configparser.Error as e:
+            compiled = CompiledConfig(config, file_path)
+            compiled.errors.append(f"parsing failed: {e}")
+            return compiled
+        logging.info("Read config file from %s", file_path)
+        return self._SCHEMA.compile(config, source=file_path)
 
     def validate_config_file(self, file_path: str) -> bool:
         """Validate config file at path without modifying main configuration.
 
-        This method loads the configuration file located at `file_path` into a
-        temporary `ConfigParser` instance to verify its structure and contents.
+        This method compiles the configuration file located at `file_path`
+        to verify its structure and contents, see `compile_file`.
         It does not alter the main configuration held by the singleton
         instance, making it suitable for testing external configurations
         (e.g., USB-based configs) before committing to their use in
@@ -828,103 +1204,147 @@ class ConfigLoader:
                 # Safe to proceed with the USB configuration
             ```
         """
-        # Initialize a temporary ConfigParser instance to load the file content
-        temp_config = configparser.ConfigParser()
-        try:
-            # Attempt to read and load the configuration file into temp_config
-            temp_config.read(file_path)
-
-            # Validate configuration structure and GPIO uniqueness using
-            # private methods to avoid altering the main configuration state
-            if self.__validate_config_structure(temp_config) and \
-                    self.__validate_unique_pins(temp_config):
-                logging.info(
-                    "Alternative config file at %s is valid.",
-                    file_path)
-                return True  # File is valid (meets structural expectations)
-            else:
-                logging.warning(
-                    "Alternative config file at %s is invalid.",
-                    file_path)
-                return False  # File is invalid if structure or pins
-                # assignments do not meet expectations
-
-        except configparser.Error as e:
-            # Log any errors encountered during parsing and return False to
-            # indicate invalid config
-            logging.error(
-                "Error parsing alternative config file %s: %s",
-                file_path, e)
-            return False
-
-    @staticmethod
-    def _convert_to_type(raw_value, specified_type, accepts_list):
-        """Convert a raw value to type, handling lists if needed.
+        compiled = self.compile_file(file_path)
+        compiled.log_report()
+        if compiled.valid:
+            logging.info("Alternative config file at %s is valid.", file_path)
+        else:
+            logging.warning("Alternative config file at %s is invalid.",
+                            file_path)
+        return compiled.valid
+
+    def subscribe(self, callback: Callable[[dict], None],
+                  sections: Optional[Iterable[str]] = None) -> Callable:
+        """Register a callback for changes made by `reload`.
 
         Args
         ----
-            raw_value (str): The raw value from the configuration file.
-            specified_type (type): The expected type of the value (int, float,
-            str). accepts_list (bool): Whether the value should be parsed as a
-            list.
+            callback (Callable[[dict], None]): Called with the changes,
+                {section: {option, ...}}, after the new config is in place.
+            sections (Iterable[str] | None): Only call back when one of these
+                sections changed. None for any change.
 
         Returns
         -------
-            The converted value, either as a single value or a list.
+            Callable: The callback, for use with `unsubscribe`.
         """
-        # logging.debug("Converting %s to type %s",
-        #              raw_value, specified_type)
-        # If the value is expected to be a list and accepts_list is True
-        if accepts_list and specified_type == int:
-            return [int(item.strip()) for item in
-                    str(raw_value).split(",") if item.strip()]
-
-        # Apply type conversion based on specified type
-        if specified_type == int:
-            return int(raw_value)
-        elif specified_type == float:
-            return float(raw_value)
-        elif specified_type == str:
-            str_val = str(raw_value)
-            if str_val.startswith('"') and str_val.endswith('"'):
-                return str(raw_value[1:-1])
-            return str_val
-        elif specified_type == bool:
-            return str(raw_value).lower() in ("true", "1", "yes", "on")
-
-        return raw_value
-
-    def _get_default_value(self, section: str, option: str):
-        """Retrieve the fallback value for a specific section and option.
+        entry = (frozenset(sections) if sections is not None else None,
+                 callback)
+        with self._subscriber_lock:
+            if entry not in self._subscribers:
+                self._subscribers.append(entry)
+        return callback
+
+    def unsubscribe(self, callback: Callable) -> None:
+        """Remove every subscription of a callback."""
+        with self._subscriber_lock:
+            self._subscribers = [entry for entry in self._subscribers
+                                 if entry[1] != callback]
+
+    def diff(self, old: CompiledConfig,
+             new: CompiledConfig) -> dict[str, set[str]]:
+        """Compare the typed values of two compiled configs.
+
+        Options are compared after conversion, so formatting changes such as
+        quoting or list spacing are not reported.
+
+        Returns
+        -------
+            dict[str, set[str]]: Changed option names by section, sections
+                                 without changes are left out.
+        """
+        changes: dict[str, set[str]] = {}
+        for (section, option), value in new.values.items():
+            if old.values.get((section, option)) != value:
+                changes.setdefault(section, set()).add(option)
+        return changes
+
+    def reload(self, compiled: Optional[CompiledConfig] = None
+               ) -> Optional[dict[str, set[str]]]:
+        """Re-read the config file and notify subscribers of what changed.
+
+        The current config is kept if the file is invalid. Subscribers are
+        only notified when every changed section can be applied in place,
+        see `needs_restart`.
 
         Args
         ----
-            section (str): The section name in `_FALLBACK_VALUES`, such as
-                        "GPS" or "GENERAL".
-            option (str): The specific option name within the section, such as
-                        "log_file".
+            compiled (CompiledConfig | None): The config file already
+                compiled by `compile_file`, it is read again if None.
 
         Returns
         -------
-            The raw fallback value as defined in `_FALLBACK_VALUES`.
+            dict[str, set[str]] | None: The changes, None if the file is
+                                        invalid.
+        """
+        if compiled is None:
+            compiled = self.compile_file(self.config_path)
+            compiled.log_report()
+        if not compiled.valid:
+            logging.error("CONFIG: Reload of %s failed, keeping the current "
+                          "configuration", self.config_path)
+            return None
+
+        old = self._compiled
+        self._valid_config = True
+        self._use(compiled)
+        changes = self.diff(old, compiled)
+        if not changes:
+            logging.info("CONFIG: Reloaded, no changes")
+            return changes
+
+        logging.info("CONFIG: Reloaded, changed %s",
+                     {section: sorted(options)
+                      for section, options in changes.items()})
+        if not self.needs_restart(changes):
+            self._notify(changes)
+        return changes
+
+    def needs_restart(self, changes: dict[str, set[str]]) -> bool:
+        """Return True if a changed section can't be applied in place.
+
+        A section can be applied in place if it is read live or has a
+        subscriber.
         """
-        def_val = self._FALLBACK_VALUES.get(section, {}).\
-            get(option, {}).get("value")
-        return def_val
+        with self._subscriber_lock:
+            handled = set(self._LIVE_SECTIONS)
+            for sections, _ in self._subscribers:
+                if sections is None:
+                    return False
+                handled |= sections
+        return not set(changes) <= handled
+
+    def _notify(self, changes: dict[str, set[str]]) -> None:
+        """Call the subscribers interested in the changed sections."""
+        changed = set(changes)
+        with self._subscriber_lock:
+            subscribers = list(self._subscribers)
+        for sections, callback in subscribers:
+            if sections is not None and not sections & changed:
+                continue
+            try:
+                callback(changes)
+            except Exception as e:
+                logging.error("CONFIG: Change handler %s failed: %s",
+                              getattr(callback, "__qualname__", callback), e,
+                              exc_info=True)
+
+    def _use(self, compiled: CompiledConfig) -> None:
+        """Make a compiled config the one in use."""
+        self.config = compiled.parser
+        self._compiled = compiled
+        # Single reference assignment, readers holding the old snapshot
+        # keep a consistent view until they pick up the new one.
+        self.snapshot = ConfigSnapshot.from_loader(self)
 
     def get_config_value(self, config, section, option):
         """Retrive config option from section.
 
-        Retrieve a configuration value from the specified section and option,
-        applying the explicitly defined type and falling back to default values
-        if necessary.
-
-        This method retrieves a configuration value from a given section and
-        option in the config file, default to a specified value if necessary.
         The type of the value is explicitly defined in `_FALLBACK_VALUES`.
         If an option is marked as accepting a list, it is parsed as a
         comma-separated string and returned as a list, even if it contains a
-        single value.
+        single value. Values of the config in use were converted when it was
+        loaded, so reading them is a dictionary lookup.
 
         Args
         ----
@@ -941,152 +1361,73 @@ class ConfigLoader:
 
         Raises
         ------
-            ValueError: If the retrieved value cannot be converted to the
-                        specified type.
+            KeyError: If the option isn't in `_FALLBACK_VALUES`.
         """
-        # Retrieve the fallback dictionary entry for type and value
-        default_value = self._get_default_value(section, option)
-        option_spec = self._FALLBACK_VALUES.get(section, {}).get(option, {})
-        specified_type = option_spec.get("type", str)
-        accepts_list = option_spec.get("accepts_list", False)
-
-        try:
-            # Retrieve the raw value from the config, or use the fallback
-            raw_value = self.config.get(
-                section, option, fallback=default_value)
-            # Convert the raw value to the correct type
-            return ConfigLoader._convert_to_type(raw_value,
-                                                 specified_type, accepts_list)
-
-        except (configparser.NoSectionError,
-                configparser.NoOptionError, ValueError) as e:
-            logging.warning(
-                "Value for %s.%s is missing or invalid in the config "
-                "file, using default value %s of type [%s], "
-                "(%s accept lists): %s", section, option, default_value,
-                str(specified_type), "does" if accepts_list else "doesn't", e)
-            # Use the fallback value and convert it to the correct type
-            return self._convert_to_type(default_value,
-                                         specified_type, accepts_list)
-
-    def __validate_and_load(self, file_path: str) -> bool:
-        """Load and validate the configuration file.
-
-        This method attempts to read the configuration from the specified file
-        path. It verifies that the configuration structure includes all
-        required sections and that GPIO pins are uniquely assigned across
-        configuration items.
-
-        Args
-        ----
-            file_path (str): Path to the configuration file to be loaded.
-
-        Returns
-        -------
-            bool: True if the configuration is successfully loaded and passes
-                  all validation checks, False otherwise.
+        if config is self.config and self._compiled is not None:
+            value = self._compiled.values[(section, option)]
+        else:
+            value = self._SCHEMA.value(config, section, option)
+        # Don't hand out the compiled list to be modified
+        return list(value) if isinstance(value, list) else value
+
+
+class _SnapshotBase:
+    """Read only typed values of every `ConfigLoader` property.
+
+    Built once per load, converting and validating each option a single
+    time. Hot paths hold a reference to the snapshot and read plain slot
+    attributes instead of going through `ConfigLoader` properties, which
+    parse the raw string on every access. Lists are stored as tuples so
+    that nothing reachable from a snapshot can be changed.
+    """
 
-        Raises
-        ------
-            configparser.Error: Raised if an error occurs during file parsing.
-        """
-        # Initialize a ConfigParser instance to read the file
-        config = configparser.ConfigParser()
-        try:
-            # Attempt to read the configuration file
-            config.read(file_path)
-            logging.info("Read config file from %s", file_path)
-
-            # Validate configuration structure and GPIO pin assignments
-            if not self.__validate_config_structure(config):
-                return False
-            if not self.__validate_unique_pins(config):
-                return False
-
-            # If all checks pass, assign the validated config to the instance
-            logging.debug("config file at %s is valid")
-            self.config = config
-            return True
-        except configparser.Error as e:
-            logging.error(
-                "Parsing error for config file %s: %s", file_path, e)
-            return False
+    __slots__ = ()
 
-    def __validate_config_structure(self,
-                                    config: configparser.ConfigParser) -> bool:
-        """Ensure all required sections are present and log any empty sections.
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read only")
 
-        This method checks that the config contains all required sections
-        as defined in `_FALLBACK_VALUES`. If a required section is missing,
-        logs an error and returns False. If a section is present but contains
-        no values, it logs a warning but still considers the structure valid.
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read only")
 
-        Args
-        ----
-            config (configparser.ConfigParser): The configuration parser
-                                instance containing the loaded configuration.
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self.__slots__)} options)"
 
-        Returns
-        -------
-            bool: True if all required sections are present, False if any
-                  required sections are missing.
-        """
-        # Retrieve required sections from fallback values
-        required_sections = self._FALLBACK_VALUES.keys()
-        for section in required_sections:
-            # Check if each required section exists in the loaded config
-            if section not in config:
-                logging.error("config file is invalid, required "
-                              "section is missing: %s", section)
-                return False
-            # Log a warning if the section exists but is empty
-            elif not config.items(section):
-                logging.warning("Section [%s] in config file contains "
-                                "no values.", section)
-        return True
-
-    def __validate_unique_pins(self,
-                               config: configparser.ConfigParser) -> bool:
-        """Ensure each GPIO pin is defined only once across the configuration.
-
-        This method iterates through all configuration items marked with the
-        'is_pin' flag in `_FALLBACK_VALUES`, retrieving the pin values and
-        checking for duplicates across the configuration. If any pin is defined
-        multiple times, it logs an error and returns False.
+    def as_dict(self) -> dict:
+        """Return the snapshot's values keyed by property name."""
+        return {name: getattr(self, name) for name in self.__slots__}
 
-        Args
-        ----
-            config (configparser.ConfigParser): The configuration parser
-                                instance containing the loaded configuration.
+    @classmethod
+    def from_loader(cls, loader: ConfigLoader) -> "ConfigSnapshot":
+        """Evaluate every property of the loader into a new snapshot.
 
-        Returns
-        -------
-            bool: True if all pins are uniquely defined, False if any pin is
-                assigned more than once.
+        A property that fails to evaluate is logged and stored as None so
+        that one bad option does not stop the rest being read.
         """
-        pins_used = set()
-        for section, options in self._FALLBACK_VALUES.items():
-            # Check only sections present in the configuration
-            if section in config:
-                for key, details in options.items():
-                    # Process items marked as GPIO pins
-                    if details.get("is_pin"):
-                        # Retrieve the pin(s) from the config
-                        pins = self.get_config_value(config, section, key)
-
-                        # If pins is a single int, wrap it in a list
-                        if isinstance(pins, int):
-                            pins = [pins]
-
-                        # logging.debug("CONFIG: %s.%s is pin assignment (%s)",
-                        #              section, key, pins)
-
-                        for pin in pins:
-                            # Check for duplicate pin assignments
-                            if pin in pins_used:
-                                logging.error("Pin %s is defined "
-                                              "multiple times. [%s]",
-                                              pin, pins_used)
-                                return False
-                            pins_used.add(pin)
-        return True
+        snapshot = object.__new__(cls)
+        for name in cls.__slots__:
+            try:
+                value = getattr(loader, name)
+            except Exception as e:
+                logging.error("CONFIG: Unable to read %s for the config "
+                              "snapshot: %s", name, e)
+                value = None
+            if isinstance(value, list):
+                value = tuple(value)
+            object.__setattr__(snapshot, name, value)
+        return snapshot
+
+
+def _make_snapshot_class(loader_cls: type) -> type:
+    """Build the snapshot class with a slot for each loader property."""
+    names = [name for name, attr in vars(loader_cls).items()
+             if isinstance(attr, property)]
+    annotations = {name: vars(loader_cls)[name].fget.__annotations__.get(
+        "return") for name in names}
+    return type("ConfigSnapshot", (_SnapshotBase,), {
+        "__slots__": tuple(names),
+        "__annotations__": annotations,
+        "__module__": __name__,
+        "__doc__": _SnapshotBase.__doc__})
+
+
+ConfigSnapshot = _make_snapshot_class(ConfigLoader)
@@ -15,8 +15,6 @@ import time
 import os
 import datetime as dt
 import pandas as pd
-from sqlalchemy import create_engine
-from sqlalchemy.exc import SQLAlchemyError
 from lightlib.config import ConfigLoader
 from typing import Optional, Tuple, List
 
@@ -270,11 +268,19 @@ class DB:
     def get_alchemy_engine(self):
         """Return an SQLAlchemy engine or fallback to None on failure."""
         if self._alchemy_engine is None and self._alchemy_exists:
+            # SQLAlchemy is slow to import, only load it when needed
+            try:
+                from sqlalchemy import create_engine
+                from sqlalchemy.exc import SQLAlchemyError
+            except ImportError as e:
+                logging.warning("Failed to create SQLAlchemy engine: %s", e)
+                self._alchemy_exists = False
+                return None
             try:
                 uri = f"postgresql://{self._db_user}:{self._db_password}" \
                       f"@{self._db_host}:{self._db_port}/{self._db_database}"
                 self._alchemy_engine = create_engine(uri)
-            except (ImportError, SQLAlchemyError) as e:
+            except SQLAlchemyError as e:
                 logging.warning("Failed to create SQLAlchemy engine: %s", e)
                 self._alchemy_exists = False
                 self._alchemy_engine = None
@@ -187,3 +187,66 @@ AS $$
         AND s.date IS NULL
     ORDER BY a.timestamp;
 $$;
+
+CREATE OR REPLACE FUNCTION get_best_historic_day(target_date DATE,
+       days_back INTEGER)
+RETURNS TABLE (
+    schedule_date DATE,
+    interval_number SMALLINT,
+    was_correct BOOLEAN,
+    accuracy NUMERIC(5,2)
+)
+LANGUAGE SQL
+STABLE
+AS $$
+    WITH day_accuracy AS (
+        SELECT
+            l.date AS day,
+            COUNT(*) FILTER (WHERE l.was_correct) * 1.0
+                / NULLIF(COUNT(*), 0) AS ratio
+        FROM light_schedules l
+        WHERE l.date >= target_date - days_back
+            AND l.date < target_date
+            AND EXTRACT(ISODOW FROM l.date)
+                = EXTRACT(ISODOW FROM target_date)
+        GROUP BY l.date
+    ), best AS (
+        SELECT day, ratio
+        FROM day_accuracy
+        ORDER BY ratio DESC NULLS LAST, day
+        LIMIT 1
+    )
+    SELECT
+        s.date AS schedule_date,
+        s.interval_number,
+        s.was_correct,
+        ROUND(b.ratio, 2)::NUMERIC(5,2) AS accuracy
+    FROM best b
+        JOIN light_schedules s ON s.date = b.day
+    ORDER BY s.interval_number;
+$$;
+
+CREATE OR REPLACE FUNCTION get_weekday_activity_rollup(target_date DATE,
+       days_back INTEGER, interval_minutes INTEGER)
+RETURNS TABLE (
+    activity_date DATE,
+    interval_number SMALLINT,
+    detections INTEGER
+)
+LANGUAGE SQL
+STABLE
+AS $$
+    SELECT
+        (a.timestamp AT TIME ZONE 'UTC')::DATE AS activity_date,
+        FLOOR(EXTRACT(EPOCH FROM (a.timestamp AT TIME ZONE 'UTC')::TIME)
+              / 60 / interval_minutes)::SMALLINT AS interval_number,
+        COUNT(*)::INTEGER AS detections
+    FROM activity_log a
+    WHERE a.timestamp >= (target_date - days_back)::TIMESTAMP
+                         AT TIME ZONE 'UTC'
+        AND a.timestamp < target_date::TIMESTAMP AT TIME ZONE 'UTC'
+        AND EXTRACT(ISODOW FROM a.timestamp AT TIME ZONE 'UTC')
+            = EXTRACT(ISODOW FROM target_date)
+    GROUP BY 1, 2
+    ORDER BY 1, 2;
+$$;
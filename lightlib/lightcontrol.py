@@ -46,7 +46,9 @@ class LightController:
     def __init__(self):
         self.schedule = LightScheduler()
         self.activity_monitor = Activity()
-        self._lights_output = ConfigLoader().lights_output
+        # Held snapshot, read on every tick and replaced on [IO] reloads
+        self._config = ConfigLoader().snapshot
+        self._lights_output = list(self._config.lights_output)
 
         # Open gpiochip0 handle for light output
         self._gpio_handle = lgpio.gpiochip_open(0)
@@ -58,10 +60,35 @@ class LightController:
         self._on_time = 0.0
         self.turn_off()  # Start with lights off
         self.on_reason = OnReason.NOT_ON
+        ConfigLoader().subscribe(self._on_io_config, sections=("IO",))
+
+    def _on_io_config(self, changes: dict) -> None:
+        """Move the light outputs to reloaded [IO] pins.
+
+        New outputs are claimed at the current light level so lighting is
+        not interrupted, removed outputs are switched off and released.
+        """
+        self._config = ConfigLoader().snapshot
+        if "lights_output" not in changes.get("IO", ()):
+            return
+        new_outputs = list(self._config.lights_output)
+        level = 1 if self.lights_are_on else 0
+        for out_pin in new_outputs:
+            if out_pin not in self._lights_output:
+                lgpio.gpio_claim_output(self._gpio_handle, out_pin, level)
+        removed = [p for p in self._lights_output if p not in new_outputs]
+        self._lights_output = new_outputs
+        for out_pin in removed:
+            try:
+                lgpio.gpio_write(self._gpio_handle, out_pin, 0)
+                lgpio.gpio_free(self._gpio_handle, out_pin)
+            except lgpio.error as e:
+                logging.warning("Failed to release light output %s: %s",
+                                out_pin, e)
+        logging.info("Light outputs moved to pins %s", new_outputs)
 
     def update(self):
-        """Update system state: check inputs and control lights."""
-        self.activity_monitor.update()
+        """Update system state: control lights from the inputs."""
         self.set_lights()
 
     @property
@@ -82,8 +109,8 @@ class LightController:
             bool: True if it is dark now, otherwise false
         """
         try:
-            ds = ConfigLoader().darkness_start
-            de = ConfigLoader().darkness_end
+            ds = self._config.darkness_start
+            de = self._config.darkness_end
             light_start = PersistentData().solar_event_time(
                 event=de, day=FutureDay.TODAY)
             light_end = PersistentData().solar_event_time(
@@ -152,7 +179,7 @@ class LightController:
             return True
         else:
             if time.monotonic() - self._on_time >= \
-               ConfigLoader().min_activity_on:
+               self._config.min_activity_on:
                 self.turn_off()
                 if not self._off_logged:
                     logging.info("Lights switched --OFF--")
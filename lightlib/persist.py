@@ -10,19 +10,25 @@ Manages persistent data across power cycles. Allowing for location,
 and sunrise, sunset times to be known before a GPS fix is obtained should a
 power failure occur.
 
+Updates are held in memory and written at most once per `flush_interval`,
+each write goes to a temporary file that is synced and renamed over the
+data file so a power cut never leaves a partly written file.
+
 Author: Will Bickerstaff
 Version: 0.1
 """
 
+import os
 import json
+import time
 import datetime as dt
 import logging
 import pytz
 from typing import Union, Optional, List
-from threading import Lock
-from timezonefinder import TimezoneFinder
+from threading import Lock, Timer
 from shelterGPS.common import SolarEvent
 from lightlib.config import ConfigLoader
+from lightlib.timezones import TimezoneResolver
 from lightlib.common import iso_to_datetime, datetime_to_iso, get_today, \
     get_tomorrow, get_now, FutureDay
 
@@ -51,8 +57,22 @@ class PersistentData:
     Manages the storage and retrieval of GPS data, including latitude,
     longitude, maximum time to obtain a fix, and sunrise and sunset times for
     today and the next seven days.
+
+    Solar event times are held per event in a dict keyed by the date's
+    ordinal, a lookup for a day is a single dict access.
     """
 
+    SCHEMA_VERSION = 2
+    # Days of solar events stored from today, so lookups are still answered
+    # on days the GPS has not got a fix yet
+    HORIZON_DAYS = 7
+    # Fixes the running mean of each GPS fix stage is taken over
+    FIX_STAGE_WINDOW = 10
+    # Fix attempts kept for each UTC hour of the day
+    FIX_ATTEMPT_HISTORY = 20
+    _EVENTS = (SolarEvent.DAWN, SolarEvent.SUNRISE,
+               SolarEvent.DUSK, SolarEvent.SUNSET)
+
     _instance = None
     _lock = Lock()  # Thread-safe lock for instance creation
 
@@ -93,23 +113,33 @@ class PersistentData:
         """
         if self.__initialized:
             return  # Skip reinitialization for singleton pattern
-        self._sunrise_times = []
-        self._sunset_times = []
-        self._dawn_times = []
-        self._dusk_times = []
+        # {event: {date ordinal: datetime}}
+        self._events: dict[SolarEvent, dict[int, dt.datetime]] = {
+            event: {} for event in self._EVENTS}
         self._current_latitude = None
         self._current_longitude = None
         self._current_altitude = None
         self._local_timezone = None
         self._missed_fixes = 0
         self._time_to_fix = None
+        # {stage: {"count", "mean", "last", "max"}} fix latencies in seconds
+        self._fix_stages: dict[str, dict] = {}
+        # {UTC hour: [[success, seconds, budget], ...]} oldest attempt first
+        self._fix_attempts: dict[int, list[list]] = {}
+        # Write coalescing: changes not yet written, when the last write
+        # was made (monotonic) and the timer for a deferred write
+        self._dirty = False
+        self._last_flush: Optional[float] = None
+        self._flush_timer: Optional[Timer] = None
+        self._store_lock = Lock()
         self._initialize_file()
         # Mark as initialized
         self._populate_locals_from_file()
+        self._dirty = False  # Loaded values are already in the file
         self.__initialized = True
 
     @staticmethod
-    def _get_empty_schema(version: int = 1) -> dict:
+    def _get_empty_schema(version: int = SCHEMA_VERSION) -> dict:
         """Return the default empty JSON structure for persistent data."""
         match version:
             case 1:
@@ -127,73 +157,195 @@ class PersistentData:
                     "last_updated": None,
                     "time_to_fix": 2
                 }
+            case 2:
+                # Solar events are {event: {ISO date: ISO datetime}}
+                return {
+                    "schema_version": 2,
+                    "missed_fixes": 0,
+                    "latitude": None,
+                    "longitude": None,
+                    "local_timezone": None,
+                    "altitude": None,
+                    "solar_events": {event.value: {}
+                                     for event in PersistentData._EVENTS},
+                    "last_updated": None,
+                    "time_to_fix": 2,
+                    "fix_stages": {},
+                    "fix_attempts": {},
+                    "timezones": {}
+                }
             case _:
                 logging.error("Unsupported schema version %s, falling back "
-                              "to version 1", version)
-                return PersistentData._get_empty_schema(1)
+                              "to version %s", version,
+                              PersistentData.SCHEMA_VERSION)
+                return PersistentData._get_empty_schema()
+
+    @staticmethod
+    def _migrate(data: dict) -> dict:
+        """Upgrade data read from the file to the current schema version."""
+        version = data.get("schema_version", 1)
+        if version == 1:
+            migrated = PersistentData._get_empty_schema(2)
+            migrated.update({key: value for key, value in data.items()
+                             if key in migrated and key != "schema_version"})
+            for event in PersistentData._EVENTS:
+                migrated["solar_events"][event.value] = {
+                    iso[:10]: iso
+                    for iso in data.get(f"{event.value}_times") or []}
+            logging.info("Persistent data migrated from schema version 1 "
+                         "to 2")
+            data = migrated
+        return data
 
     def _initialize_file(self) -> None:
         """Init JSON file if doesn't exist, create an empty data structure."""
+        path = ConfigLoader().persistent_data_json
+        logging.debug("Attempting to initialize data storage file %s", path)
         try:
-            # Create a basic structure if the JSON file does not exist
-            logging.debug(
-                "Attempting to initialize data storage file %s",
-                ConfigLoader().persistent_data_json)
-            with open(ConfigLoader().persistent_data_json, 'a+') as file:
-                file.seek(0)
-                if file.read().strip() == "":
-                    json.dump(self._get_empty_schema(), file,
-                              indent=2, sort_keys=True)
-                    logging.info("JSON file initialized at %s",
-                                 ConfigLoader().persistent_data_json)
-        except IOError as e:
+            if os.path.isfile(path) and os.path.getsize(path) > 0:
+                return
+        except OSError as e:
             logging.error("Failed to initialize JSON file: %s", e)
             raise DataStorageError("Failed to initialize JSON file.") from e
+        self._write_file(path, self._get_empty_schema())
+        logging.info("JSON file initialized at %s", path)
 
     def store_data(self) -> None:
         """Store the latest GPS data in the JSON file, overwrite existing.
 
+        Writes are coalesced, if the file was written less than
+        `flush_interval` seconds ago the write is deferred until the interval
+        has passed and includes any changes made in the meantime.
+
         Raises
         ------
             DataStorageError: If storing data in the JSON file fails.
         """
+        self._dirty = True
+        self.flush(force=False)
+
+    def flush(self, force: bool = True) -> bool:
+        """Write changes not yet stored to the JSON file.
+
+        Args
+        ----
+            force (bool): Write now, even if the last write was less than
+                          `flush_interval` seconds ago.
+
+        Returns
+        -------
+            bool: True if the file was written.
+
+        Raises
+        ------
+            DataStorageError: If storing data in the JSON file fails.
+        """
+        with self._store_lock:
+            if not self._dirty:
+                return False
+            if not force and self._last_flush is not None:
+                interval = ConfigLoader().persist_flush_interval
+                wait = self._last_flush + interval - time.monotonic()
+                if wait > 0:
+                    self._schedule_flush(wait)
+                    return False
+
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            # Cleared before the data is read, a change made while writing
+            # marks it dirty again for the next write
+            self._dirty = False
+            try:
+                self._write_file(ConfigLoader().persistent_data_json,
+                                 self._serialise())
+            except DataStorageError:
+                self._dirty = True
+                raise
+            self._last_flush = time.monotonic()
+            logging.debug("Data stored successfully in JSON file.")
+            return True
+
+    def _schedule_flush(self, delay: float) -> None:
+        """Make a deferred write once `delay` seconds have passed."""
+        if self._flush_timer is not None:
+            return  # Already scheduled, it will include these changes
+        self._flush_timer = Timer(delay, self._deferred_flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _deferred_flush(self) -> None:
+        """Timer callback for a deferred write."""
+        with self._store_lock:
+            self._flush_timer = None
         try:
-            data = self._get_empty_schema()
-            data.update({
-                "missed_fixes": self.missed_fix_days,
-                "latitude": self.current_latitude,
-                "longitude": self.current_longitude,
-                "altitude": self.current_altitude,
-                "local_timezone": self.local_timezone_zone,
-                "sunrise_times":
-                    [datetime_to_iso(t) for t in self._sunrise_times],
-                "sunset_times":
-                    [datetime_to_iso(t) for t in self._sunset_times],
-                "dawn_times":
-                    [datetime_to_iso(t) for t in self._dawn_times],
-                "dusk_times":
-                    [datetime_to_iso(t) for t in self._dusk_times],
-                "last_updated": datetime_to_iso(get_now()),
-                "time_to_fix": self.time_to_fix
-            })
-
-            with open(ConfigLoader().persistent_data_json, 'w') as file:
-                json.dump(data, file, indent=2, sort_keys=True)
-                logging.debug("Data stored successfully in JSON file.")
+            self.flush()
+        except DataStorageError:
+            pass  # Logged by _write_file, still dirty for the next write
 
-            # Refresh local convenience attributes
-            self._populate_locals_from_file()
-        except IOError as e:
+    def _serialise(self) -> dict:
+        """Return the data to store in the schema's JSON structure."""
+        self._clear_past_times()
+        data = self._get_empty_schema()
+        data.update({
+            "missed_fixes": self.missed_fix_days,
+            "latitude": self.current_latitude,
+            "longitude": self.current_longitude,
+            "altitude": self.current_altitude,
+            "local_timezone": self.local_timezone_zone,
+            "solar_events": {
+                event.value: {dt.date.fromordinal(day).isoformat():
+                              datetime_to_iso(time)
+                              for day, time in sorted(times.items())}
+                for event, times in self._events.items()},
+            "last_updated": datetime_to_iso(get_now()),
+            "time_to_fix": self.time_to_fix,
+            "fix_stages": self.fix_stages,
+            "fix_attempts": {str(hour): attempts for hour, attempts
+                             in sorted(self._fix_attempts.items())},
+            "timezones": TimezoneResolver().cache
+        })
+        return data
+
+    @staticmethod
+    def _write_file(path: str, data: dict) -> None:
+        """Atomically replace the JSON file with data.
+
+        The data is written and synced to a temporary file beside the target
+        which is then renamed over it, the file on disk is always either the
+        previous or the new version.
+
+        Raises
+        ------
+            DataStorageError: If the file can't be written.
+        """
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as file:
+                json.dump(data, file, indent=2, sort_keys=True)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
             logging.error("Failed to store Data in JSON: %s", e)
             raise DataStorageError("Failed to store data in JSON.") from e
+        try:
+            # Make the rename itself durable
+            dir_fd = os.open(os.path.dirname(os.path.abspath(path)),
+                             os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError as e:
+            logging.debug("Unable to sync directory of %s: %s", path, e)
 
     def _set_tz(self) -> None:
         """Determine the local timezone."""
         if not (self.current_latitude and self.current_longitude):
             return
-        tz_finder = TimezoneFinder()
-        self.local_timezone = pytz.timezone(tz_finder.timezone_at(
-            lng=self.current_longitude, lat=self.current_latitude))
+        self.local_timezone = TimezoneResolver().zone_at(
+            lat=self.current_latitude, lng=self.current_longitude)
         logging.info("Local timezone set to %s", self.local_timezone)
 
     def _warn_once(self, flag_attr: str, missing_date: dt.date, message: str):
@@ -235,6 +387,7 @@ class PersistentData:
             logging.warning("Unknown timezone '%s'. Falling back to UTC.",
                             value)
             self._local_timezone = pytz.UTC
+        self._dirty = True
 
     @property
     def local_timezone_zone(self) -> Optional[str]:
@@ -269,6 +422,73 @@ class PersistentData:
                             "Consider adjusting the the GPS antenna.",
                             "High" if fix_dur >= 600 else "Invalid", fix_dur)
             self._time_to_fix = 120
+        self._dirty = True
+
+    @property
+    def fix_stages(self) -> dict[str, dict]:
+        """Latency statistics for each stage of a GPS fix.
+
+        Returns
+        -------
+            dict[str, dict]: {stage: {"count", "mean", "last", "max"}}, times
+                             in seconds from the GPS being powered on.
+        """
+        return {stage: dict(stats)
+                for stage, stats in self._fix_stages.items()}
+
+    def record_fix_stages(self, stages: dict[str, float]) -> None:
+        """Add the stage latencies of a successful fix to the statistics.
+
+        The mean is a running mean over the last `FIX_STAGE_WINDOW` fixes,
+        older fixes decay away so the statistics follow the antenna and sky
+        conditions the module has now.
+
+        Args
+        ----
+            stages (dict[str, float]): Seconds from power on to each stage.
+        """
+        for stage, seconds in stages.items():
+            stats = self._fix_stages.setdefault(
+                stage, {"count": 0, "mean": 0.0, "last": 0.0, "max": 0.0})
+            stats["count"] += 1
+            stats["mean"] += ((seconds - stats["mean"]) /
+                              min(stats["count"], self.FIX_STAGE_WINDOW))
+            stats["last"] = seconds
+            stats["max"] = max(stats["max"], seconds)
+        self._dirty = True
+
+    @property
+    def fix_attempts(self) -> dict[int, list[tuple[bool, float, float]]]:
+        """Recent GPS fix attempts by the UTC hour they started in.
+
+        Returns
+        -------
+            dict[int, list[tuple[bool, float, float]]]: {hour: [(success,
+                seconds, budget), ...]} oldest first. `seconds` is the time
+                to fix for a success and the time powered for a failure,
+                `budget` the time the attempt was allowed.
+        """
+        return {hour: [(bool(success), float(seconds), float(budget))
+                       for success, seconds, budget in attempts]
+                for hour, attempts in self._fix_attempts.items()}
+
+    def record_fix_attempt(self, hour: int, success: bool, seconds: float,
+                           budget: float) -> None:
+        """Add a GPS fix attempt to the history for its hour.
+
+        Only the last `FIX_ATTEMPT_HISTORY` attempts of each hour are kept.
+
+        Args
+        ----
+            hour (int): UTC hour the attempt started in.
+            success (bool): True if the attempt fixed.
+            seconds (float): Time to fix, or time powered if it failed.
+            budget (float): Time the attempt was allowed.
+        """
+        attempts = self._fix_attempts.setdefault(hour, [])
+        attempts.append([int(success), round(seconds, 1), round(budget, 1)])
+        del attempts[:-self.FIX_ATTEMPT_HISTORY]
+        self._dirty = True
 
     @property
     def current_altitude(self) -> float:
@@ -278,6 +498,7 @@ class PersistentData:
     @current_altitude.setter
     def current_altitude(self, altitude: float) -> None:
         self._current_altitude = altitude
+        self._dirty = True
 
     @property
     def current_latitude(self) -> float:
@@ -287,6 +508,7 @@ class PersistentData:
     @current_latitude.setter
     def current_latitude(self, lat: float) -> None:
         self._current_latitude = lat
+        self._dirty = True
         self._set_tz()
 
     @property
@@ -297,6 +519,7 @@ class PersistentData:
     @current_longitude.setter
     def current_longitude(self, lng: float) -> None:
         self._current_longitude = lng
+        self._dirty = True
         self._set_tz()
 
     @property
@@ -307,151 +530,116 @@ class PersistentData:
     @missed_fix_days.setter
     def missed_fix_days(self, missed_days: int) -> None:
         self._missed_fixes = missed_days
+        self._dirty = True
 
     @property
     def sunrise_times(self) -> List[dt.datetime]:
         """Datetime object List of sunrise times from persistent data."""
-        return self._sunrise_times
+        return self._times(SolarEvent.SUNRISE)
 
     @property
     def sunset_times(self) -> List[dt.datetime]:
         """Datetime object list of sunset times from persistent data."""
-        return self._sunset_times
+        return self._times(SolarEvent.SUNSET)
 
     @property
     def dawn_times(self) -> List[dt.datetime]:
         """Datetime object list of dawn times from persistent data."""
-        return self._dawn_times
+        return self._times(SolarEvent.DAWN)
 
     @property
     def dusk_times(self) -> List[dt.datetime]:
         """Datetime object list of dusk times from persistent data."""
-        return self._dusk_times
+        return self._times(SolarEvent.DUSK)
 
     @property
     def dawn_today(self) -> Optional[dt.datetime]:
         """Today's dawn time from persistent data (first visible light)."""
-        try:
-            return PersistentData._date_in_dates(check_date=get_today(),
-                                                 dates_list=self.dawn_times)
-        except DataRetrievalError:
-            self._warn_once("dawn_today", get_today(),
-                            "%s not found in persistent data dawn times")
-            return None
+        return self.solar_event_time(SolarEvent.DAWN,
+                                     FutureDay.TODAY)
 
     @property
     def sunrise_today(self) -> Optional[dt.datetime]:
         """Today's sunrise time from persistent data."""
-        try:
-            return PersistentData._date_in_dates(check_date=get_today(),
-                                                 dates_list=self.sunrise_times)
-        except DataRetrievalError:
-            self._warn_once("sunrise_today", get_today(),
-                            "%s not found in persistent data sunrise times")
-            return None
+        return self.solar_event_time(SolarEvent.SUNRISE,
+                                     FutureDay.TODAY)
 
     @property
     def dusk_today(self) -> Optional[dt.datetime]:
-        """Today's dusk time from persistent data."" (last visible light)."""
-        try:
-            return PersistentData._date_in_dates(check_date=get_today(),
-                                                 dates_list=self.dusk_times)
-        except DataRetrievalError:
-            self._warn_once("dusk_today", get_today(),
-                            "%s not found in persistent data dusk times")
-            return None
+        """Today's dusk time from persistent data (last visible light)."""
+        return self.solar_event_time(SolarEvent.DUSK,
+                                     FutureDay.TODAY)
 
     @property
     def sunset_today(self) -> Optional[dt.datetime]:
         """Today's sunset time from persistent data."""
-        try:
-            return PersistentData._date_in_dates(check_date=get_today(),
-                                                 dates_list=self.sunset_times)
-        except DataRetrievalError:
-            self._warn_once("sunset_today", get_today(),
-                            "%s not found in persistent data sunset times")
-            return None
+        return self.solar_event_time(SolarEvent.SUNSET,
+                                     FutureDay.TODAY)
 
     @property
     def dawn_tomorrow(self) -> Optional[dt.datetime]:
         """Tomorrows dawn time from persistent data (first visible light)."""
-        try:
-            return PersistentData._date_in_dates(check_date=get_tomorrow(),
-                                                 dates_list=self.dawn_times)
-        except DataRetrievalError:
-            self._warn_once("dawn_tomorrow", get_tomorrow(),
-                            "%s not found in persistent data dawn times")
-            return None
+        return self.solar_event_time(SolarEvent.DAWN,
+                                     FutureDay.TOMORROW)
 
     @property
     def sunrise_tomorrow(self) -> Optional[dt.datetime]:
         """Tomorrows sunrise time from persistent data."""
-        try:
-            return PersistentData._date_in_dates(check_date=get_tomorrow(),
-                                                 dates_list=self.sunrise_times)
-        except DataRetrievalError:
-            self._warn_once("sunrise_tomorrow", get_tomorrow(),
-                            "%s not found in persistent data sunrise times")
-            return None
+        return self.solar_event_time(SolarEvent.SUNRISE,
+                                     FutureDay.TOMORROW)
 
     @property
     def dusk_tomorrow(self) -> Optional[dt.datetime]:
         """Tomorrows dusk time from persistent data (last visible light)."""
-        try:
-            return PersistentData._date_in_dates(check_date=get_tomorrow(),
-                                                 dates_list=self.dusk_times)
-        except DataRetrievalError:
-            self._warn_once("dusk_tomorrow", get_tomorrow(),
-                            "%s not found in persistent data dusk times")
-            return None
+        return self.solar_event_time(SolarEvent.DUSK,
+                                     FutureDay.TOMORROW)
 
     @property
     def sunset_tomorrow(self) -> Optional[dt.datetime]:
         """Tomorrows sunset time from persistent data."""
-        try:
-            return PersistentData._date_in_dates(check_date=get_tomorrow(),
-                                                 dates_list=self.sunset_times)
-        except DataRetrievalError:
-            self._warn_once("sunset_tomorrow", get_tomorrow(),
-                            "%s not found in persistent data sunset times")
-            return None
+        return self.solar_event_time(SolarEvent.SUNSET,
+                                     FutureDay.TOMORROW)
 
-    @staticmethod
-    def _date_in_dates(check_date: dt.date,
-                       dates_list: List[dt.datetime]) -> dt.datetime:
-        """Search for a datetime with a matching date in dates_list."""
-        for d in dates_list:
-            if d.date() == check_date:
-                return d
-        raise DataRetrievalError(
-            f"Date {datetime_to_iso(check_date)} not found in list")
+    @property
+    def dawn_next_day(self) -> Optional[dt.datetime]:
+        """Dawn in two days from persistent data (first visible light)."""
+        return self.solar_event_time(SolarEvent.DAWN,
+                                     FutureDay.NEXTDAY)
+
+    @property
+    def sunrise_next_day(self) -> Optional[dt.datetime]:
+        """Sunrise in two days from persistent data."""
+        return self.solar_event_time(SolarEvent.SUNRISE,
+                                     FutureDay.NEXTDAY)
+
+    @property
+    def dusk_next_day(self) -> Optional[dt.datetime]:
+        """Dusk in two days from persistent data (last visible light)."""
+        return self.solar_event_time(SolarEvent.DUSK,
+                                     FutureDay.NEXTDAY)
+
+    @property
+    def sunset_next_day(self) -> Optional[dt.datetime]:
+        """Sunset in two days from persistent data."""
+        return self.solar_event_time(SolarEvent.SUNSET,
+                                     FutureDay.NEXTDAY)
+
+    def _times(self, event: SolarEvent) -> List[dt.datetime]:
+        """Return the stored times of an event in date order."""
+        times = self._events[event]
+        return [times[day] for day in sorted(times)]
 
     def _add_date(self, dt_obj: dt.datetime, event: SolarEvent) -> None:
         """Add a sunrise/sunset datetime, replace existing entries for date."""
-        # Strip microseconds (don't need that accuracy)
-        dt_obj = dt_obj.replace(microsecond=0)
-        # Remove outdated entries
-        self._clear_past_times()
-        # Get date portion for comparison
-        dt_date = dt_obj.date()
-        # Select the correct list
-        match event:
-            case SolarEvent.DAWN:
-                target_list = self._dawn_times
-            case SolarEvent.SUNRISE:
-                target_list = self._sunrise_times
-            case SolarEvent.DUSK:
-                target_list = self._dusk_times
-            case SolarEvent.SUNSET:
-                target_list = self._sunset_times
-            case _:
-                logging.warning("No such solar time list %s: %s",
-                                event, event.value)
-                return
-        # Remove any entries for the same date
-        target_list[:] = [d for d in target_list if d.date() != dt_date]
-        # Add the new datetime
-        target_list.append(dt_obj)
+        times = self._events.get(event)
+        if times is None:
+            logging.warning("No such solar time list %s: %s",
+                            event, event.value)
+            return
+        # Strip microseconds (don't need that accuracy), past days are
+        # dropped when the data is stored
+        times[dt_obj.date().toordinal()] = dt_obj.replace(microsecond=0)
+        self._dirty = True
 
     def add_sunrise_time(self, datetime_instance: dt.datetime) -> None:
         """Add a sunrise time to persistent data."""
@@ -472,135 +660,115 @@ class PersistentData:
     def _get_event_time(self, event: SolarEvent,
                         target_date: dt.date) -> Optional[dt.datetime]:
         """Look up the time for an event on a date from persistent data."""
-        event_map = {
-            SolarEvent.SUNRISE: self.sunrise_times,
-            SolarEvent.SUNSET: self.sunset_times,
-            SolarEvent.DAWN: self.dawn_times,
-            SolarEvent.DUSK: self.dusk_times,
-        }
-
-        times = event_map.get(event)
-        if not times:
+        return self._event_on(event, target_date.toordinal())
+
+    def _event_on(self, event: SolarEvent,
+                  day: int) -> Optional[dt.datetime]:
+        """Look up the time for an event on a date ordinal."""
+        times = self._events.get(event)
+        if times is None:
             logging.warning("Unknown SolarEvent: %s", event)
             return None
 
-        try:
-            return PersistentData._date_in_dates(check_date=target_date,
-                                                 dates_list=times)
-        except DataRetrievalError:
+        found = times.get(day)
+        if found is None:
+            target_date = dt.date.fromordinal(day)
             self._warn_once(f"{event.name.lower()}_{target_date}",
                             target_date,
                             f"%s not found in persistent data for "
                             f"{event.name.lower()}")
-            return None
+        return found
 
     def solar_event_time(self, event: SolarEvent,
                          day: FutureDay) -> Optional[dt.datetime]:
         """Return the solar event time for the given future day."""
-        target_date = get_today() + dt.timedelta(days=int(day))
-        return self._get_event_time(event, target_date)
-
-    def _populate_times_from_local(self, iso_datetimes: List[str],
-                                   event: SolarEvent) -> None:
-        match event:
-            case SolarEvent.DAWN:
-                logstr = "dawn"
-                times_list = self._dawn_times
-            case SolarEvent.SUNRISE:
-                logstr = "sunrise"
-                times_list = self._sunrise_times
-            case SolarEvent.DUSK:
-                logstr = "dusk"
-                times_list = self._dusk_times
-            case SolarEvent.SUNSET:
-                logstr = "sunset"
-                times_list = self._sunset_times
-            case _:
-                logging.warning("Unhandled solar event type in load: %s",
-                                event)
-                return
-
-        logging.debug("Retrieved %s times: %s",
-                      logstr, iso_datetimes)
-        for srt in iso_datetimes:
-            self._add_date(dt_obj=iso_to_datetime(srt), event=event)
-
-        logging.debug("Converted %s times to date.datetimes: \n  %s",
-                      logstr, times_list)
+        return self._event_on(event, get_today().toordinal() + int(day))
 
     def _clear_past_times(self) -> None:
         """Remove any sunrise or solar events that are in the past."""
-        today = get_today()
-        # Filter out times from previous days
-        self._dawn_times = [time for time in self._dawn_times
-                            if time.date() >= today]
-        self._sunrise_times = [time for time in self._sunrise_times
-                               if time.date() >= today]
-        self._dusk_times = [time for time in self._dusk_times
-                            if time.date() >= today]
-        self._sunset_times = [time for time in self._sunset_times
-                              if time.date() >= today]
+        today = get_today().toordinal()
+        for times in self._events.values():
+            for day in [day for day in times if day < today]:
+                del times[day]
         logging.debug("Past solar event times cleared.")
 
     def _populate_locals_from_file(self):
         key = ""
         try:
             with open(ConfigLoader().persistent_data_json, 'r') as file:
-                data = json.load(file)
-
-                # Populate location and altitude values if not already set
-                if self._current_latitude is None:
-                    key = "latitude"
-                    self._current_latitude = data.get(key)
-
-                if self._current_longitude is None:
-                    key = "longitude"
-                    self._current_longitude = data.get(key)
-
-                if self._current_altitude is None:
-                    key = "altitude"
-                    self._current_altitude = data.get(key)
-
-                if self.local_timezone is None:
-                    key = "local_timezone"
-                    self.local_timezone = data.get(key)
-
-                if self._missed_fixes is None:
-                    key = "missed_fixes"
-                    self._missed_fixes = data.get(key)
-
-                if self._time_to_fix is None:
-                    key = "time_to_fix"
-                    self._time_to_fix = data.get(key)
-
-                # Populate solar event times if they are empty
-                for attr, key, event in [
-                        (self._dawn_times, "dawn_times",
-                         SolarEvent.DAWN),
-                        (self._sunrise_times, "sunrise_times",
-                         SolarEvent.SUNRISE),
-                        (self._dusk_times, "dusk_times",
-                         SolarEvent.DUSK),
-                        (self._sunset_times, "sunset_times",
-                         SolarEvent.SUNSET)]:
-
-                    if not attr:
-                        self._populate_times_from_local(
-                            iso_datetimes=data.get(key, []), event=event)
-
-                logging.debug("Memory AFTER JSON load\n"
-                              "\tdawn_times: %s\n"
-                              "\tsunrise_times: %s\n"
-                              "\tdusk_times: %s\n"
-                              "\tsunset_times: %s\n",
-                              self._dawn_times, self._sunrise_times,
-                              self._dusk_times, self._sunset_times)
+                data = self._migrate(json.load(file))
         except IOError as e:
             logging.error(
                 "Failed to read persistent data from file %s : %s",
                 ConfigLoader().persistent_data_json, e
             )
+            return
         except json.JSONDecodeError as e:
+            logging.warning(
+                "Unable to decode %s : %s",
+                ConfigLoader().persistent_data_json, e
+            )
+            return
+
+        try:
+            # Populate location and altitude values if not already set
+            if self._current_latitude is None:
+                key = "latitude"
+                self._current_latitude = data.get(key)
+
+            if self._current_longitude is None:
+                key = "longitude"
+                self._current_longitude = data.get(key)
+
+            if self._current_altitude is None:
+                key = "altitude"
+                self._current_altitude = data.get(key)
+
+            if self.local_timezone is None:
+                key = "local_timezone"
+                self.local_timezone = data.get(key)
+
+            if self._missed_fixes is None:
+                key = "missed_fixes"
+                self._missed_fixes = data.get(key)
+
+            if self._time_to_fix is None:
+                key = "time_to_fix"
+                self._time_to_fix = data.get(key)
+
+            if not self._fix_stages:
+                key = "fix_stages"
+                self._fix_stages = {
+                    stage: dict(stats)
+                    for stage, stats in (data.get(key) or {}).items()}
+
+            if not self._fix_attempts:
+                key = "fix_attempts"
+                self._fix_attempts = {
+                    int(hour): [list(a) for a in attempts]
+                    for hour, attempts in (data.get(key) or {}).items()}
+
+            key = "timezones"
+            TimezoneResolver().load(data.get(key))
+
+            # Populate solar event times if they are empty
+            key = "solar_events"
+            stored = data.get(key) or {}
+            for event in self._EVENTS:
+                if not self._events[event]:
+                    for iso in (stored.get(event.value) or {}).values():
+                        self._add_date(dt_obj=iso_to_datetime(iso),
+                                       event=event)
+            self._clear_past_times()
+
+            logging.debug("Memory AFTER JSON load\n"
+                          "\tdawn_times: %s\n"
+                          "\tsunrise_times: %s\n"
+                          "\tdusk_times: %s\n"
+                          "\tsunset_times: %s\n",
+                          self.dawn_times, self.sunrise_times,
+                          self.dusk_times, self.sunset_times)
+        except (AttributeError, TypeError, ValueError) as e:
             logging.warning(
                 "Unable to decode key [%s] in %s : %s",
                 key, ConfigLoader().persistent_data_json, e
@@ -0,0 +1,182 @@
+"""lightlib.profiler.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Lightweight stage timing for training and schedule runs.
+             A run is opened with `profile_run`, code on the hot path marks
+             its stages with `stage` (context manager or decorator). Stages
+             outside of an active run cost a thread-local lookup and nothing
+             else. Each finished run is logged and appended as one JSON line
+             so regressions can be tracked as the database grows.
+
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import tracemalloc
+import datetime as dt
+from contextlib import contextmanager, ContextDecorator
+from typing import Optional
+
+_local = threading.local()
+
+
+class RunProfile:
+    """Timings (and optional memory peaks) for the stages of one run.
+
+    Args
+    ----
+        name (str): Name of the run, e.g. "daily_schedule".
+        trace_memory (bool): Record tracemalloc peaks per stage. This slows
+                             Python allocations noticeably, use only when
+                             investigating memory.
+    """
+
+    def __init__(self, name: str, trace_memory: bool = False):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.started = dt.datetime.now(dt.timezone.utc)
+        self.total_seconds = None
+        self.stages: dict[str, dict] = {}
+        self.info: dict = {}
+        self._stack: list[list] = []    # [name, start, running peak]
+        self._start = time.perf_counter()
+
+    def enter(self, name: str) -> None:
+        """Start timing a stage, nested stages are timed independently."""
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._stack.append([name, time.perf_counter(), 0])
+
+    def exit(self) -> None:
+        """Stop timing the innermost stage."""
+        if not self._stack:
+            return  # Stage was entered before this run started
+        name, start, peak = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        entry = self.stages.setdefault(
+            name, {"seconds": 0.0, "calls": 0,
+                   "parent": self._stack[-1][0] if self._stack else None})
+        entry["seconds"] += elapsed
+        entry["calls"] += 1
+
+        if self.trace_memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            entry["peak_kb"] = max(entry.get("peak_kb", 0), peak // 1024)
+            if self._stack:
+                # reset_peak() in this stage hid the parent's peak so far
+                self._stack[-1][2] = max(self._stack[-1][2], peak)
+
+    def finish(self) -> None:
+        """Close the run."""
+        self.total_seconds = time.perf_counter() - self._start
+
+    def record(self) -> dict:
+        """Return the run as a JSON serialisable dict."""
+        return {"run": self.name,
+                "started": self.started.isoformat(),
+                "total_seconds": self.total_seconds,
+                "stages": self.stages,
+                "info": self.info}
+
+    def summary(self) -> str:
+        """Human readable stage breakdown for the log."""
+        lines = [f"Profile of {self.name} "
+                 f"({self.total_seconds or 0:.2f}s total):"]
+        for name, entry in sorted(self.stages.items(),
+                                  key=lambda item: -item[1]["seconds"]):
+            line = (f"\t{name:>20}: {entry['seconds']:8.3f}s "
+                    f"x{entry['calls']}")
+            if "peak_kb" in entry:
+                line += f"  peak {entry['peak_kb'] / 1024:.1f} MB"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+class stage(ContextDecorator):
+    """Time a stage of the active run.
+
+    Can be used as `with stage("prediction"):` or as a `@stage("prediction")`
+    decorator. Does nothing when no run is active on this thread.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        run = active_run()
+        if run is not None:
+            run.enter(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        # profile_run restores the previous run on exit, so the run active
+        # now is always the one this stage was entered in.
+        run = active_run()
+        if run is not None:
+            run.exit()
+        return False
+
+
+def active_run() -> Optional[RunProfile]:
+    """Return the run being profiled on this thread, if any."""
+    return getattr(_local, "run", None)
+
+
+def annotate(**info) -> None:
+    """Attach values (row counts etc.) to the active run's record."""
+    run = active_run()
+    if run is not None:
+        run.info.update(info)
+
+
+@contextmanager
+def profile_run(name: str, trace_memory: bool = False,
+                output: Optional[str] = None):
+    """Profile a run, logging it and appending it to a JSONL file.
+
+    Args
+    ----
+        name (str): Name of the run.
+        trace_memory (bool): Enable tracemalloc peaks per stage.
+        output (str | None): JSONL file to append the record to.
+
+    Yields
+    ------
+        RunProfile: The profile being recorded.
+    """
+    run = RunProfile(name, trace_memory)
+    previous = active_run()
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _local.run = run
+    try:
+        yield run
+    finally:
+        run.finish()
+        _local.run = previous
+        if started_tracing:
+            tracemalloc.stop()
+        logging.info(run.summary())
+        if output:
+            write_record(output, run.record())
+
+
+def write_record(path: str, record: dict) -> None:
+    """Append one record to a JSONL file."""
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    except OSError as e:
+        logging.warning("Unable to write profile record to %s: %s", path, e)
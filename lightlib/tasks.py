@@ -0,0 +1,315 @@
+"""lightlib.tasks.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Periodic and one off jobs run from a single scheduler thread.
+             Jobs wait in a heap ordered by when they are due, the thread
+             sleeps until the first is due so nothing polls. Long jobs can
+             run in the background on a thread of their own for each run.
+             Jobs are grouped so everything started for one configuration
+             is cancelled together on reload, and every job keeps run time
+             statistics.
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Optional, Union
+
+# Seconds, or a callable returning them so reloaded config applies
+Interval = Union[float, Callable[[], float]]
+
+
+class Job:
+    """A job known to the `TaskScheduler`.
+
+    The job's function is called with no arguments. If it returns a number
+    the next run is that many seconds away, otherwise `interval` after this
+    run was due, or never for a one off job.
+
+    Attributes
+    ----------
+        name (str): Name the job is logged and reported by.
+        group (str | None): Group the job is cancelled with.
+        background (bool): True to run on a thread of its own.
+        runs (int): Completed runs.
+        failures (int): Runs that raised an exception.
+        skipped (int): Runs skipped as the last was still running.
+        total_seconds (float): Time spent running.
+        max_seconds (float): Longest run.
+        last_seconds (float): Most recent run.
+        max_late (float): Most seconds a run started after it was due.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Optional[float]],
+                 interval: Optional[Interval], group: Optional[str],
+                 background: bool):
+        self.name = name
+        self.group = group
+        self.background = background
+        self._func = func
+        self._interval = interval
+        self.due = 0.0
+        self.cancelled = False
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+        self.max_late = 0.0
+
+    @property
+    def interval(self) -> Optional[float]:
+        """float | None: Seconds between runs, None for a one off job."""
+        if callable(self._interval):
+            return self._interval()
+        return self._interval
+
+    def cancel(self) -> None:
+        """Stop the job being run again, a run in progress completes."""
+        self.cancelled = True
+
+    def run(self, due: float) -> Optional[float]:
+        """Run the job once, recording its statistics.
+
+        Args
+        ----
+            due (float): Monotonic time the run was due at.
+
+        Returns
+        -------
+            float | None: The delay to the next run the job asked for.
+        """
+        start = time.monotonic()
+        self.max_late = max(self.max_late, start - due)
+        delay = None
+        try:
+            delay = self._func()
+        except Exception as e:
+            self.failures += 1
+            logging.error("Scheduled job %s failed: %s", self.name, e,
+                          exc_info=True)
+        finally:
+            self.last_seconds = time.monotonic() - start
+            self.max_seconds = max(self.max_seconds, self.last_seconds)
+            self.total_seconds += self.last_seconds
+            self.runs += 1
+            self.running = False
+        return delay if isinstance(delay, (int, float)) else None
+
+    @property
+    def stats(self) -> dict:
+        """dict: Run counts and times of the job."""
+        return {"runs": self.runs,
+                "failures": self.failures,
+                "skipped": self.skipped,
+                "mean_seconds": (self.total_seconds / self.runs
+                                 if self.runs else None),
+                "max_seconds": self.max_seconds,
+                "last_seconds": self.last_seconds,
+                "max_late_seconds": self.max_late}
+
+
+class TaskScheduler:
+    """Run jobs at their due times from one thread (Singleton pattern).
+
+    The thread is started by the first job scheduled. Jobs run in turn on
+    it, so they should be short, `background` jobs start a thread for each
+    run and a run still going when the next is due is skipped.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        """Ensure only one scheduler exists."""
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+        self._heap: list[tuple[float, int, Job]] = []
+        self._jobs: dict[str, Job] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def every(self, name: str, func: Callable[[], Optional[float]],
+              interval: Interval, delay: float = 0,
+              group: Optional[str] = None, background: bool = False) -> Job:
+        """Run a job periodically.
+
+        A job already scheduled with the same name is cancelled first.
+
+        Args
+        ----
+            name (str): Job name for logs and `stats`.
+            func (Callable): The job, returning None or the seconds until
+                its next run.
+            interval (float | Callable[[], float]): Seconds between runs,
+                read after each run.
+            delay (float): Seconds until the first run.
+            group (str | None): Group for `cancel_group`.
+            background (bool): Run on a thread of its own.
+
+        Returns
+        -------
+            Job: The scheduled job.
+        """
+        return self._add(Job(name, func, interval, group, background), delay)
+
+    def once(self, name: str, func: Callable[[], Optional[float]],
+             delay: float = 0, group: Optional[str] = None,
+             background: bool = False) -> Job:
+        """Run a job once after `delay` seconds, see `every`."""
+        return self._add(Job(name, func, None, group, background), delay)
+
+    def _add(self, job: Job, delay: float) -> Job:
+        with self._cond:
+            previous = self._jobs.get(job.name)
+            if previous is not None:
+                previous.cancel()
+            self._jobs[job.name] = job
+            self._push(job, time.monotonic() + max(delay, 0))
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, daemon=True, name="task-scheduler")
+                self._thread.start()
+        logging.debug("Scheduled job %s", job.name)
+        return job
+
+    def _push(self, job: Job, due: float) -> None:
+        """Queue a job, the caller holds `_cond`."""
+        job.due = due
+        heapq.heappush(self._heap, (due, next(self._seq), job))
+        self._cond.notify()
+
+    def cancel(self, name: str) -> None:
+        """Cancel a job by name."""
+        with self._cond:
+            job = self._jobs.pop(name, None)
+        if job is not None:
+            job.cancel()
+            logging.debug("Cancelled job %s", name)
+
+    def cancel_group(self, group: str) -> None:
+        """Cancel every job in a group, e.g. before a config reload."""
+        with self._cond:
+            names = [name for name, job in self._jobs.items()
+                     if job.group == group]
+        for name in names:
+            self.cancel(name)
+        logging.info("Cancelled %d %s jobs", len(names), group)
+
+    @property
+    def stats(self) -> dict[str, dict]:
+        """dict: Each scheduled job's statistics by name."""
+        with self._cond:
+            return {name: job.stats for name, job in self._jobs.items()}
+
+    def stop(self) -> None:
+        """Cancel every job and stop the thread."""
+        with self._cond:
+            for job in self._jobs.values():
+                job.cancel()
+            self._jobs.clear()
+            self._heap.clear()
+            self._stopping = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self) -> None:
+        """Run jobs as they come due."""
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    if self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                        continue
+                    wait = (self._heap[0][0] - time.monotonic()
+                            if self._heap else None)
+                    if wait is not None and wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopping:
+                    return
+                job = heapq.heappop(self._heap)[2]
+                due = job.due
+                if job.running:
+                    job.skipped += 1
+                    self._queue_next(job)
+                    continue
+                job.running = True
+                if job.background:
+                    # The next periodic run is due whether or not this one
+                    # has finished by then
+                    self._queue_next(job)
+            if job.background:
+                threading.Thread(target=self._run_background,
+                                 args=(job, due), daemon=True,
+                                 name=job.name).start()
+            else:
+                delay = job.run(due)
+                with self._cond:
+                    self._finished(job, delay)
+
+    def _run_background(self, job: Job, due: float) -> None:
+        delay = job.run(due)
+        with self._cond:
+            self._finished(job, delay)
+
+    def _queue_next(self, job: Job) -> None:
+        """Queue a periodic job's next run, the caller holds `_cond`.
+
+        Runs are at a fixed rate from when the last was due, without
+        catching up runs missed while the job or the system was busy. One
+        off jobs are left to `_finished`.
+        """
+        interval = job.interval
+        if interval is None or job.cancelled or self._stopping:
+            return
+        now = time.monotonic()
+        due = job.due + interval
+        self._push(job, due if due > now else now + interval)
+
+    def _finished(self, job: Job, delay: Optional[float]) -> None:
+        """Queue or forget a job after a run, the caller holds `_cond`.
+
+        Only the thread that ran the job calls this, so a one off job is
+        forgotten only once its run has ended without asking for another.
+
+        Args
+        ----
+            job (Job): The job just run.
+            delay (float | None): Seconds to the next run the job asked for.
+        """
+        if job.cancelled or self._stopping:
+            return
+        if delay is not None:
+            if job.background:
+                # Replace the run queued when this one started
+                self._heap = [entry for entry in self._heap
+                              if entry[2] is not job]
+                heapq.heapify(self._heap)
+            self._push(job, time.monotonic() + max(delay, 0))
+        elif job.interval is None:
+            if self._jobs.get(job.name) is job:
+                del self._jobs[job.name]  # A one off job is done
+        elif not job.background:
+            self._queue_next(job)
@@ -0,0 +1,125 @@
+"""lightlib.timezones.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Timezone resolution from coordinates. Zones are memoized by
+             coordinates rounded to about a kilometre, the cache is stored
+             with the persistent data so it survives restarts.
+             `TimezoneFinder` is only imported and built on a cache miss,
+             reading its polygon data from file rather than into memory.
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import logging
+import threading
+from typing import Optional
+import pytz
+
+# Decimal places coordinates are rounded to, 0.01 degrees is ~1.1km
+KEY_DECIMALS = 2
+# Locations remembered, the oldest is forgotten first
+MAX_ENTRIES = 64
+
+
+def cache_key(lat: float, lng: float) -> str:
+    """Return the cache key for a latitude and longitude."""
+    return f"{lat:.{KEY_DECIMALS}f},{lng:.{KEY_DECIMALS}f}"
+
+
+class TimezoneResolver:
+    """Resolve and memoize timezone names for coordinates.
+
+    Attributes
+    ----------
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that needed `TimezoneFinder`.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        """Ensure only one instance of TimezoneResolver is created."""
+        if not cls._instance:
+            with cls._lock:  # Thread-safe check and assignment
+                if not cls._instance:
+                    cls._instance = super(TimezoneResolver, cls).__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self) -> None:
+        if self._initialized:
+            return
+        # {cache_key: zone name, "" where no zone was found}
+        self._cache: dict[str, str] = {}
+        self._finder = None
+        self._finder_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._initialized = True
+
+    @property
+    def cache(self) -> dict[str, str]:
+        """Copy of the cache for storing, {"lat,lng": zone name}."""
+        return dict(self._cache)
+
+    def load(self, cache: Optional[dict[str, str]]) -> None:
+        """Add previously stored entries to the cache.
+
+        Entries already resolved in this run are kept.
+
+        Args
+        ----
+            cache (dict[str, str] | None): As returned by `cache`.
+        """
+        for key, zone in (cache or {}).items():
+            if isinstance(zone, str):
+                self._cache.setdefault(key, zone)
+        self._trim()
+
+    def zone_at(self, lat: float, lng: float) -> Optional[str]:
+        """Return the timezone name at a location.
+
+        Args
+        ----
+            lat (float): Latitude in degrees.
+            lng (float): Longitude in degrees.
+
+        Returns
+        -------
+            str | None: IANA zone name, None if the location has none.
+        """
+        key = cache_key(lat, lng)
+        zone = self._cache.get(key)
+        if zone is not None:
+            self.hits += 1
+            return zone or None
+
+        self.misses += 1
+        zone = self._get_finder().timezone_at(lat=lat, lng=lng) or ""
+        self._cache[key] = zone
+        self._trim()
+        logging.debug("Timezone at %s resolved to %s", key, zone or "none")
+        return zone or None
+
+    def timezone_at(self, lat: float,
+                    lng: float) -> pytz.tzinfo.BaseTzInfo:
+        """Return the pytz timezone at a location, UTC if it has none."""
+        zone = self.zone_at(lat, lng)
+        return pytz.timezone(zone) if zone else pytz.UTC
+
+    def _get_finder(self):
+        """Build the TimezoneFinder on first use."""
+        if self._finder is None:
+            with self._finder_lock:
+                if self._finder is None:
+                    from timezonefinder import TimezoneFinder  # Slow import
+                    self._finder = TimezoneFinder(in_memory=False)
+        return self._finder
+
+    def _trim(self) -> None:
+        while len(self._cache) > MAX_ENTRIES:
+            del self._cache[next(iter(self._cache))]
@@ -21,6 +21,7 @@ from lightlib.common import get_today, get_tomorrow, get_now, get_yesterday
 from lightlib.common import sec_to_hms_str
 from lightlib.db import DB
 from lightlib.config import ConfigLoader
+from lightlib.profiler import profile_run, stage
 from scheduler.features import FeatureEngineer
 from scheduler.model import LightModel
 from scheduler.evaluation import ScheduleEvaluator
@@ -132,8 +133,10 @@ class LightScheduler:
         self.db = None
         self._warned_missing = None
         self.days_history = ConfigLoader().training_days_history
+        self._model_config_changed = False
 
         self._initialize_components()
+        ConfigLoader().subscribe(self._on_model_config, sections=("MODEL",))
 
     def _initialize_components(self):
         self.set_db_connection()
@@ -185,6 +188,34 @@ class LightScheduler:
                     logging.error("Failed to reconnect to the database: %s", e)
                     self.db = None  # Set to None to prevent further issues
 
+    def _on_model_config(self, changes: dict) -> None:
+        """Invalidate the model when the [MODEL] configuration changes.
+
+        A training run in progress keeps its configuration, the change is
+        then applied before the next run starts.
+        """
+        self._model_config_changed = True
+        if self._lock.acquire(blocking=False):
+            try:
+                self._apply_model_config()
+            finally:
+                self._lock.release()
+        else:
+            logging.info("MODEL configuration changed during a training "
+                         "run, it will be applied to the next run")
+
+    def _apply_model_config(self) -> None:
+        """Apply a pending [MODEL] change, the caller holds `_lock`."""
+        if not self._model_config_changed:
+            return
+        self._model_config_changed = False
+        self.min_confidence = ConfigLoader().confidence_threshold
+        self.days_history = ConfigLoader().training_days_history
+        self.model_engine.reset_model()
+        self._apply_shared_config()
+        logging.info("MODEL configuration applied, the model will be "
+                     "retrained at the next schedule generation")
+
     @staticmethod
     def progressive_history(max_days: Optional[int] = None) -> int:
         """Return the maximum available number of days for training.
@@ -300,16 +331,25 @@ class LightScheduler:
             # any time
             training_start = time.monotonic()
             date_tomorrow = get_tomorrow()
-            with self._lock:
+            with self._lock, profile_run(
+                    "daily_schedule",
+                    trace_memory=ConfigLoader().profile_memory,
+                    output=ConfigLoader().profile_file) as run:
+                self._apply_model_config()
+                run.info["schedule_date"] = date_tomorrow.isoformat()
                 # Evaluate yesterday's schedule accuracy
-                self.evaluator.evaluate_previous_schedule(get_yesterday())
+                with stage("evaluation"):
+                    self.evaluator.evaluate_previous_schedule(
+                        get_yesterday())
                 # Retrain the model using updated accuracy data
-                self.model_engine.train_model(
-                    days_history=LightScheduler.progressive_history())
+                with stage("training"):
+                    self.model_engine.train_model(
+                        days_history=LightScheduler.progressive_history())
                 training_end = time.monotonic()
                 # Generate a new schedule for tomorrow
-                new_schedule = self.generate_daily_schedule(
-                    date_tomorrow.strftime("%Y-%m-%d"))
+                with stage("schedule_generation"):
+                    new_schedule = self.generate_daily_schedule(
+                        date_tomorrow.strftime("%Y-%m-%d"))
                 # Storage of the generated schedule in the database & cache
                 # is completed by `self.generate_daily_schedule' with its
                 # final call to `self.store_schedule'
@@ -346,6 +386,89 @@ class LightScheduler:
             raise e
             return None
 
+    def restore_startup_schedule(self) -> Optional[str]:
+        """Make a schedule available as soon as possible after startup.
+
+        Restores the saved model and the stored schedules for today and
+        tomorrow. Any that are missing are generated with the fastest
+        engine available, the restored model without retraining, then the
+        blended history fallback and finally the fallback schedule file.
+        The daily schedule generation later replaces them as normal.
+
+        The time taken to have a valid schedule is logged and appended to
+        the profile file.
+
+        Returns
+        -------
+            Optional[str]: The engine that provided the last schedule that
+                           had to be generated, "stored" if all were already
+                           stored or None if no schedule could be made.
+        """
+        started = time.monotonic()
+        with self._lock, profile_run(
+                "startup_schedule",
+                output=ConfigLoader().profile_file) as run:
+            self._apply_model_config()
+            with stage("model_restore"):
+                if self.model_engine.model is None:
+                    self.model_engine.load_model(ConfigLoader().model_file)
+
+            source = "stored"
+            for schedule_date in (get_today(), get_tomorrow()):
+                with stage("schedule_restore"):
+                    schedule = self.store.reload_schedule(schedule_date)
+                if schedule:
+                    continue
+                logging.info("No stored schedule for %s, generating one",
+                             schedule_date)
+                with stage("schedule_generation"):
+                    source = self._quick_schedule(schedule_date)
+                if source is None:
+                    break
+
+            time_to_schedule = time.monotonic() - started
+            run.info.update(source=source,
+                            time_to_schedule=round(time_to_schedule, 3),
+                            model_restored=self.model_engine.model
+                            is not None)
+            logging.info("Time to first valid schedule: %.2fs (%s)",
+                         time_to_schedule, source or "no schedule")
+        return source
+
+    def _quick_schedule(self, schedule_date: dt.date) -> Optional[str]:
+        """Generate and store a schedule without training the model.
+
+        Args
+        ----
+            schedule_date (dt.date): The date to generate a schedule for.
+
+        Returns
+        -------
+            Optional[str]: The engine that produced the schedule, or None.
+        """
+        if self.model_engine.model is not None and \
+                self.generate_daily_schedule(
+                    schedule_date.strftime("%Y-%m-%d")):
+            self.store.reload_schedule(schedule_date)
+            return "model"
+
+        fallback = Fallback()
+        fallback.set_config(db=self.db,
+                            interval_minutes=self.interval_minutes,
+                            schedule_cache=self.schedule_cache,
+                            features=self.features)
+        for source, method in (("blend", fallback.blend_method),
+                               ("schedule", fallback.generate_schedule)):
+            schedule = method(schedule_date)
+            if schedule and self.store.store_fallback(schedule_date,
+                                                      schedule):
+                self.store.reload_schedule(schedule_date)
+                return source
+
+        logging.warning("Unable to generate a startup schedule for %s",
+                        schedule_date)
+        return None
+
     def should_light_be_on(
             self, check_time: Optional[dt.datetime] = None) -> bool:
         """Determine if the lights should be on at a given moment.
@@ -511,6 +634,9 @@ class LightScheduler:
             - "history": Try the most accurate past schedule for the same
                          weekday, falling back to the configured schedule file
                          if not found.
+            - "blend": Threshold the recency weighted activity of the same
+                       weekday over the history window, falling back to the
+                       configured schedule file if there is no history.
             - "schedule": Use the configured fallback schedule file directly.
             - "none": Always use the model output, even if confidence is low.
 
@@ -562,14 +688,23 @@ class LightScheduler:
         )
 
         fallback_schedule = None
-        if fallback_mode == "history":
-            fallback_schedule = fallback.best_historic_method(schedule_date)
-            if not fallback_schedule:
+        with stage("fallback"):
+            if fallback_mode == "history":
+                fallback_schedule = fallback.best_historic_method(
+                    schedule_date)
+                if not fallback_schedule:
+                    fallback_schedule = fallback.generate_schedule(
+                        schedule_date)
+
+            elif fallback_mode == "blend":
+                fallback_schedule = fallback.blend_method(schedule_date)
+                if not fallback_schedule:
+                    fallback_schedule = fallback.generate_schedule(
+                        schedule_date)
+
+            elif fallback_mode == "schedule":
                 fallback_schedule = fallback.generate_schedule(schedule_date)
 
-        elif fallback_mode == "schedule":
-            fallback_schedule = fallback.generate_schedule(schedule_date)
-
         if fallback_schedule:
             return self.store.store_fallback(schedule_date, fallback_schedule)
 
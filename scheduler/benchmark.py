@@ -0,0 +1,301 @@
+"""scheduler.benchmark.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Feature set benchmarking. Replays historical days, training
+             a model for every FeatureSet on the data before each day and
+             predicting that day. Reports precision, recall, lit minutes
+             (energy) and feature build/training/inference wall-clock time
+             per feature set so accuracy can be traded against CPU time on
+             the Pi.
+
+             Features are built for each feature set once to time them, the
+             FULL_FEATURES frame is cached and each feature set slices the
+             columns it needs from it for the replay. Schedule accuracy
+             features are recalculated for each replayed day from the
+             schedules before it, so no day is scored with its own outcome.
+
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import os
+import json
+import time
+import logging
+import datetime as dt
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from typing import Optional
+import scheduler.feature_sets as fset
+from scheduler.training_matrix import compact_frame, feature_matrix
+
+# Every feature set that has a fixed column list.
+BENCHMARK_SETS = (fset.FeatureSet.MINIMAL, fset.FeatureSet.DEFAULT,
+                  fset.FeatureSet.NO_ROLLING, fset.FeatureSet.COUNT,
+                  fset.FeatureSet.FULL_FEATURES)
+
+# Schedule accuracy features with their value for an interval that has no
+# schedule history, as `LightModel._add_schedule_accuracy_features` fills.
+HISTORY_DEFAULTS = {"historical_accuracy": 0.5,
+                    "historical_false_positives": 0,
+                    "historical_false_negatives": 0,
+                    "historical_confidence": 0.5}
+SCHEDULE_COLUMNS = ["date", "interval_number", "was_correct",
+                    "false_positive", "false_negative", "confidence"]
+
+
+def prepare_feature_frame(model, days_history: int,
+                          cache_path: Optional[str] = None,
+                          feature_sets=BENCHMARK_SETS
+                          ) -> Optional[tuple[pd.DataFrame, pd.DataFrame]]:
+    """Prepare every feature column once, optionally cached on disk.
+
+    The features of each feature set are built from the activity data and
+    timed, the seconds taken are kept in ``df.attrs["build_seconds"]`` by
+    feature set name. Schedule accuracy features are left at their
+    defaults, `FeatureSetBenchmark` fills them for each replayed day from
+    the schedules returned. The cache is reused only if it was built with
+    the same history length, interval size and feature sets, its build
+    times are those of the run that built it.
+
+    Args
+    ----
+        model (LightModel): A configured model engine.
+        days_history (int): Days of history to prepare.
+        cache_path (str | None): Pickle file to load from / save to.
+        feature_sets (Iterable[FeatureSet]): Feature sets to time.
+
+    Returns
+    -------
+        tuple[pd.DataFrame, pd.DataFrame] | None: timestamp, date,
+            activity_pin and all features sorted by timestamp, and the
+            schedule accuracy rows. None if there is no data.
+    """
+    key = {"days_history": days_history,
+           "interval_minutes": model.interval_minutes,
+           "feature_sets": [feature_set.name for feature_set in feature_sets]}
+    if cache_path and os.path.exists(cache_path):
+        cached = pd.read_pickle(cache_path)
+        if isinstance(cached, dict) and cached.get("key") == key:
+            logging.info("Using cached prepared data from %s", cache_path)
+            return cached["features"], cached["schedules"]
+        logging.info("Prepared data cache %s is stale, rebuilding",
+                     cache_path)
+
+    fetched = model._prepare_training_data(days_history)
+    if fetched is None or fetched[0].empty:
+        return None
+
+    df_activity, df_schedules = fetched
+    build_seconds = {}
+    try:
+        for feature_set in feature_sets:
+            model.features.set_feature_set(feature_set)
+            start = time.perf_counter()
+            model.features._create_base_features(df_activity)
+            build_seconds[feature_set.name] = time.perf_counter() - start
+        # Generate every feature once more, each feature set slices what it
+        # needs for the replay
+        model.features.set_feature_set(fset.FeatureSet.FULL_FEATURES)
+        df = model.features._create_base_features(df_activity)
+    finally:
+        model.features.set_feature_set(model.feature_set)
+    for col, default in HISTORY_DEFAULTS.items():
+        df[col] = default
+    all_cols = fset.FeatureSetManager.get_columns(
+        fset.FeatureSet.FULL_FEATURES)
+    df = df[["timestamp", "date", "activity_pin"] + all_cols]
+    df = df.sort_values("timestamp").reset_index(drop=True)
+    compact_frame(df)
+    df.attrs["build_seconds"] = build_seconds
+    df_schedules = df_schedules[SCHEDULE_COLUMNS].reset_index(drop=True)
+
+    if cache_path:
+        pd.to_pickle({"key": key, "features": df,
+                      "schedules": df_schedules}, cache_path)
+        logging.info("Prepared data cached to %s", cache_path)
+    return df, df_schedules
+
+
+class FeatureSetBenchmark:
+    """Replay historical days for each feature set and score them.
+
+    Args
+    ----
+        df (pd.DataFrame): Output of `prepare_feature_frame`.
+        model_params (dict): LightGBM parameters to train with.
+        interval_minutes (int): Schedule interval length.
+        boost_rounds (int): Boosting rounds per trained model.
+        threshold (float): Probability at or above which an interval is ON.
+        on_boost (float | None): ON boost applied as in
+                                 `LightModel.train_model`, None disables it.
+        schedules (pd.DataFrame | None): Schedule accuracy rows from
+            `prepare_feature_frame`. The schedule accuracy features are
+            recalculated for each replayed day from the rows before it,
+            None uses the columns in `df` as they are.
+    """
+
+    def __init__(self, df: pd.DataFrame, model_params: dict,
+                 interval_minutes: int, boost_rounds: int = 100,
+                 threshold: float = 0.6, on_boost: Optional[float] = 1.0,
+                 schedules: Optional[pd.DataFrame] = None):
+        self.df = df
+        self.schedules = schedules
+        self.model_params = dict(model_params)
+        self.interval_minutes = interval_minutes
+        self.boost_rounds = boost_rounds
+        self.threshold = threshold
+        self.on_boost = on_boost
+        self._labels = (df["activity_pin"] > 0).to_numpy(dtype=np.int8)
+        self._dates = df["date"].to_numpy()
+        self._build_seconds = df.attrs.get("build_seconds", {})
+
+    def replay_dates(self, replay_days: int) -> list[dt.date]:
+        """Return the last `replay_days` dates that have earlier data."""
+        dates = sorted(set(self._dates))
+        return dates[1:][-replay_days:] if replay_days > 0 else dates[1:]
+
+    def run(self, replay_days: int = 7,
+            feature_sets=BENCHMARK_SETS) -> dict:
+        """Benchmark each feature set over the replayed days.
+
+        Returns
+        -------
+            dict: Machine-readable report, see `_summarise`.
+        """
+        days = self.replay_dates(replay_days)
+        report = {
+            "generated": dt.datetime.now(dt.timezone.utc).isoformat(),
+            "interval_minutes": self.interval_minutes,
+            "threshold": self.threshold,
+            "boost_rounds": self.boost_rounds,
+            "replay_days": [d.isoformat() for d in days],
+            "history_before_day": self.schedules is not None,
+            "feature_sets": {}}
+        histories = {day: self._history_features(day) for day in days} \
+            if self.schedules is not None else {}
+
+        for feature_set in feature_sets:
+            cols = fset.FeatureSetManager.get_columns(feature_set)
+            x_all = feature_matrix(self.df, cols)
+            per_day = [self._replay_day(x_all, day, {
+                           cols.index(col): values
+                           for col, values in histories.get(day, {}).items()
+                           if col in cols})
+                       for day in days]
+            report["feature_sets"][feature_set.name] = self._summarise(
+                cols, [d for d in per_day if d is not None],
+                self._build_seconds.get(feature_set.name))
+            logging.info("Benchmark %s: %s", feature_set.name,
+                         report["feature_sets"][feature_set.name])
+        return report
+
+    def _history_features(self, day: dt.date) -> dict[str, np.ndarray]:
+        """Schedule accuracy features of every row as known before `day`.
+
+        Aggregated as `LightModel._add_schedule_accuracy_features` does, but
+        only over the schedules before the day.
+        """
+        schedules = self.schedules
+        before = schedules[schedules["date"].to_numpy() < day].astype(
+            {"was_correct": float, "false_positive": float,
+             "false_negative": float, "confidence": float})
+        metrics = before.groupby("interval_number").agg(
+            historical_accuracy=("was_correct", "mean"),
+            historical_false_positives=("false_positive", "sum"),
+            historical_false_negatives=("false_negative", "sum"),
+            historical_confidence=("confidence", "mean"))
+        intervals = self.df["interval_number"]
+        return {col: intervals.map(metrics[col]).fillna(default)
+                .to_numpy(dtype=np.float32)
+                for col, default in HISTORY_DEFAULTS.items()}
+
+    def _replay_day(self, x_all: np.ndarray, day: dt.date,
+                    history: dict[int, np.ndarray]) -> Optional[dict]:
+        """Train on everything before `day` and predict `day`.
+
+        Args
+        ----
+            x_all (np.ndarray): Feature matrix of every row.
+            day (dt.date): Day to predict.
+            history (dict[int, np.ndarray]): Schedule accuracy features as
+                known before `day` by column of `x_all`.
+        """
+        if history:
+            x_all = x_all.copy()
+            for col, values in history.items():
+                x_all[:, col] = values
+        train_mask = self._dates < day
+        day_mask = self._dates == day
+        y_train = self._labels[train_mask]
+        if not day_mask.any() or y_train.size == 0 or \
+           y_train.min() == y_train.max():
+            # Nothing to predict or LightGBM can't learn a single class
+            return None
+
+        params = dict(self.model_params)
+        num_on = int(y_train.sum())
+        params["scale_pos_weight"] = \
+            (y_train.size - num_on) / (num_on / self.on_boost) \
+            if self.on_boost else 1.0
+
+        start = time.perf_counter()
+        booster = lgb.train(params,
+                            lgb.Dataset(x_all[train_mask], label=y_train),
+                            num_boost_round=self.boost_rounds)
+        train_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        probabilities = booster.predict(x_all[day_mask])
+        infer_seconds = time.perf_counter() - start
+
+        predicted = probabilities >= self.threshold
+        actual = self._labels[day_mask].astype(bool)
+        return {"tp": int((predicted & actual).sum()),
+                "fp": int((predicted & ~actual).sum()),
+                "fn": int((~predicted & actual).sum()),
+                "tn": int((~predicted & ~actual).sum()),
+                "on_intervals": int(predicted.sum()),
+                "train_seconds": train_seconds,
+                "infer_seconds": infer_seconds}
+
+    def _summarise(self, cols: list[str], days: list[dict],
+                   build_seconds: Optional[float]) -> dict:
+        """Aggregate per-day replay results for one feature set.
+
+        `build_seconds` is the time taken to build the set's features over
+        the whole history, None if it was not timed.
+        """
+        tp = sum(d["tp"] for d in days)
+        fp = sum(d["fp"] for d in days)
+        fn = sum(d["fn"] for d in days)
+        n_days = len(days)
+        return {
+            "features": cols,
+            "days_scored": n_days,
+            "build_seconds": build_seconds,
+            "tp": tp, "fp": fp, "fn": fn,
+            "tn": sum(d["tn"] for d in days),
+            "precision": tp / (tp + fp) if tp + fp else None,
+            "recall": tp / (tp + fn) if tp + fn else None,
+            "on_minutes_per_day":
+                sum(d["on_intervals"] for d in days)
+                * self.interval_minutes / n_days if n_days else None,
+            "train_seconds_mean":
+                float(np.mean([d["train_seconds"] for d in days]))
+                if n_days else None,
+            "infer_seconds_mean":
+                float(np.mean([d["infer_seconds"] for d in days]))
+                if n_days else None,
+        }
+
+
+def write_report(report: dict, path: str) -> None:
+    """Write a benchmark report as JSON."""
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    logging.info("Feature set benchmark report written to %s", path)
@@ -11,15 +11,221 @@ Version: 0.1
 """
 
 import os
+import csv
 import logging
 import pytz
-import pandas as pd
+import numpy as np
 import datetime as dt
 from typing import Optional
 from scheduler.base import SchedulerComponent
 from lightlib.config import ConfigLoader
 from lightlib.persist import PersistentData
 
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday",
+            "saturday", "sunday")
+_MINUTES_PER_DAY = 1440
+
+
+class CompiledFallback:
+    """A fallback schedule file compiled into per-weekday local time masks.
+
+    Each weekday has a minute resolution local time mask covering that day
+    and the following one, so blocks that run past midnight are kept. The
+    masks are reduced to runs of (start_minute, length) which are converted
+    to UTC for a specific date, so DST is handled per date rather than
+    once at compile time.
+
+    Attributes
+    ----------
+        path (str): The compiled file.
+        key (tuple): (mtime_ns, size) of the file when it was compiled.
+        masks (np.ndarray): bool array (7, 2 * 1440), Monday first.
+        runs (list[list[tuple[int, int]]]): ON runs per weekday.
+    """
+
+    __slots__ = ("path", "key", "masks", "runs", "_memo")
+
+    def __init__(self, path: str, key: tuple, masks: np.ndarray):
+        self.path = path
+        self.key = key
+        self.masks = masks
+        self.runs = [self._mask_runs(mask) for mask in masks]
+        self._memo: dict[tuple, np.ndarray] = {}
+
+    @staticmethod
+    def _mask_runs(mask: np.ndarray) -> list[tuple[int, int]]:
+        """Convert a minute mask into (start_minute, length) runs."""
+        edges = np.flatnonzero(np.diff(np.concatenate(
+            ([0], mask.astype(np.int8), [0]))))
+        return [(int(start), int(end - start))
+                for start, end in zip(edges[::2], edges[1::2])]
+
+    @classmethod
+    def from_file(cls, path: str) -> "CompiledFallback":
+        """Parse a fallback CSV (day, on_time, duration) into masks.
+
+        Invalid rows are logged and skipped.
+
+        Raises
+        ------
+            OSError: If the file can't be read.
+        """
+        stat = os.stat(path)
+        masks = np.zeros((7, 2 * _MINUTES_PER_DAY), dtype=bool)
+        with open(path, newline="") as f:
+            reader = csv.reader(f, skipinitialspace=True)
+            header = [h.strip().lower() for h in next(reader, [])]
+            for line_no, row in enumerate(reader, start=2):
+                if not any(field.strip() for field in row):
+                    continue
+                try:
+                    entry = dict(zip(header, (v.strip() for v in row)))
+                    day = entry["day"].lower()
+                    hours, minutes = entry["on_time"].split(":")
+                    start = int(hours) * 60 + int(minutes)
+                    hours, minutes = entry["duration"].split(":")
+                    length = int(hours) * 60 + int(minutes)
+                    if not 0 <= start < _MINUTES_PER_DAY or \
+                            not 0 <= length <= _MINUTES_PER_DAY:
+                        raise ValueError("time out of range")
+                    days = range(7) if day == "any" \
+                        else [WEEKDAYS.index(day)]
+                except (KeyError, ValueError) as e:
+                    logging.error("Invalid fallback row %d %s: %s",
+                                  line_no, row, e)
+                    continue
+                for weekday in days:
+                    masks[weekday, start:start + length] = True
+
+        logging.info("Compiled fallback schedule %s", path)
+        return cls(path, (stat.st_mtime_ns, stat.st_size), masks)
+
+    def has_entries(self, weekday: int) -> bool:
+        """Return True if any block starts on the weekday (0=Monday)."""
+        return self.masks[weekday, :_MINUTES_PER_DAY].any()
+
+    def interval_mask(self, date: dt.date, tz: dt.tzinfo,
+                      interval_minutes: int) -> np.ndarray:
+        """Return the UTC interval mask for a schedule date.
+
+        The UTC day can include blocks from the local previous and next day
+        depending on the timezone offset, so all three are considered. Each
+        block start is localized on its own date (DST correct) and the block
+        lasts its elapsed duration.
+
+        Returns
+        -------
+            np.ndarray: bool array, one element per interval of the UTC day.
+        """
+        memo_key = (date, str(tz), interval_minutes)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+
+        n_intervals = _MINUTES_PER_DAY // interval_minutes
+        mask = np.zeros(n_intervals, dtype=bool)
+        day_start = dt.datetime.combine(date, dt.time(0, 0),
+                                        tzinfo=dt.timezone.utc)
+        for offset in (-1, 0, 1):
+            local_date = date + dt.timedelta(days=offset)
+            local_midnight = dt.datetime.combine(local_date, dt.time(0, 0))
+            for start, length in self.runs[local_date.weekday()]:
+                local_start = local_midnight + dt.timedelta(minutes=start)
+                if hasattr(tz, "localize"):
+                    utc_start = tz.localize(local_start)
+                else:
+                    utc_start = local_start.replace(tzinfo=tz)
+                utc_start = utc_start.astimezone(dt.timezone.utc)
+                first = (utc_start - day_start).total_seconds() / 60
+                last = first + length
+                first_idx = max(0, int(np.floor(first / interval_minutes)))
+                last_idx = min(n_intervals,
+                               int(np.ceil(last / interval_minutes)))
+                if first_idx < last_idx:
+                    mask[first_idx:last_idx] = True
+
+        if len(self._memo) > 8:
+            self._memo.clear()
+        self._memo[memo_key] = mask
+        return mask
+
+
+# Compiled fallback files by absolute path
+_compiled_cache: dict[str, CompiledFallback] = {}
+
+
+def load_compiled_fallback(path: str) -> Optional[CompiledFallback]:
+    """Return the compiled fallback file, recompiling only if it changed.
+
+    Args
+    ----
+        path (str): The fallback schedule CSV.
+
+    Returns
+    -------
+        CompiledFallback | None: None if the file is missing or unreadable.
+    """
+    full_path = os.path.abspath(path)
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        logging.error("Fallback schedule file not found: %s", path)
+        _compiled_cache.pop(full_path, None)
+        return None
+
+    compiled = _compiled_cache.get(full_path)
+    if compiled is None or compiled.key != (stat.st_mtime_ns, stat.st_size):
+        try:
+            compiled = CompiledFallback.from_file(full_path)
+        except OSError as e:
+            logging.error("Unable to read fallback schedule %s: %s", path, e)
+            return None
+        _compiled_cache[full_path] = compiled
+    return compiled
+
+
+def invalidate_fallback_cache() -> None:
+    """Drop all compiled fallback schedules (e.g. after a config swap)."""
+    _compiled_cache.clear()
+
+
+def blend_probability(rows: list, date: dt.date, interval_minutes: int,
+                      decay: float) -> np.ndarray:
+    """Blend same-weekday activity into a per-interval ON probability.
+
+    Every day in `rows` contributes 1 to the intervals it had activity in,
+    weighted by `decay` for each week it is older than the most recent
+    week. Days with no activity at all are not in the rollup and are
+    treated as missing data rather than as quiet days.
+
+    Args
+    ----
+        rows (list): (activity_date, interval_number, detections) rows.
+        date (datetime.date): The date being scheduled.
+        interval_minutes (int): Schedule interval length.
+        decay (float): Weight of a week relative to the week after it.
+
+    Returns
+    -------
+        np.ndarray: float array, one probability per interval of the day.
+    """
+    n_intervals = _MINUTES_PER_DAY // interval_minutes
+    if not rows:
+        return np.zeros(n_intervals)
+
+    days, intervals, _ = zip(*rows)
+    age_days = np.fromiter(((date - day).days for day in days),
+                           dtype=np.int32, count=len(days))
+    intervals = np.asarray(intervals, dtype=np.int32)
+    keep = (intervals >= 0) & (intervals < n_intervals)
+
+    # One row of the activity matrix per historic day, oldest last
+    ages, day_index = np.unique(age_days, return_inverse=True)
+    active = np.zeros((len(ages), n_intervals), dtype=np.float32)
+    active[day_index[keep], intervals[keep]] = 1.0
+
+    weights = np.power(decay, (ages - 1) // 7, dtype=np.float64)
+    return weights @ active / weights.sum()
+
 
 class Fallback(SchedulerComponent):
     """Fallback schedule generator using a CSV time block definition."""
@@ -32,10 +238,10 @@ class Fallback(SchedulerComponent):
     def generate_schedule(self, date: dt.date) -> dict[int, dict]:
         """Generate a full fallback schedule for the given date.
 
-        Reads the fallback schedule file (CSV) and applies any matching blocks
-        (either for the specific weekday or ANY). Time blocks defined in local
-        time are converted to UTC. Matching intervals are marked as ON, others
-        as OFF.
+        Uses the compiled fallback schedule file (CSV) and applies any
+        matching blocks (either for the specific weekday or ANY). Time blocks
+        defined in local time are converted to UTC. Matching intervals are
+        marked as ON, others as OFF.
 
         Parameters
         ----------
@@ -48,109 +254,30 @@ class Fallback(SchedulerComponent):
             A dictionary of interval number -> {start, end, prediction}
             where prediction is 1 (ON) or 0 (OFF).
         """
-        df = self._load_schedule_dataframe(date)
-        if df.empty:
+        compiled = load_compiled_fallback(
+            ConfigLoader().fallback_schedule_file)
+        if compiled is None or not compiled.has_entries(date.weekday()):
             logging.warning("No fallback schedule entries found for %s",
                             date)
             return {}
 
-        on_intervals = self._expand_rows_to_intervals(df, date)
-        return self._build_full_schedule(on_intervals, date)
-
-    def _load_schedule_dataframe(self, date: dt.date) -> pd.DataFrame:
-        """Load the fallback schedule CSV and filter for matching weekdays.
-
-        Parameters
-        ----------
-        date : datetime.date
-            The target date used to match against the 'day' column in the CSV.
-
-        Returns
-        -------
-        pd.DataFrame
-            A filtered DataFrame containing only rows where the day is 'ANY' or
-            matches the target weekday (e.g. 'Monday').
-        """
-        fallback_file = ConfigLoader().fallback_schedule_file
-        if not os.path.exists(fallback_file):
-            logging.error("Fallback schedule file not found: %s",
-                          fallback_file)
-            return pd.DataFrame()
-
-        df = pd.read_csv(fallback_file, skipinitialspace=True)
-        df.columns = df.columns.str.strip() # Remove whitespace around column names
-        weekday = date.strftime("%A")
-        return df[df["day"].str.strip().isin(["ANY", weekday])]
-
-    def _expand_rows_to_intervals(self, df: pd.DataFrame,
-                                  date: dt.date) -> set[int]:
-        """Convert each local on_time + duration block to UTC interval numbers.
-
-        For each matching row in the fallback CSV, this method:
-            - Parses the on_time and duration
-            - Constructs the local datetime block
-            - Converts to UTC using the persisted local timezone
-            - Identifies all intervals covered by that block
-            - Returns a set of those interval indices
+        on_mask = compiled.interval_mask(date, self.local_tz,
+                                         self.interval_minutes)
+        return self._build_full_schedule(on_mask, date)
 
-        Parameters
-        ----------
-        df : pd.DataFrame
-            The filtered fallback schedule DataFrame (rows for this date).
-            date : datetime.date
-            The target schedule date.
-
-        Returns
-        -------
-        set[int]
-            A set of interval indices where the light should be ON.
-        """
-        on_intervals = set()
-        interval_minutes = self.interval_minutes
-
-        for _, row in df.iterrows():
-            try:
-                # Parse on_time as local time (HH:MM)
-                on_time = dt.datetime.strptime(row["on_time"].strip(),
-                                               "%H:%M").time()
-
-                # Parse duration into timedelta
-                duration_parts = row["duration"].strip().split(":")
-                duration = dt.timedelta(hours=int(duration_parts[0]),
-                                        minutes=int(duration_parts[1]))
-
-                # Combine date and on_time, then localize to correct timezone
-                local_start = dt.datetime.combine(date, on_time)
-                start_dt = self.local_tz.localize(
-                    local_start).astimezone(dt.timezone.utc)
-                end_dt = start_dt + duration
-
-                # Walk through each interval the block spans and mark as active
-                current = start_dt
-                while current < end_dt:
-                    interval = (current.hour * 60 +
-                                current.minute) // interval_minutes
-                    on_intervals.add(interval)
-                    current += dt.timedelta(minutes=interval_minutes)
-            except Exception as e:
-                logging.error("Invalid fallback row %s: %s", row, e)
-
-        return on_intervals
-
-    def _build_full_schedule(self, on_intervals: set[int],
+    def _build_full_schedule(self, on_mask: np.ndarray,
                              date: dt.date) -> dict[int, dict]:
         """Construct a full-day UTC schedule by marking intervals as ON or OFF.
 
         Builds a complete 24-hour schedule by generating all interval blocks
         (based on the configured interval length) and marking each as either ON
-        (prediction=1) or OFF (prediction=0), depending on whether the interval
-        is in the `on_intervals` set.
+        (prediction=1) or OFF (prediction=0), depending on the interval mask.
 
         Parameters
         ----------
-        on_intervals : set[int]
-            Set of interval indices where the light should be ON.
-            date : datetime.date
+        on_mask : np.ndarray
+            bool array, True for intervals where the light should be ON.
+        date : datetime.date
             The schedule date (used to calculate each interval's timestamp).
 
         Returns
@@ -162,35 +289,92 @@ class Fallback(SchedulerComponent):
                 "prediction": 1 if ON, else 0
                 }
         """
-        schedule = {}
-        interval_minutes = self.interval_minutes
-        total_intervals = 1440 // interval_minutes
-
-        for i in range(total_intervals):
-            # Calculate the interval UTC start & end time.
-            start = dt.datetime.combine(
-                date, dt.time(0, 0), tzinfo=dt.timezone.utc) + \
-                dt.timedelta(minutes=i * interval_minutes)
-            end = start + dt.timedelta(minutes=interval_minutes)
-
-            schedule[i] = {
-                "start": start,
-                "end": end,
-                "prediction": 1 if i in on_intervals else 0
-            }
+        interval = dt.timedelta(minutes=self.interval_minutes)
+        day_start = dt.datetime.combine(
+            date, dt.time(0, 0), tzinfo=dt.timezone.utc)
+
+        schedule = {
+            i: {"start": day_start + i * interval,
+                "end": day_start + (i + 1) * interval,
+                "prediction": int(on)}
+            for i, on in enumerate(on_mask.tolist())}
 
         logging.info("Generated fallback schedule for %s with "
                      "%d ON intervals.",
-                     date.isoformat(), len(on_intervals))
+                     date.isoformat(), int(on_mask.sum()))
         return schedule
 
+    def blend_method(self, date: dt.date) -> Optional[dict[int, dict]]:
+        """Build a schedule from the blended activity of past weekdays.
+
+        Activity counts per interval for every same-weekday day within the
+        configured history are rolled up by the `get_weekday_activity_rollup`
+        stored function. They are blended into one ON probability per
+        interval, recent weeks weighted more heavily, and thresholded into a
+        schedule. Needs no trained model, so it is also suitable when no
+        model is available.
+
+        Parameters
+        ----------
+        date : datetime.date
+            The date to generate the schedule for.
+
+        Returns
+        -------
+        Optional[dict[int, dict]]
+            The blended schedule, or None if there is no activity history
+            for the weekday.
+        """
+        config = ConfigLoader()
+        rows = self._query_activity_rollup(date, config.fallback_history_days)
+        if not rows:
+            logging.info("No activity history to blend for weekday %s",
+                         date.strftime("%A"))
+            return None
+
+        probability = blend_probability(rows, date, self.interval_minutes,
+                                        config.fallback_blend_decay)
+        logging.info("Blended activity from %d %s(s)",
+                     len({row[0] for row in rows}), date.strftime("%A"))
+        return self._build_full_schedule(
+            probability >= config.fallback_blend_threshold, date)
+
+    def _query_activity_rollup(self, date: dt.date,
+                               history_days: int) -> list:
+        """Fetch per-interval activity counts for the date's weekday.
+
+        Parameters
+        ----------
+        date : datetime.date
+            The date being scheduled, history before it is searched.
+        history_days : int
+            Number of days before `date` to search.
+
+        Returns
+        -------
+        list
+            (activity_date, interval_number, detections) for each interval
+            with activity. Empty if the query fails.
+        """
+        query = "SELECT * FROM get_weekday_activity_rollup(%s, %s, %s)"
+        try:
+            with self.db.conn.cursor() as cur:
+                cur.execute(query, (date, history_days,
+                                    self.interval_minutes))
+                return cur.fetchall()
+        except Exception as e:
+            logging.error("Failed to query activity rollup: %s", e)
+            return []
+
     def best_historic_method(self, date: dt.date) -> Optional[dict[int, dict]]:
         """Retrieve the most accurate past schedule for the same weekday.
 
         Searches back over the configured number of fallback history days to
         find previous schedules that occurred on the same weekday as the given
-        `date`. It then evaluates their accuracy based on prediction
-        correctness and selects the best-performing day.
+        `date`. The `get_best_historic_day` stored function scores each of
+        those days by prediction correctness and returns only the intervals of
+        the best-performing day, so the transfer is a single day no matter how
+        much history is searched.
 
         If no prior schedules exist or none match the weekday, returns None.
 
@@ -206,151 +390,67 @@ class Fallback(SchedulerComponent):
             The best schedule (in interval format) for the matched weekday,
             or None if no valid fallback could be found.
         """
-        history_days = ConfigLoader().fallback_history_days
-        start = date - dt.timedelta(days=history_days)
-        end = date
-
-        rows = self._query_historic_schedule_rows(start, end)
+        rows = self._query_best_historic_day(
+            date, ConfigLoader().fallback_history_days)
         if not rows:
-            return None
-
-        stats, schedules = self._aggregate_schedule_stats(rows, date.weekday())
-        best_day = self._select_best_day(stats)
-
-        if not best_day:
             logging.info("No suitable historic schedule found for weekday %s",
                          date.strftime("%A"))
             return None
 
+        best_day, accuracy = rows[0][0], rows[0][3]
         logging.info("Using fallback from %s with %.1f%% accuracy",
-                     best_day,
-                     100 * stats[best_day]["correct"]
-                     / stats[best_day]["total"])
+                     best_day, 100 * float(accuracy or 0))
 
-        return schedules[best_day]
+        return self._rows_to_schedule(rows)
 
-    def _query_historic_schedule_rows(self,
-                                      start: dt.date, end: dt.date) -> list:
-        """Query the db for light schedule performance data over a date range.
-
-        Retrieves all interval-level schedule entries from the light_schedules
-        table between the specified start and end dates. These rows include
-        correctness and error flags used for later accuracy evaluation.
+    def _query_best_historic_day(self, date: dt.date,
+                                 history_days: int) -> list:
+        """Fetch the intervals of the most accurate same-weekday schedule.
 
         Parameters
         ----------
-        start : datetime.date
-            The start date (inclusive) of the query range.
-        end : datetime.date
-            The end date (exclusive) of the query range.
+        date : datetime.date
+            The date being replaced, history before it is searched.
+        history_days : int
+            Number of days before `date` to search.
 
         Returns
         -------
         list
-            A list of rows, where each row is:
-                (date, interval_number, was_correct, false_positive,
-                 false_negative)
+            A list of rows for the winning day, where each row is:
+                (date, interval_number, was_correct, accuracy)
 
         Notes
         -----
         If the query fails or no data exists, returns an empty list.
         """
-        query = """
-            SELECT date, interval_number, was_correct,
-                false_positive, false_negative
-            FROM light_schedules
-            WHERE date >= %s AND date < %s
-        """
+        query = "SELECT * FROM get_best_historic_day(%s, %s)"
         try:
             with self.db.conn.cursor() as cur:
-                cur.execute(query, (start, end))
+                cur.execute(query, (date, history_days))
                 return cur.fetchall()
         except Exception as e:
             logging.error("Failed to query historic schedules: %s", e)
             return []
 
-    def _aggregate_schedule_stats(self, rows: list, target_weekday: int
-                                  ) -> tuple[dict, dict]:
-        """Summarize past schedule performance by date for the target weekday.
-
-        Filters the provided schedule rows to only include entries from the
-        same weekday (e.g., Tuesday). It then:
-            - Aggregates false positives, false negatives, and correct
-              predictions per date
-            - Reconstructs the full interval-level schedule for each day
-
-        This data is used to identify the most reliable past day for fallback.
+    def _rows_to_schedule(self, rows: list) -> dict[int, dict]:
+        """Rebuild the interval schedule of a historic day.
 
         Parameters
         ----------
         rows : list
-            A list of tuples from the database containing:
-                (date, interval_number, was_correct, false_positive,
-                 false_negative)
-
-        target_weekday : int
-            The weekday to match against (0=Monday, 6=Sunday).
-
-        Returns
-        -------
-        tuple[dict, dict]
-            - stats: {date -> {'fp', 'fn', 'correct', 'total'}}
-            - schedules: {date -> {interval_number -> {start, end,
-                                                       prediction}}}
-        """
-        from collections import defaultdict
-        interval_minutes = self.interval_minutes
-        stats = defaultdict(
-            lambda: {"fp": 0, "fn": 0, "correct": 0, "total": 0})
-        schedules = defaultdict(dict)
-
-        for sched_date, interval, was_correct, fp, fn in rows:
-            if sched_date.weekday() != target_weekday:
-                continue
-
-            # Update performance stats
-            stat = stats[sched_date]
-            stat["fp"] += int(fp) if fp is not None else 0
-            stat["fn"] += int(fn) if fn is not None else 0
-            stat["correct"] += int(was_correct) if was_correct is not None \
-                else 0
-            stat["total"] += 1
-
-            # Reconstruct the schedule structure for fallback use
-            start_dt = dt.datetime.combine(
-                sched_date, dt.time(0, 0), tzinfo=dt.timezone.utc
-            ) + dt.timedelta(minutes=interval * interval_minutes)
-
-            schedules[sched_date][interval] = {
-                "start": start_dt,
-                "end": start_dt + dt.timedelta(minutes=interval_minutes),
-                "prediction": 1 if was_correct else 0
-            }
-
-        return stats, schedules
-
-    def _select_best_day(self, stats: dict) -> Optional[dt.date]:
-        """Identify the day with the highest accuracy from aggregated stats.
-
-        Selects the date with the highest (correct / total) ratio.
-        If no data is available, returns None.
-
-        Parameters
-        ----------
-        stats : dict
-            Dictionary of date -> performance summary, where each value
-                includes: 'correct', 'fp', 'fn', 'total'
+            Rows returned by `_query_best_historic_day`.
 
         Returns
         -------
-        Optional[datetime.date]
-            The date with the best overall prediction accuracy, or None if
-            stats is empty.
+        dict[int, dict]
+            interval_number -> {start, end, prediction}
         """
-        if not stats:
-            return None
-        return max(
-            stats.items(),
-            key=lambda item: item[1]["correct"] / item[1]["total"]
-            if item[1]["total"] else 0
-        )[0]
+        interval = dt.timedelta(minutes=self.interval_minutes)
+        day_start = dt.datetime.combine(
+            rows[0][0], dt.time(0, 0), tzinfo=dt.timezone.utc)
+        return {
+            number: {"start": day_start + number * interval,
+                     "end": day_start + (number + 1) * interval,
+                     "prediction": 1 if was_correct else 0}
+            for _, number, was_correct, _ in rows}
@@ -15,7 +15,7 @@ Version: 0.1
 
 import logging
 from enum import IntEnum
-from typing import List
+from typing import Iterable, List
 
 
 class FeatureSet(IntEnum):
@@ -29,6 +29,112 @@ class FeatureSet(IntEnum):
     CUSTOM = 999
 
 
+# Every feature the FeatureEngineer can produce, mapped to the computation
+# group that produces it. Features in the same group are calculated together.
+FEATURE_REGISTRY = {
+    'hour_sin': 'hour', 'hour_cos': 'hour',
+    'day_sin': 'day', 'day_cos': 'day',
+    'month_sin': 'month', 'month_cos': 'month',
+    'interval_number': 'interval',
+    'rolling_activity_1h': 'rolling_activity',  # DB lookup per interval
+    'rolling_activity_1d': 'rolling_activity',
+    'rolling_count_1h': 'rolling_count',        # DB lookup per interval
+    'rolling_count_1d': 'rolling_count',
+    'historical_accuracy': 'history',
+    'historical_false_positives': 'history',
+    'historical_false_negatives': 'history',
+    'historical_confidence': 'history',
+}
+
+# Groups that must be calculated before another group can be.
+GROUP_DEPENDENCIES = {
+    'rolling_activity': ('interval',),
+    'rolling_count': ('interval',),
+    'history': ('interval',),
+}
+
+# Groups every plan runs whatever features are asked for. interval_number
+# is always needed to merge in schedule accuracy and to key schedules.
+BASE_GROUPS = ('interval',)
+
+
+class InvalidFeatureError(ValueError):
+    """Raised when a feature list names features that don't exist."""
+
+    pass
+
+
+class FeaturePlan:
+    """The compiled set of computations needed for a list of features.
+
+    Attributes
+    ----------
+        columns (tuple[str]): The requested feature columns, in order.
+        groups (frozenset[str]): Computation groups to run, including
+                                 dependencies of the requested features.
+    """
+
+    __slots__ = ("columns", "groups")
+
+    def __init__(self, columns: tuple[str, ...], groups: frozenset[str]):
+        self.columns = columns
+        self.groups = groups
+
+    def needs(self, group: str) -> bool:
+        """Return True if the computation group must be run."""
+        return group in self.groups
+
+    def __repr__(self):
+        return (f"FeaturePlan(columns={list(self.columns)}, "
+                f"groups={sorted(self.groups)})")
+
+
+def validate_features(features: Iterable[str]) -> List[str]:
+    """Check feature names against the registry.
+
+    Args
+    ----
+        features (Iterable[str]): Feature names, duplicates are dropped.
+
+    Returns
+    -------
+        List[str]: The validated feature names in their original order.
+
+    Raises
+    ------
+        InvalidFeatureError: If the list is empty or any name is unknown.
+    """
+    names = list(dict.fromkeys(f.strip() for f in features if f.strip()))
+    unknown = [f for f in names if f not in FEATURE_REGISTRY]
+    if unknown:
+        raise InvalidFeatureError(
+            f"Unknown feature(s) {unknown}. Valid features are "
+            f"{list(FEATURE_REGISTRY)}")
+    if not names:
+        raise InvalidFeatureError("Feature list is empty")
+    return names
+
+
+def compile_feature_plan(features: Iterable[str]) -> FeaturePlan:
+    """Compile a feature list into the computations needed to produce it.
+
+    The plan always includes `BASE_GROUPS`.
+
+    Raises
+    ------
+        InvalidFeatureError: If the feature list is invalid.
+    """
+    columns = tuple(validate_features(features))
+    groups = set()
+    pending = list(BASE_GROUPS) + [FEATURE_REGISTRY[f] for f in columns]
+    while pending:
+        group = pending.pop()
+        if group not in groups:
+            groups.add(group)
+            pending.extend(GROUP_DEPENDENCIES.get(group, ()))
+    return FeaturePlan(columns, frozenset(groups))
+
+
 class FeatureSetManager:
     """Manages feature column sets for different modeling strategies."""
 
@@ -97,9 +203,14 @@ class FeatureSetManager:
                 ]
 
             case FeatureSet.CUSTOM:
-                logging.warning("CUSTOM feature set is not yet implemented. "
-                                "using BASELINE")
-                return FeatureSetManager.get_columns(FeatureSet.MINIMAL)
+                # Imported here, lightlib.config depends on this module
+                from lightlib.config import ConfigLoader
+                try:
+                    return validate_features(ConfigLoader().custom_features)
+                except InvalidFeatureError as e:
+                    logging.warning("Invalid MODEL.custom_features: %s. "
+                                    "Using MINIMAL", e)
+                    return FeatureSetManager.get_columns(FeatureSet.MINIMAL)
 
             case FeatureSet.DEFAULT | _:
                 if feature_set != FeatureSet.DEFAULT:
@@ -115,3 +226,20 @@ class FeatureSetManager:
                     'historical_false_negatives',
                     'historical_confidence'
                 ]
+
+    @staticmethod
+    def get_plan(feature_set: FeatureSet) -> FeaturePlan:
+        """Compile the feature plan for a given FeatureSet.
+
+        Args
+        ----
+            feature_set (FeatureSet): The feature set to compile.
+
+        Returns
+        -------
+            FeaturePlan: Only the computations the feature set needs.
+        """
+        plan = compile_feature_plan(
+            FeatureSetManager.get_columns(feature_set))
+        logging.debug("Compiled %s feature set: %s", feature_set.name, plan)
+        return plan
@@ -15,7 +15,10 @@ import logging
 import datetime as dt
 import pandas as pd
 import numpy as np
+import scheduler.feature_sets as fset
 from scheduler.base import SchedulerComponent
+from lightlib.config import ConfigLoader
+from lightlib.profiler import stage
 
 
 class FeatureEngineer(SchedulerComponent):
@@ -38,94 +41,101 @@ class FeatureEngineer(SchedulerComponent):
     def __init__(self):
         super().__init__()  # Ensure base SchedulerComponent config works
         self._warned_missing = None
+        self.set_feature_set(ConfigLoader().model_features)
 
-    def _generate_features_dict(self, timestamp: dt.datetime) -> dict:
+    def set_feature_set(self, feature_set: fset.FeatureSet) -> None:
+        """Compile the plan of features to generate for a feature set.
+
+        Only the features in the set (and anything they depend on) are
+        calculated, so lean feature sets skip the rolling activity DB lookups
+        entirely.
+
+        Args
+        ----
+            feature_set (FeatureSet): The feature set used by the model.
+        """
+        self.feature_set = feature_set
+        self._plan = fset.FeatureSetManager.get_plan(feature_set)
+
+    def _generate_features_dict(self, timestamp: dt.datetime,
+                                with_interval: bool = False) -> dict:
         """Generate feature values for a timestamp.
 
         Args
         ----
             timestamp (dt.datetime): The timestamp to generate features for.
+            with_interval (bool): Include interval_number even when the
+                model doesn't use it.
 
+        Only the computation groups in the compiled feature plan are run:
         -Extracts time-based features (hour, day of week, month).
         -Converts these into cyclical features (`sin/cos` encoding).
-        -Determines whether the timestamp falls within darkness hours.
         -Retrieves historical schedule accuracy features for this interval.
         -Computes rolling activity features for short- and long-term trends.
 
         Returns
         -------
-            dict: A dictionary of extracted feature values.
+            dict: A dictionary of the feature values in the plan.
         """
-        # Extract time components
-        hour = timestamp.hour
-        minute = timestamp.minute
-        day_of_week = timestamp.weekday()
-        month = timestamp.month
+        plan = self._plan
+        feature_values = {}
 
         # Create cyclical time features
         #    sin(2pi * value/max_value)
         #    cos(2pi * value/max_value)
 
-        # - Hours (24-hour cycle)
         # - hour_sin, hour_cos (24-hour cycle)
-        hour_sin = np.sin(2 * np.pi * hour / 24)
-        hour_cos = np.cos(2 * np.pi * hour / 24)
+        if plan.needs("hour"):
+            hour = timestamp.hour
+            feature_values["hour_sin"] = np.sin(2 * np.pi * hour / 24)
+            feature_values["hour_cos"] = np.cos(2 * np.pi * hour / 24)
 
-        # - Days of week (7-day cycle)
         # - day_sin, day_cos (7-day cycle)
-        day_sin = np.sin(2 * np.pi * day_of_week / 7)
-        day_cos = np.cos(2 * np.pi * day_of_week / 7)
+        if plan.needs("day"):
+            day_of_week = timestamp.weekday()
+            feature_values["day_sin"] = np.sin(2 * np.pi * day_of_week / 7)
+            feature_values["day_cos"] = np.cos(2 * np.pi * day_of_week / 7)
 
-        # - Months (12-month cycle)
         # - month_sin, month_cos (12-month cycle)
-        month_sin = np.sin(2 * np.pi * month / 12)
-        month_cos = np.cos(2 * np.pi * month / 12)
+        if plan.needs("month"):
+            month = timestamp.month
+            feature_values["month_sin"] = np.sin(2 * np.pi * month / 12)
+            feature_values["month_cos"] = np.cos(2 * np.pi * month / 12)
 
         # Calculate interval number
-        interval_number = (hour * 60 + minute) // self.interval_minutes
+        if plan.needs("interval"):
+            interval_number = (timestamp.hour * 60 + timestamp.minute
+                               ) // self.interval_minutes
+            feature_values["interval_number"] = interval_number
 
         # Retrieve historical accuracy features (default if missing)
-        history = self._get_cached_schedule_entry(
-            timestamp.date(), interval_number)
-        historical_accuracy = history.get(
-            "historical_accuracy", 0.5)
-        historical_false_positives = history.get(
-            "historical_false_positives", 0)
-        historical_false_negatives = history.get(
-            "historical_false_negatives", 0)
-        historical_confidence = history.get(
-            "historical_confidence", 0.5)
-
-        # Compute rolling activity features
-        past_activity = self._retrieve_past_activity(
-            timestamp.date(), interval_number)
-
-        # Compute rolling activity features
-        if len(past_activity) >= 6:
-            rolling_activity_1h = np.mean(past_activity[-6:])  # Last hour
-        else:
-            rolling_activity_1h = 0
-
-        if past_activity:
-            rolling_activity_1d = np.mean(past_activity)       # Last 24 hours
-        else:
-            rolling_activity_1d = 0
-
-        rolling_counts = self._get_rolling_count_features(timestamp)
-        # Construct full dictionary of all available features
-        feature_values = {
-            "hour_sin": hour_sin, "hour_cos": hour_cos,
-            "day_sin": day_sin, "day_cos": day_cos,
-            "month_sin": month_sin, "month_cos": month_cos,
-            "rolling_activity_1h": rolling_activity_1h,
-            "rolling_activity_1d": rolling_activity_1d,
-            "interval_number": interval_number,
-            "historical_accuracy": historical_accuracy,
-            "historical_false_positives": historical_false_positives,
-            "historical_false_negatives": historical_false_negatives,
-            "historical_confidence": historical_confidence,
-        }
-        feature_values.update(rolling_counts)
+        if plan.needs("history"):
+            history = self._get_cached_schedule_entry(
+                timestamp.date(), interval_number)
+            feature_values.update({
+                "historical_accuracy": history.get(
+                    "historical_accuracy", 0.5),
+                "historical_false_positives": history.get(
+                    "historical_false_positives", 0),
+                "historical_false_negatives": history.get(
+                    "historical_false_negatives", 0),
+                "historical_confidence": history.get(
+                    "historical_confidence", 0.5)})
+
+        # Compute rolling activity features (one DB query per timestamp)
+        if plan.needs("rolling_activity"):
+            past_activity = self._retrieve_past_activity(
+                timestamp.date(), interval_number)
+            # Last hour
+            feature_values["rolling_activity_1h"] = \
+                np.mean(past_activity[-6:]) if len(past_activity) >= 6 else 0
+            # Last 24 hours
+            feature_values["rolling_activity_1d"] = \
+                np.mean(past_activity) if past_activity else 0
+
+        # Compute rolling count features (one DB query per timestamp)
+        if plan.needs("rolling_count"):
+            feature_values.update(self._get_rolling_count_features(timestamp))
 
         # Only return the features needed by the model.
         # _get_feature_columns() lists the features the model uses.
@@ -133,34 +143,22 @@ class FeatureEngineer(SchedulerComponent):
         # - Control which features are used in one place
         # - Try out new features here without affecting the model
         # - Keep training and prediction using the same inputs
-        return {
-            key: feature_values[key] for key in self._get_feature_columns()}
+        columns = self._get_feature_columns()
+        if with_interval and "interval_number" not in columns:
+            columns.append("interval_number")
+        return {key: feature_values[key] for key in columns}
 
     def _get_feature_columns(self) -> list[str]:
         """Return the list of features used by the model.
 
-        These are the columns the model uses when training and making
-        predictions. Any other features that are calculated will be ignored.
+        These are the columns of the compiled feature plan, the model uses
+        them when training and making predictions.
 
         Returns
         -------
             list[str]: The names of the features the model expects.
         """
-        return [
-            'hour_sin', 'hour_cos',        # Hour encoding
-            'month_sin', 'month_cos',      # Seasonal encoding
-            'day_sin', 'day_cos',          # Weekly pattern encoding
-            'rolling_activity_1h',         # Short-term activity trend
-            'rolling_activity_1d',         # Long-term activity trend
-            'rolling_count_1h',            # Short-term count trend
-            'rolling_count_1d',            # Total detection count for this
-            'interval_number',             # Time interval index
-            'historical_accuracy',         # Past scheduling success rate
-            'historical_false_positives',  # Past over-predictions
-            'historical_false_negatives',  # Past under-predictions
-            'historical_confidence'        # Average confidence in past
-                                           # schedules
-        ]
+        return list(self._plan.columns)
 
     def _get_rolling_count_features(self, timestamp: dt.datetime,
                                     history_days: int = 30
@@ -197,6 +195,7 @@ class FeatureEngineer(SchedulerComponent):
         return {"rolling_count_1h": rolling_count_1h,
                 "rolling_count_1d": rolling_count_1d}
 
+    @stage("feature_build")
     def _create_base_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add training features.
 
@@ -205,8 +204,10 @@ class FeatureEngineer(SchedulerComponent):
         - Seasonal patterns (through month encoding)
         - Recent activity patterns (through rolling averages)
         """
-        # Apply the shared feature function to all timestamps
-        feature_dicts = df['timestamp'].apply(self._generate_features_dict)
+        # Apply the shared feature function to all timestamps, keeping
+        # interval_number for the schedule accuracy merge
+        feature_dicts = df['timestamp'].apply(self._generate_features_dict,
+                                              with_interval=True)
 
         # Convert the list of feature dictionaries into a DataFrame
         features_df = pd.DataFrame(feature_dicts.tolist(), index=df.index)
@@ -11,6 +11,7 @@ Author: Will Bickerstaff
 Version: 0.1
 """
 import lightgbm as lgb  # https://lightgbm.readthedocs.io/en/stable/
+import os
 import logging
 import pandas as pd
 import numpy as np
@@ -18,8 +19,13 @@ import datetime as dt
 import scheduler.feature_sets as fset
 from scheduler.base import SchedulerComponent
 from .synthetic_days import generate_synthetic_days
+from .tuning import load_tuned_params
+from .training_matrix import compact_frame, feature_matrix, make_dataset, \
+    class_weight
 from lightlib.config import ConfigLoader
-from lightlib.common import get_now
+from lightlib.common import get_now, current_rss_mb, peak_rss_mb, \
+    reset_peak_rss
+from lightlib.profiler import stage, annotate
 
 
 class LightModel(SchedulerComponent):
@@ -37,6 +43,10 @@ class LightModel(SchedulerComponent):
 
     def __init__(self):
         super().__init__()
+        self.reset_model()
+
+    def reset_model(self) -> None:
+        """Discard the trained model and re-read the model configuration."""
         self.model = None
         self.set_feature_set(ConfigLoader().model_features)
         self.model_params = {
@@ -50,6 +60,29 @@ class LightModel(SchedulerComponent):
             'bagging_freq': 5,
             'verbose': -1
         }
+        tuned = load_tuned_params(ConfigLoader().tuned_params_file,
+                                  self.feature_set)
+        if tuned:
+            logging.info("Using tuned model parameters: %s", tuned)
+            self.model_params.update(tuned)
+
+    @property
+    def on_boost(self) -> float | None:
+        """float | None: The configured ON boost, None if disabled."""
+        if ConfigLoader().boost_enable:
+            return ConfigLoader().ON_boost
+        return None
+
+    def training_params(self) -> dict:
+        """Return the LightGBM parameters `train_model` fits with.
+
+        `model_params` with min_data_in_leaf from the config. The
+        scale_pos_weight depends on the training data, see `class_weight`.
+        """
+        params = {k: v for k, v in self.model_params.items()
+                  if k != "scale_pos_weight"}
+        params["min_data_in_leaf"] = ConfigLoader().min_data_in_leaf
+        return params
 
     def _split_train_validation(self, df: pd.DataFrame,
                                 feature_cols: list[str],
@@ -115,6 +148,8 @@ class LightModel(SchedulerComponent):
             None
         """
         logging.info("Training with feature set %s", self.feature_set.name)
+        reset_peak_rss()
+        rss_before = current_rss_mb()
         #   1-Retrieve & prepare training data
         fetched_data = self._prepare_training_data(days_history)
         # If there is no training data then exit
@@ -132,7 +167,9 @@ class LightModel(SchedulerComponent):
             return
 
         df = self.features._create_base_features(df_activity)
-        df = self._add_schedule_accuracy_features(df, df_schedules)
+        del df_activity
+        df = compact_frame(
+            self._add_schedule_accuracy_features(df, df_schedules))
 
         # 2-Select features for training
         feature_cols = fset.FeatureSetManager.get_columns(self.feature_set)
@@ -149,39 +186,46 @@ class LightModel(SchedulerComponent):
         num_off = (y_train == 0).sum()
 
         # Boost ONs if needed (for sparse datasets)
-        if num_on > 0 and ConfigLoader().boost_enable:
-            on_boost = ConfigLoader().ON_boost
-            scale_pos_weight = num_off / (num_on / on_boost)
-            self.model_params["scale_pos_weight"] = scale_pos_weight
+        on_boost = self.on_boost
+        self.model_params = self.training_params()
+        scale_pos_weight = class_weight(num_on, num_off, on_boost)
+        self.model_params["scale_pos_weight"] = scale_pos_weight
+        if num_on > 0 and on_boost:
             logging.info("Set scale_pos_weight to %.3f based on class "
                          "imbalance. ON_Boost is at: %.3f",
                          scale_pos_weight, on_boost)
         else:
-            self.model_params["scale_pos_weight"] = 1.0
             logging.warning("No positive samples found or ON boost disabled. "
                             ". scale_pos_weight set to 1.0")
 
-        self.model_params["min_data_in_leaf"] = ConfigLoader().min_data_in_leaf
         # 3-Define the target variable
         y = (df['activity_pin'] > 0).astype(int)
         label_dist = pd.Series(y).value_counts().to_dict()
         logging.debug("y_train distribution: %s", label_dist)
         logging.debug("Sample activity_pin values:\n%s",
                       df[['timestamp', 'activity_pin']].head(10))
-        # 4-Create the dataset
-        train_data = lgb.Dataset(x_train, label=y_train)
+        # 4-Create the dataset (compact float32, raw data freed once binned)
+        train_data = make_dataset(x_train, y_train, feature_cols)
+        val_data = make_dataset(x_val, y_val, feature_cols,
+                                reference=train_data) \
+            if not x_val.empty else None
+        del df, x_train, x_val
 
         # 5-Train the model
-        if not x_val.empty:
-            val_data = lgb.Dataset(x_val, label=y_val)
-            self._train_with_data(train_data=train_data,
-                                  val_data=val_data,
-                                  feature_cols=feature_cols)
-        else:
-            self._train_with_data(train_data=train_data,
-                                  val_data=None,
-                                  feature_cols=feature_cols)
+        self._train_with_data(train_data=train_data,
+                              val_data=val_data,
+                              feature_cols=feature_cols)
+
+        self.save_model(ConfigLoader().model_file)
 
+        rss_after, rss_peak = current_rss_mb(), peak_rss_mb()
+        annotate(feature_set=self.feature_set.name,
+                 rss_before_mb=rss_before, rss_after_mb=rss_after,
+                 rss_peak_mb=rss_peak)
+        logging.info("Training memory: RSS %.1f MB before, %.1f MB after, "
+                     "peak %.1f MB", rss_before, rss_after, rss_peak)
+
+    @stage("lgbm_fit")
     def _train_with_data(self,
                          train_data: lgb.Dataset,
                          val_data: lgb.Dataset | None,
@@ -250,6 +294,66 @@ class LightModel(SchedulerComponent):
 
         logging.info("Feature importance:\n%s", importance)
 
+    def save_model(self, path: str) -> bool:
+        """Save the trained model so it survives a restart.
+
+        The file is written beside the target and renamed over it, a crash
+        mid-write leaves the previous model in place.
+
+        Args
+        ----
+            path (str): Model file, empty to skip saving.
+
+        Returns
+        -------
+            bool: True if the model was saved.
+        """
+        if self.model is None or not path:
+            return False
+        tmp_path = f"{path}.tmp"
+        try:
+            self.model.save_model(tmp_path)
+            os.replace(tmp_path, path)
+            logging.info("Saved trained model to %s", path)
+            return True
+        except (OSError, lgb.basic.LightGBMError) as e:
+            logging.warning("Unable to save model to %s: %s", path, e)
+            return False
+
+    def load_model(self, path: str) -> bool:
+        """Restore a model saved by `save_model`.
+
+        A model trained on a different feature set than the one configured
+        can't be used for prediction and is ignored.
+
+        Args
+        ----
+            path (str): Model file.
+
+        Returns
+        -------
+            bool: True if a usable model was restored.
+        """
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            booster = lgb.Booster(model_file=path)
+        except lgb.basic.LightGBMError as e:
+            logging.warning("Unable to load model from %s: %s", path, e)
+            return False
+
+        feature_cols = fset.FeatureSetManager.get_columns(self.feature_set)
+        if booster.feature_name() != list(feature_cols):
+            logging.warning("Saved model in %s was trained on different "
+                            "features than feature set %s, ignoring it",
+                            path, self.feature_set.name)
+            return False
+
+        self.model = booster
+        logging.info("Restored trained model from %s", path)
+        return True
+
+    @stage("prediction")
     def _predict_schedule(self, df: pd.DataFrame) -> np.ndarray:
         """Generate predictions for the given schedule DataFrame.
 
@@ -272,11 +376,10 @@ class LightModel(SchedulerComponent):
         drop_cols = ['date', 'timestamp']
         df = df.drop(columns=[col for col in drop_cols if col in df.columns])
 
-        # Always slice the DataFrame cleanly
-        x_predict = df[feature_cols].copy()
-        y_pred = self.model.predict(x_predict)
-        probabilities = self.model.predict(x_predict, raw_score=False)
-        predictions = (y_pred >= self.min_confidence).astype(int)
+        # Predict from the same float32 layout the model was trained on
+        x_predict = feature_matrix(df, feature_cols)
+        probabilities = self.model.predict(x_predict)
+        predictions = (probabilities >= self.min_confidence).astype(int)
 
         logging.debug("ON confidence threshold is: %.2f", self.min_confidence)
         logging.debug("Prediction probabilities: %s", probabilities.tolist())
@@ -316,8 +419,8 @@ class LightModel(SchedulerComponent):
 
             df_intervals = self._build_interval_grid(start_time, end_time)
             activity_ts = self._load_activity_data(start_time, end_time)
-            df_intervals = self._assign_activity_flags(
-                df_intervals, activity_ts)
+            df_intervals = compact_frame(self._assign_activity_flags(
+                df_intervals, activity_ts))
             df_schedules = self._load_schedule_data(start_time, end_time)
 
             if df_schedules.empty:
@@ -331,14 +434,17 @@ class LightModel(SchedulerComponent):
 
             if ConfigLoader().synth_days:
                 # Generate synthetic days to fill gaps in activity data
-                df_synthetic = generate_synthetic_days(
-                    start_date=df_intervals["date"].min(),
-                    end_date=df_intervals["date"].max(),
-                    db=self.db,
-                    target_columns=list(df_intervals.columns),
-                    activity_only=True)
+                with stage("synthetic_days"):
+                    df_synthetic = generate_synthetic_days(
+                        start_date=df_intervals["date"].min(),
+                        end_date=df_intervals["date"].max(),
+                        db=self.db,
+                        target_columns=list(df_intervals.columns),
+                        activity_only=True)
 
                 if not df_synthetic.empty:
+                    # Matching compact dtypes keep the concat from upcasting
+                    df_synthetic = compact_frame(df_synthetic)
                     df_intervals = pd.concat([df_intervals, df_synthetic],
                                              ignore_index=True, axis=0)
                     logging.info("Added %d synthetic intervals for %d "
@@ -348,6 +454,9 @@ class LightModel(SchedulerComponent):
                                   [d.isoformat() for d in
                                    sorted(df_synthetic["date"].unique())])
 
+            annotate(training_intervals=len(df_intervals),
+                     activity_intervals=int(
+                         (df_intervals['activity_pin'] > 0).sum()))
             logging.info(f"Training set: {len(df_intervals)} intervals, "
                          f"{(df_intervals['activity_pin'] > 0).sum()} "
                          f"with activity")
@@ -360,6 +469,7 @@ class LightModel(SchedulerComponent):
         # Return the complete dataset
         return df_intervals, df_schedules
 
+    @stage("schedule_load")
     def _load_schedule_data(self, start: dt.datetime,
                             end: dt.datetime) -> pd.DataFrame:
         """Load light schedule evaluation data from the database.
@@ -394,6 +504,7 @@ class LightModel(SchedulerComponent):
         return pd.read_sql_query(
             query, engine, params={'start': start.date(), 'end': end.date()})
 
+    @stage("activity_flags")
     def _assign_activity_flags(self,
                                df_intervals: pd.DataFrame,
                                activity_ts: list[dt.datetime]) -> pd.DataFrame:
@@ -420,6 +531,7 @@ class LightModel(SchedulerComponent):
         df_intervals['activity_pin'] = flags
         return df_intervals
 
+    @stage("activity_load")
     def _load_activity_data(self, start: dt.datetime,
                             end: dt.datetime) -> list[dt.datetime]:
         """Load activity timestamps from the database.
@@ -458,6 +570,7 @@ class LightModel(SchedulerComponent):
                           (df_all["timestamp"] < end), "timestamp"
                           ].tolist()
 
+    @stage("grid_build")
     def _build_interval_grid(self, start: dt.datetime,
                              end: dt.datetime) -> pd.DataFrame:
         """Build a DataFrame of time intervals between start and end.
@@ -547,3 +660,6 @@ class LightModel(SchedulerComponent):
         logging.debug("FeatureManager is using feature set %s",
                       feature_set.name)
         self.feature_set = feature_set
+        # Keep the feature engineer computing the same features
+        if getattr(self, "features", None) is not None:
+            self.features.set_feature_set(feature_set)
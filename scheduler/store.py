@@ -16,7 +16,9 @@ import datetime as dt
 import pandas as pd
 import numpy as np
 import psycopg2
+from psycopg2.extras import execute_values
 import lightlib.common as llc
+from lightlib.profiler import stage
 from scheduler.base import SchedulerComponent
 
 
@@ -33,6 +35,7 @@ class ScheduleStore(SchedulerComponent):
     including database connection and interval settings.
     """
 
+    @stage("storage")
     def store_schedule(self, schedule_date: dt.date, df: pd.DataFrame,
                        predictions: np.ndarray,
                        probabilities: np.ndarray) -> dict:
@@ -82,18 +85,20 @@ class ScheduleStore(SchedulerComponent):
         # If we get here, database is healthy, Store in database
         try:
             with self.db.conn.cursor() as cursor:
-                for interval, info in schedule.items():
-                    cursor.execute("""
-                        INSERT INTO light_schedules (date, interval_number,
-                                                     start_time, end_time,
-                                                     prediction, confidence)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (date, interval_number) DO UPDATE
-                        SET prediction = EXCLUDED.prediction,
-                        confidence = EXCLUDED.confidence;
-                        """, (schedule_date, int(interval), info["start"],
-                              info["end"], bool(info["prediction"]),
-                              float(info.get("confidence", 0.5))))
+                # One round trip for the whole day
+                execute_values(cursor, """
+                    INSERT INTO light_schedules (date, interval_number,
+                                                 start_time, end_time,
+                                                 prediction, confidence)
+                    VALUES %s
+                    ON CONFLICT (date, interval_number) DO UPDATE
+                    SET prediction = EXCLUDED.prediction,
+                    confidence = EXCLUDED.confidence;
+                    """, [(schedule_date, int(interval), info["start"],
+                           info["end"], bool(info["prediction"]),
+                           float(info.get("confidence", 0.5)))
+                          for interval, info in schedule.items()],
+                    page_size=len(schedule) or 1)
 
             self.db.conn.commit()  # Commit transaction
             logging.info(f"Stored schedule for {schedule_date} in database.")
@@ -104,7 +109,7 @@ class ScheduleStore(SchedulerComponent):
 
         return schedule
 
-    def _purge_old_cache_entries(self):
+    def purge_old_cache_entries(self):
         """Keep only, yesterday, today & tomorrow in schedule cache."""
         valid_dates = {
             llc.get_yesterday(),
@@ -165,7 +170,7 @@ class ScheduleStore(SchedulerComponent):
             # If retrieved from the database, store it in cache
             self.schedule_cache[target_date] = schedule
             # Prevent the cache from infinitely growing
-            self._purge_old_cache_entries()
+            self.purge_old_cache_entries()
 
             return schedule
 
@@ -174,6 +179,20 @@ class ScheduleStore(SchedulerComponent):
                 f"Failed to retrieve schedule for {target_date}: {e}")
             return {}
 
+    def reload_schedule(self, target_date: dt.date) -> dict:
+        """Drop any cached schedule for a date and read it from the database.
+
+        Args
+        ----
+            target_date (dt.date): The date to reload.
+
+        Returns
+        -------
+            dict: The stored schedule, empty if there is none.
+        """
+        self.schedule_cache.pop(target_date, None)
+        return self.get_schedule(target_date)
+
     def get_current_schedule(self) -> dict:
         """Get the cached schedule or load it from the database if needed.
 
@@ -189,6 +208,7 @@ class ScheduleStore(SchedulerComponent):
 
         return sched_yesterday | sched_today
 
+    @stage("storage")
     def store_fallback(self,
                        schedule_date: dt.date,
                        schedule: dict[int, dict]) -> dict[int, dict]:
@@ -218,21 +238,18 @@ class ScheduleStore(SchedulerComponent):
 
         try:
             with self.db.conn.cursor() as cur:
-                for interval, entry in schedule.items():
-                    cur.execute("""
-                        INSERT INTO light_schedules
-                            (date, interval_number, start_time, end_time,
-                             prediction)
-                        VALUES (%s, %s, %s, %s, %s)
-                        ON CONFLICT (date, interval_number) DO UPDATE
-                        SET prediction = EXCLUDED.prediction;
-                        """, (
-                            schedule_date,
-                            int(interval),
-                            entry["start"],
-                            entry["end"],
-                            bool(entry["prediction"])
-                        ))
+                # One round trip for the whole day
+                execute_values(cur, """
+                    INSERT INTO light_schedules
+                        (date, interval_number, start_time, end_time,
+                         prediction)
+                    VALUES %s
+                    ON CONFLICT (date, interval_number) DO UPDATE
+                    SET prediction = EXCLUDED.prediction;
+                    """, [(schedule_date, int(interval), entry["start"],
+                           entry["end"], bool(entry["prediction"]))
+                          for interval, entry in schedule.items()],
+                    page_size=len(schedule) or 1)
             self.db.conn.commit()
             logging.info("Stored fallback schedule for %s with %d intervals.",
                          schedule_date, len(schedule))
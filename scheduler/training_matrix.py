@@ -0,0 +1,131 @@
+"""scheduler.training_matrix.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Memory lean training data for LightGBM. Downcasts prepared
+             DataFrames to the smallest valid dtypes (uint8, int16, float32)
+             and builds contiguous float32 feature matrices that LightGBM
+             can bin without taking a float64 copy. Keeps retraining within
+             the memory a Pi Zero shares with Postgres.
+
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from typing import Optional
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast numeric columns to the smallest dtype that holds them.
+
+    - Integer and boolean columns become uint8 or int16 when their values
+      fit, otherwise they are left alone.
+    - Nullable integer columns are only downcast if they contain no NA.
+    - float64 columns become float32.
+    - Non numeric columns (timestamps, dates) are left unchanged.
+
+    Args
+    ----
+        df (pd.DataFrame): The frame to compact. Modified in place.
+
+    Returns
+    -------
+        pd.DataFrame: The same frame, for chaining.
+    """
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            df[col] = series.astype(np.uint8)
+        elif pd.api.types.is_integer_dtype(dtype):
+            if series.isna().any():
+                continue
+            if series.empty:
+                df[col] = series.astype(np.uint8)
+                continue
+            lo, hi = int(series.min()), int(series.max())
+            if 0 <= lo and hi <= np.iinfo(np.uint8).max:
+                df[col] = series.astype(np.uint8)
+            elif np.iinfo(np.int16).min <= lo and \
+                    hi <= np.iinfo(np.int16).max:
+                df[col] = series.astype(np.int16)
+        elif dtype == np.float64:
+            df[col] = series.astype(np.float32)
+    return df
+
+
+def feature_matrix(df: pd.DataFrame, feature_cols: list[str]) -> np.ndarray:
+    """Build a C-contiguous float32 matrix of the feature columns.
+
+    Columns are copied one at a time into a preallocated array so no
+    intermediate float64 copy of the whole frame is ever created. Missing
+    values become NaN, which LightGBM treats as missing.
+
+    Args
+    ----
+        df (pd.DataFrame): Frame holding the feature columns.
+        feature_cols (list[str]): Columns, in model order.
+
+    Returns
+    -------
+        np.ndarray: Array of shape (len(df), len(feature_cols)).
+    """
+    matrix = np.empty((len(df), len(feature_cols)), dtype=np.float32)
+    for i, col in enumerate(feature_cols):
+        matrix[:, i] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+    return matrix
+
+
+def label_vector(y: pd.Series) -> np.ndarray:
+    """Binary labels as a uint8 array."""
+    return (pd.to_numeric(y, errors="coerce").fillna(0).to_numpy() > 0
+            ).astype(np.uint8)
+
+
+def make_dataset(x: pd.DataFrame, y: pd.Series, feature_cols: list[str],
+                 reference: Optional[lgb.Dataset] = None) -> lgb.Dataset:
+    """Create a LightGBM Dataset from a compact float32 matrix.
+
+    The raw matrix is released by LightGBM once the dataset is binned.
+
+    Args
+    ----
+        x (pd.DataFrame): Feature frame.
+        y (pd.Series): Target labels aligned with `x`.
+        feature_cols (list[str]): Feature columns, in model order.
+        reference (lgb.Dataset | None): Training dataset a validation set
+                                        shares bins with.
+    """
+    matrix = feature_matrix(x, feature_cols)
+    logging.debug("Training matrix %s float32, %.1f MB", matrix.shape,
+                  matrix.nbytes / (1024 * 1024))
+    return lgb.Dataset(matrix, label=label_vector(y),
+                       feature_name=list(feature_cols),
+                       reference=reference, free_raw_data=True)
+
+
+def class_weight(num_on: int, num_off: int,
+                 on_boost: Optional[float]) -> float:
+    """LightGBM scale_pos_weight for training data with this class balance.
+
+    ON intervals are weighted by the OFF to ON ratio times `on_boost`.
+
+    Args
+    ----
+        num_on (int): ON intervals in the training data.
+        num_off (int): OFF intervals in the training data.
+        on_boost (float | None): ON boost, None when boosting is disabled.
+
+    Returns
+    -------
+        float: The weight, 1.0 with no ONs or boosting disabled.
+    """
+    if num_on > 0 and on_boost:
+        return num_off / (num_on / on_boost)
+    return 1.0
@@ -0,0 +1,393 @@
+"""scheduler.tuning.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Offline hyperparameter search for the LightGBM schedule model.
+             Runs time-series cross-validation over the prepared training
+             data, evaluating a parameter grid (or a random sample of it) in
+             parallel worker processes. The training arrays are placed in
+             shared memory once and attached read-only by every worker. The
+             best parameters are persisted to JSON for LightModel to load.
+
+             Intended to run on a workstation against a dump of the shelter
+             database, not on the Pi.
+
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import itertools
+import datetime as dt
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import scheduler.feature_sets as fset
+from scheduler.training_matrix import feature_matrix, label_vector, \
+    class_weight
+
+# Parameters the search is allowed to change. Anything else in the persisted
+# file is ignored by LightModel so the objective/metric can never be
+# overwritten. num_boost_rounds and min_data_in_leaf remain under the
+# control of config.ini. Every tunable parameter is searched by
+# DEFAULT_SEARCH_SPACE.
+TUNABLE_PARAMS = ("num_leaves", "learning_rate", "feature_fraction",
+                  "bagging_fraction", "lambda_l2")
+
+DEFAULT_SEARCH_SPACE = {
+    "num_leaves": [15, 31, 63],
+    "learning_rate": [0.02, 0.05, 0.1],
+    "feature_fraction": [0.7, 0.9, 1.0],
+    "bagging_fraction": [0.7, 0.8, 1.0],
+    "lambda_l2": [0.0, 1.0, 10.0],
+}
+
+# Worker process state, populated once per worker by _worker_init.
+_worker_shm: list[shared_memory.SharedMemory] = []
+_worker_x: Optional[np.ndarray] = None
+_worker_y: Optional[np.ndarray] = None
+
+
+def load_tuned_params(path: str,
+                      feature_set: Optional[fset.FeatureSet] = None) -> dict:
+    """Load persisted tuned parameters, keeping only tunable keys.
+
+    Args
+    ----
+        path (str): Path to the JSON file written by `save_tuned_params`.
+        feature_set (FeatureSet | None): Feature set the model uses. The
+            parameters are only loaded if they were tuned on it.
+
+    Returns
+    -------
+        dict: Tuned LightGBM parameters, empty if the file is missing,
+              invalid or tuned on another feature set.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning("Unable to read tuned model parameters %s: %s",
+                        path, e)
+        return {}
+
+    if not isinstance(data, dict):
+        return {}
+    if feature_set is not None and \
+            data.get("feature_set") != feature_set.name:
+        logging.info("Tuned model parameters in %s are for feature set %s "
+                     "not %s, using defaults", path,
+                     data.get("feature_set"), feature_set.name)
+        return {}
+    params = data.get("params", {})
+    return {k: v for k, v in params.items() if k in TUNABLE_PARAMS}
+
+
+def save_tuned_params(path: str, result: dict,
+                      feature_set: fset.FeatureSet) -> None:
+    """Persist the winning search result to JSON.
+
+    Args
+    ----
+        path (str): Destination file.
+        result (dict): The best result returned by `HyperparameterSearch.run`.
+        feature_set (FeatureSet): Feature set the search was run against.
+    """
+    record = {
+        "generated": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "feature_set": feature_set.name,
+        "score": result["score"],
+        "best_iteration": result["best_iteration"],
+        "folds": result["folds"],
+        "params": {k: v for k, v in result["params"].items()
+                   if k in TUNABLE_PARAMS},
+    }
+    with open(path, "w") as f:
+        json.dump(record, f, indent=2)
+    logging.info("Tuned model parameters written to %s", path)
+
+
+def time_series_folds(n_rows: int, n_folds: int = 4,
+                      min_train_fraction: float = 0.5
+                      ) -> list[tuple[int, int]]:
+    """Build expanding-window folds over time ordered rows.
+
+    The first `min_train_fraction` of the rows is only ever used for
+    training. The remainder is cut into `n_folds` consecutive validation
+    windows, each fold training on every row before its window so no fold
+    ever sees the future.
+
+    Returns
+    -------
+        list[tuple[int, int]]: (train_end, val_end) row indices per fold.
+    """
+    if n_folds < 1 or n_rows < 2:
+        return []
+    first_val = int(n_rows * min_train_fraction)
+    window = (n_rows - first_val) // n_folds
+    if first_val < 1 or window < 1:
+        return []
+    return [(first_val + i * window,
+             n_rows if i == n_folds - 1 else first_val + (i + 1) * window)
+            for i in range(n_folds)]
+
+
+def roc_auc(y_true: np.ndarray, y_score: np.ndarray) -> Optional[float]:
+    """Area under the ROC curve using the rank statistic.
+
+    Returns None when only one class is present and AUC is undefined.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    n_pos = int(y_true.sum())
+    n_neg = y_true.size - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return None
+    ranks = pd.Series(y_score).rank(method="average").to_numpy()
+    return float((ranks[y_true].sum() - n_pos * (n_pos + 1) / 2)
+                 / (n_pos * n_neg))
+
+
+def expand_grid(space: dict) -> list[dict]:
+    """Expand a search space into every parameter combination."""
+    keys = list(space)
+    return [dict(zip(keys, values))
+            for values in itertools.product(*(space[k] for k in keys))]
+
+
+def sample_grid(space: dict, trials: int, seed: int = 0) -> list[dict]:
+    """Random search: sample `trials` distinct combinations of the grid."""
+    grid = expand_grid(space)
+    if trials <= 0 or trials >= len(grid):
+        return grid
+    return random.Random(seed).sample(grid, trials)
+
+
+def _share_array(arr: np.ndarray
+                 ) -> tuple[shared_memory.SharedMemory, tuple]:
+    """Copy an array into a new shared memory block.
+
+    Returns
+    -------
+        tuple: The owning SharedMemory and a picklable (name, shape, dtype)
+               descriptor workers use to attach.
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    view[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def _attach_array(desc: tuple) -> np.ndarray:
+    """Attach a read-only view of an array shared with `_share_array`."""
+    name, shape, dtype = desc
+    shm = shared_memory.SharedMemory(name=name)
+    _worker_shm.append(shm)  # Keep the mapping alive for the worker's life
+    arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    arr.flags.writeable = False
+    return arr
+
+
+def _worker_init(x_desc: tuple, y_desc: tuple) -> None:
+    """Process pool initializer: attach the shared training arrays."""
+    global _worker_x, _worker_y
+    _worker_x = _attach_array(x_desc)
+    _worker_y = _attach_array(y_desc)
+
+
+def _evaluate_params(params: dict, base_params: dict,
+                     folds: list[tuple[int, int]], boost_rounds: int,
+                     early_stopping_rounds: int, on_boost: Optional[float],
+                     x: Optional[np.ndarray] = None,
+                     y: Optional[np.ndarray] = None) -> dict:
+    """Cross-validate one parameter combination.
+
+    Runs inside a worker process using the shared arrays unless `x` and `y`
+    are supplied directly (serial mode). Each fold is weighted as
+    `LightModel.train_model` weights its training data.
+
+    Returns
+    -------
+        dict: {params, score, best_iteration, folds, seconds}. score is the
+              mean validation AUC over folds where it is defined, or None.
+    """
+    x = _worker_x if x is None else x
+    y = _worker_y if y is None else y
+    trial_params = {**base_params, **params}
+    start = time.monotonic()
+    scores, iterations = [], []
+
+    for train_end, val_end in folds:
+        y_train = y[:train_end]
+        num_on = int(y_train.sum())
+        trial_params["scale_pos_weight"] = class_weight(
+            num_on, train_end - num_on, on_boost)
+
+        train_data = lgb.Dataset(x[:train_end], label=y_train)
+        val_data = lgb.Dataset(x[train_end:val_end],
+                               label=y[train_end:val_end],
+                               reference=train_data)
+        booster = lgb.train(
+            trial_params, train_data, num_boost_round=boost_rounds,
+            valid_sets=[val_data], valid_names=["valid"],
+            callbacks=[lgb.early_stopping(early_stopping_rounds,
+                                          verbose=False)])
+        best_iter = booster.best_iteration or boost_rounds
+        score = roc_auc(y[train_end:val_end],
+                        booster.predict(x[train_end:val_end],
+                                        num_iteration=best_iter))
+        if score is not None:
+            scores.append(score)
+            iterations.append(best_iter)
+
+    return {"params": params,
+            "score": float(np.mean(scores)) if scores else None,
+            "best_iteration": int(np.mean(iterations)) if iterations else 0,
+            "folds": len(scores),
+            "seconds": time.monotonic() - start}
+
+
+def prepare_training_matrix(model, days_history: int
+                            ) -> Optional[tuple[np.ndarray, np.ndarray,
+                                                list[str]]]:
+    """Build the time ordered feature matrix and labels for tuning.
+
+    Uses the same preparation path as `LightModel.train_model` so the search
+    scores exactly what the Pi would train on.
+
+    Args
+    ----
+        model (LightModel): A configured model engine (DB, features set).
+        days_history (int): Days of history to prepare.
+
+    Returns
+    -------
+        tuple | None: (x, y, feature_cols) or None if there is no data.
+    """
+    fetched = model._prepare_training_data(days_history)
+    if fetched is None or fetched[0].empty:
+        return None
+
+    df_activity, df_schedules = fetched
+    df = model.features._create_base_features(df_activity)
+    df = model._add_schedule_accuracy_features(df, df_schedules)
+    df = df.sort_values("timestamp")
+
+    feature_cols = fset.FeatureSetManager.get_columns(model.feature_set)
+    x = feature_matrix(df, feature_cols)
+    y = label_vector(df["activity_pin"])
+    return x, y, feature_cols
+
+
+class HyperparameterSearch:
+    """Evaluate candidate LightGBM parameters with time-series CV.
+
+    Args
+    ----
+        x (np.ndarray): Time ordered feature matrix.
+        y (np.ndarray): Binary labels aligned with `x`.
+        base_params (dict): Parameters every trial starts from (normally
+                            `LightModel.training_params()`).
+        n_folds (int): Number of expanding-window validation folds.
+        boost_rounds (int): Maximum boosting rounds per fold.
+        early_stopping_rounds (int): Early stopping patience per fold.
+        on_boost (float | None): ON boost as `LightModel.on_boost`, None
+                                 trains unweighted.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, base_params: dict,
+                 n_folds: int = 4, boost_rounds: int = 500,
+                 early_stopping_rounds: int = 20,
+                 on_boost: Optional[float] = 1.0):
+        self.x = np.ascontiguousarray(x)
+        self.y = np.ascontiguousarray(y)
+        self.base_params = {k: v for k, v in base_params.items()
+                            if k != "scale_pos_weight"}
+        self.folds = time_series_folds(len(self.y), n_folds)
+        self.boost_rounds = boost_rounds
+        self.early_stopping_rounds = early_stopping_rounds
+        self.on_boost = on_boost
+        self.results: list[dict] = []
+
+    def run(self, candidates: list[dict],
+            workers: Optional[int] = None) -> Optional[dict]:
+        """Evaluate all candidates and return the best result.
+
+        Args
+        ----
+            candidates (list[dict]): Parameter combinations to evaluate.
+            workers (int | None): Worker processes. None uses every CPU,
+                                  1 evaluates serially in this process.
+                                  The CPUs are shared out between workers
+                                  as LightGBM threads.
+
+        Returns
+        -------
+            dict | None: The best scoring result, None if no candidate could
+                         be scored (e.g. validation windows with no ONs).
+        """
+        if not self.folds:
+            logging.warning("Not enough rows (%d) for time-series "
+                            "cross-validation", len(self.y))
+            return None
+
+        workers = workers or os.cpu_count() or 1
+        logging.info("Evaluating %d parameter sets over %d folds "
+                     "with %d worker(s)", len(candidates), len(self.folds),
+                     workers)
+        self.results = []
+        base_params = self.base_params
+        if workers > 1:
+            # Each LightGBM would otherwise start a thread for every CPU
+            base_params = {**base_params, "num_threads":
+                           max(1, (os.cpu_count() or 1) // workers)}
+        args = (base_params, self.folds, self.boost_rounds,
+                self.early_stopping_rounds, self.on_boost)
+
+        if workers == 1:
+            for params in candidates:
+                self._record(_evaluate_params(params, *args,
+                                              x=self.x, y=self.y))
+        else:
+            x_shm, x_desc = _share_array(self.x)
+            y_shm, y_desc = _share_array(self.y)
+            try:
+                with ProcessPoolExecutor(max_workers=workers,
+                                         initializer=_worker_init,
+                                         initargs=(x_desc, y_desc)) as pool:
+                    futures = [pool.submit(_evaluate_params, params, *args)
+                               for params in candidates]
+                    for future in as_completed(futures):
+                        self._record(future.result())
+            finally:
+                for shm in (x_shm, y_shm):
+                    shm.close()
+                    shm.unlink()
+
+        return self.best()
+
+    def best(self) -> Optional[dict]:
+        """Return the highest scoring result recorded so far."""
+        scored = [r for r in self.results if r["score"] is not None]
+        if not scored:
+            return None
+        return max(scored, key=lambda r: r["score"])
+
+    def _record(self, result: dict) -> None:
+        """Store and log one trial result."""
+        self.results.append(result)
+        logging.info("Trial %d: AUC %s (%d folds, %.1fs) %s",
+                     len(self.results),
+                     "n/a" if result["score"] is None
+                     else f"{result['score']:.4f}",
+                     result["folds"], result["seconds"], result["params"])
@@ -13,8 +13,8 @@ import datetime as dt
 import threading
 import time
 import logging
+import sqlite3
 import pytz
-from timezonefinder import TimezoneFinder
 from enum import Enum
 from typing import Optional, Tuple, Dict, Union, Callable
 from astral.sun import sun
@@ -22,10 +22,12 @@ from astral import Observer
 from lightlib.config import ConfigLoader
 from lightlib.common import EPOCH_DATETIME
 from lightlib.common import strfdt, get_today, get_tomorrow, get_now
-from lightlib.persist import PersistentData
+from lightlib.persist import PersistentData, DataStorageError
+from lightlib.timezones import TimezoneResolver
 from shelterGPS.common import GPSNoFix, NoSolarEventError, InvalidObserverError
 import shelterGPS.Position as pos
-from geocode.local import Location, InvalidLocationError
+from shelterGPS.fix_scheduler import FixScheduler
+from geocode.local import Location, InvalidLocationError, open_geocode
 
 
 class PolarNightError(Exception):
@@ -86,6 +88,9 @@ class SunTimes:
         self._fixed_today: bool = False
         self._gps_fix_running: threading.Event = threading.Event()
         self._gps_fix_thread: Optional[threading.Thread] = None
+        # Set to wake the fix thread from a wait when it is stopped
+        self._gps_fix_stop: threading.Event = threading.Event()
+        self._fix_scheduler = FixScheduler()
         self._polar = PolarEvent.NO
         self._initialized = True
         logging.debug(
@@ -126,6 +131,16 @@ class SunTimes:
         """
         return self._gps_fix_running.is_set()
 
+    @property
+    def fix_metrics(self) -> dict:
+        """Decisions and outcomes of the adaptive GPS fix scheduler.
+
+        Returns
+        -------
+            dict: See `FixScheduler.metrics`.
+        """
+        return self._fix_scheduler.metrics
+
     @property
     def UTC_dawn_today(self) -> Optional[dt.datetime]:
         """Date & time of today's dawn - 1st visible light (UTC).
@@ -440,6 +455,7 @@ class SunTimes:
         the country and place name specified in the configuration file.
         """
         if not self.gps_fix_is_running:
+            self._gps_fix_stop.clear()
             self._gps_fix_thread = threading.Thread(
                 target=self._gps_fix_process, daemon=True)
             self._gps_fix_thread.start()
@@ -448,6 +464,7 @@ class SunTimes:
         """Stop the GPS fix process if it is running."""
         if self.gps_fix_is_running:
             self._gps_fix_running.clear()
+            self._gps_fix_stop.set()
             if self._gps_fix_thread:
                 self._gps_fix_thread.join()
 
@@ -473,7 +490,7 @@ class SunTimes:
                     logging.error("An error occurred during GPS fixing: %s",
                                   e, exc_info=True)
                 # Wait for retry interval
-                time.sleep(ConfigLoader().gps_fix_retry_interval)
+                self._gps_fix_stop.wait(ConfigLoader().gps_fix_retry_interval)
         finally:
             # Clear the running flag to indicate the process has stopped
             self._gps_fix_running.clear()
@@ -513,29 +530,43 @@ class SunTimes:
     def _perform_gps_fix_attempts(self) -> None:
         """Attempt to obtain a GPS fix within the defined fixing window.
 
-        This method attempts to obtain a GPS fix, retrying at intervals
-        specified in the configuration if unsuccessful. The attempts are only
-        made within a defined fixing window, and the method tracks consecutive
-        failed attempts, halting after a configurable maximum failure
-        threshold is reached.
+        Each attempt is planned by the fix scheduler, which picks when in the
+        fix window to start and how long to allow from past attempts, and its
+        outcome is recorded for the next plan. Failed attempts are retried
+        no sooner than the configured retry interval. The method tracks
+        consecutive failed attempts, halting after a configurable maximum
+        failure threshold is reached.
         """
         max_fix_errors = ConfigLoader().gps_failed_fix_days
         wait_time = ConfigLoader().gps_pwr_up_time
         fix_start_time = time.monotonic()
         while True:
+            plan = self._fix_scheduler.plan(get_now(),
+                                            *self._fix_window_bounds())
+            delay = (plan.start - get_now()).total_seconds()
+            if delay > 0 and self._gps_fix_stop.wait(delay):
+                return
+            started = get_now()
+            attempt_start = time.monotonic()
             try:
                 logging.info("Attempting GPS fix.")
                 # Wait for gps to power up
-                self._gps.get_fix(pwr_up_wait=wait_time)
+                stages = self._gps.get_fix(pwr_up_wait=wait_time,
+                                           max_fix_time=plan.budget)
 
                 if self._gps.datetime_established and \
                         self._gps.position_established:
+                    self._fix_scheduler.record(
+                        started, plan.budget, True,
+                        (stages or {}).get(
+                            "fix", time.monotonic() - attempt_start))
                     # End fix timing and store duration
                     PersistentData().time_to_fix = (
                         fix_start_time, time.monotonic())
                     self._fixed_today = get_now().date()
                     logging.info("GPS Fix succeeded, position & "
                                  "time established")
+                    self._log_nearest_place()
                     #  Update solar times and fix window based on GPS
                     #  coordinates
                     self._set_solar_times_and_fix_window()
@@ -543,6 +574,8 @@ class SunTimes:
                     break
 
             except pos.GPSInvalid:
+                self._fix_scheduler.record(started, plan.budget, False,
+                                           time.monotonic() - attempt_start)
                 self._fix_err_day += 1
                 logging.debug("GPS failed to fix:\n\t"
                               "GPS Position: %s\tEstabilshed: %s\n\t"
@@ -562,7 +595,45 @@ class SunTimes:
                           self._gps.position_established,
                           self._gps.datetime,
                           self._gps.datetime_established)
-            time.sleep(ConfigLoader().gps_fix_retry_interval)
+            if self._gps_fix_stop.wait(ConfigLoader().gps_fix_retry_interval):
+                return
+
+    def _log_nearest_place(self) -> None:
+        """Log the geocode database place nearest to the GPS position."""
+        try:
+            found = open_geocode().nearest(self._gps.latitude,
+                                           self._gps.longitude)
+        except (InvalidLocationError, sqlite3.Error, ValueError,
+                OSError) as e:
+            logging.debug("No nearest place for the GPS position: %s", e)
+            return
+        if found is not None:
+            place, km = found
+            logging.info("GPS position is %.1fkm from %s (%s)", km,
+                         place.name, place.country)
+
+    def _fix_window_bounds(self) -> Tuple[Optional[dt.datetime],
+                                          Optional[dt.datetime]]:
+        """Return the rest of the current or next fix window.
+
+        Returns
+        -------
+            tuple[dt.datetime | None, dt.datetime | None]: Start and end of
+                the window, (None, None) if no window applies and the
+                attempt should be made now.
+        """
+        if ConfigLoader().bypass_fix_window:
+            return None, None
+        now = get_now()
+        for day in ("today", "tomorrow"):
+            start = self._fix_window.get(f"start_{day}")
+            end = self._fix_window.get(f"end_{day}")
+            # Polar conditions clear the window to naive datetime.min
+            if start is None or end is None or start.tzinfo is None:
+                continue
+            if now <= end:
+                return max(start, now), end
+        return None, None
 
     # -------------------- Solar Times and Fix Window Setup -------------------
 
@@ -692,7 +763,7 @@ class SunTimes:
         self._dusk_next_day = solar_times_next_day["dusk"]
         self._ss_next_day = solar_times_next_day["sunset"]
 
-        self._store_persistent_data()
+        self._store_persistent_data(observer)
 
         logging.info("Updated solar events:\n"
                      "     Today: Sunrise: %s, Sunset: %s\n"
@@ -814,14 +885,12 @@ class SunTimes:
             raise InvalidLocationError("No valid location data available.")
 
         # Determine local timezone based on the coordinates
-        tz_finder = TimezoneFinder()
-        timezone_str = tz_finder.timezone_at(lat=lat, lng=lng)
-        self._local_tz = pytz.timezone(timezone_str) if timezone_str \
-            else pytz.UTC
+        self._local_tz = TimezoneResolver().timezone_at(lat=lat, lng=lng)
 
         return lat, lng, alt
 
-    def _store_persistent_data(self) -> None:
+    def _store_persistent_data(self,
+                               observer: Optional[Observer] = None) -> None:
         """Store the current GPS location and solar event times persistently.
 
         This method saves the current latitude, longitude, and altitude from
@@ -829,6 +898,12 @@ class SunTimes:
         tomorrow. This data is stored persistently for future reference,
         allowing fallback use if GPS fix is unavailable.
 
+        Args
+        ----
+            observer (Observer | None): When given, solar events are also
+                calculated and stored for the rest of the persistent data
+                horizon, so they are known on days without a fix.
+
         Returns
         -------
             None
@@ -854,6 +929,18 @@ class SunTimes:
         persist.add_sunset_time(self.UTC_sunset_today)
         persist.add_sunset_time(self.UTC_sunset_tomorrow)
         persist.add_sunset_time(self._ss_next_day)
+        if observer is not None:
+            for offset in range(3, PersistentData.HORIZON_DAYS):
+                date = get_today() + dt.timedelta(days=offset)
+                try:
+                    times = SunTimes.calculate_solar_times(
+                        observer=observer, date=date, raise_err=False)
+                except InvalidObserverError:
+                    break  # Already logged, the days we have are stored
+                persist.add_dawn_time(times["dawn"])
+                persist.add_sunrise_time(times["sunrise"])
+                persist.add_dusk_time(times["dusk"])
+                persist.add_sunset_time(times["sunset"])
         persist.store_data()
 
     @staticmethod
@@ -995,6 +1082,10 @@ class SunTimes:
             raise InvalidObserverError(f"Unexpected failure: {ex}") from ex
 
     def cleanup(self):
-        """Stop fix thread and clean up GPS."""
+        """Stop fix thread, clean up GPS and write pending persistent data."""
         self.stop_gps_fix_process()
         self._gps.cleanup()
+        try:
+            PersistentData().flush()
+        except DataStorageError:
+            pass  # Already logged, nothing more can be done at shutdown
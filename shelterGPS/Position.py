@@ -22,6 +22,7 @@ from threading import Lock
 from typing import Union, Optional
 from collections import deque
 from shelterGPS.coord import Coordinate
+from shelterGPS.nmea import NMEAStreamParser, NMEASentence
 from lightlib.config import ConfigLoader
 from lightlib.smartlight import log_caller
 from shelterGPS.common import GPSDir, GPSInvalid, GPSOutOfBoundsError
@@ -104,6 +105,11 @@ class GPS:
                 in UTC.
             _last_msg (list): The most recent parsed message from the GPS,
                 used for validation and troubleshooting.
+            _nmea (NMEAStreamParser): Frames and checksums the bytes read
+                from the serial port, returning tracked sentence types only.
+            _pending (deque): Parsed sentences read from the port but not
+                yet consumed by `_get_msg`.
+            sync_clock (bool): Set the system clock from each fix.
 
         Raises
         ------
@@ -139,6 +145,10 @@ class GPS:
         self._alt = 0.0
         self._dt = EPOCH_DATETIME
         self._last_msg = []
+        self._nmea = NMEAStreamParser(
+            entry['MSG'] for entry in self.msg_validate)
+        self._pending: deque[NMEASentence] = deque()
+        self.sync_clock = True
         self._datetime_established = False
         self._position_established = False
         self._fix_start_time = 0.0
@@ -174,6 +184,37 @@ class GPS:
             return
         return self._last_msg[0]
 
+    @property
+    def serial_connection(self) -> Optional[serial.Serial]:
+        """The serial connection to the module, None if it isn't open."""
+        return self.__gps_ser
+
+    def use_serial(self, ser) -> Optional[serial.Serial]:
+        """Read from another serial port, e.g. a capture replay.
+
+        Args
+        ----
+            ser (serial.Serial): Port, or an object with the same `read`,
+                                 `in_waiting` and `close`.
+
+        Returns
+        -------
+            serial.Serial | None: The port that was in use.
+        """
+        previous = self.__gps_ser
+        self.__gps_ser = ser
+        self._nmea.reset()
+        self._pending.clear()
+        return previous
+
+    @property
+    def nmea_stats(self) -> dict[str, int]:
+        """Counts from the NMEA parser since the GPS was created."""
+        return {"sentences": self._nmea.sentences,
+                "skipped": self._nmea.skipped,
+                "bad_checksum": self._nmea.bad_checksum,
+                "discarded_bytes": self._nmea.discarded_bytes}
+
     @property
     def latitude_coord(self) -> Coordinate:
         """Coordinate object that represents latitude."""
@@ -350,6 +391,9 @@ class GPS:
                                          before continuing
         """
         self._fix_start_time = time.monotonic()  # Start of fix timing
+        # Nothing read before power up belongs to this fix
+        self._nmea.reset()
+        self._pending.clear()
         try:
             # Open gpiochip0 if not already
             if not hasattr(self, '_gpio_handle') or self._gpio_handle is None:
@@ -392,9 +436,13 @@ class GPS:
             self._fix_start_time = 0.0
 
     def get_fix(self, pwr_up_wait: float = None,
-                max_fix_time: float = None) -> None:
+                max_fix_time: float = None) -> dict[str, float]:
         """Attempt to obtain a GPS fix, retrieving coordinates and timestamp.
 
+        Position, a verified time and the date are collected together from
+        whichever sentences arrive first, within a single `max_fix_time`
+        budget. The module is powered off as soon as all are established.
+
         Args
         ----
             pwr_up_wait (float): Time to wait in seconds after powering on the
@@ -402,6 +450,11 @@ class GPS:
             max_fix_time (float): Max time to attempt to acquire GPS fix data
             in seconds. Defaulting to that in config file
 
+        Returns
+        -------
+            dict[str, float]: Seconds from power on to each stage of the fix,
+                              see `_acquire_fix`.
+
         Raises
         ------
             GPSInvalid: Raised if a valid fix cannot be obtained within the
@@ -418,7 +471,7 @@ class GPS:
         if max_fix_time is None:
             max_fix_time = self._max_fix_time
 
-        fix_t = PersistentData().time_to_fix or self.pwr_up_wait
+        fix_t = PersistentData().time_to_fix or pwr_up_wait
         logging.info("GPS: Starting fix attempt, expecting fix in ~%ds", fix_t)
 
         self.pwr_on(pwr_up_wait)
@@ -429,8 +482,7 @@ class GPS:
                               "the correct serial port?", self.__serial_port)
                 self._initialise_serial()
 
-            self._get_coordinates(max_fix_time)
-            self._get_datetime(max_fix_time)
+            stages = self._acquire_fix(max_fix_time)
 
         except GPSInvalid:
             logging.error("GPS: Failed to acquire a fix.")
@@ -438,6 +490,94 @@ class GPS:
         finally:
             self.pwr_off()
 
+        if self.sync_clock:
+            self._sync_system_time()
+        return stages
+
+    def _acquire_fix(self, max_time: float) -> dict[str, float]:
+        """Collect position, verified time and date from one sentence stream.
+
+        GGA sentences establish the position and build the history
+        `_verify_time` needs, RMC sentences give the date. An RMC is only
+        used once the time has been verified and if it is for the same
+        second as the last GGA, or was received after it, so the datetime is
+        never older than the verified time. The module is powered off the
+        moment everything is established and the latency of each stage is
+        added to the persistent fix statistics.
+
+        Args
+        ----
+            max_time (float): Maximum time for the whole fix, in seconds from
+                              the module being powered on.
+
+        Returns
+        -------
+            dict[str, float]: Seconds from power on to each stage,
+                              "first_sentence", "position", "time_verified",
+                              "datetime" and "fix".
+
+        Raises
+        ------
+            GPSInvalid: If the fix is not complete within `max_time`.
+        """
+        start = self._fix_start_time or time.monotonic()
+        msg_time = PersistentData().time_to_fix
+        stages: dict[str, float] = {}
+        gga_history = deque(maxlen=10)
+        rmc = None  # Latest valid RMC that can give the datetime
+        self._position_established = False
+        self._datetime_established = False
+
+        while not self._datetime_established:
+            elapsed = time.monotonic() - start
+            if elapsed >= max_time:
+                logging.warning("GPS: Fix incomplete after %ss, stages "
+                                "reached: %s", max_time, stages or "none")
+                raise GPSInvalid(
+                    f"No valid fix obtained after {max_time} seconds")
+            # Start verbose log output once the fix is taking longer than
+            # the last one did
+            self._log_msgs = elapsed > msg_time
+
+            if not self._pending:
+                self._pending.extend(self._read_sentences())
+            while self._pending and not self._datetime_established:
+                sentence = self._pending.popleft()
+                if "first_sentence" not in stages:
+                    stages["first_sentence"] = time.monotonic() - start
+                self._last_msg = sentence.fields
+                if not self._validate_message_content(sentence.msg_type):
+                    continue
+
+                if sentence.msg_type == "GGA":
+                    if not self._position_established:
+                        self._set_position(sentence.fields)
+                        if self._position_established:
+                            stages["position"] = time.monotonic() - start
+                    gga_history.append(sentence.fields)
+                    if "time_verified" not in stages and \
+                            self._verify_time(gga_history):
+                        stages["time_verified"] = time.monotonic() - start
+                        # An RMC from an earlier second is stale
+                        if rmc is not None and \
+                                rmc[1][:6] != sentence.fields[1][:6]:
+                            rmc = None
+                elif sentence.msg_type == "RMC":
+                    rmc = sentence.fields
+
+                if rmc is not None and self._position_established and \
+                        "time_verified" in stages:
+                    self._set_datetime(rmc)
+                    stages["datetime"] = time.monotonic() - start
+
+        stages["fix"] = time.monotonic() - start
+        self.pwr_off()  # Nothing more is needed from the module
+        logging.info("GPS: Fix complete, seconds from power on: %s",
+                     ", ".join(f"{stage} {seconds:.1f}"
+                               for stage, seconds in stages.items()))
+        PersistentData().record_fix_stages(stages)
+        return stages
+
     def _initialise_serial(self) -> None:
         """Attempt to initialse the GPS serial connection."""
         ports_to_try = ["/dev/ttyAMA0", "/dev/serial0", "/dev/s0"]
@@ -465,6 +605,9 @@ class GPS:
 
         Continuously attempts to read from the GPS module until a valid message
         of the specified type is received or the maximum time is reached.
+        Sentences are parsed from bulk reads of the serial buffer, any left
+        over from the read that completed the message are kept for the next
+        call so the stream is only read and parsed once.
 
         Args
         ----
@@ -485,29 +628,42 @@ class GPS:
 
         # Keep trying until we get the required message and it validates
         # or we reach the defined maximum attempt duration
-        tick = self._fix_start_time
+        start = self._fix_start_time or time.monotonic()
         valid_msg_history = deque(maxlen=10)
-        while tick - self._fix_start_time < max_time:
-            ser_line: str = self.__gps_ser.readline()
-            self._log_msg(logging.DEBUG,
-                          "GPS Raw message received:\n\t%s", ser_line)
-            # Check if message is valid and proceed with decoding and
-            # content verification if true
-            if self._is_valid_message(ser_line):
-                self._decode_message(ser_line)
+        while time.monotonic() - start < max_time:
+            if not self._pending:
+                self._pending.extend(self._read_sentences())
+            while self._pending:
+                sentence = self._pending.popleft()
+                if sentence.msg_type != msg:
+                    continue
+                self._last_msg = sentence.fields
                 if self._validate_message_content(msg):
                     valid_msg_history.append(self._last_msg)
                     if self._verify_time(valid_msg_history):
                         return True  # Exit once a valid message is confirmed
 
-            tick = time.monotonic()
-            if tick - self._fix_start_time <= msg_time:
-                self._log_msgs = False  # Start verbose log output
-            else:
-                self._log_msgs = True
+            # Start verbose log output once the fix is taking longer than
+            # the last one did
+            self._log_msgs = time.monotonic() - start > msg_time
 
         raise GPSInvalid(f"No valid fix obtained after {max_time} seconds")
 
+    def _read_sentences(self) -> list[NMEASentence]:
+        """Read everything waiting on the serial port and parse it.
+
+        Blocks for up to the serial timeout when nothing is waiting.
+
+        Returns
+        -------
+            list[NMEASentence]: Valid sentences of the tracked types.
+        """
+        chunk = self.__gps_ser.read(self.__gps_ser.in_waiting or 1)
+        if chunk:
+            self._log_msg(logging.DEBUG,
+                          "GPS Raw data received:\n\t%s", chunk)
+        return self._nmea.feed(chunk)
+
     def _verify_time(self, msg_list: list[list[str]]) -> bool:
         """Verify GPS message timestamps are consistent and not stale.
 
@@ -739,22 +895,34 @@ class GPS:
         """
         if not self._get_msg('GGA', fix_wait):
             return
+        self._set_position(self._last_msg)
+
+    def _set_position(self, fields: list[str]) -> None:
+        """Set latitude, longitude and altitude from a decoded message.
+
+        Args
+        ----
+            fields (list[str]): Decoded message, laid out as `_last_msg`.
+
+        Raises
+        ------
+            GPSInvalid: If the message's coordinate fields can't be read.
+        """
         self._position_established = False
         matched = False
         for entry in self.msg_coords:
-            if self._last_msg[0][-3:] == entry['MSG']:
+            if fields[0][-3:] == entry['MSG']:
                 try:
-                    logging.debug("COORD: %s", self._last_msg)
+                    logging.debug("COORD: %s", fields)
                     self._lat = Coordinate(
-                        gps_string=self._last_msg[entry['LAT']],
-                        direction=GPSDir[self._last_msg[entry['NS']]])
+                        gps_string=fields[entry['LAT']],
+                        direction=GPSDir[fields[entry['NS']]])
                     self._lon = Coordinate(
-                        gps_string=self._last_msg[entry['LON']],
-                        direction=GPSDir[self._last_msg[entry['EW']]])
+                        gps_string=fields[entry['LON']],
+                        direction=GPSDir[fields[entry['EW']]])
                     # Check if 'ALT' field exists and set altitude accordingly
-                    if entry['ALT'] != -1 and entry['ALT'] < (
-                            len(self._last_msg)):
-                        self._alt = float(self._last_msg[entry['ALT']])
+                    if entry['ALT'] != -1 and entry['ALT'] < len(fields):
+                        self._alt = float(fields[entry['ALT']])
                     else:
                         self._alt = 0.0
                     logging.info("GPS: Position fix obtained:\n\t%s, "
@@ -770,8 +938,7 @@ class GPS:
                                   e, exc_info=True)
                     raise GPSInvalid("Failed to retrieve coordinates.")
         if not matched:
-            logging.debug("Never matched a %s in msg_coords",
-                          self._last_msg[0][-3:])
+            logging.debug("Never matched a %s in msg_coords", fields[0][-3:])
 
     def _get_datetime(self, fix_wait: float) -> None:
         """Retrieve GPS datetime from the module.
@@ -786,26 +953,38 @@ class GPS:
         """
         if not self._get_msg('RMC', fix_wait):
             return
+        self._set_datetime(self._last_msg)
+        self._sync_system_time()
+
+    def _set_datetime(self, fields: list[str]) -> None:
+        """Set the fix datetime from a decoded message.
+
+        Args
+        ----
+            fields (list[str]): Decoded message, laid out as `_last_msg`.
+
+        Raises
+        ------
+            GPSInvalid: If the message's time or date can't be read.
+        """
         self._datetime_established = False
         matched = False
         for entry in self.msg_dt:
-            if self._last_msg[0][-3:] == entry['MSG']:
+            if fields[0][-3:] == entry['MSG']:
                 try:
-                    utc_time = self._last_msg[entry['UTC']]
-                    date_str = (self._last_msg[entry['DATE']]
+                    utc_time = fields[entry['UTC']]
+                    date_str = (fields[entry['DATE']]
                                 if entry['DATE'] != -1 else None)
                     self._dt = self._process_datetime(utc_time, date_str)
                     logging.info(
                         "Date and time obtained from GPS: %s", self._dt)
                     self._datetime_established = True
-                    self._sync_system_time()
                     matched = True
                 except (KeyError, ValueError) as e:
                     logging.error("Error processing GPS datetime: %s", e)
                     raise GPSInvalid("Failed to retrieve datetime.")
         if not matched:
-            logging.debug("Never matched a %s in msg_dt",
-                          self._last_msg[0][-3:])
+            logging.debug("Never matched a %s in msg_dt", fields[0][-3:])
 
     def _process_datetime(self, utc_time: str,
                           date_str: Optional[str] = None) -> dt.datetime:
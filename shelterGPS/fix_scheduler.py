@@ -0,0 +1,242 @@
+"""shelterGPS.fix_scheduler.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Adaptive GPS fix scheduling. Each fix attempt is recorded
+             against the UTC hour it started in with how long it took or how
+             long the module was powered if it failed. From that rolling
+             history the scheduler picks when in the fix window to start the
+             next attempt and how long to let it run, choosing the hour and
+             budget that need the fewest powered on seconds per fix.
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import datetime as dt
+import logging
+import statistics
+from typing import NamedTuple, Optional
+from lightlib.config import ConfigLoader
+from lightlib.persist import PersistentData
+
+# (success, seconds, budget) as stored by PersistentData.record_fix_attempt
+Attempt = tuple[bool, float, float]
+
+
+class FixPlan(NamedTuple):
+    """When to start the next fix attempt and how long to allow it.
+
+    `expected_cost` is the expected seconds powered on per successful fix
+    and `success_rate` the expected chance the attempt fixes, both None
+    when there is not enough history to estimate them.
+    """
+
+    start: dt.datetime
+    budget: float
+    expected_cost: Optional[float]
+    success_rate: Optional[float]
+    reason: str
+
+
+def expected_cost(attempts: list[Attempt],
+                  budget: float) -> Optional[tuple[float, float]]:
+    """Estimate the powered seconds per fix of attempts given `budget`.
+
+    Successes that took longer than `budget` count as failures that ran for
+    `budget`. Failures only count if they were allowed at least `budget`,
+    a shorter failed attempt says nothing about a longer one.
+
+    Args
+    ----
+        attempts (list[tuple[bool, float, float]]): (success, seconds,
+            budget) of past attempts.
+        budget (float): Seconds the attempt would be allowed.
+
+    Returns
+    -------
+        tuple[float, float] | None: (seconds powered per fix, success rate),
+                                    None with too little history or no fix.
+    """
+    relevant = fixes = 0
+    powered = 0.0
+    for success, seconds, allowed in attempts:
+        if success:
+            relevant += 1
+            if seconds <= budget:
+                fixes += 1
+                powered += seconds
+            else:
+                powered += budget
+        elif allowed >= budget:
+            relevant += 1
+            powered += budget
+    if relevant < FixScheduler.MIN_ATTEMPTS or not fixes:
+        return None
+    return powered / fixes, fixes / relevant
+
+
+class FixScheduler:
+    """Choose GPS fix attempt start times and budgets from fix history.
+
+    Hours with fewer than `MIN_ATTEMPTS` attempts of their own are
+    estimated from every hour's attempts together. With too little history
+    for that the attempt starts now with the configured `max_fix_time`,
+    as it does after a failed attempt so a retry is never cut short.
+
+    Attributes
+    ----------
+        last_plan (FixPlan | None): The most recent plan made.
+    """
+
+    MIN_ATTEMPTS = 5
+    # Margin added to each past time to fix when trying it as a budget
+    BUDGET_MARGIN = 1.2
+    # An earlier hour is chosen over the cheapest if it is this close
+    START_TOLERANCE = 0.1
+
+    def __init__(self) -> None:
+        self.last_plan: Optional[FixPlan] = None
+        self._failed_on: Optional[dt.date] = None
+        self._attempts = 0
+        self._fixes = 0
+        self._powered = 0.0
+
+    def best_budget(self, attempts: list[Attempt], max_budget: float
+                    ) -> Optional[tuple[float, float, float]]:
+        """Find the budget with the lowest expected powered seconds per fix.
+
+        Args
+        ----
+            attempts (list[tuple[bool, float, float]]): Past attempts.
+            max_budget (float): Longest budget allowed.
+
+        Returns
+        -------
+            tuple[float, float, float] | None: (budget, seconds per fix,
+                                               success rate) or None.
+        """
+        candidates = {min(seconds * self.BUDGET_MARGIN, max_budget)
+                      for success, seconds, _ in attempts if success}
+        candidates.add(max_budget)
+        best = None
+        for budget in sorted(candidates):
+            estimate = expected_cost(attempts, budget)
+            if estimate is not None and (best is None or
+                                         estimate[0] < best[1]):
+                best = (budget, *estimate)
+        return best
+
+    def plan(self, now: dt.datetime,
+             window_start: Optional[dt.datetime] = None,
+             window_end: Optional[dt.datetime] = None) -> FixPlan:
+        """Plan the next fix attempt within a fix window.
+
+        Args
+        ----
+            now (dt.datetime): Current UTC time.
+            window_start (dt.datetime | None): Earliest start, default now.
+            window_end (dt.datetime | None): Latest start, default now.
+
+        Returns
+        -------
+            FixPlan: When to start and the budget to allow.
+        """
+        max_budget = ConfigLoader().gps_max_fix_time
+        if not ConfigLoader().gps_adaptive_fix_schedule:
+            return self._keep(FixPlan(now, max_budget, None, None,
+                                      "adaptive scheduling disabled"))
+        if self._failed_on == now.date():
+            return self._keep(FixPlan(now, max_budget, None, None,
+                                      "retry after a failed attempt"))
+
+        history = PersistentData().fix_attempts
+        pooled = [a for attempts in history.values() for a in attempts]
+        pooled_best = self.best_budget(pooled, max_budget)
+        if pooled_best is None:
+            return self._keep(FixPlan(now, max_budget, None, None,
+                                      "not enough fix history"))
+
+        start = max(now, window_start or now)
+        end = max(start, window_end or start)
+        options = []
+        while True:
+            attempts = history.get(start.hour, [])
+            best = (self.best_budget(attempts, max_budget)
+                    if len(attempts) >= self.MIN_ATTEMPTS else None)
+            options.append((start, *(best or pooled_best),
+                            "hour" if best else "pooled"))
+            start = (start.replace(minute=0, second=0, microsecond=0) +
+                     dt.timedelta(hours=1))
+            if start > end:
+                break
+
+        cheapest = min(option[2] for option in options)
+        start, budget, cost, rate, source = next(
+            option for option in options
+            if option[2] <= cheapest * (1 + self.START_TOLERANCE))
+        return self._keep(FixPlan(
+            start, budget, cost, rate,
+            f"lowest cost at {start.hour:02d}:00 UTC from {source} history"))
+
+    def record(self, started: dt.datetime, budget: float, success: bool,
+               seconds: float) -> None:
+        """Record the outcome of a fix attempt.
+
+        Args
+        ----
+            started (dt.datetime): UTC time the attempt started.
+            budget (float): Seconds the attempt was allowed.
+            success (bool): True if the attempt fixed.
+            seconds (float): Time to fix, or time powered if it failed.
+        """
+        self._attempts += 1
+        self._powered += seconds
+        if success:
+            self._fixes += 1
+            self._failed_on = None
+        else:
+            self._failed_on = started.date()
+        PersistentData().record_fix_attempt(started.hour, success, seconds,
+                                            budget)
+
+    @property
+    def metrics(self) -> dict:
+        """Scheduler decisions and outcomes.
+
+        Returns
+        -------
+            dict: attempts, fixes and powered seconds since start up, the
+                  last plan and per UTC hour history statistics.
+        """
+        hours = {}
+        for hour, attempts in sorted(PersistentData().fix_attempts.items()):
+            fixes = [seconds for success, seconds, _ in attempts if success]
+            hours[hour] = {
+                "attempts": len(attempts),
+                "success_rate": len(fixes) / len(attempts),
+                "median_time_to_fix": (statistics.median(fixes)
+                                       if fixes else None)}
+        plan = self.last_plan
+        return {
+            "adaptive": ConfigLoader().gps_adaptive_fix_schedule,
+            "attempts": self._attempts,
+            "fixes": self._fixes,
+            "powered_seconds": self._powered,
+            "powered_seconds_per_fix": (self._powered / self._fixes
+                                        if self._fixes else None),
+            "plan": None if plan is None else {
+                **plan._asdict(), "start": plan.start.isoformat()},
+            "hours": hours,
+        }
+
+    def _keep(self, plan: FixPlan) -> FixPlan:
+        self.last_plan = plan
+        logging.info("GPS fix planned for %s with a %.0fs budget (%s), "
+                     "expecting %s powered seconds per fix",
+                     plan.start.isoformat(timespec="minutes"), plan.budget,
+                     plan.reason,
+                     "unknown" if plan.expected_cost is None
+                     else f"{plan.expected_cost:.0f}")
+        return plan
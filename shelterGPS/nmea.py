@@ -0,0 +1,165 @@
+"""shelterGPS.nmea.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Streaming NMEA 0183 sentence parser. Bytes read in bulk from
+             the GPS serial buffer are framed, filtered by sentence type and
+             checksum validated without being decoded. Only sentences that
+             are wanted and valid are decoded and split into fields.
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+from functools import reduce
+from operator import xor
+from typing import Iterable, NamedTuple, Optional
+
+# Hex digit value for each ASCII byte that can appear in a checksum
+_HEX_DIGITS = {ord(c): int(c, 16) for c in "0123456789abcdefABCDEF"}
+
+
+class NMEASentence(NamedTuple):
+    """A checksum validated NMEA sentence.
+
+    `fields` has the same layout as `GPS._last_msg`, the address field
+    (e.g. "$GPGGA") first, the data fields, then the two character checksum.
+    """
+
+    msg_type: str
+    fields: list[str]
+
+
+def xor_checksum(data: bytes) -> int:
+    """XOR every byte of `data` together.
+
+    Args
+    ----
+        data (bytes | bytearray | memoryview): Sentence body between the
+            '$' and '*', excluding both.
+
+    Returns
+    -------
+        int: The NMEA checksum of `data` (0-255).
+    """
+    return reduce(xor, data, 0)
+
+
+class NMEAStreamParser:
+    """Incremental parser for a stream of NMEA sentences.
+
+    Feed it whatever the serial port returned, complete or partial lines,
+    and it returns the valid sentences it completed. Partial sentences are
+    kept until the rest arrives. Sentences of types that are not wanted are
+    dropped from the address field alone, before any checksum work.
+
+    Args
+    ----
+        msg_types (Iterable[str] | None): Sentence types to return, e.g.
+            ("GGA", "RMC"). None returns every valid sentence.
+
+    Attributes
+    ----------
+        sentences (int): Valid sentences returned.
+        skipped (int): Complete sentences dropped by type.
+        bad_checksum (int): Sentences dropped for a checksum mismatch or a
+            malformed checksum field.
+        discarded_bytes (int): Bytes dropped outside of any sentence.
+    """
+
+    # NMEA 0183 limits a sentence to 82 characters including '$' and CRLF,
+    # anything longer without a line end is noise.
+    MAX_SENTENCE_LEN = 82
+    MIN_SENTENCE_LEN = 10   # "$GPXXX*CS" plus at least one field
+
+    __slots__ = ("_buf", "_types", "sentences", "skipped", "bad_checksum",
+                 "discarded_bytes")
+
+    def __init__(self, msg_types: Optional[Iterable[str]] = None):
+        self._buf = bytearray()
+        self._types = (None if msg_types is None else
+                       frozenset(t.encode("ascii") for t in msg_types))
+        self.sentences = 0
+        self.skipped = 0
+        self.bad_checksum = 0
+        self.discarded_bytes = 0
+
+    def reset(self) -> None:
+        """Drop any partial sentence, e.g. when the GPS is powered off."""
+        self._buf.clear()
+
+    def feed(self, data: bytes) -> list[NMEASentence]:
+        """Add bytes from the serial port and return completed sentences.
+
+        Args
+        ----
+            data (bytes): Raw bytes read from the GPS.
+
+        Returns
+        -------
+            list[NMEASentence]: Valid, wanted sentences in the order they
+                                were received.
+        """
+        buf = self._buf
+        buf += data
+        found = []
+        pos = 0
+        size = len(buf)
+        while pos < size:
+            start = buf.find(b"$", pos)
+            if start < 0:
+                self.discarded_bytes += size - pos
+                pos = size
+                break
+            self.discarded_bytes += start - pos
+            end = buf.find(b"\n", start)
+            if end < 0:
+                if size - start > self.MAX_SENTENCE_LEN:
+                    # No line end where there should be one, resync on
+                    # the next '$'
+                    self.discarded_bytes += 1
+                    pos = start + 1
+                    continue
+                pos = start
+                break
+            # A sentence cut short by a new '$' is garbage, only the last
+            # '$' before the line end starts a sentence.
+            last = buf.rfind(b"$", start, end)
+            self.discarded_bytes += last - start
+            start = last
+            pos = end + 1
+            sentence = self._parse(buf, start, end)
+            if sentence is not None:
+                found.append(sentence)
+        if pos:
+            del buf[:pos]
+        return found
+
+    def _parse(self, buf: bytearray, start: int,
+               end: int) -> Optional[NMEASentence]:
+        """Validate and decode the sentence in buf[start:end]."""
+        if end - start < self.MIN_SENTENCE_LEN:
+            self.bad_checksum += 1
+            return None
+        msg_type = bytes(buf[start + 3:start + 6])
+        if self._types is not None and msg_type not in self._types:
+            self.skipped += 1
+            return None
+
+        star = buf.find(b"*", start, end)
+        if star < 0 or end - star < 3:
+            self.bad_checksum += 1
+            return None
+        high = _HEX_DIGITS.get(buf[star + 1])
+        low = _HEX_DIGITS.get(buf[star + 2])
+        with memoryview(buf)[start + 1:star] as body:
+            computed = xor_checksum(body)
+        if high is None or low is None or computed != high << 4 | low:
+            self.bad_checksum += 1
+            return None
+
+        fields = buf[start:star].decode("ascii", "replace").split(",")
+        fields.append(buf[star + 1:star + 3].decode("ascii"))
+        self.sentences += 1
+        return NMEASentence(msg_type.decode("ascii"), fields)
@@ -0,0 +1,340 @@
+"""shelterGPS.replay.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: NMEA capture and replay. Raw bytes from the GPS module are
+             recorded with the time they arrived to a gzip compressed
+             capture file. A capture is replayed through `ReplaySerial`, a
+             stand in for `serial.Serial`, either in real time or as fast as
+             it is read, driving `GPS.get_fix` or
+             `SunTimes._perform_gps_fix_attempts` without hardware. Each
+             replay reports the sentences parsed per CPU second, the time to
+             fix on the capture's clock and the CPU time the fix took, so
+             parser changes can be benchmarked and regressions caught.
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import gzip
+import logging
+import struct
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Union
+from lightlib.config import ConfigLoader
+from shelterGPS.common import GPSInvalid
+from shelterGPS.Position import GPS
+
+CAPTURE_MAGIC = b"NMEACAP1"
+# Each record is the seconds since recording started and the byte count,
+# followed by the bytes
+_RECORD = struct.Struct("<dI")
+
+Capture = list[tuple[float, bytes]]
+
+
+class CaptureEnd(Exception):
+    """Raised when a replay reads past the end of its capture."""
+
+
+def write_capture(path: str, chunks: Capture) -> None:
+    """Write (seconds, bytes) chunks to a compressed capture file.
+
+    Args
+    ----
+        path (str): Capture file to write.
+        chunks (list[tuple[float, bytes]]): Bytes and the seconds after the
+            start of recording they were read.
+    """
+    with gzip.open(path, "wb") as f:
+        f.write(CAPTURE_MAGIC)
+        for offset, data in chunks:
+            f.write(_RECORD.pack(offset, len(data)))
+            f.write(data)
+
+
+def read_capture(path: str) -> Capture:
+    """Read a capture file written by `write_capture`.
+
+    Args
+    ----
+        path (str): Capture file to read.
+
+    Returns
+    -------
+        list[tuple[float, bytes]]: The recorded chunks in order.
+
+    Raises
+    ------
+        ValueError: If the file is not a capture or is truncated.
+    """
+    with gzip.open(path, "rb") as f:
+        raw = f.read()
+    if not raw.startswith(CAPTURE_MAGIC):
+        raise ValueError(f"{path} is not an NMEA capture file")
+    chunks = []
+    pos = len(CAPTURE_MAGIC)
+    while pos < len(raw):
+        if pos + _RECORD.size > len(raw):
+            raise ValueError(f"Capture {path} is truncated")
+        offset, size = _RECORD.unpack_from(raw, pos)
+        pos += _RECORD.size
+        if pos + size > len(raw):
+            raise ValueError(f"Capture {path} is truncated")
+        chunks.append((offset, raw[pos:pos + size]))
+        pos += size
+    return chunks
+
+
+def record_capture(path: str, seconds: float, ser=None) -> Capture:
+    """Record the raw output of the GPS module to a capture file.
+
+    With no serial port given the GPS module is powered on and recorded from
+    power up, so the capture includes the time the module takes to fix.
+
+    Args
+    ----
+        path (str): Capture file to write.
+        seconds (float): How long to record for.
+        ser (serial.Serial | None): Port to record, defaults to the GPS
+            module's.
+
+    Returns
+    -------
+        list[tuple[float, bytes]]: The recorded chunks.
+    """
+    gps = None
+    if ser is None:
+        gps = GPS()
+        if gps.serial_connection is None:
+            raise GPSInvalid("No GPS serial connection to record from.")
+        ser = gps.serial_connection
+        gps.pwr_on(0)
+    chunks = []
+    start = time.monotonic()
+    try:
+        while (elapsed := time.monotonic() - start) < seconds:
+            data = ser.read(ser.in_waiting or 1)
+            if data:
+                chunks.append((elapsed, data))
+    finally:
+        if gps is not None:
+            gps.pwr_off()
+    write_capture(path, chunks)
+    logging.info("Recorded %d bytes of GPS output over %.0fs to %s",
+                 sum(len(data) for _, data in chunks), seconds, path)
+    return chunks
+
+
+class ReplaySerial:
+    """Serve a capture through the parts of `serial.Serial` the GPS uses.
+
+    In real time mode bytes become readable at the offset they were
+    recorded, measured from the first read. Otherwise each read that finds
+    nothing waiting releases the next recorded chunk, so the capture runs
+    as fast as it is parsed while `capture_time` still follows the
+    recording's clock.
+
+    Args
+    ----
+        chunks (list[tuple[float, bytes]]): The capture to serve.
+        realtime (bool): Release bytes at their recorded times.
+        timeout (float): Longest a real time read waits for bytes.
+
+    Attributes
+    ----------
+        capture_time (float): Recorded offset of the last chunk released.
+        bytes_read (int): Bytes returned by `read`.
+    """
+
+    def __init__(self, chunks: Capture, realtime: bool = False,
+                 timeout: float = 1.0):
+        self._chunks = chunks
+        self._next = 0
+        self._buf = bytearray()
+        self._start: Optional[float] = None
+        self.realtime = realtime
+        self.timeout = timeout
+        self.is_open = True
+        self.capture_time = 0.0
+        self.bytes_read = 0
+
+    @property
+    def exhausted(self) -> bool:
+        """True once every byte of the capture has been read."""
+        return self._next >= len(self._chunks) and not self._buf
+
+    @property
+    def in_waiting(self) -> int:
+        """Bytes that can be read without waiting."""
+        self._release(wait=False)
+        return len(self._buf)
+
+    def read(self, size: int = 1) -> bytes:
+        """Read up to `size` bytes, waiting for them like a serial port.
+
+        Raises
+        ------
+            CaptureEnd: If the whole capture has already been read.
+        """
+        self._release(wait=True)
+        if not self._buf and self.exhausted:
+            raise CaptureEnd("End of NMEA capture")
+        data = bytes(self._buf[:size])
+        del self._buf[:size]
+        self.bytes_read += len(data)
+        return data
+
+    def readline(self) -> bytes:
+        """Read up to and including the next line end."""
+        line = bytearray()
+        while not line.endswith(b"\n"):
+            self._release(wait=True)
+            if not self._buf:
+                if self.exhausted:
+                    break
+                continue
+            end = self._buf.find(b"\n")
+            size = len(self._buf) if end < 0 else end + 1
+            line += self._buf[:size]
+            del self._buf[:size]
+        self.bytes_read += len(line)
+        return bytes(line)
+
+    def close(self) -> None:
+        """Close the port."""
+        self.is_open = False
+
+    def _release(self, wait: bool) -> None:
+        """Move the chunks that are due into the read buffer."""
+        if self._next >= len(self._chunks):
+            return
+        if not self.realtime:
+            if not self._buf:
+                self._take()
+            return
+
+        if self._start is None:
+            self._start = time.monotonic()
+        elapsed = time.monotonic() - self._start
+        if wait and not self._buf:
+            delay = self._chunks[self._next][0] - elapsed
+            if delay > 0:
+                time.sleep(min(delay, self.timeout))
+                elapsed = time.monotonic() - self._start
+        while self._next < len(self._chunks) and \
+                self._chunks[self._next][0] <= elapsed:
+            self._take()
+
+    def _take(self) -> None:
+        offset, data = self._chunks[self._next]
+        self._next += 1
+        self._buf += data
+        self.capture_time = offset
+
+
+@contextmanager
+def replaying(gps: GPS, ser: ReplaySerial):
+    """Point the GPS at a replay, without touching the system clock."""
+    previous = gps.use_serial(ser)
+    sync_clock = gps.sync_clock
+    gps.sync_clock = False
+    try:
+        yield gps
+    finally:
+        gps.use_serial(previous)
+        gps.sync_clock = sync_clock
+
+
+def _run_replay(gps: GPS, ser: ReplaySerial, run: Callable[[], object],
+                source: str) -> dict:
+    """Run a fix against a replay and measure it."""
+    def framed() -> int:
+        stats = gps.nmea_stats
+        return stats["sentences"] + stats["skipped"] + stats["bad_checksum"]
+
+    framed_before = framed()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    stages = None
+    with replaying(gps, ser):
+        try:
+            stages = run()
+        except (GPSInvalid, CaptureEnd) as e:
+            logging.warning("Replay of %s ended without a fix: %s", source, e)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    sentences = framed() - framed_before
+    fixed = gps.position_established and gps.datetime_established
+
+    report = {
+        "capture": source,
+        "mode": "realtime" if ser.realtime else "max_speed",
+        "fixed": fixed,
+        "time_to_fix": ser.capture_time if fixed else None,
+        "sentences": sentences,
+        "bytes": ser.bytes_read,
+        "cpu_seconds": cpu,
+        "wall_seconds": wall,
+        "sentences_per_sec": sentences / cpu if cpu > 0 else None,
+        "stages": stages if isinstance(stages, dict) else None,
+    }
+    logging.info("Replay of %s (%s): %s, %d sentences, %.0f sentences/s, "
+                 "%.3fs CPU", source, report["mode"],
+                 f"fixed at {ser.capture_time:.1f}s" if fixed else "no fix",
+                 sentences, report["sentences_per_sec"] or 0, cpu)
+    return report
+
+
+def replay_fix(capture: Union[str, Capture], realtime: bool = False,
+               max_fix_time: Optional[float] = None) -> dict:
+    """Replay a capture through `GPS.get_fix` and report on it.
+
+    Args
+    ----
+        capture (str | list[tuple[float, bytes]]): Capture file or chunks.
+        realtime (bool): Replay at the recorded speed.
+        max_fix_time (float | None): Fix budget, defaults to the config.
+
+    Returns
+    -------
+        dict: fixed, time_to_fix (seconds on the capture's clock),
+              sentences, bytes, cpu_seconds, wall_seconds,
+              sentences_per_sec and the fix stages.
+    """
+    source = capture if isinstance(capture, str) else "<chunks>"
+    chunks = read_capture(capture) if isinstance(capture, str) else capture
+    gps = GPS()
+    ser = ReplaySerial(chunks, realtime, ConfigLoader().gps_timeout)
+    return _run_replay(
+        gps, ser,
+        lambda: gps.get_fix(pwr_up_wait=0, max_fix_time=max_fix_time),
+        source)
+
+
+def replay_sun_times(capture: Union[str, Capture],
+                     realtime: bool = False) -> dict:
+    """Replay a capture through `SunTimes._perform_gps_fix_attempts`.
+
+    The full fix path is run, solar times and the fix window are calculated
+    and the persistent data is updated from the captured position.
+
+    Args
+    ----
+        capture (str | list[tuple[float, bytes]]): Capture file or chunks.
+        realtime (bool): Replay at the recorded speed.
+
+    Returns
+    -------
+        dict: As `replay_fix`, stages are not available on this path.
+    """
+    from shelterGPS.Helio import SunTimes
+
+    source = capture if isinstance(capture, str) else "<chunks>"
+    chunks = read_capture(capture) if isinstance(capture, str) else capture
+    sun = SunTimes()
+    sun.stop_gps_fix_process()
+    ser = ReplaySerial(chunks, realtime, ConfigLoader().gps_timeout)
+    return _run_replay(sun._gps, ser, sun._perform_gps_fix_attempts, source)
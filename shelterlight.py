@@ -15,18 +15,29 @@ import socket
 import threading
 import datetime as dt
 import time
-from shelterGPS.Helio import SunTimes
-from lightlib import USBManager
-from scheduler.Schedule import LightScheduler
-from lightlib.smartlight import init_log
+from typing import TYPE_CHECKING
 from lightlib.config import ConfigLoader
 from lightlib.common import ConfigReloaded, get_now
-from lightlib.lightcontrol import LightController
 from lightlib import cli
 from lightlib.exceptions import ExitAfter
+from lightlib.tasks import TaskScheduler
 
+# The scheduler, GPS and light control pull in LightGBM, pandas, astral,
+# timezonefinder and serial. They are imported in main() once the command
+# line has been handled so CLI subcommands only load what they use.
+if TYPE_CHECKING:
+    from shelterGPS.Helio import SunTimes
+    from scheduler.Schedule import LightScheduler
+    from lightlib.lightcontrol import LightController
 
-def cleanup_resources(gps: SunTimes, light_control: LightController) -> None:
+# Group of the jobs started by main(), cancelled when it stops or reloads
+MAIN_JOBS = "main"
+# Seconds between purges of old schedules from the schedule cache
+CACHE_PURGE_INTERVAL = 3600
+
+
+def cleanup_resources(gps: "SunTimes",
+                      light_control: "LightController") -> None:
     """Perform resource cleanup for GPS, GPIO, and logging."""
     logging.info("Performing resource cleanup...")
     gps.cleanup()  # Stops GPS fix process thread, if any
@@ -54,85 +65,104 @@ def usb_listener(usb_manager, gps, stop_event: threading.Event,
                 try:
                     usb_manager.usb_check()
                 except ConfigReloaded:
+                    from scheduler.fallback import invalidate_fallback_cache
+                    from lightlib.lightcontrol import LightController
+                    # The new config may point at a different fallback file
+                    invalidate_fallback_cache()
                     cleanup_resources(gps, LightController())
                     raise  # Propagate to restart main loop in main program
 
 
-def light_loop(light_control: LightController,
-               stop_event: threading.Event):
-    """Run light control updates in a tight polling loop."""
-    try:
-        start_tick = time.monotonic()
-        heartbeat = ConfigLoader().heartbeat_interval
-        while not stop_event.is_set():
-            light_control.update()
-            time.sleep(1)
-            if heartbeat > 0:
-                tick_now = time.monotonic()
-                if tick_now >= start_tick + heartbeat:
-                    logging.info("[LOOP] Heartbeat tick lights are %s",
-                                 f"ON ({light_control.on_reason.name})"
-                                 if light_control.lights_are_on else "OFF",)
-                    start_tick = tick_now
-    except Exception as e:
-        logging.exception("Light control loop encountered an error: %s", e,
-                          exc_info=True)
-    finally:
-        logging.info("Light loop exited")
-
+def heartbeat(light_control: "LightController") -> None:
+    """Log whether the lights are on and how the scheduled jobs are doing."""
+    logging.info("[LOOP] Heartbeat tick lights are %s",
+                 f"ON ({light_control.on_reason.name})"
+                 if light_control.lights_are_on else "OFF",)
+    for name, stats in TaskScheduler().stats.items():
+        logging.debug("[LOOP] Job %s: %s", name, stats)
+
+
+def gps_check(gps: "SunTimes") -> None:
+    """Start a GPS fix attempt if there is no fix today and it's time to."""
+    if not gps.fixed_today and gps.in_fix_window:
+        gps.start_gps_fix_process()
+
+
+def daily_schedule_generation(scheduler: "LightScheduler",
+                              solar_times: "SunTimes") -> float:
+    """Generate the daily schedule 1 hour after sunrise.
+
+    Run as a scheduled job, each run generates the schedule if it is due
+    and returns when the job should next run.
+
+    Returns
+    -------
+        float: Seconds until the next run.
+    """
+    now = get_now()
+
+    # Wait until solar times are available, if 1 is set, all are set
+    sr_today = solar_times.UTC_sunrise_today
+    if not sr_today:
+        retry_at = now + dt.timedelta(minutes=5)
+        logging.warning("Sunrise time not available. "
+                        "retrying in 5 minutes at %s.", retry_at.time())
+        return (retry_at - now).total_seconds()
+
+    generation_time = sr_today + dt.timedelta(hours=1)
+    if generation_time > now:
+        logging.info("Schedule will be generated at %s.",
+                     generation_time.time())
+        return (generation_time - now).total_seconds()
+
+    logging.info("Generating daily schedule.")
+    scheduler.update_daily_schedule()
+
+    # Wait until tomorrows generation time
+    next_run = solar_times.UTC_sunrise_tomorrow + dt.timedelta(hours=1)
+    logging.info("Next Schedule generation will be at %s, on %s.",
+                 next_run.time(), next_run.date())
+    return max((next_run - get_now()).total_seconds(), 0)
+
+
+def start_jobs(light_control: "LightController", gps: "SunTimes") -> None:
+    """Schedule the periodic jobs of the main program.
+
+    The light control, heartbeat, GPS fix check, schedule generation and
+    schedule cache purge all run from the one `TaskScheduler` thread, in
+    the `MAIN_JOBS` group that is cancelled when the main program stops.
+    """
+    # [GENERAL] changes need a restart, the snapshot is good for the jobs
+    config = ConfigLoader().snapshot
+    tasks = TaskScheduler()
+    tasks.every("light-control", light_control.update, 1, group=MAIN_JOBS)
+    if config.heartbeat_interval > 0:
+        tasks.every("heartbeat", lambda: heartbeat(light_control),
+                    config.heartbeat_interval,
+                    delay=config.heartbeat_interval, group=MAIN_JOBS)
+    tasks.every("gps-fix-check", lambda: gps_check(gps), config.cycle_time,
+                group=MAIN_JOBS)
+    scheduler = light_control.schedule
+    tasks.every("schedule-cache-purge",
+                scheduler.store.purge_old_cache_entries,
+                CACHE_PURGE_INTERVAL, delay=CACHE_PURGE_INTERVAL,
+                group=MAIN_JOBS)
 
-def gps_loop(gps: SunTimes, stop_event: threading.Event):
-    """Run periodic GPS fix attempts on a configurable interval."""
-    try:
-        while not stop_event.is_set():
-            if not gps.fixed_today and gps.in_fix_window:
-                gps.start_gps_fix_process()
-            time.sleep(ConfigLoader().cycle_time)
-    except Exception as e:
-        logging.exception("GPS control loop encountered an error: %s", e,
+    def restore_schedule():
+        """Restore the stored schedule then start daily generation."""
+        try:
+            scheduler.restore_startup_schedule()
+        except Exception as e:
+            logging.error("Startup schedule restore failed: %s", e,
                           exc_info=True)
-    finally:
-        logging.info("GPS loop exited")
-
-
-def daily_schedule_generation(stop_event: threading.Event,
-                              scheduler: LightScheduler,
-                              solar_times: SunTimes):
-    """Generate the daily schedule 1 hour after sunrise."""
-    while not stop_event.is_set():
-        now = get_now()
-
-        # Wait until solar times are available, if 1 is set, all are set
-        sr_today = solar_times.UTC_sunrise_today
-        if sr_today:
-            generation_time = sr_today + dt.timedelta(hours=1)
-            sleep_duration = (generation_time - now).total_seconds()
-
-            if sleep_duration > 0:
-                logging.info("Schedule will be generated at %s.",
-                             generation_time.time())
-                stop_event.wait(timeout=sleep_duration)
-                if stop_event.is_set():
-                    return
-
-            logging.info("Generating daily schedule.")
-            scheduler.update_daily_schedule()
+        tasks.once("daily-schedule",
+                   lambda: daily_schedule_generation(scheduler, gps),
+                   group=MAIN_JOBS, background=True)
 
-            # Wait until tomorrows generation time
-            sr_tomorrow = solar_times.UTC_sunrise_tomorrow
-            next_run = sr_tomorrow + dt.timedelta(hours=1)
-            sleep_duration = (next_run - get_now()).total_seconds()
-
-            if sleep_duration > 0:
-                logging.info("Next Schedule generation will be at %s, on %s.",
-                             next_run.time(), next_run.date())
-                stop_event.wait(timeout=sleep_duration)
-
-        else:
-            retry_at = now + dt.timedelta(minutes=5)
-            logging.warning("Sunrise time not available. "
-                            "retrying in 5 minutes at %s.", retry_at.time())
-            stop_event.wait((retry_at - now).total_seconds())
+    # Schedule restore and generation train models, they run in the
+    # background so the light control job is not held up
+    tasks.once("schedule-restore", restore_schedule, group=MAIN_JOBS,
+               background=True)
 
 
 def main_loop():
@@ -164,10 +194,15 @@ def main_loop():
 
 def main(stop_event: threading.Event):
     """Program entry point."""
+    from lightlib.smartlight import init_log
     args = cli.parse_args()
     init_log(args.log_level)
     cli.arg_handler(args)
 
+    from lightlib import USBManager
+    from shelterGPS.Helio import SunTimes
+    from lightlib.lightcontrol import LightController
+
     # Initialize USB manager, configuration, and logging
     usb_manager = USBManager.USBFileManager()
     gps = SunTimes()  # Initialize GPS/SunTimes instance
@@ -182,24 +217,8 @@ def main(stop_event: threading.Event):
                                   daemon=True)
     usb_thread.start()  # Begin listening for USB-based config reloads
 
-    # Start schedule generation in background
-    scheduler = light_control.schedule
-    scheduler_thread = threading.Thread(target=daily_schedule_generation,
-                                        args=(stop_event, scheduler, gps),
-                                        daemon=True)
-    scheduler_thread.start()
-
-    # Start GPS fix loop in background
-    gps_thread = threading.Thread(target=gps_loop,
-                                  args=(gps, stop_event),
-                                  daemon=True)
-    gps_thread.start()
-
-    # Start light control loop in background
-    light_thread = threading.Thread(target=light_loop,
-                                    args=(light_control, stop_event),
-                                    daemon=True)
-    light_thread.start()
+    # Light control, GPS fix checks and schedule generation
+    start_jobs(light_control, gps)
 
     try:
         while True:
@@ -211,7 +230,9 @@ def main(stop_event: threading.Event):
         pass  # Handle by restarting the loop in `main_loop()`
     finally:
         stop_event.set()
-        scheduler_thread.join()
+        # Nothing from this configuration runs again, the restarted main
+        # program schedules the jobs afresh
+        TaskScheduler().cancel_group(MAIN_JOBS)
         cleanup_resources(gps, light_control)
 
 
@@ -0,0 +1,159 @@
+"""tests.activity_source_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Simulated activity source unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import datetime as dt
+import os
+import sys
+import threading
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+from lightlib.activity_source import SimulatedSource, create_source
+from lightlib.activitydb import Activity, PinLevel
+
+
+class EdgeRecorder:
+    """Collect edges reported by a source."""
+
+    def __init__(self):
+        self.edges = []
+        self._lock = threading.Lock()
+
+    def __call__(self, pin, level, tick):
+        with self._lock:
+            self.edges.append((pin, level, tick))
+
+
+class TestSimulatedSource(unittest.TestCase):
+    """Test generated and replayed activity."""
+
+    def test_replay_edges(self):
+        """Replayed activity bounces then settles at each transition."""
+        source = SimulatedSource(speed=0, bounce=2, seed=1,
+                                 replay=[(0.0, 5, 10.0), (60.0, 6, 2.0)])
+        recorder = EdgeRecorder()
+        source.claim([5, 6], recorder)
+        source.join(5)
+        source.close()
+
+        for pin in (5, 6):
+            levels = [level for p, level, _ in recorder.edges if p == pin]
+            # Rise and fall, each with 2 bounces of 2 edges
+            self.assertEqual(len(levels), 10)
+            self.assertEqual(levels[4], 1)
+            self.assertEqual(levels[-1], 0)
+            self.assertEqual(source.read(pin), 0)
+        ticks = [tick for _, _, tick in recorder.edges]
+        self.assertEqual(ticks, sorted(ticks))
+        self.assertEqual(source.edges, 20)
+
+    def test_poisson_rate(self):
+        """Arrivals on each pin follow the configured rate."""
+        source = SimulatedSource(rate_per_hour=3600, mean_duration=0.2,
+                                 speed=0, bounce=0, seed=2)
+        recorder = EdgeRecorder()
+        pins = list(range(8))
+        source.claim(pins, recorder)
+        while source.now() < 600:
+            threading.Event().wait(0.01)
+        source.close()
+
+        rises = [pin for pin, level, _ in recorder.edges if level == 1]
+        per_pin = len(rises) / len(pins) / (source.now() / 3600)
+        # 1 arrival per second less the time each activity holds the pin
+        self.assertGreater(per_pin, 2000)
+        self.assertLess(per_pin, 3600)
+        self.assertEqual(set(rises), set(pins))
+
+    def test_release_stops_pin(self):
+        """Released pins report no more edges."""
+        source = SimulatedSource(speed=20, bounce=0,
+                                 replay=[(0.0, 1, 1.0), (5.0, 2, 1.0)])
+        recorder = EdgeRecorder()
+        source.claim([1, 2], recorder)
+        source.release([2])
+        source.join(5)
+        source.close()
+        self.assertEqual({pin for pin, _, _ in recorder.edges}, {1})
+
+    def test_replay_from_log(self):
+        """activity_log rows become offsets from the first activity."""
+        start = dt.datetime(2025, 6, 1, 20, 0)
+        rows = [(start + dt.timedelta(minutes=5), 17, 30),
+                (start, 18, 12)]
+        self.assertEqual(SimulatedSource.replay_from_log(rows),
+                         [(0.0, 18, 12.0), (300.0, 17, 30.0)])
+        self.assertEqual(SimulatedSource.replay_from_log([]), [])
+
+    def test_create_simulated_source(self):
+        """The config selects the simulator."""
+        config = MagicMock(activity_source="simulated",
+                           simulated_activity_rate=6.0,
+                           simulated_activity_speed=50.0)
+        source = create_source(config)
+        self.assertIsInstance(source, SimulatedSource)
+        self.assertEqual(source.rate_per_hour, 6.0)
+        self.assertEqual(source.speed, 50.0)
+
+
+class TestSimulatedActivity(unittest.TestCase):
+    """Test activity capture driven by the simulator."""
+
+    @patch('lightlib.activitydb.ConfigLoader')
+    @patch('lightlib.activitydb.DB')
+    def setUp(self, mock_db_class, mock_config_loader):
+        """Create Activity on a replayed source with a mock database."""
+        snapshot = mock_config_loader.return_value.snapshot
+        snapshot.activity_digital_inputs = (17,)
+        snapshot.max_activity_time = 60
+        snapshot.health_check_interval = 300
+        snapshot.activity_debounce_s = 0.02
+        self.mock_db = MagicMock()
+        mock_db_class.return_value = self.mock_db
+        self.source = SimulatedSource(
+            speed=0, bounce=0,
+            replay=[(0.0, 20, 1.0), (0.0, 21, 1.0), (5.0, 22, 1.0)])
+
+        self._saved = Activity._instance
+        Activity._instance = None
+        self.activity = Activity(source=self.source, pins=[20, 21, 22])
+
+    def tearDown(self):
+        """Stop the simulator and restore the singleton."""
+        self.activity.cleanup()
+        Activity._instance = self._saved
+
+    def test_activity_logged(self):
+        """Each simulated activity is captured and written to the DB."""
+        self.source.join(5)
+        stats = self.activity.stats
+        self.assertEqual(stats["edges"], 6)
+        self.assertEqual(stats["activities"], 3)
+        self.assertEqual(stats["db_writes"], 3)
+        self.assertEqual(self.mock_db.query.call_count, 3)
+        logged = {call.kwargs["params"][4]
+                  for call in self.mock_db.query.call_args_list}
+        self.assertEqual(logged, {20, 21, 22})
+        self.assertFalse(self.activity.activity_detected())
+        for pin in (20, 21, 22):
+            self.assertEqual(self.activity.get_pin_status(pin)["state"],
+                             PinLevel.LOW)
+
+
+if __name__ == "__main__":
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
@@ -10,11 +10,11 @@ Version: 0.1
 """
 
 from unittest.mock import patch, MagicMock
-import datetime as dt
 import unittest
 import sys
 import os
 import logging
+import threading
 import types
 import util
 # Set up logging ONCE for the entire test module
@@ -30,8 +30,14 @@ except ImportError:
     from tests.RPi import lgpio as fake_lgpio
     sys.modules['lgpio'] = fake_lgpio
 
-from lightlib.activitydb import Activity, PinLevel, PinHealth
-from lightlib.common import valid_smallint, get_now
+from lightlib.activitydb import Activity, PinLevel, PinHealth, PinState, \
+    FAULT_CHECK_JOB
+from lightlib.tasks import TaskScheduler
+from lightlib.activity_source import SimulatedSource
+from lightlib.common import valid_smallint
+
+SECOND = 10**9  # Ticks are in nanoseconds
+
 
 class TestActivity(unittest.TestCase):
     """Tests Activity functions."""
@@ -42,40 +48,57 @@ class TestActivity(unittest.TestCase):
         """Set up the test environment for each test case."""
         self.test_pin = 11
         # Mock config values
-        mock_config_loader.return_value.activity_digital_inputs = \
-            [self.test_pin]
-        mock_config_loader.return_value.max_activity_time = 60
-        mock_config_loader.return_value.health_check_interval = 300
+        snapshot = mock_config_loader.return_value.snapshot
+        snapshot.activity_digital_inputs = (self.test_pin,)
+        snapshot.max_activity_time = 60
+        snapshot.health_check_interval = 300
+        snapshot.activity_debounce_s = 0.02
 
         # Stub DB connection
         self.mock_db = MagicMock()
         mock_db_class.return_value = self.mock_db
         mock_db_class.valid_smallint = valid_smallint
 
-        # Reset singleton and initialize fresh Activity
+        # Reset singleton and initialize fresh Activity, edges are fed in
+        # by the tests so the simulator generates none
+        self.source = SimulatedSource(rate_per_hour=0)
         Activity._instance = None
-        self.activity = Activity()
+        self.activity = Activity(source=self.source)
+        self.state = self.activity._pins[self.test_pin]
+        self.tick = self.source.tick()
+
+    def tearDown(self):
+        """Stop the source."""
+        self.activity.cleanup()
+
+    def set_high(self, seconds: float, health=PinHealth.OK):
+        """Make the test pin HIGH since `seconds` before `self.tick`."""
+        self.state.level = PinLevel.HIGH
+        self.state.health = health
+        self.state.raw = 1
+        self.state.changed_tick = self.tick - int(seconds * SECOND)
+        self.activity._high[self.state] = (self.state.changed_tick,)
 
     def test_start_activity_event_sets_state_and_status(self):
         """_start_activity_event should set pin HIGH & status to OK."""
-        self.activity._start_activity_event(self.test_pin)
+        self.activity._start_activity_event(self.test_pin, self.tick)
 
-        pin_status = self.activity._pin_status[self.test_pin]
+        pin_status = self.activity.get_pin_status(self.test_pin)
         self.assertEqual(pin_status["state"], PinLevel.HIGH)
         self.assertEqual(pin_status["status"], PinHealth.OK)
-        self.assertIn(self.test_pin, self.activity._start_times)
+        self.assertEqual(self.state.changed_tick, self.tick)
+        self.assertTrue(self.activity.activity_detected())
 
     def test_end_activity_event_logs_valid_activity(self):
         """_end_activity_event should log activity and reset pin state."""
-        start_time = get_now() - dt.timedelta(seconds=10)
-        self.activity._start_times[self.test_pin] = start_time
+        self.set_high(10)
 
-        self.activity._end_activity_event(self.test_pin)
+        self.activity._end_activity_event(self.test_pin, self.tick)
 
-        pin_status = self.activity._pin_status[self.test_pin]
+        pin_status = self.activity.get_pin_status(self.test_pin)
         self.assertEqual(pin_status["status"], PinHealth.OK)
         self.assertEqual(pin_status["state"], PinLevel.LOW)
-        self.assertNotIn(self.test_pin, self.activity._start_times)
+        self.assertFalse(self.activity.activity_detected())
         self.assertTrue(self.mock_db.query.called)
 
         call = self.mock_db.query.call_args
@@ -83,6 +106,7 @@ class TestActivity(unittest.TestCase):
             _, kwargs = call
             sql = kwargs.get("query", "<No query key>")
             params = kwargs.get("params", "<No params>")
+            self.assertEqual(params[4:], (self.test_pin, 10))
             logging.debug("SQL that would have been executed:\n"
                           "%s\nwith parameters: %s", sql, params)
         else:
@@ -93,33 +117,31 @@ class TestActivity(unittest.TestCase):
         threshold = self.activity._fault_threshold
 
         # Simulate a long HIGH to trigger fault
-        self.activity._start_times[self.test_pin] = (
-            get_now() - dt.timedelta(seconds=threshold + 5))
-        self.activity._pin_status[self.test_pin]["state"] = PinLevel.HIGH
+        self.set_high(threshold + 5)
 
         # First fault check (should set FAULT)
         logging.debug("1st Fault check")
         self.activity._run_fault_check_cycle()
         self.assertEqual(
-            self.activity._pin_status[self.test_pin]["status"],
+            self.activity.get_pin_status(self.test_pin)["status"],
             PinHealth.FAULT,
             "Pin should be marked FAULT due to prolonged HIGH signal."
         )
         logging.debug("Pin correctly set FAULT")
 
         logging.debug("Setting pin edge low to trigger _end_activity_event")
-        # Call _end_activity_event to simulate falling edge
-        self.activity._end_activity_event(self.test_pin)
+        # Falling edge
+        self.activity._on_edge(self.test_pin, 0, self.source.tick())
 
         # Should now be OK
         self.assertEqual(
-            self.activity._pin_status[self.test_pin]["status"],
+            self.activity.get_pin_status(self.test_pin)["status"],
             PinHealth.OK,
             "Pin should reset to OK after falling edge."
         )
         logging.debug("Pin correctly set OK")
         self.assertEqual(
-            self.activity._pin_status[self.test_pin]["state"],
+            self.activity.get_pin_status(self.test_pin)["state"],
             PinLevel.LOW,
             "Pin state should be LOW after falling edge."
         )
@@ -129,11 +151,10 @@ class TestActivity(unittest.TestCase):
         logging.debug("2nd Fault check")
         self.activity._run_fault_check_cycle()
         self.assertEqual(
-            self.activity._pin_status[self.test_pin]["status"],
+            self.activity.get_pin_status(self.test_pin)["status"],
             PinHealth.OK,
             "Pin should be marked OK due to LOW signal."
         )
-        logging.debug("Pin correctly set FAULT")
         logging.debug("** Pin successfully cleared fault on falling edge **")
 
     def test_end_activity_event_handles_excessive_duration(self):
@@ -141,25 +162,21 @@ class TestActivity(unittest.TestCase):
         # Set start time beyond the 32767-second limit
         self.activity._fault_threshold = 99999
         sub_time = 32768
-        self.activity._start_times[self.test_pin] = (
-           get_now() - dt.timedelta(seconds=sub_time))
-        self.activity._pin_status[self.test_pin]["state"] = PinLevel.HIGH
-        self.activity._pin_status[self.test_pin]["status"] = PinHealth.FAULT
+        self.set_high(sub_time, health=PinHealth.FAULT)
         logging.debug("Pin %i forced to FAULT with duration %is (invalid)",
                       self.test_pin, sub_time)
 
         # Patch the logger to verify error message
         with self.assertLogs(level="DEBUG") as log:
-            self.activity._end_activity_event(self.test_pin)
+            self.activity._end_activity_event(self.test_pin, self.tick)
 
         # Should NOT call query() due to duration error
         self.mock_db.query.assert_not_called()
-        pin_status = self.activity._pin_status[self.test_pin]
+        pin_status = self.activity.get_pin_status(self.test_pin)
         self.assertEqual(pin_status["state"], PinLevel.LOW)
         self.assertEqual(pin_status["status"], PinHealth.OK)
         logging.debug("Pin status correctly reset\n\t\tState: %s\tStatus: %s",
-                      self.activity._pin_status[self.test_pin]["state"].name,
-                      self.activity._pin_status[self.test_pin]["status"].name)
+                      pin_status["state"].name, pin_status["status"].name)
 
         # Should log an appropriate error message
         self.assertTrue(any(
@@ -174,27 +191,24 @@ class TestActivity(unittest.TestCase):
         """_end_activity_event should log duration of 32767 seconds."""
         self.activity._fault_threshold = 99999
         duration = 32767  # Max allowed SMALLINT value
-        start_time = get_now() - dt.timedelta(seconds=duration)
-        self.activity._start_times[self.test_pin] = start_time
-        self.activity._pin_status[self.test_pin]["state"] = PinLevel.HIGH
-        self.activity._pin_status[self.test_pin]["status"] = PinHealth.OK
+        self.set_high(duration)
 
         logging.debug("Pin %i set with duration %is (valid)",
                       self.test_pin, duration)
 
         # Patch the logger to verify error message
         with self.assertLogs(level="DEBUG") as log:
-            self.activity._end_activity_event(self.test_pin)
+            self.activity._end_activity_event(self.test_pin, self.tick)
 
         # Should attempt to insert into DB
         self.mock_db.query.assert_called_once()
         logging.debug("Database query was called")
 
-        # Check that start_time was removed
-        self.assertNotIn(self.test_pin, self.activity._start_times)
+        # The end is now the pin's last change
+        self.assertEqual(self.state.changed_tick, self.tick)
 
         # Pin state and status should still be cleared
-        pin_status = self.activity._pin_status[self.test_pin]
+        pin_status = self.activity.get_pin_status(self.test_pin)
         self.assertEqual(pin_status["state"], PinLevel.LOW)
         self.assertEqual(pin_status["status"], PinHealth.OK)
 
@@ -203,13 +217,11 @@ class TestActivity(unittest.TestCase):
 
     def test_end_activity_event_skips_if_no_start_time(self):
         """_end_activity_event should skip logging if start time is missing."""
-        # Simulate no start time
-        self.activity._start_times = {}  # ensure it's not present
-        self.activity._pin_status[self.test_pin]["state"] = PinLevel.HIGH
-        self.activity._pin_status[self.test_pin]["status"] = PinHealth.FAULT
+        # A pin that never went HIGH has no start time
+        self.state.health = PinHealth.FAULT
 
         with self.assertLogs(level="WARNING") as log:
-            self.activity._end_activity_event(self.test_pin)
+            self.activity._end_activity_event(self.test_pin, self.tick)
 
         # DB should not be called
         self.mock_db.query.assert_not_called()
@@ -221,7 +233,7 @@ class TestActivity(unittest.TestCase):
         ))
 
         # State should still be LOW and OK (recovery behavior)
-        pin_status = self.activity._pin_status[self.test_pin]
+        pin_status = self.activity.get_pin_status(self.test_pin)
         self.assertEqual(pin_status["state"], PinLevel.LOW)
         self.assertEqual(pin_status["status"], PinHealth.OK)
 
@@ -235,18 +247,14 @@ class TestActivity(unittest.TestCase):
                       self.activity._fault_threshold)
         # Exceed the patched threshold
         duration = self.activity._fault_threshold + 1
-
-        self.activity._start_times[self.test_pin] = (
-           get_now() - dt.timedelta(seconds=duration))
-        self.activity._pin_status[self.test_pin]["state"] = PinLevel.HIGH
-        self.activity._pin_status[self.test_pin]["status"] = PinHealth.FAULT
+        self.set_high(duration, health=PinHealth.FAULT)
 
         with self.assertLogs(level="WARNING") as log:
-            self.activity._end_activity_event(self.test_pin)
+            self.activity._end_activity_event(self.test_pin, self.tick)
 
         self.mock_db.query.assert_not_called()
 
-        pin_status = self.activity._pin_status[self.test_pin]
+        pin_status = self.activity.get_pin_status(self.test_pin)
         self.assertEqual(pin_status["state"], PinLevel.LOW)
         self.assertEqual(pin_status["status"], PinHealth.OK)
 
@@ -277,10 +285,12 @@ class TestActivity(unittest.TestCase):
         # Generate pin numbers for each test case
         pin_base = 17
         pins = [pin_base + i for i in range(len(initial_combinations))]
+        self.activity._pins = {pin: PinState(pin) for pin in pins}
 
         # Assign initial states
         for pin, (health, level) in zip(pins, initial_combinations):
-            self.activity._pin_status[pin] = {"status": health, "state": level}
+            self.activity._pins[pin].health = health
+            self.activity._pins[pin].level = level
             logging.debug(
                 "Initially set Pin %i => Status: %s, State: %s",
                 pin, health.name, level.name)
@@ -298,8 +308,8 @@ class TestActivity(unittest.TestCase):
 
         # Update states
         for pin, (new_status, new_state) in zip(pins, updated_combinations):
-            self.activity._pin_status[pin]["status"] = new_status
-            self.activity._pin_status[pin]["state"] = new_state
+            self.activity._pins[pin].health = new_status
+            self.activity._pins[pin].level = new_state
             logging.debug(
                 "Updated Pin %i => Status: %s, State: %s",
                 pin, new_status.name, new_state.name)
@@ -315,6 +325,77 @@ class TestActivity(unittest.TestCase):
                     "Verified (updated) Pin %i => Status: %s, State: %s",
                     pin, result["status"].name, result["state"].name)
 
+    def test_bounce_is_one_activity(self):
+        """Edges within the debounce time of a change are ignored."""
+        ms = SECOND // 1000
+        rise = self.tick
+        for offset, level in ((0, 1), (2, 0), (4, 1), (7, 0), (9, 1)):
+            self.activity._on_edge(self.test_pin, level, rise + offset * ms)
+        self.assertTrue(self.activity.activity_detected())
+        fall = rise + 5 * SECOND
+        for offset, level in ((0, 0), (3, 1), (5, 0)):
+            self.activity._on_edge(self.test_pin, level, fall + offset * ms)
+        self.assertFalse(self.activity.activity_detected())
+
+        self.assertEqual(self.activity.stats["activities"], 1)
+        self.mock_db.query.assert_called_once()
+        params = self.mock_db.query.call_args.kwargs["params"]
+        self.assertEqual(params[4:], (self.test_pin, 5))
+
+    def test_short_pulse_settles(self):
+        """A level changed back inside the debounce time is taken later."""
+        ms = SECOND // 1000
+        # A 5ms glitch, the fall is inside the 20ms debounce time
+        self.activity._on_edge(self.test_pin, 1, self.tick)
+        self.activity._on_edge(self.test_pin, 0, self.tick + 5 * ms)
+        self.assertTrue(self.activity.activity_detected())
+
+        # With no more edges the fault check takes the LOW level
+        self.source.tick = lambda: self.tick + SECOND
+        self.activity._run_fault_check_cycle()
+        self.assertFalse(self.activity.activity_detected())
+        self.assertEqual(self.state.changed_tick, self.tick + 20 * ms)
+
+    def test_stats_from_many_threads(self):
+        """Counts from edges on several callback threads are all kept."""
+        pins = [20, 21, 22, 23]
+        self.activity._pins = {pin: PinState(pin) for pin in pins}
+
+        def edges(pin):
+            tick = self.tick
+            for _ in range(200):
+                self.activity._on_edge(pin, 1, tick)
+                self.activity._on_edge(pin, 0, tick + SECOND)
+                tick += 2 * SECOND
+
+        threads = [threading.Thread(target=edges, args=(pin,))
+                   for pin in pins]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = self.activity.stats
+        self.assertEqual(stats["edges"], 1600)
+        self.assertEqual(stats["activities"], 800)
+        self.assertEqual(stats["db_writes"], 800)
+        self.assertEqual(self.mock_db.query.call_count, 800)
+
+    def test_cleanup_stops_fault_check(self):
+        """The fault check job is cancelled with the activity inputs."""
+        self.assertIn(FAULT_CHECK_JOB, TaskScheduler().stats)
+        self.activity.cleanup()
+        self.assertNotIn(FAULT_CHECK_JOB, TaskScheduler().stats)
+
+    def test_released_pin_not_detected(self):
+        """Pins removed on reload stop counting as activity."""
+        self.activity._on_edge(self.test_pin, 1, self.tick)
+        self.assertTrue(self.activity.activity_detected())
+        self.activity._pins = {}
+        self.activity._run_fault_check_cycle()
+        self.assertFalse(self.activity.activity_detected())
+
+
 if __name__ == '__main__':
     """Verbosity:
 
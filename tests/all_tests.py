@@ -26,12 +26,26 @@ test_env = {
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 test_files = [
+    "tests/activity_source_test.py",
     "tests/activity_test.py",
+    "tests/benchmark_test.py",
+    "tests/config_test.py",
+    "tests/fallback_test.py",
+    "tests/features_test.py",
+    "tests/fix_scheduler_test.py",
     "tests/geocode_test.py",
     "tests/gps_test.py",
     "tests/helio_test.py",
+    "tests/import_test.py",
     "tests/persist_test.py",
+    "tests/profiler_test.py",
+    "tests/replay_test.py",
     "tests/schedule_test.py",
+    "tests/startup_test.py",
+    "tests/tasks_test.py",
+    "tests/timezones_test.py",
+    "tests/training_matrix_test.py",
+    "tests/tuning_test.py",
     "tests/usb_test.py",
 ]
 
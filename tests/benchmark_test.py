@@ -0,0 +1,172 @@
+"""tests.benchmark_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Feature set benchmark unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import json
+import tempfile
+import datetime as dt
+import numpy as np
+import pandas as pd
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+from scheduler import benchmark
+from scheduler.feature_sets import FeatureSet, FeatureSetManager
+
+
+def make_feature_frame(days=6, interval_minutes=60):
+    """Prepared data where activity happens every evening 18:00-21:00."""
+    rng = np.random.default_rng(3)
+    start = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    ts = pd.date_range(start, periods=days * 1440 // interval_minutes,
+                       freq=f"{interval_minutes}min")
+    df = pd.DataFrame({"timestamp": ts})
+    df["date"] = df["timestamp"].dt.date
+    hours = df["timestamp"].dt.hour
+    df["activity_pin"] = ((hours >= 18) & (hours < 21)).astype(int)
+    for col in FeatureSetManager.get_columns(FeatureSet.FULL_FEATURES):
+        df[col] = rng.random(len(df))
+    df["hour_sin"] = np.sin(2 * np.pi * hours / 24)
+    df["hour_cos"] = np.cos(2 * np.pi * hours / 24)
+    df["interval_number"] = hours
+    return df
+
+
+def make_schedules(days=()):
+    """Schedule accuracy rows, interval 18 was right on the given days."""
+    return pd.DataFrame({
+        "date": list(days), "interval_number": [18] * len(days),
+        "was_correct": [True] * len(days),
+        "false_positive": [0] * len(days), "false_negative": [0] * len(days),
+        "confidence": [0.9] * len(days)},
+        columns=benchmark.SCHEDULE_COLUMNS)
+
+
+class TestFeatureSetBenchmark(unittest.TestCase):
+    """Test replay benchmarking of feature sets."""
+
+    PARAMS = {'objective': 'binary', 'verbose': -1, 'min_data_in_leaf': 2}
+
+    def test_report_covers_every_feature_set(self):
+        """Each feature set is scored on every replayed day."""
+        df = make_feature_frame()
+        bench = benchmark.FeatureSetBenchmark(
+            df, self.PARAMS, interval_minutes=60, boost_rounds=20,
+            threshold=0.5, on_boost=None)
+        report = bench.run(replay_days=3)
+
+        self.assertEqual(len(report["replay_days"]), 3)
+        self.assertEqual(set(report["feature_sets"]),
+                         {fs.name for fs in benchmark.BENCHMARK_SETS})
+        minimal = report["feature_sets"]["MINIMAL"]
+        self.assertEqual(minimal["days_scored"], 3)
+        self.assertEqual(minimal["tp"] + minimal["fp"] + minimal["fn"]
+                         + minimal["tn"], 3 * 24)
+        # Hour encoding alone is enough to learn the evening pattern
+        self.assertEqual(minimal["precision"], 1.0)
+        self.assertEqual(minimal["recall"], 1.0)
+        self.assertEqual(minimal["on_minutes_per_day"], 180)
+        self.assertGreater(minimal["train_seconds_mean"], 0)
+        # Feature build time is only known for frames prepared from the DB
+        self.assertIsNone(minimal["build_seconds"])
+        json.dumps(report)  # Must be machine readable
+
+    def test_replay_dates_need_history(self):
+        """The first day is never replayed, there is nothing to train on."""
+        df = make_feature_frame(days=3)
+        bench = benchmark.FeatureSetBenchmark(df, self.PARAMS, 60)
+        self.assertEqual(bench.replay_dates(10),
+                         [dt.date(2025, 1, 2), dt.date(2025, 1, 3)])
+
+    def test_prepared_data_cache(self):
+        """Cached prepared data is reused until the key changes."""
+        df = make_feature_frame(days=2)
+        model = MagicMock()
+        model.interval_minutes = 60
+        model._prepare_training_data.return_value = (df, make_schedules())
+        model.features._create_base_features.side_effect = lambda d: d
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = os.path.join(tmp, "prepared.pkl")
+            first, first_schedules = benchmark.prepare_feature_frame(
+                model, 2, cache)
+            second, second_schedules = benchmark.prepare_feature_frame(
+                model, 2, cache)
+            self.assertEqual(model._prepare_training_data.call_count, 1)
+            pd.testing.assert_frame_equal(first, second)
+            pd.testing.assert_frame_equal(first_schedules, second_schedules)
+
+            benchmark.prepare_feature_frame(model, 5, cache)
+            self.assertEqual(model._prepare_training_data.call_count, 2)
+
+    def test_feature_build_timed(self):
+        """Each feature set's features are built and timed for the report."""
+        df = make_feature_frame(days=3)
+        model = MagicMock()
+        model.interval_minutes = 60
+        model._prepare_training_data.return_value = (df, make_schedules())
+        model.features._create_base_features.side_effect = lambda d: d
+
+        prepared, _ = benchmark.prepare_feature_frame(model, 3)
+        built = [call.args[0] for call in
+                 model.features.set_feature_set.call_args_list]
+        for feature_set in benchmark.BENCHMARK_SETS:
+            self.assertIn(feature_set, built)
+        self.assertEqual(set(prepared.attrs["build_seconds"]),
+                         {fs.name for fs in benchmark.BENCHMARK_SETS})
+
+        bench = benchmark.FeatureSetBenchmark(
+            prepared, self.PARAMS, interval_minutes=60, boost_rounds=5,
+            threshold=0.5, on_boost=None)
+        report = bench.run(replay_days=1)
+        for name, result in report["feature_sets"].items():
+            self.assertEqual(result["build_seconds"],
+                             prepared.attrs["build_seconds"][name])
+
+    def test_history_only_before_replayed_day(self):
+        """A replayed day's schedule outcomes never reach its features."""
+        df = make_feature_frame(days=3)
+        days = sorted(set(df["date"]))
+        bench = benchmark.FeatureSetBenchmark(
+            df, self.PARAMS, interval_minutes=60,
+            schedules=make_schedules(days[:2]))
+        evening = (df["interval_number"] == 18).to_numpy()
+
+        history = bench._history_features(days[1])
+        accuracy = history["historical_accuracy"]
+        np.testing.assert_array_equal(accuracy[evening], 1.0)
+        np.testing.assert_array_equal(accuracy[~evening], 0.5)
+        np.testing.assert_array_equal(
+            history["historical_confidence"][evening], np.float32(0.9))
+
+        # Nothing is known before the first day
+        history = bench._history_features(days[0])
+        np.testing.assert_array_equal(history["historical_accuracy"], 0.5)
+        np.testing.assert_array_equal(
+            history["historical_false_positives"], 0)
+
+        report = bench.run(replay_days=2,
+                           feature_sets=(FeatureSet.NO_ROLLING,))
+        self.assertTrue(report["history_before_day"])
+        self.assertEqual(report["feature_sets"]["NO_ROLLING"]["days_scored"],
+                         2)
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
@@ -0,0 +1,277 @@
+"""tests.config_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Configuration schema, reload and snapshot unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import shutil
+import configparser
+import logging
+import tempfile
+import timeit
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+from lightlib.config import ConfigLoader, ConfigSchema, ConfigSnapshot
+from shelterGPS.common import SolarEvent
+
+
+class ConfigFileTestCase(unittest.TestCase):
+    """Give each test its own ConfigLoader on a copy of config.ini."""
+
+    def setUp(self):
+        """Copy config.ini and load it into a fresh singleton."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "config.ini")
+        shutil.copy(os.path.join(base_path, "config.ini"), self.path)
+        self._saved = ConfigLoader._instance
+        ConfigLoader._instance = None
+        self.config = ConfigLoader(self.path)
+
+    def tearDown(self):
+        """Restore the shared singleton."""
+        ConfigLoader._instance = self._saved
+        self.tmp.cleanup()
+
+    def set_option(self, section, option, value):
+        """Rewrite one option in the copied config file."""
+        with open(self.path) as f:
+            lines = f.readlines()
+        in_section = False
+        for i, line in enumerate(lines):
+            if line.strip().startswith("["):
+                in_section = line.strip() == f"[{section}]"
+            elif in_section and line.split("=")[0].strip() == option:
+                lines[i] = f"{option} = {value}\n"
+                break
+        else:
+            raise AssertionError(f"{section}.{option} not in config.ini")
+        with open(self.path, "w") as f:
+            f.writelines(lines)
+
+
+class TestConfigSchema(ConfigFileTestCase):
+    """Test compiling config files against the schema."""
+
+    def test_all_problems_reported(self):
+        """Every error and warning is collected in one report."""
+        self.set_option("IO", "fault_output", 22)
+        self.set_option("IO", "crit_fault_out", 22)
+        self.set_option("GPS", "baudrate", "fast")
+        with open(self.path) as f:
+            text = f.read().replace("[FALLBACK]", "[NOT_FALLBACK]")
+        with open(self.path, "w") as f:
+            f.write(text)
+
+        compiled = self.config.compile_file(self.path)
+        self.assertFalse(compiled.valid)
+        self.assertEqual(len(compiled.errors), 3)
+        self.assertIn("required section is missing: [FALLBACK]",
+                      compiled.errors)
+        self.assertEqual(len(compiled.warnings), 1)
+        self.assertEqual(compiled["GPS", "baudrate"], 9600)
+        with self.assertLogs(level="ERROR") as logs:
+            compiled.log_report()
+        self.assertEqual(len(logs.records), 1)
+        self.assertFalse(self.config.validate_config_file(self.path))
+        self.assertFalse(self.config.compile_file(self.path + ".x").valid)
+
+    def test_typed_values(self):
+        """Values are converted once and read back with their types."""
+        compiled = self.config.compile_file(self.path)
+        self.assertTrue(compiled.valid)
+        self.assertIs(self.config.boost_enable, True)
+        self.assertIsInstance(self.config.heartbeat_interval, int)
+        self.assertEqual(self.config.activity_digital_inputs,
+                         compiled["IO", "activity_digital_inputs"])
+        # Lists handed out can't change the compiled value
+        self.config.activity_digital_inputs.append(99)
+        self.assertNotIn(99, self.config.activity_digital_inputs)
+
+    def test_get_config_value_uses_given_config(self):
+        """Other configs are converted, not read from the one in use."""
+        other = configparser.ConfigParser()
+        other.read_dict({"GPS": {"baudrate": "4800"}})
+        self.assertEqual(self.config.get_config_value(other, "GPS",
+                                                      "baudrate"), 4800)
+        self.assertEqual(self.config.get_config_value(other, "GPS",
+                                                      "timeout"), 0.5)
+        self.assertNotEqual(self.config.gps_baudrate, 4800)
+
+    def test_invalid_file_uses_typed_defaults(self):
+        """An invalid file loads the defaults with their types."""
+        with open(self.path, "w") as f:
+            f.write("[GENERAL]\nlog_level = DEBUG\n")
+        ConfigLoader._instance = None
+        config = ConfigLoader(self.path)
+        self.assertFalse(config.valid_config)
+        self.assertEqual(config.log_level, "INFO")
+        self.assertEqual(config.model_file, "light_model.txt")
+        self.assertEqual(config.lights_output, [16])
+
+    def test_reload_compiled(self):
+        """A compiled config is applied without reading the file again."""
+        self.set_option("MODEL", "num_boost_rounds", 321)
+        compiled = self.config.compile_file(self.path)
+        self.set_option("MODEL", "num_boost_rounds", 123)
+        self.assertEqual(self.config.reload(compiled),
+                         {"MODEL": {"num_boost_rounds"}})
+        self.assertEqual(self.config.model_boost_rounds, 321)
+
+    def test_spec_errors(self):
+        """Mistakes in the spec are found when it is compiled."""
+        with self.assertRaises(ValueError):
+            ConfigSchema({"GENERAL": {"cycle_time": {
+                "value": 300, "type": int, "Accepts_list": False}}})
+        with self.assertRaises(ValueError):
+            ConfigSchema({"GENERAL": {"cycle_time": {
+                "value": "soon", "type": int}}})
+
+
+class TestConfigReload(ConfigFileTestCase):
+    """Test the config diff and change subscriptions."""
+
+    def test_no_changes(self):
+        """Reloading an unchanged file reports nothing."""
+        callback = MagicMock()
+        self.config.subscribe(callback)
+        self.assertEqual(self.config.reload(), {})
+        callback.assert_not_called()
+
+    def test_only_affected_subscribers(self):
+        """Subscribers are called only for the sections they asked for."""
+        model, io, everything = MagicMock(), MagicMock(), MagicMock()
+        self.config.subscribe(model, sections=("MODEL",))
+        self.config.subscribe(model, sections=("MODEL",))
+        self.config.subscribe(io, sections=("IO",))
+        self.config.subscribe(everything)
+        self.set_option("MODEL", "num_boost_rounds", 321)
+
+        changes = self.config.reload()
+        self.assertEqual(changes, {"MODEL": {"num_boost_rounds"}})
+        self.assertEqual(self.config.model_boost_rounds, 321)
+        model.assert_called_once_with(changes)
+        everything.assert_called_once_with(changes)
+        io.assert_not_called()
+
+        self.config.unsubscribe(model)
+        self.set_option("MODEL", "num_boost_rounds", 123)
+        self.config.reload()
+        self.assertEqual(model.call_count, 1)
+
+    def test_restart_needed(self):
+        """Sections nobody handles need a restart and aren't notified."""
+        model = MagicMock()
+        self.config.subscribe(model, sections=("MODEL",))
+        self.set_option("MODEL", "num_boost_rounds", 321)
+        self.set_option("GPS", "baudrate", 4800)
+
+        changes = self.config.reload()
+        self.assertEqual(set(changes), {"MODEL", "GPS"})
+        self.assertTrue(self.config.needs_restart(changes))
+        self.assertFalse(self.config.needs_restart(
+            {"FALLBACK": {"action"}, "MODEL": {"feature_set"}}))
+        model.assert_not_called()
+
+    def test_failing_handler_and_invalid_file(self):
+        """A failing handler doesn't stop the others, bad files are kept."""
+        broken = MagicMock(side_effect=RuntimeError("boom"))
+        working = MagicMock()
+        self.config.subscribe(broken, sections=("MODEL",))
+        self.config.subscribe(working, sections=("MODEL",))
+        self.set_option("MODEL", "num_boost_rounds", 321)
+        self.config.reload()
+        working.assert_called_once()
+
+        with open(self.path, "w") as f:
+            f.write("[GENERAL]\nlog_level = DEBUG\n")
+        self.assertIsNone(self.config.reload())
+        self.assertEqual(self.config.model_boost_rounds, 321)
+
+
+class TestConfigSnapshot(ConfigFileTestCase):
+    """Test the typed read only config snapshot."""
+
+    def test_snapshot_matches_properties(self):
+        """Every property is in the snapshot with its converted value."""
+        snapshot = self.config.snapshot
+        self.assertIsInstance(snapshot, ConfigSnapshot)
+        self.assertEqual(snapshot.model_boost_rounds,
+                         self.config.model_boost_rounds)
+        self.assertIsInstance(snapshot.darkness_start, SolarEvent)
+        self.assertIsInstance(snapshot.activity_digital_inputs, tuple)
+        self.assertEqual(list(snapshot.activity_digital_inputs),
+                         list(self.config.activity_digital_inputs))
+        self.assertEqual(len(snapshot.as_dict()),
+                         len(ConfigSnapshot.__slots__))
+
+    def test_snapshot_is_read_only(self):
+        """Snapshot attributes can't be set, added or deleted."""
+        snapshot = self.config.snapshot
+        with self.assertRaises(AttributeError):
+            snapshot.cycle_time = 1
+        with self.assertRaises(AttributeError):
+            snapshot.new_option = 1
+        with self.assertRaises(AttributeError):
+            del snapshot.cycle_time
+        self.assertFalse(hasattr(snapshot, "__dict__"))
+
+    def test_snapshot_swapped_on_reload(self):
+        """A reload replaces the snapshot, held references are unchanged."""
+        held = self.config.snapshot
+        self.set_option("IO", "min_detect_on_dur", 123)
+        self.config.reload()
+        self.assertIsNot(self.config.snapshot, held)
+        self.assertEqual(self.config.snapshot.min_activity_on, 123)
+        self.assertNotEqual(held.min_activity_on, 123)
+
+        # An invalid file keeps the current snapshot
+        current = self.config.snapshot
+        with open(self.path, "w") as f:
+            f.write("[GENERAL]\nlog_level = DEBUG\n")
+        self.config.reload()
+        self.assertIs(self.config.snapshot, current)
+
+    def test_snapshot_read_overhead(self):
+        """Microbenchmark the per tick config reads of the light loop."""
+        config = self.config
+
+        def property_reads():
+            ConfigLoader().darkness_start
+            ConfigLoader().darkness_end
+            ConfigLoader().min_activity_on
+            ConfigLoader().activity_debounce_s
+
+        def snapshot_reads(snapshot=config.snapshot):
+            snapshot.darkness_start
+            snapshot.darkness_end
+            snapshot.min_activity_on
+            snapshot.activity_debounce_s
+
+        number = 2000
+        properties = min(timeit.repeat(property_reads, number=number,
+                                       repeat=3)) / number
+        snapshot = min(timeit.repeat(snapshot_reads, number=number,
+                                     repeat=3)) / number
+        logging.info("Config reads per tick: properties %.2fus, "
+                     "snapshot %.2fus (%.0fx)", properties * 1e6,
+                     snapshot * 1e6, properties / snapshot)
+        self.assertLess(snapshot * 5, properties)
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
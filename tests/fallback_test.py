@@ -0,0 +1,203 @@
+"""tests.fallback_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Fallback schedule unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import tempfile
+import datetime as dt
+import pytz
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+from scheduler import fallback as fb
+from lightlib.config import ConfigLoader
+
+LONDON = pytz.timezone("Europe/London")
+
+
+class TestCompiledFallback(unittest.TestCase):
+    """Test compiling the fallback CSV into weekday masks."""
+
+    def setUp(self):
+        """Write a fallback file into a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "fallback.csv")
+        self._write("day,\ton_time,    duration\n"
+                    "ANY,    01:30,      01:00\n"
+                    "Saturday, 23:30,    01:00\n"
+                    "Funday, 10:00,      01:00\n"
+                    "ANY,    bad,        01:00\n")
+        fb.invalidate_fallback_cache()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+        fb.invalidate_fallback_cache()
+
+    def _write(self, text):
+        with open(self.path, "w") as f:
+            f.write(text)
+
+    def _on(self, mask):
+        return [int(i) for i in mask.nonzero()[0]]
+
+    def test_compile_skips_invalid_rows(self):
+        """Valid rows become weekday masks, invalid rows are ignored."""
+        compiled = fb.CompiledFallback.from_file(self.path)
+        self.assertEqual(compiled.runs[0], [(90, 60)])
+        # Saturday's late block spills into the next day's minutes
+        self.assertEqual(compiled.runs[5], [(90, 60), (1410, 60)])
+        self.assertTrue(all(compiled.has_entries(d) for d in range(7)))
+
+    def test_utc_conversion_is_dst_correct(self):
+        """The same local block moves in UTC across the DST change."""
+        compiled = fb.load_compiled_fallback(self.path)
+        # Friday 28 March 2025 is GMT, 01:30 local is 01:30 UTC
+        self.assertEqual(self._on(compiled.interval_mask(
+            dt.date(2025, 3, 28), LONDON, 10)), list(range(9, 15)))
+        # Monday 31 March 2025 is BST, 01:30 local is 00:30 UTC
+        self.assertEqual(self._on(compiled.interval_mask(
+            dt.date(2025, 3, 31), LONDON, 10)), list(range(3, 9)))
+
+    def test_blocks_crossing_utc_midnight(self):
+        """Blocks from the neighbouring local days land in the UTC day."""
+        compiled = fb.load_compiled_fallback(self.path)
+        # Saturday 5 July (BST) 23:30 local = 22:30 UTC until 23:30 UTC
+        on = self._on(compiled.interval_mask(dt.date(2025, 7, 5), LONDON,
+                                             10))
+        self.assertEqual(on, list(range(3, 9)) + list(range(135, 141)))
+        # Unaligned interval sizes mark every interval touched
+        on = self._on(compiled.interval_mask(dt.date(2025, 1, 6), pytz.utc,
+                                             40))
+        self.assertEqual(on, [2, 3])
+
+    def test_cache_reloads_on_change(self):
+        """The compiled file is reused until the file changes."""
+        first = fb.load_compiled_fallback(self.path)
+        self.assertIs(fb.load_compiled_fallback(self.path), first)
+        self._write("day,on_time,duration\nMonday,18:00,02:00\n")
+        os.utime(self.path, ns=(first.key[0] + 10 ** 9,
+                                first.key[0] + 10 ** 9))
+        second = fb.load_compiled_fallback(self.path)
+        self.assertIsNot(second, first)
+        self.assertFalse(second.has_entries(1))
+        fb.invalidate_fallback_cache()
+        self.assertIsNot(fb.load_compiled_fallback(self.path), second)
+        self.assertIsNone(fb.load_compiled_fallback(self.path + ".none"))
+
+    def test_generate_schedule(self):
+        """Fallback.generate_schedule builds the full day from the mask."""
+        with patch.object(fb, "PersistentData") as persist, \
+             patch.object(ConfigLoader, "fallback_schedule_file", self.path):
+            persist.return_value.local_timezone_zone = "Europe/London"
+            fallback = fb.Fallback()
+            fallback.set_config(interval_minutes=30)
+            schedule = fallback.generate_schedule(dt.date(2025, 1, 6))
+
+        self.assertEqual(len(schedule), 48)
+        self.assertEqual([i for i, e in schedule.items()
+                          if e["prediction"]], [3, 4])
+        self.assertEqual(schedule[3]["start"],
+                         dt.datetime(2025, 1, 6, 1, 30,
+                                     tzinfo=dt.timezone.utc))
+        self.assertEqual(schedule[47]["end"],
+                         dt.datetime(2025, 1, 7, tzinfo=dt.timezone.utc))
+
+
+class TestBestHistoric(unittest.TestCase):
+    """Test the stored function backed historic fallback."""
+
+    def _fallback(self, rows):
+        with patch.object(fb, "PersistentData") as persist:
+            persist.return_value.local_timezone_zone = "UTC"
+            fallback = fb.Fallback()
+        db = MagicMock()
+        cursor = db.conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = rows
+        fallback.set_config(db=db, interval_minutes=60)
+        return fallback, cursor
+
+    def test_winning_day_is_rebuilt(self):
+        """Only the winning day's rows are fetched and rebuilt."""
+        day = dt.date(2025, 1, 6)
+        fallback, cursor = self._fallback(
+            [(day, i, i in (18, 19), 0.92) for i in range(24)])
+        with patch.object(ConfigLoader, "fallback_history_days", 28):
+            schedule = fallback.best_historic_method(dt.date(2025, 1, 13))
+
+        sql, args = cursor.execute.call_args[0]
+        self.assertIn("get_best_historic_day", sql)
+        self.assertEqual(args, (dt.date(2025, 1, 13), 28))
+        self.assertEqual(len(schedule), 24)
+        self.assertEqual([i for i, e in schedule.items()
+                          if e["prediction"]], [18, 19])
+        self.assertEqual(schedule[18]["start"],
+                         dt.datetime(2025, 1, 6, 18, tzinfo=dt.timezone.utc))
+
+    def test_no_history(self):
+        """No matching day, or a failed query, gives no schedule."""
+        fallback, cursor = self._fallback([])
+        self.assertIsNone(fallback.best_historic_method(dt.date(2025, 1, 13)))
+        cursor.execute.side_effect = RuntimeError("no function")
+        self.assertIsNone(fallback.best_historic_method(dt.date(2025, 1, 13)))
+
+
+class TestBlend(unittest.TestCase):
+    """Test blending same-weekday activity into a schedule."""
+
+    def test_blend_probability(self):
+        """Recent weeks dominate and quiet days are missing data."""
+        target = dt.date(2025, 1, 27)
+        rows = [(dt.date(2025, 1, 20), 18, 3),
+                (dt.date(2025, 1, 20), 19, 1),
+                (dt.date(2025, 1, 13), 19, 2),
+                (dt.date(2025, 1, 6), 5, 1)]
+        probability = fb.blend_probability(rows, target, 60, 0.5)
+        self.assertEqual(len(probability), 24)
+        # Weights 1, 0.5 and 0.25 for the last three weeks
+        self.assertAlmostEqual(probability[18], 1 / 1.75)
+        self.assertAlmostEqual(probability[19], 1.5 / 1.75)
+        self.assertAlmostEqual(probability[5], 0.25 / 1.75)
+        self.assertEqual(probability[0], 0)
+        self.assertFalse(fb.blend_probability([], target, 60, 0.5).any())
+
+    def test_blend_method(self):
+        """The blended probability is thresholded into a full schedule."""
+        with patch.object(fb, "PersistentData") as persist:
+            persist.return_value.local_timezone_zone = "UTC"
+            fallback = fb.Fallback()
+        db = MagicMock()
+        cursor = db.conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(dt.date(2025, 1, 20), 18, 3),
+                                        (dt.date(2025, 1, 13), 5, 1)]
+        fallback.set_config(db=db, interval_minutes=60)
+        with patch.object(ConfigLoader, "fallback_blend_decay", 0.5), \
+             patch.object(ConfigLoader, "fallback_blend_threshold", 0.5):
+            schedule = fallback.blend_method(dt.date(2025, 1, 27))
+        self.assertIn("get_weekday_activity_rollup",
+                      cursor.execute.call_args[0][0])
+        self.assertEqual(len(schedule), 24)
+        self.assertEqual([i for i, e in schedule.items()
+                          if e["prediction"]], [18])
+
+        cursor.fetchall.return_value = []
+        self.assertIsNone(fallback.blend_method(dt.date(2025, 1, 27)))
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
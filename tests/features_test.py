@@ -0,0 +1,130 @@
+"""tests.features_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Feature registry and compiled feature plan unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import datetime as dt
+import pandas as pd
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+import scheduler.feature_sets as fset
+from scheduler.features import FeatureEngineer
+from scheduler.model import LightModel
+from lightlib.config import ConfigLoader
+
+
+class TestFeaturePlan(unittest.TestCase):
+    """Test feature validation and plan compilation."""
+
+    def test_every_feature_set_is_registered(self):
+        """All fixed feature set columns exist in the registry."""
+        for feature_set in (fset.FeatureSet.MINIMAL, fset.FeatureSet.DEFAULT,
+                            fset.FeatureSet.NO_ROLLING, fset.FeatureSet.COUNT,
+                            fset.FeatureSet.FULL_FEATURES):
+            cols = fset.FeatureSetManager.get_columns(feature_set)
+            self.assertEqual(fset.validate_features(cols), cols)
+
+    def test_unknown_feature_rejected(self):
+        """Unknown and empty feature lists raise InvalidFeatureError."""
+        with self.assertRaises(fset.InvalidFeatureError):
+            fset.validate_features(["hour_sin", "moon_phase"])
+        with self.assertRaises(fset.InvalidFeatureError):
+            fset.validate_features([" "])
+
+    def test_plan_resolves_dependencies(self):
+        """Groups pull in their dependencies but columns stay as asked."""
+        plan = fset.compile_feature_plan(["rolling_count_1d", "hour_sin",
+                                          "hour_sin"])
+        self.assertEqual(plan.columns, ("rolling_count_1d", "hour_sin"))
+        self.assertEqual(plan.groups,
+                         frozenset({"rolling_count", "interval", "hour"}))
+        self.assertFalse(plan.needs("rolling_activity"))
+
+    def test_plan_always_has_interval(self):
+        """interval is planned even when no requested feature needs it."""
+        plan = fset.compile_feature_plan(["hour_sin", "hour_cos"])
+        self.assertEqual(plan.groups, frozenset({"hour", "interval"}))
+        self.assertEqual(plan.columns, ("hour_sin", "hour_cos"))
+
+    def test_custom_feature_set_from_config(self):
+        """CUSTOM uses the validated config list, MINIMAL if invalid."""
+        with patch.object(ConfigLoader, "custom_features",
+                          ["month_sin", "month_cos"]):
+            self.assertEqual(
+                fset.FeatureSetManager.get_columns(fset.FeatureSet.CUSTOM),
+                ["month_sin", "month_cos"])
+        with patch.object(ConfigLoader, "custom_features", ["bogus"]):
+            self.assertEqual(
+                fset.FeatureSetManager.get_columns(fset.FeatureSet.CUSTOM),
+                fset.FeatureSetManager.get_columns(fset.FeatureSet.MINIMAL))
+
+
+class TestFeatureEngineerPlan(unittest.TestCase):
+    """Test the FeatureEngineer only computes planned features."""
+
+    def setUp(self):
+        """Feature engineer with a mocked DB and empty schedule cache."""
+        self.features = FeatureEngineer()
+        self.features.set_config(db=MagicMock(), interval_minutes=10,
+                                 schedule_cache={})
+        self.features._retrieve_past_activity = MagicMock(return_value=[1])
+        self.features._get_past_activity_count = MagicMock(return_value={})
+        self.ts = dt.datetime(2025, 3, 4, 18, 30, tzinfo=dt.timezone.utc)
+
+    def test_minimal_skips_db_lookups(self):
+        """A lean feature set never queries rolling activity."""
+        self.features.set_feature_set(fset.FeatureSet.MINIMAL)
+        values = self.features._generate_features_dict(self.ts)
+        self.assertEqual(list(values), fset.FeatureSetManager.get_columns(
+            fset.FeatureSet.MINIMAL))
+        self.assertEqual(values["interval_number"], 111)
+        self.features._retrieve_past_activity.assert_not_called()
+        self.features._get_past_activity_count.assert_not_called()
+
+    def test_full_features_computes_everything(self):
+        """FULL_FEATURES still generates every registered feature."""
+        self.features.set_feature_set(fset.FeatureSet.FULL_FEATURES)
+        values = self.features._generate_features_dict(self.ts)
+        self.assertEqual(set(values), set(fset.FEATURE_REGISTRY))
+        self.features._retrieve_past_activity.assert_called_once()
+        self.features._get_past_activity_count.assert_called_once()
+
+    def test_custom_without_interval_merges_accuracy(self):
+        """Training features for a CUSTOM list still merge accuracy."""
+        with patch.object(ConfigLoader, "custom_features",
+                          ["hour_sin", "hour_cos"]):
+            self.features.set_feature_set(fset.FeatureSet.CUSTOM)
+        self.assertEqual(list(self.features._generate_features_dict(self.ts)),
+                         ["hour_sin", "hour_cos"])
+        df = pd.DataFrame({"timestamp": [self.ts,
+                                         self.ts + dt.timedelta(minutes=10)]})
+        df = self.features._create_base_features(df)
+        self.assertEqual(list(df["interval_number"]), [111, 112])
+
+        schedules = pd.DataFrame({
+            "interval_number": [111, 111], "was_correct": [True, True],
+            "false_positive": [0, 1], "false_negative": [0, 0],
+            "confidence": [0.9, 0.7]})
+        df = LightModel()._add_schedule_accuracy_features(df, schedules)
+        self.assertEqual(list(df["historical_accuracy"]), [1.0, 0.5])
+        self.assertEqual(list(df["historical_false_positives"]), [1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
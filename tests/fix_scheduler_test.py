@@ -0,0 +1,142 @@
+"""tests.fix_scheduler_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Adaptive GPS fix scheduler unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import datetime as dt
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+from shelterGPS import fix_scheduler as fs
+from lightlib.config import ConfigLoader
+
+NOW = dt.datetime(2025, 6, 21, 9, 30, tzinfo=dt.timezone.utc)
+
+
+def at(hour, minute=0):
+    """Return NOW's date at hour:minute UTC."""
+    return NOW.replace(hour=hour, minute=minute)
+
+
+@patch.object(ConfigLoader, "gps_adaptive_fix_schedule", True)
+@patch.object(ConfigLoader, "gps_max_fix_time", 120.0)
+class TestFixScheduler(unittest.TestCase):
+    """Test planning fix attempts from the attempt history."""
+
+    def setUp(self):
+        """Serve the attempt history from a dict."""
+        self.history = {}
+        patcher = patch.object(fs, "PersistentData")
+        persist = patcher.start()
+        self.addCleanup(patcher.stop)
+        type(persist.return_value).fix_attempts = property(
+            lambda _: self.history)
+        self.record = persist.return_value.record_fix_attempt
+        self.scheduler = fs.FixScheduler()
+
+    def test_expected_cost(self):
+        """Slow fixes and long failures are cut off at the budget."""
+        attempts = [(True, 20.0, 120.0)] * 4 + [(True, 100.0, 120.0),
+                                                 (False, 120.0, 120.0),
+                                                 (False, 30.0, 30.0)]
+        # 4 fixes in 6 relevant attempts, 80s fixing + 2 x 40s cut off
+        self.assertEqual(fs.expected_cost(attempts, 40.0), (40.0, 4 / 6))
+        # The short failure counts once the budget is within it
+        cost, rate = fs.expected_cost(attempts, 30.0)
+        self.assertEqual(rate, 4 / 7)
+        self.assertIsNone(fs.expected_cost(attempts[:4], 40.0))
+        self.assertIsNone(fs.expected_cost([(False, 120.0, 120.0)] * 5, 60))
+
+    def test_best_budget(self):
+        """A short budget wins when slow fixes are rare."""
+        attempts = [(True, 30.0, 120.0)] * 9 + [(True, 110.0, 120.0)]
+        budget, cost, rate = self.scheduler.best_budget(attempts, 120.0)
+        self.assertEqual(budget, 36.0)
+        self.assertEqual(cost, 34.0)
+        self.assertEqual(rate, 0.9)
+        # Mostly slow fixes need the full budget
+        attempts = [(True, 30.0, 120.0)] + [(True, 110.0, 120.0)] * 9
+        self.assertEqual(self.scheduler.best_budget(attempts, 120.0)[0],
+                         120.0)
+
+    def test_no_history(self):
+        """Without enough history the attempt starts now in full."""
+        self.history[10] = [(True, 20.0, 120.0)] * 4
+        plan = self.scheduler.plan(NOW, at(9), at(18))
+        self.assertEqual((plan.start, plan.budget), (NOW, 120.0))
+        self.assertIsNone(plan.expected_cost)
+        self.assertEqual(self.scheduler.last_plan, plan)
+
+    def test_cheapest_hour(self):
+        """The attempt waits for the hour that fixes fastest."""
+        self.history[10] = [(True, 100.0, 120.0)] * 5
+        self.history[12] = [(True, 20.0, 120.0)] * 5
+        plan = self.scheduler.plan(NOW, at(9), at(14))
+        self.assertEqual(plan.start, at(12))
+        self.assertEqual(plan.budget, 24.0)
+        self.assertEqual(plan.expected_cost, 20.0)
+        self.assertEqual(plan.success_rate, 1.0)
+
+        # The window has passed the best hour, the pooled history is used
+        plan = self.scheduler.plan(at(13, 10), at(9), at(14))
+        self.assertEqual((plan.start, plan.budget), (at(13, 10), 24.0))
+        self.assertIn("pooled", plan.reason)
+
+        # An earlier hour within the tolerance of the best is preferred
+        self.history[11] = [(True, 21.0, 120.0)] * 5
+        self.assertEqual(self.scheduler.plan(NOW, at(9), at(14)).start,
+                         at(11))
+
+    def test_escalate_after_failure(self):
+        """A failed attempt is recorded and retried with the full budget."""
+        self.history[12] = [(True, 20.0, 120.0)] * 5
+        self.scheduler.record(at(12, 5), 24.0, False, 26.0)
+        self.record.assert_called_once_with(12, False, 26.0, 24.0)
+        plan = self.scheduler.plan(at(12, 20), at(9), at(14))
+        self.assertEqual((plan.start, plan.budget), (at(12, 20), 120.0))
+
+        self.scheduler.record(at(12, 30), 120.0, True, 40.0)
+        self.assertEqual(self.scheduler.plan(at(12, 40)).budget, 24.0)
+
+    def test_disabled(self):
+        """With adaptive scheduling off every attempt is now and in full."""
+        self.history[12] = [(True, 20.0, 120.0)] * 5
+        with patch.object(ConfigLoader, "gps_adaptive_fix_schedule", False):
+            plan = self.scheduler.plan(NOW, at(9), at(14))
+        self.assertEqual((plan.start, plan.budget), (NOW, 120.0))
+
+    def test_metrics(self):
+        """Metrics report outcomes, the last plan and hourly history."""
+        self.history[12] = [(True, 20.0, 120.0), (True, 40.0, 120.0),
+                            (False, 120.0, 120.0)]
+        self.assertIsNone(self.scheduler.metrics["plan"])
+        self.scheduler.plan(NOW, at(9), at(14))
+        self.scheduler.record(NOW, 120.0, False, 121.0)
+        self.scheduler.record(NOW, 120.0, True, 35.0)
+        metrics = self.scheduler.metrics
+        self.assertEqual(metrics["attempts"], 2)
+        self.assertEqual(metrics["fixes"], 1)
+        self.assertEqual(metrics["powered_seconds_per_fix"], 156.0)
+        self.assertEqual(metrics["plan"]["start"], NOW.isoformat())
+        self.assertEqual(metrics["hours"][12],
+                         {"attempts": 3, "success_rate": 2 / 3,
+                          "median_time_to_fix": 30.0})
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
@@ -8,6 +8,10 @@ import unittest
 import logging
 import os
 import sys
+import math
+import random
+import sqlite3
+import tempfile
 from unittest.mock import patch
 import pytz
 import util
@@ -17,9 +21,32 @@ sys.path.append(base_path)
 
 
 
-from geocode.local import Location, InvalidLocationError
+from geocode.local import Location, InvalidLocationError, GeocodeStore
+from geocode import local
+from geocode.common import place_key, edit_distance, closest_key
+from geocode.compact import CompactGeocode, build_compact
+from geocode.spatial import NearestIndex, chord_to_km, unit_vector
+from geocode import create
 from lightlib.config import ConfigLoader
 
+# (name, lat, lng, country, timezone)
+PLACES = [("London", 51.50853, -0.12574, "GB", "Europe/London"),
+          ("Saint-Étienne", 45.43389, 4.39, "FR", "Europe/Paris"),
+          ("Paris", 48.85341, 2.3488, "FR", "Europe/Paris"),
+          ("Suva", -18.14161, 178.44149, "FJ", "Pacific/Fiji"),
+          ("Apia", -13.83333, -171.76666, "WS", "Pacific/Apia"),
+          ("Longyearbyen", 78.2232, 15.6267, "SJ", "Arctic/Longyearbyen")]
+
+
+def write_geonames(path, places):
+    """Write places as a GeoNames cities TSV."""
+    with open(path, "w", encoding="utf-8") as f:
+        for i, (name, lat, lng, iso, tz) in enumerate(places):
+            row = [""] * 19
+            row[0], row[1], row[2] = str(i), name, name
+            row[4], row[5], row[8], row[17] = str(lat), str(lng), iso, tz
+            f.write("\t".join(row) + "\n")
+
 # Set up logging ONCE for the entire test module
 util.setup_test_logging()
 
@@ -77,6 +104,214 @@ class TestGeocode(unittest.TestCase):
         logging.debug("InvalidLocationError correctly raised.")
 
 
+class TestGeocodeStore(unittest.TestCase):
+    """Test lookups against a database built from GeoNames data."""
+
+    def setUp(self):
+        """Build a small geocode database."""
+        self.tmp = tempfile.TemporaryDirectory()
+        tsv = os.path.join(self.tmp.name, "cities.txt")
+        self.db = os.path.join(self.tmp.name, "geocode.db")
+        write_geonames(tsv, PLACES)
+        self.assertEqual(create.build(tsv, self.db), len(PLACES))
+        self.store = GeocodeStore(self.db)
+
+    def tearDown(self):
+        """Remove the database."""
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_place_key(self):
+        """Accents, case and separators do not change the key."""
+        self.assertEqual(place_key("Saint-Étienne"), "saint etienne")
+        self.assertEqual(place_key("  SAINT  etienne "), "saint etienne")
+
+    def test_find(self):
+        """Places are found on their normalised key through the index."""
+        place = self.store.find("fr", "saint etienne")
+        self.assertEqual(place.name, "Saint-Étienne")
+        self.assertEqual((place.lat, place.timezone),
+                         (45.43389, "Europe/Paris"))
+        self.assertIsNone(self.store.find("GB", "Paris"))
+        # Repeated lookups are answered without a query
+        with patch.object(self.store, "_conn") as conn:
+            self.assertIs(self.store.find("FR", "Saint Etienne"), place)
+            conn.execute.assert_not_called()
+
+        plan = self.store._connect().execute(
+            "EXPLAIN QUERY PLAN SELECT Place_Name, ISO_Country, Lat, Lng, "
+            "Timezone FROM geocode_data WHERE ISO_Country = ? AND "
+            "Place_Key = ?", ("FR", "paris")).fetchall()
+        self.assertIn("COVERING INDEX geocode_key_idx", plan[0][-1])
+
+    def test_legacy_database(self):
+        """Databases without Place_Key match names ignoring case."""
+        legacy = os.path.join(self.tmp.name, "legacy.db")
+        with sqlite3.connect(legacy) as conn:
+            conn.execute("CREATE TABLE geocode_data (Place_Name TEXT, "
+                         "Lat REAL, Lng REAL, ISO_Country TEXT, "
+                         "Timezone TEXT)")
+            conn.execute("INSERT INTO geocode_data VALUES "
+                         "('London', 51.5, -0.1, 'GB', 'Europe/London')")
+        store = GeocodeStore(legacy)
+        self.assertEqual(store.find("GB", "LONDON").lat, 51.5)
+        store.close()
+
+    def test_nearest(self):
+        """The nearest place is found, across the date line too."""
+        place, km = self.store.nearest(51.45, -0.97)  # Reading
+        self.assertEqual(place.name, "London")
+        self.assertAlmostEqual(km, 59.5, delta=1)
+        # Suva is nearer than Apia from just east of the date line
+        self.assertEqual(self.store.nearest(-17.0, -179.9)[0].name, "Suva")
+        self.assertEqual(self.store.nearest(89.0, -120.0)[0].name,
+                         "Longyearbyen")
+
+    def test_location(self):
+        """Location resolves the config place through the store."""
+        with patch.object(ConfigLoader, "ISO_country2", "FR"), \
+                patch.object(ConfigLoader, "place_name", "saint-etienne"), \
+                patch.object(local, "open_geocode",
+                             return_value=self.store):
+            location = Location()
+        self.assertEqual(location.latitude, 45.43389)
+        self.assertEqual(location.timezone, pytz.timezone("Europe/Paris"))
+        # A misspelt place resolves to the closest match
+        with patch.object(ConfigLoader, "ISO_country2", "GB"), \
+                patch.object(ConfigLoader, "place_name", "Lodnon"), \
+                patch.object(local, "open_geocode",
+                             return_value=self.store):
+            self.assertEqual(Location().place, "London")
+        with patch.object(ConfigLoader, "ISO_country2", "FR"), \
+                patch.object(ConfigLoader, "place_name", "Nowhere"), \
+                patch.object(local, "open_geocode",
+                             return_value=self.store):
+            with self.assertRaises(InvalidLocationError):
+                Location()
+
+    def test_prefix_and_fuzzy(self):
+        """Prefixes and misspellings are matched on the key index."""
+        self.assertEqual([p.name for p in self.store.prefix("fr", "Sain")],
+                         ["Saint-Étienne"])
+        self.assertEqual(self.store.resolve("FR", "saint etien")[1],
+                         "prefix")
+        place, match = self.store.resolve("FR", "Parsi")
+        self.assertEqual((place.name, match), ("Paris", "fuzzy"))
+        self.assertIsNone(self.store.resolve("FR", "Lyon"))
+
+
+class TestCompactGeocode(unittest.TestCase):
+    """Test the compact memory mapped geocode file."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build a compact file in several sorted runs."""
+        cls.tmp = tempfile.TemporaryDirectory()
+        tsv = os.path.join(cls.tmp.name, "cities.txt")
+        cls.path = os.path.join(cls.tmp.name, "geocode.bin")
+        # The second London is dropped as the SQLite database drops it
+        write_geonames(tsv, PLACES + [
+            ("LONDON", 0.0, 0.0, "GB", "Europe/London"),
+            ("Paris", 33.66, -95.55, "US", "America/Chicago"),
+            ("Parisot", 44.26, 1.86, "FR", "Europe/Paris")])
+        with open(tsv, "a") as f:
+            f.write("malformed\tline\n")
+        cls.report = build_compact(tsv, cls.path, chunk_rows=3)
+        cls.geocode = CompactGeocode(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the file."""
+        cls.geocode.close()
+        cls.tmp.cleanup()
+
+    def test_build_report(self):
+        """The build reports its size and memory."""
+        self.assertEqual(self.report["places"], len(PLACES) + 2)
+        self.assertEqual(self.report["runs"], 3)
+        self.assertEqual(self.report["file_bytes"],
+                         os.path.getsize(self.path))
+        self.assertGreater(self.report["peak_memory_bytes"], 0)
+        self.assertEqual(len(self.geocode), len(PLACES) + 2)
+        with self.assertRaises(ValueError):
+            CompactGeocode(os.path.join(self.tmp.name, "cities.txt"))
+
+    def test_find(self):
+        """Places are found by country and normalised name."""
+        london = self.geocode.find("gb", "LONDON")
+        self.assertEqual((london.name, london.timezone),
+                         ("London", "Europe/London"))
+        self.assertAlmostEqual(london.lat, 51.50853, places=4)
+        self.assertEqual(self.geocode.find("US", "paris").timezone,
+                         "America/Chicago")
+        self.assertEqual(self.geocode.find("FR", "saint etienne").name,
+                         "Saint-Étienne")
+        self.assertIsNone(self.geocode.find("FR", "Lyon"))
+        self.assertIsNone(self.geocode.find("ZZ", "Paris"))
+
+    def test_prefix_and_fuzzy(self):
+        """Prefix and misspelt names resolve to a place."""
+        self.assertEqual([p.name for p in self.geocode.prefix("FR", "par")],
+                         ["Paris", "Parisot"])
+        self.assertEqual(self.geocode.prefix("FR", "par", limit=1)[0].name,
+                         "Paris")
+        self.assertEqual(self.geocode.resolve("FR", "Paris")[1], "exact")
+        self.assertEqual(self.geocode.resolve("FR", "Pariso")[1], "prefix")
+        place, match = self.geocode.resolve("GB", "Lodnon")
+        self.assertEqual((place.name, match), ("London", "fuzzy"))
+        self.assertIsNone(self.geocode.resolve("GB", "Manchester"))
+
+    def test_nearest(self):
+        """The nearest place is found from the file's coordinates."""
+        place, km = self.geocode.nearest(33.7, -95.5)
+        self.assertEqual((place.name, place.country), ("Paris", "US"))
+        self.assertLess(km, 10)
+
+    def test_preferred(self):
+        """The compact file is used in preference to SQLite."""
+        self.assertIsInstance(local.open_geocode(self.tmp.name),
+                              CompactGeocode)
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsInstance(local.open_geocode(tmp), GeocodeStore)
+
+
+class TestEditDistance(unittest.TestCase):
+    """Test fuzzy name matching."""
+
+    def test_edit_distance(self):
+        """Edits and adjacent swaps count once, far strings stop early."""
+        self.assertEqual(edit_distance("london", "london", 2), 0)
+        self.assertEqual(edit_distance("lodnon", "london", 2), 1)
+        self.assertEqual(edit_distance("londn", "london", 2), 1)
+        self.assertEqual(edit_distance("paris", "lyon", 2), 3)
+        self.assertEqual(edit_distance("a", "abcdef", 2), 3)
+        self.assertEqual(closest_key("brsitol", ["bath", "bristol"]),
+                         "bristol")
+        self.assertIsNone(closest_key("york", ["bath", "leeds"]))
+
+
+class TestNearestIndex(unittest.TestCase):
+    """Test the KD-tree against a brute force search."""
+
+    def test_matches_brute_force(self):
+        """Random queries find the same place as checking every one."""
+        rng = random.Random(5)
+        coords = [(math.degrees(math.asin(rng.uniform(-1, 1))),
+                   rng.uniform(-180, 180)) for _ in range(2000)]
+        index = NearestIndex(coords, range(100, 2100))
+        self.assertEqual(len(index), 2000)
+        for _ in range(200):
+            lat, lng = rng.uniform(-90, 90), rng.uniform(-180, 180)
+            q = unit_vector(lat, lng)
+            dists = [sum((a - b) ** 2 for a, b in zip(q, unit_vector(*c)))
+                     for c in coords]
+            best = min(range(len(coords)), key=dists.__getitem__)
+            found, km = index.nearest(lat, lng)
+            self.assertEqual(found, best + 100)
+            self.assertAlmostEqual(km, chord_to_km(dists[best]), places=6)
+        self.assertIsNone(NearestIndex([], []).nearest(0, 0))
+
+
 if __name__ == '__main__':
     """Verbosity:
 
@@ -15,6 +15,8 @@ import gps_test_vals as test_vals
 import sys
 import os
 import logging
+import timeit
+import datetime as dt
 import util
 
 base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -26,11 +28,42 @@ if 'RPi' not in sys.modules:
 from shelterGPS.common import GPSInvalid, GPSOutOfBoundsError
 from shelterGPS.Position import GPS
 from shelterGPS.coord import Coordinate
+from shelterGPS.nmea import NMEAStreamParser, xor_checksum
+from lightlib.persist import PersistentData
 
 
 # Set up logging ONCE for the entire test module
 util.setup_test_logging()
 
+
+class FakeSerial:
+    """Serial port returning scripted bytes in chunks of up to `chunk`."""
+
+    def __init__(self, data: bytes, chunk: int = 64):
+        self._data = data
+        self._chunk = chunk
+        self.is_open = True
+
+    @property
+    def in_waiting(self) -> int:
+        return min(len(self._data), self._chunk)
+
+    def read(self, size: int = 1) -> bytes:
+        out, self._data = self._data[:size], self._data[size:]
+        return out
+
+    def close(self):
+        self.is_open = False
+
+
+def with_fraction(msg: str) -> bytes:
+    """Add hundredths to a sentence's UTC time, as real modules send."""
+    fields = msg[:msg.index("*")].split(",")
+    fields[1] += ".00"
+    body = ",".join(fields)[1:]
+    return b"$%s*%02X\r\n" % (body.encode(), xor_checksum(body.encode()))
+
+
 class TestGPS(unittest.TestCase):
     """Class for GPS testing."""
 
@@ -56,23 +89,19 @@ class TestGPS(unittest.TestCase):
         gps.pwr_off()
         mock_pwr_off.assert_called_once()
 
-    @patch('shelterGPS.Position.serial.Serial')
-    def test_coordinate_extraction(self, mock_serial):
+    def test_coordinate_extraction(self):
         """Testing coordinate extraction from NMEA messages."""
-        # Create a mock serial instance
-        mock_instance = mock_serial.return_value
-
-        # Initialize the GPS class and assign the mock serial instance
         gps = GPS()
-        gps._gps_ser = mock_instance  # Assign the mocked serial instance
-
-        # Iterate over each test case in test_data
         for tv in test_vals.valid_NMEA:
-            # Set the mock serial instance to return the NMEA sentence
-            mock_instance.readline.return_value = tv['msg'].encode()
+            if "GGA" not in tv['msg']:
+                continue
+            # Time verification needs a run of 10 GGA messages, surround
+            # them with noise and sentences of other types
+            sentence = with_fraction(tv['msg'])
+            gps._GPS__gps_ser = FakeSerial(
+                b"\x00garbage" + sentence * 5 +
+                b"$GPGSV,3,1,11,03,03,111,00*4A\r\n" + sentence * 5)
 
-            # Call the _get_coordinates method, which should read from the
-            # mocked serial
             gps._get_coordinates(fix_wait=5)
 
             # Check the extracted latitude, longitude, and altitude
@@ -131,19 +160,18 @@ class TestGPS(unittest.TestCase):
         logging.info("\t*** %s of %s invalid checksum tests passed",
                      pass_n, len(test_vals.valid_NMEA))
 
-    @patch('shelterGPS.Position.GPS._get_msg')
-    @patch('shelterGPS.Position.GPS._get_coordinates')
-    @patch('shelterGPS.Position.GPS._get_datetime')
-    def test_get_fix_success(self, mock_get_datetime,
-                             mock_get_coordinates, mock_get_msg):
+    @patch('shelterGPS.Position.GPS._sync_system_time')
+    @patch('shelterGPS.Position.GPS._acquire_fix')
+    def test_get_fix_success(self, mock_acquire_fix, mock_sync):
         """Test that `get_fix` calls required methods for a successful fix."""
         gps = GPS()
-        gps.get_fix()
-        mock_get_coordinates.assert_called_once()
-        mock_get_datetime.assert_called_once()
+        gps._GPS__gps_ser = FakeSerial(b"")
+        gps.get_fix(pwr_up_wait=0)
+        mock_acquire_fix.assert_called_once()
+        mock_sync.assert_called_once()
 
-    @patch('shelterGPS.Position.GPS._get_msg', side_effect=GPSInvalid)
-    def test_get_fix_failure(self, mock_get_msg):
+    @patch('shelterGPS.Position.GPS._acquire_fix', side_effect=GPSInvalid)
+    def test_get_fix_failure(self, mock_acquire_fix):
         """Test `get_fix` raises GPSInvalid if no valid fix is obtained."""
         gps = GPS()
         with self.assertRaises(GPSInvalid):
@@ -197,6 +225,150 @@ class TestGPS(unittest.TestCase):
             self.assertTrue(gps._validate_message_content(gps.message_type))
 
 
+@patch('shelterGPS.Position.GPS.pwr_on')
+@patch.object(PersistentData, 'record_fix_stages')
+class TestFixAcquisition(unittest.TestCase):
+    """Test collecting a fix from a replayed NMEA capture."""
+
+    def setUp(self):
+        """Reset the GPS singleton."""
+        GPS._instance = None
+
+    def _gps(self, capture: bytes) -> GPS:
+        gps = GPS()
+        gps._GPS__gps_ser = FakeSerial(capture, chunk=256)
+        return gps
+
+    def test_fix_across_midnight(self, record, pwr_on):
+        """Position, verified time and date come from one pass."""
+        expected = dt.datetime(2025, 6, 22, 0, 0, 9, tzinfo=dt.timezone.utc)
+        for rmc_first in (True, False):
+            with self.subTest(rmc_first=rmc_first), \
+                    patch.object(GPS, 'pwr_off') as pwr_off:
+                gps = self._gps(test_vals.nmea_capture(
+                    fix_after=3, seconds=30, rmc_first=rmc_first))
+                stages = gps._acquire_fix(max_time=5)
+
+                self.assertTrue(gps.position_established)
+                self.assertAlmostEqual(gps.latitude, 51.5)
+                self.assertAlmostEqual(gps.longitude, -0.1)
+                self.assertEqual(gps.altitude, 35.0)
+                # Ten GGAs in the same minute are needed, the first fixed
+                # minute ends after 7, the date is the day after the start
+                self.assertTrue(gps.datetime_established)
+                self.assertEqual(gps.datetime, expected)
+                pwr_off.assert_called_once()
+                self.assertEqual(list(stages), [
+                    "first_sentence", "position", "time_verified",
+                    "datetime", "fix"])
+                self.assertEqual(stages, dict(sorted(
+                    stages.items(), key=lambda item: item[1])))
+
+    def test_powered_off_before_sync(self, record, pwr_on):
+        """The module is off before the clock is set, stages are stored."""
+        gps = self._gps(test_vals.nmea_capture(fix_after=0, seconds=15))
+        calls = MagicMock()
+        with patch.object(GPS, 'pwr_off', calls.pwr_off), \
+                patch.object(GPS, '_sync_system_time', calls.sync):
+            gps.get_fix(pwr_up_wait=0, max_fix_time=5)
+        self.assertEqual([name for name, _, _ in calls.mock_calls],
+                         ["pwr_off", "pwr_off", "sync"])
+        record.assert_called_once()
+        self.assertIn("time_verified", record.call_args[0][0])
+
+    def test_no_fix(self, record, pwr_on):
+        """Without a fix in the time allowed GPSInvalid is raised."""
+        gps = self._gps(test_vals.nmea_capture(fix_after=60, seconds=20))
+        with patch.object(GPS, 'pwr_off'), \
+                self.assertRaises(GPSInvalid):
+            gps._acquire_fix(max_time=0.5)
+        self.assertFalse(gps.position_established)
+        self.assertFalse(gps.datetime_established)
+        record.assert_not_called()
+
+
+class TestNMEAStreamParser(unittest.TestCase):
+    """Test framing and checksum validation of the NMEA byte stream."""
+
+    def test_matches_line_decoding(self):
+        """Fields match those decoded line by line from the same data."""
+        gps = GPS()
+        stream = b"".join(tv['msg'].encode() + b"\r\n"
+                          for tv in test_vals.valid_NMEA)
+        parser = NMEAStreamParser()
+        # Feed in awkward chunk sizes so sentences span several reads
+        sentences = []
+        for i in range(0, len(stream), 7):
+            sentences.extend(parser.feed(stream[i:i + 7]))
+
+        self.assertEqual(len(sentences), len(test_vals.valid_NMEA))
+        for sentence, tv in zip(sentences, test_vals.valid_NMEA):
+            gps._decode_message(tv['msg'])
+            self.assertEqual(sentence.fields, gps._last_msg)
+            self.assertEqual(sentence.msg_type, tv['msg'][3:6])
+        self.assertEqual(parser.bad_checksum, 0)
+
+    def test_invalid_data_dropped(self):
+        """Bad checksums, cut short sentences and noise are dropped."""
+        msg = test_vals.valid_NMEA[0]['msg']
+        good = msg.encode() + b"\r\n"
+        # A valid sentence with a lower case checksum
+        lower = next(tv['msg'] for tv in test_vals.valid_NMEA
+                     if "*5B" in tv['msg']).replace("*5B", "*5b")
+        parser = NMEAStreamParser(("GGA",))
+        sentences = parser.feed(
+            b"noise" + msg[:-2].encode() + b"00\r\n" +     # bad checksum
+            b"$GPGGA,123519,4807.0380*Z7\r\n" +            # malformed
+            msg[:30].encode() + good +                     # cut short
+            lower.encode() + b"\r\n" +
+            b"$GPRMC,1,A*00\r\n" + good[:20])             # skipped, partial
+        self.assertEqual(len(sentences), 2)
+        self.assertEqual(parser.bad_checksum, 2)
+        self.assertEqual(parser.skipped, 1)
+        self.assertEqual(parser.discarded_bytes, len("noise") + 30)
+        # The partial sentence completes on the next read
+        self.assertEqual(len(parser.feed(good[20:])), 1)
+        # Noise without a line end doesn't grow the buffer
+        parser.feed(b"$" + b"x" * 500)
+        self.assertLessEqual(len(parser._buf),
+                             NMEAStreamParser.MAX_SENTENCE_LEN + 1)
+
+    def test_checksum(self):
+        """The byte checksum agrees with `GPS.nmea_checksum`."""
+        for tv in test_vals.valid_NMEA:
+            msg = tv['msg']
+            self.assertEqual(xor_checksum(msg[1:msg.index("*")].encode()),
+                             int(msg[-2:], 16))
+
+    def test_throughput(self):
+        """The stream parser is faster than per line checksum and split."""
+        gps = GPS()
+        # A typical one second burst, only GGA and RMC are of interest
+        burst = [test_vals.valid_NMEA[i]['msg'].encode() + b"\r\n"
+                 for i in (0, 15)]
+        burst += [b"$GPGSV,3,1,11,03,03,111,00,04,15,270,00,06,01,010,00,"
+                  b"13,06,292,00*74\r\n"] * 4
+        stream = b"".join(burst)
+        parser = NMEAStreamParser(
+            entry['MSG'] for entry in GPS.msg_validate)
+
+        def per_line():
+            for line in burst:
+                if gps._is_valid_message(line):
+                    gps._decode_message(line)
+
+        def streaming():
+            parser.feed(stream)
+
+        number = 2000
+        lines = min(timeit.repeat(per_line, number=number, repeat=3))
+        stream_t = min(timeit.repeat(streaming, number=number, repeat=3))
+        logging.info("\t*** %d sentences/s per line, %d sentences/s "
+                     "streaming", len(burst) * number / lines,
+                     len(burst) * number / stream_t)
+        self.assertLess(stream_t, lines)
+
+
 if __name__ == '__main__':
     """Verbosity:
 
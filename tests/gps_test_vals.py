@@ -15,6 +15,7 @@ import sys
 base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(base_path)
 from shelterGPS.common import GPSDir
+from shelterGPS.nmea import xor_checksum
 
 # Chat GPT used to generate test message.
 # GPT messages included incorrect checksums, validated at:
@@ -395,3 +396,43 @@ invalid_coordinates = [
     {"coord": "12.34.5678", "dir": GPSDir.South},  # Too many parts
     {"coord": "111111.5678", "dir": GPSDir.East},  # Longitude too long
 ]
+
+
+def _sentence(body: str) -> bytes:
+    """Frame an NMEA sentence body with its checksum."""
+    return b"$%s*%02X\r\n" % (body.encode(), xor_checksum(body.encode()))
+
+
+def nmea_capture(fix_after: int, seconds: int,
+                 start: dt.datetime = dt.datetime(2025, 6, 21, 23, 59, 50),
+                 rmc_first: bool = True) -> bytes:
+    """Output of a GPS module from power on, one burst of sentences a second.
+
+    The module has no fix for `fix_after` seconds (RMC status V, GGA quality
+    0), then a fix at 51.5N 0.1W, 35m.
+
+    Args
+    ----
+        fix_after (int): Seconds before the module has a fix.
+        seconds (int): Seconds of output.
+        start (datetime): UTC time of the first burst.
+        rmc_first (bool): Send the RMC before the GGA in each burst.
+    """
+    out = []
+    for second in range(seconds):
+        now = start + dt.timedelta(seconds=second)
+        utc = now.strftime("%H%M%S.00")
+        date = now.strftime("%d%m%y")
+        fixed = second >= fix_after
+        rmc = _sentence(f"GPRMC,{utc},{'A' if fixed else 'V'},5130.0000,N,"
+                        f"00006.0000,W,0.1,0.0,{date},,,A")
+        gga = _sentence(f"GPGGA,{utc},5130.0000,N,00006.0000,W,"
+                        f"{1 if fixed else 0},08,0.9,35.0,M,47.0,M,,")
+        burst = [rmc, _sentence("GPVTG,0.0,T,,M,0.1,N,0.2,K,A"), gga,
+                 _sentence("GPGSA,A,3,03,06,13,19,,,,,,,,,1.8,0.9,1.5")]
+        burst += [_sentence(f"GPGSV,3,{n},11,03,45,111,30,06,20,270,25")
+                  for n in (1, 2, 3)]
+        if not rmc_first:
+            burst[0], burst[2] = burst[2], burst[0]
+        out.extend(burst)
+    return b"".join(out)
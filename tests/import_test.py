@@ -0,0 +1,95 @@
+"""tests.import_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Cold start import time testing. Each check runs a fresh
+             interpreter with `-X importtime` and parses its report.
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+import os
+import sys
+import logging
+import subprocess
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+test_path = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must only load when they are first used
+HEAVY_MODULES = ("lightgbm", "pandas", "numpy", "sqlalchemy",
+                 "timezonefinder", "astral", "serial", "lgpio")
+
+
+def import_times(code: str) -> dict[str, int]:
+    """Run code in a fresh interpreter, return cumulative us per module."""
+    env = dict(os.environ,
+               PYTHONPATH=os.pathsep.join([base_path, test_path]))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=base_path, env=env, capture_output=True,
+                            text=True, timeout=300)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr[-2000:])
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def log_slowest(label: str, times: dict[str, int], count: int = 5) -> None:
+    """Log the total and slowest imports so changes show in the test log."""
+    slowest = sorted(times.items(), key=lambda item: -item[1])[:count]
+    logging.info("%s imports %d modules, slowest: %s", label, len(times),
+                 ", ".join(f"{name} {us / 1000:.1f}ms"
+                           for name, us in slowest))
+
+
+class TestImportTime(unittest.TestCase):
+    """Check heavy dependencies are not loaded at startup."""
+
+    def assertLight(self, times):
+        loaded = sorted({name.split(".")[0] for name in times}
+                        & set(HEAVY_MODULES))
+        self.assertEqual(loaded, [], f"Heavy modules imported: {loaded}")
+
+    def test_shelterlight_import(self):
+        """Importing the entry point loads no heavy modules."""
+        times = import_times("import shelterlight")
+        log_slowest("shelterlight", times)
+        self.assertIn("shelterlight", times)
+        self.assertLight(times)
+
+    def test_cli_help(self):
+        """--help parses the command line without the scheduler."""
+        times = import_times(
+            "import sys\n"
+            "sys.argv = ['shelterlight.py', '--help']\n"
+            "import shelterlight\n"
+            "try:\n"
+            "    shelterlight.cli.parse_args()\n"
+            "except SystemExit:\n"
+            "    pass\n")
+        log_slowest("--help", times)
+        self.assertLight(times)
+
+    def test_scheduler_import(self):
+        """The scheduler still brings in the model stack when it's used."""
+        times = import_times("import scheduler.Schedule")
+        log_slowest("scheduler.Schedule", times)
+        self.assertIn("lightgbm", times)
+        self.assertNotIn("sqlalchemy", times)
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
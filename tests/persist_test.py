@@ -10,10 +10,14 @@ Version: 0.1
 """
 
 import unittest
+from unittest.mock import patch
 import datetime as dt
 import sys
 import os
+import json
+import time
 import logging
+import tempfile
 import util
 
 # Set up logging ONCE for the entire test module
@@ -22,8 +26,10 @@ util.setup_test_logging()
 base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(base_path)
 
-from lightlib.persist import PersistentData
-from lightlib.common import get_now
+from lightlib.persist import PersistentData, DataStorageError
+from lightlib.config import ConfigLoader
+from lightlib.common import get_now, get_today, datetime_to_iso, FutureDay
+from shelterGPS.common import SolarEvent
 
 class TestPersist(unittest.TestCase):
     """Testing persistent data."""
@@ -59,6 +65,168 @@ class TestPersist(unittest.TestCase):
         PersistentData()._populate_locals_from_file()
 
 
+class PersistFileTestCase(unittest.TestCase):
+    """Give each test a fresh store on a temporary file."""
+
+    def setUp(self):
+        """Give each test a fresh store writing to a temporary file."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "persist.json")
+        self.patches = [
+            patch.object(ConfigLoader, "persistent_data_json", self.path),
+            patch.object(ConfigLoader, "persist_flush_interval", 0.2)]
+        for p in self.patches:
+            p.start()
+        self._saved = PersistentData._instance
+        PersistentData._instance = None
+        self.persist = PersistentData()
+
+    def tearDown(self):
+        """Restore the shared store."""
+        if self.persist._flush_timer is not None:
+            self.persist._flush_timer.cancel()
+        PersistentData._instance = self._saved
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+    def _read(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+
+class TestPersistStore(PersistFileTestCase):
+    """Test coalesced, atomic writes of the persistent data file."""
+
+    def test_writes_are_coalesced(self):
+        """Writes inside the interval are deferred and combined."""
+        self.assertFalse(self.persist.flush())  # Nothing changed yet
+        self.persist.missed_fix_days = 1
+        self.persist.store_data()
+        self.assertEqual(self._read()["missed_fixes"], 1)
+
+        with patch.object(PersistentData, "_populate_locals_from_file") \
+                as reread:
+            self.persist.missed_fix_days = 2
+            self.persist.store_data()
+            self.persist.missed_fix_days = 3
+            self.persist.store_data()
+            # Still the first write, one deferred write is pending
+            self.assertEqual(self._read()["missed_fixes"], 1)
+            self.assertIsNotNone(self.persist._flush_timer)
+            time.sleep(0.5)
+            reread.assert_not_called()
+        self.assertEqual(self._read()["missed_fixes"], 3)
+        self.assertFalse(self.persist._dirty)
+
+    def test_flush_forces_write(self):
+        """Flush writes pending changes without waiting."""
+        self.persist.missed_fix_days = 1
+        self.persist.store_data()
+        self.persist.add_sunrise_time(get_now() + dt.timedelta(days=1))
+        self.persist.add_sunrise_time(get_now() - dt.timedelta(days=2))
+        self.persist.store_data()
+        self.assertTrue(self.persist.flush())
+        self.assertIsNone(self.persist._flush_timer)
+        # Past days are dropped when stored
+        self.assertEqual(len(self._read()["solar_events"]["sunrise"]), 1)
+
+    def test_atomic_write(self):
+        """A failed write leaves the previous file and the data dirty."""
+        self.persist.missed_fix_days = 1
+        self.persist.flush()
+        self.persist.missed_fix_days = 2
+        with patch("lightlib.persist.os.replace",
+                   side_effect=OSError("power cut")):
+            with self.assertRaises(DataStorageError):
+                self.persist.flush()
+        self.assertEqual(self._read()["missed_fixes"], 1)
+        self.assertTrue(self.persist._dirty)
+        self.assertTrue(self.persist.flush())
+        self.assertEqual(self._read()["missed_fixes"], 2)
+        self.assertEqual(os.listdir(self.tmp.name), ["persist.json"])
+
+    def test_fix_stage_statistics(self):
+        """Fix stage latencies are averaged and survive a reload."""
+        for seconds in (10.0, 20.0, 30.0):
+            self.persist.record_fix_stages({"position": seconds,
+                                            "fix": seconds + 5})
+        stats = self.persist.fix_stages
+        self.assertEqual(stats["position"], {"count": 3, "mean": 20.0,
+                                             "last": 30.0, "max": 30.0})
+        # Older fixes decay once the window is full
+        for _ in range(PersistentData.FIX_STAGE_WINDOW):
+            self.persist.record_fix_stages({"position": 5.0})
+        self.assertLess(self.persist.fix_stages["position"]["mean"], 10.0)
+        self.persist.flush()
+
+        PersistentData._instance = None
+        self.persist = PersistentData()
+        self.assertEqual(self.persist.fix_stages["fix"]["count"], 3)
+        self.assertEqual(self.persist.fix_stages["position"]["count"], 13)
+
+    def test_fix_attempt_history(self):
+        """Fix attempts are kept per hour, bounded and survive a reload."""
+        for i in range(PersistentData.FIX_ATTEMPT_HISTORY + 3):
+            self.persist.record_fix_attempt(13, i % 2 == 0, 30.0 + i, 120.0)
+        self.persist.record_fix_attempt(2, False, 60.04, 60.0)
+        attempts = self.persist.fix_attempts
+        self.assertEqual(len(attempts[13]), PersistentData.FIX_ATTEMPT_HISTORY)
+        self.assertEqual(attempts[13][0], (False, 33.0, 120.0))
+        self.assertEqual(attempts[2], [(False, 60.0, 60.0)])
+        self.persist.flush()
+
+        PersistentData._instance = None
+        self.persist = PersistentData()
+        self.assertEqual(self.persist.fix_attempts, attempts)
+
+
+class TestSolarEventStore(PersistFileTestCase):
+    """Test the date indexed solar event store and its schema."""
+
+    def _at(self, days, hour):
+        return dt.datetime.combine(get_today() + dt.timedelta(days=days),
+                                   dt.time(hour, 0, 0), dt.timezone.utc)
+
+    def test_lookup_by_day(self):
+        """Events are found by day, a later add replaces the same day."""
+        self.persist.add_sunrise_time(self._at(0, 7))
+        self.persist.add_sunrise_time(self._at(1, 6))
+        self.persist.add_sunrise_time(self._at(1, 8))
+        self.assertEqual(self.persist.solar_event_time(
+            SolarEvent.SUNRISE, FutureDay.TODAY), self._at(0, 7))
+        self.assertEqual(self.persist.sunrise_tomorrow, self._at(1, 8))
+        self.assertIsNone(self.persist.sunrise_next_day)
+        self.assertIsNone(self.persist.solar_event_time(
+            SolarEvent.NOON, FutureDay.TODAY))
+        self.assertEqual(self.persist.sunrise_times,
+                         [self._at(0, 7), self._at(1, 8)])
+
+    def test_schema_1_migrated(self):
+        """A version 1 file is loaded and written back as version 2."""
+        v1 = PersistentData._get_empty_schema(1)
+        v1.update({"latitude": 51.5, "missed_fixes": 3,
+                   "dusk_times": [datetime_to_iso(self._at(-1, 17)),
+                                  datetime_to_iso(self._at(0, 17)),
+                                  datetime_to_iso(self._at(6, 18))]})
+        with open(self.path, "w") as f:
+            json.dump(v1, f)
+        PersistentData._instance = None
+        self.persist = PersistentData()
+
+        self.assertEqual(self.persist.current_latitude, 51.5)
+        self.assertEqual(self.persist.dusk_today, self._at(0, 17))
+        self.assertEqual(len(self.persist.dusk_times), 2)
+        self.persist.missed_fix_days = 4
+        self.persist.flush()
+        stored = self._read()
+        self.assertEqual(stored["schema_version"], 2)
+        self.assertNotIn("dusk_times", stored)
+        self.assertEqual(stored["solar_events"]["dusk"], {
+            (get_today() + dt.timedelta(days=d)).isoformat():
+            datetime_to_iso(self._at(d, h)) for d, h in ((0, 17), (6, 18))})
+
+
 if __name__ == '__main__':
     """Verbosity:
 
@@ -0,0 +1,90 @@
+"""tests.profiler_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Training run profiler unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+import os
+import sys
+import json
+import time
+import tempfile
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+from lightlib import profiler
+
+
+@profiler.stage("decorated")
+def decorated_work():
+    """Stage timed through the decorator."""
+    time.sleep(0.01)
+    return 42
+
+
+class TestProfiler(unittest.TestCase):
+    """Test stage timing, nesting and the JSONL record."""
+
+    def test_stages_without_run_are_noops(self):
+        """Stages outside a run don't fail or record anything."""
+        self.assertIsNone(profiler.active_run())
+        self.assertEqual(decorated_work(), 42)
+        with profiler.stage("orphan"):
+            profiler.annotate(rows=1)
+
+    def test_run_records_stages(self):
+        """Nested and repeated stages are timed and written as JSONL."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.jsonl")
+            with profiler.profile_run("test", output=path) as run:
+                with profiler.stage("outer"):
+                    decorated_work()
+                    decorated_work()
+                profiler.annotate(rows=10)
+            with profiler.profile_run("test", output=path):
+                pass
+
+            self.assertIsNone(profiler.active_run())
+            self.assertEqual(run.stages["decorated"]["calls"], 2)
+            self.assertEqual(run.stages["decorated"]["parent"], "outer")
+            self.assertGreaterEqual(run.stages["outer"]["seconds"],
+                                    run.stages["decorated"]["seconds"])
+            self.assertGreaterEqual(run.total_seconds,
+                                    run.stages["outer"]["seconds"])
+
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+            self.assertEqual(len(records), 2)
+            self.assertEqual(records[0]["info"], {"rows": 10})
+            self.assertIn("decorated", records[0]["stages"])
+
+    def test_memory_peaks(self):
+        """With tracing on each stage reports its peak allocation."""
+        with profiler.profile_run("mem", trace_memory=True) as run:
+            with profiler.stage("outer"):
+                with profiler.stage("alloc"):
+                    block = bytearray(4 * 1024 * 1024)
+                    del block
+                with profiler.stage("small"):
+                    pass
+        self.assertGreaterEqual(run.stages["alloc"]["peak_kb"], 4 * 1024)
+        self.assertLess(run.stages["small"]["peak_kb"],
+                        run.stages["alloc"]["peak_kb"])
+        # The parent's peak includes its children's peaks
+        self.assertGreaterEqual(run.stages["outer"]["peak_kb"],
+                                run.stages["alloc"]["peak_kb"])
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
@@ -0,0 +1,165 @@
+"""tests.replay_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: NMEA capture and replay unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import gzip
+import time
+import tempfile
+import gps_test_vals as test_vals
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+from shelterGPS import replay
+from shelterGPS.Position import GPS
+from lightlib.config import ConfigLoader
+from lightlib.persist import PersistentData
+
+
+def capture_chunks(fix_after: int, seconds: int) -> replay.Capture:
+    """Split a scripted capture into one chunk per second of output."""
+    lines = test_vals.nmea_capture(fix_after, seconds).splitlines(
+        keepends=True)
+    per_second = len(lines) // seconds
+    return [(float(s), b"".join(lines[s * per_second:(s + 1) * per_second]))
+            for s in range(seconds)]
+
+
+class TestCaptureFile(unittest.TestCase):
+    """Test writing, reading and serving captures."""
+
+    def setUp(self):
+        """Write captures into a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "capture.gz")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """A capture reads back as written, compressed."""
+        chunks = capture_chunks(fix_after=3, seconds=30)
+        replay.write_capture(self.path, chunks)
+        self.assertEqual(replay.read_capture(self.path), chunks)
+        self.assertLess(os.path.getsize(self.path),
+                        sum(len(data) for _, data in chunks) / 4)
+
+        with gzip.open(self.path, "wb") as f:
+            f.write(b"not a capture")
+        with self.assertRaises(ValueError):
+            replay.read_capture(self.path)
+
+    def test_record(self):
+        """Recording a port stores what it read and when."""
+        source = replay.ReplaySerial(capture_chunks(0, 3), realtime=True,
+                                     timeout=0.1)
+        recorded = replay.record_capture(self.path, 0.3, ser=source)
+        self.assertEqual(b"".join(data for _, data in recorded),
+                         capture_chunks(0, 3)[0][1])
+        self.assertEqual(replay.read_capture(self.path), recorded)
+
+    def test_max_speed(self):
+        """Chunks are released one per read until the capture ends."""
+        chunks = capture_chunks(fix_after=0, seconds=3)
+        ser = replay.ReplaySerial(chunks)
+        self.assertEqual(ser.in_waiting, len(chunks[0][1]))
+        self.assertEqual(ser.read(ser.in_waiting), chunks[0][1])
+        self.assertEqual(ser.readline(), chunks[1][1].splitlines(True)[0])
+        self.assertEqual(ser.capture_time, 1.0)
+        ser.read(10 ** 6)
+        ser.read(10 ** 6)
+        self.assertTrue(ser.exhausted)
+        with self.assertRaises(replay.CaptureEnd):
+            ser.read()
+
+    def test_realtime(self):
+        """In real time bytes are readable at their recorded offsets."""
+        ser = replay.ReplaySerial([(0.0, b"a"), (0.2, b"b"), (0.4, b"c")],
+                                  realtime=True, timeout=0.1)
+        start = time.monotonic()
+        self.assertEqual(ser.read(10), b"a")
+        self.assertEqual(ser.read(10), b"")  # Timed out waiting
+        data = b""
+        while not ser.exhausted:
+            data += ser.read(10)
+        self.assertEqual(data, b"bc")
+        self.assertGreaterEqual(time.monotonic() - start, 0.4)
+
+
+@patch.object(GPS, 'pwr_on')
+@patch.object(PersistentData, 'record_fix_stages')
+class TestReplayFix(unittest.TestCase):
+    """Test driving GPS fixes from captures."""
+
+    def setUp(self):
+        """Reset the GPS singleton."""
+        GPS._instance = None
+
+    def test_replay_fix(self, record, pwr_on):
+        """A fix is replayed at max speed and measured."""
+        gps = GPS()
+        port = gps.serial_connection
+        with patch.object(GPS, '_sync_system_time') as sync:
+            report = replay.replay_fix(capture_chunks(3, 30), max_fix_time=5)
+        sync.assert_not_called()
+        self.assertIs(gps.serial_connection, port)
+
+        self.assertTrue(report["fixed"])
+        # The first fixed minute ends after 7 GGAs, the next 10 verify
+        self.assertEqual(report["time_to_fix"], 19.0)
+        self.assertEqual(report["sentences"], 20 * 7)
+        self.assertGreater(report["sentences_per_sec"], 0)
+        self.assertGreater(report["cpu_seconds"], 0)
+        self.assertIn("datetime", report["stages"])
+        record.assert_called_once()
+
+    def test_replay_without_fix(self, record, pwr_on):
+        """A capture that never fixes ends the replay when exhausted."""
+        start = time.monotonic()
+        report = replay.replay_fix(capture_chunks(60, 10), max_fix_time=60)
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertFalse(report["fixed"])
+        self.assertIsNone(report["time_to_fix"])
+        self.assertEqual(report["sentences"], 10 * 7)
+        record.assert_not_called()
+
+    def test_replay_sun_times(self, record, pwr_on):
+        """The full SunTimes fix path runs from a capture."""
+        from shelterGPS.Helio import SunTimes
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(ConfigLoader, "persistent_data_json",
+                             os.path.join(tmp, "persist.json")), \
+                patch.object(ConfigLoader, "gps_pwr_up_time", 0), \
+                patch.object(SunTimes, "_attempt_initial_fix_window",
+                             return_value=True), \
+                patch.object(GPS, '_sync_system_time'):
+            saved = PersistentData._instance, SunTimes._instance
+            PersistentData._instance = SunTimes._instance = None
+            try:
+                report = replay.replay_sun_times(capture_chunks(3, 30))
+                self.assertAlmostEqual(PersistentData().current_latitude,
+                                       51.5)
+            finally:
+                PersistentData._instance, SunTimes._instance = saved
+        self.assertTrue(report["fixed"])
+        self.assertEqual(report["time_to_fix"], 19.0)
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
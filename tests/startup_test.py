@@ -0,0 +1,118 @@
+"""tests.startup_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Startup model and schedule restore unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import tempfile
+import numpy as np
+import lightgbm as lgb
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+import scheduler.Schedule as sched
+from scheduler.model import LightModel
+from scheduler.feature_sets import FeatureSet, FeatureSetManager
+from lightlib.config import ConfigLoader
+
+
+def _train_booster(feature_cols):
+    x = np.random.default_rng(1).random((200, len(feature_cols)))
+    data = lgb.Dataset(x, label=(x[:, 0] > 0.5).astype(int),
+                       feature_name=list(feature_cols))
+    return lgb.train({"objective": "binary", "verbose": -1}, data,
+                     num_boost_round=2)
+
+
+class TestModelPersistence(unittest.TestCase):
+    """Test saving and restoring the trained model."""
+
+    def test_save_and_load(self):
+        """A saved model is restored only for the same feature set."""
+        model = LightModel()
+        model.set_feature_set(FeatureSet.MINIMAL)
+        self.assertFalse(model.save_model("unused.txt"))
+        model.model = _train_booster(
+            FeatureSetManager.get_columns(FeatureSet.MINIMAL))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.txt")
+            self.assertTrue(model.save_model(path))
+            self.assertFalse(os.path.exists(path + ".tmp"))
+
+            restored = LightModel()
+            restored.set_feature_set(FeatureSet.MINIMAL)
+            self.assertTrue(restored.load_model(path))
+            self.assertEqual(restored.model.num_trees(),
+                             model.model.num_trees())
+
+            other = LightModel()
+            other.set_feature_set(FeatureSet.FULL_FEATURES)
+            self.assertFalse(other.load_model(path))
+            self.assertIsNone(other.model)
+            self.assertFalse(other.load_model(path + ".missing"))
+
+
+class TestStartupSchedule(unittest.TestCase):
+    """Test the engine order of the startup schedule."""
+
+    def setUp(self):
+        """Create a scheduler without a database."""
+        sched.LightScheduler._instance = None
+        with patch.object(sched, "DB", side_effect=sched.psycopg2.DatabaseError):
+            self.scheduler = sched.LightScheduler()
+        self.scheduler.store = MagicMock()
+        self.scheduler.model_engine = MagicMock(model=None)
+        self.scheduler.model_engine.load_model.return_value = False
+        patcher = patch.object(ConfigLoader, "profile_file", "")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Don't leak the mocked singleton into other tests."""
+        sched.LightScheduler._instance = None
+
+    def test_stored_schedule_is_used(self):
+        """Nothing is generated when both schedules are stored."""
+        self.scheduler.store.reload_schedule.return_value = {"x": 1}
+        self.assertEqual(self.scheduler.restore_startup_schedule(), "stored")
+        self.scheduler.model_engine.load_model.assert_called_once()
+        self.scheduler.store.store_fallback.assert_not_called()
+
+    def test_model_then_fallbacks(self):
+        """Missing schedules use the model, then blend, then the file."""
+        self.scheduler.store.reload_schedule.return_value = {}
+        self.scheduler.model_engine.model = object()
+        with patch.object(self.scheduler, "generate_daily_schedule",
+                          return_value={1: {}}) as generate:
+            self.assertEqual(self.scheduler.restore_startup_schedule(),
+                             "model")
+        self.assertEqual(generate.call_count, 2)
+
+        self.scheduler.model_engine.model = None
+        with patch.object(sched.Fallback, "blend_method",
+                          return_value=None), \
+             patch.object(sched.Fallback, "generate_schedule",
+                          return_value={1: {}}):
+            self.assertEqual(self.scheduler.restore_startup_schedule(),
+                             "schedule")
+            self.scheduler.store.store_fallback.return_value = {}
+            self.assertIsNone(self.scheduler.restore_startup_schedule())
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
@@ -0,0 +1,161 @@
+"""tests.tasks_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Task scheduler unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+import os
+import sys
+import threading
+import time
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+from lightlib.tasks import TaskScheduler
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait until `condition()` is true, False if it times out."""
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+class TestTaskScheduler(unittest.TestCase):
+    """Test jobs run from the scheduler thread."""
+
+    def setUp(self):
+        """Give each test a fresh scheduler."""
+        self._saved = TaskScheduler._instance
+        TaskScheduler._instance = None
+        self.tasks = TaskScheduler()
+
+    def tearDown(self):
+        """Stop the scheduler and restore the singleton."""
+        self.tasks.stop()
+        TaskScheduler._instance = self._saved
+
+    def test_periodic_job(self):
+        """A periodic job keeps running and records its run times."""
+        threads = set()
+        job = self.tasks.every(
+            "tick", lambda: threads.add(threading.current_thread().name),
+            0.01)
+        self.assertTrue(wait_for(lambda: job.runs >= 5))
+        self.assertEqual(threads, {"task-scheduler"})
+        stats = self.tasks.stats["tick"]
+        self.assertGreaterEqual(stats["runs"], 5)
+        self.assertEqual(stats["failures"], 0)
+        self.assertIsNotNone(stats["mean_seconds"])
+
+    def test_jobs_run_in_due_order(self):
+        """Jobs run when due, not in the order they were scheduled."""
+        order = []
+        self.tasks.once("late", lambda: order.append("late"), delay=0.1)
+        self.tasks.once("early", lambda: order.append("early"), delay=0.02)
+        self.assertTrue(wait_for(lambda: len(order) == 2))
+        self.assertEqual(order, ["early", "late"])
+        # One off jobs are forgotten once run
+        self.assertTrue(wait_for(lambda: not self.tasks.stats))
+
+    def test_returned_delay(self):
+        """A job returning a number sets the delay to its next run."""
+        runs = []
+
+        def job():
+            runs.append(time.monotonic())
+            return 0.01 if len(runs) < 3 else 3600
+
+        self.tasks.once("chained", job)
+        self.assertTrue(wait_for(lambda: len(runs) == 3))
+        time.sleep(0.05)
+        self.assertEqual(len(runs), 3)
+        self.assertIn("chained", self.tasks.stats)
+
+    def test_callable_interval(self):
+        """The interval is read after each run."""
+        interval = [3600]
+        job = self.tasks.every("reloaded", lambda: None,
+                               lambda: interval[0])
+        self.assertTrue(wait_for(lambda: job.runs == 1))
+        interval[0] = 0.01
+        # The run due in an hour is not brought forward
+        time.sleep(0.05)
+        self.assertEqual(job.runs, 1)
+        self.tasks.cancel("reloaded")
+        job = self.tasks.every("reloaded", lambda: None, lambda: interval[0])
+        self.assertTrue(wait_for(lambda: job.runs >= 3))
+
+    def test_cancel_group(self):
+        """Cancelling a group stops only its jobs."""
+        main = self.tasks.every("main-job", lambda: None, 0.01, group="main")
+        other = self.tasks.every("other-job", lambda: None, 0.01)
+        self.assertTrue(wait_for(lambda: main.runs and other.runs))
+        self.tasks.cancel_group("main")
+        runs = main.runs
+        self.assertTrue(wait_for(lambda: other.runs >= runs + 3))
+        self.assertLessEqual(main.runs, runs + 1)
+        self.assertNotIn("main-job", self.tasks.stats)
+
+    def test_same_name_replaces(self):
+        """Scheduling a name again cancels the earlier job."""
+        first = self.tasks.every("job", lambda: None, 0.01)
+        second = self.tasks.every("job", lambda: None, 0.01)
+        self.assertTrue(first.cancelled)
+        self.assertTrue(wait_for(lambda: second.runs >= 2))
+
+    def test_failure_counted(self):
+        """An exception is logged and counted, the job keeps running."""
+        def fail():
+            raise RuntimeError("job failed")
+
+        job = self.tasks.every("failing", fail, 0.01)
+        self.assertTrue(wait_for(lambda: job.failures >= 2))
+        self.assertEqual(self.tasks.stats["failing"]["failures"],
+                         job.failures)
+
+    def test_background_job(self):
+        """Background jobs don't hold up others and skip overlapping runs."""
+        release = threading.Event()
+        slow = self.tasks.every("slow", lambda: release.wait(5), 0.01,
+                                background=True)
+        fast = self.tasks.every("fast", lambda: None, 0.01)
+        self.assertTrue(wait_for(lambda: fast.runs >= 5))
+        self.assertTrue(wait_for(lambda: slow.skipped >= 1))
+        self.assertEqual(slow.runs, 0)
+        release.set()
+        self.assertTrue(wait_for(lambda: slow.runs >= 1))
+
+    def test_background_chain_cancelled(self):
+        """A background job asking for its next run stays cancellable."""
+        jobs = [self.tasks.once(f"chain-{i}", lambda: 0.001,
+                                group="main", background=True)
+                for i in range(20)]
+        self.assertTrue(wait_for(lambda: all(job.runs >= 3
+                                             for job in jobs)))
+        self.assertEqual(set(self.tasks.stats),
+                         {f"chain-{i}" for i in range(20)})
+        self.tasks.cancel_group("main")
+        time.sleep(0.05)  # Let runs in progress end
+        runs = [job.runs for job in jobs]
+        time.sleep(0.05)
+        self.assertEqual([job.runs for job in jobs], runs)
+        self.assertEqual(self.tasks.stats, {})
+
+
+if __name__ == "__main__":
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
@@ -0,0 +1,118 @@
+"""tests.timezones_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Timezone resolution cache unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import json
+import tempfile
+import pytz
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+from lightlib import timezones
+from lightlib.timezones import TimezoneResolver
+from lightlib.persist import PersistentData
+from lightlib.config import ConfigLoader
+
+
+class TestTimezoneResolver(unittest.TestCase):
+    """Test memoized timezone lookups."""
+
+    def setUp(self):
+        """Give each test a fresh resolver."""
+        self._saved = TimezoneResolver._instance
+        TimezoneResolver._instance = None
+        self.resolver = TimezoneResolver()
+
+    def tearDown(self):
+        """Restore the shared resolver."""
+        TimezoneResolver._instance = self._saved
+
+    def test_lazy_finder(self):
+        """TimezoneFinder is built once, on the first miss only."""
+        with patch("timezonefinder.TimezoneFinder") as finder:
+            finder.return_value.timezone_at.return_value = "Europe/London"
+            self.resolver.load({"48.86,2.35": "Europe/Paris"})
+            self.assertEqual(self.resolver.zone_at(48.8566, 2.3522),
+                             "Europe/Paris")
+            finder.assert_not_called()
+
+            self.assertEqual(self.resolver.zone_at(51.5072, -0.1276),
+                             "Europe/London")
+            self.assertEqual(self.resolver.timezone_at(51.5099, -0.1301),
+                             pytz.timezone("Europe/London"))
+            finder.assert_called_once_with(in_memory=False)
+            finder.return_value.timezone_at.assert_called_once()
+        self.assertEqual((self.resolver.hits, self.resolver.misses), (2, 1))
+        self.assertEqual(self.resolver.cache["51.51,-0.13"], "Europe/London")
+
+    def test_no_zone(self):
+        """A location without a zone is cached and resolves to UTC."""
+        with patch("timezonefinder.TimezoneFinder") as finder:
+            finder.return_value.timezone_at.return_value = None
+            self.assertIs(self.resolver.timezone_at(0.0, -160.0), pytz.UTC)
+            self.assertIsNone(self.resolver.zone_at(0.0, -160.0))
+            finder.return_value.timezone_at.assert_called_once()
+
+    def test_bounded(self):
+        """The oldest locations are forgotten first."""
+        self.resolver.load({f"{i}.00,0.00": "UTC"
+                            for i in range(timezones.MAX_ENTRIES + 5)})
+        cache = self.resolver.cache
+        self.assertEqual(len(cache), timezones.MAX_ENTRIES)
+        self.assertNotIn("0.00,0.00", cache)
+
+    def test_real_lookup(self):
+        """A real lookup resolves the zone."""
+        self.assertEqual(self.resolver.zone_at(51.5072, -0.1276),
+                         "Europe/London")
+
+    def test_persisted(self):
+        """The cache is stored with the persistent data."""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(ConfigLoader, "persistent_data_json",
+                             os.path.join(tmp, "persist.json")), \
+                patch("timezonefinder.TimezoneFinder") as finder:
+            finder.return_value.timezone_at.return_value = "Europe/Paris"
+            saved = PersistentData._instance
+            PersistentData._instance = None
+            try:
+                persist = PersistentData()
+                persist.current_latitude = 48.8566
+                persist.current_longitude = 2.3522
+                persist.flush()
+                with open(os.path.join(tmp, "persist.json")) as f:
+                    stored = json.load(f)["timezones"]
+                self.assertEqual(stored["48.86,2.35"], "Europe/Paris")
+
+                # A restart answers from the file without TimezoneFinder
+                TimezoneResolver._instance = None
+                PersistentData._instance = None
+                finder.reset_mock()
+                persist = PersistentData()
+                persist.current_longitude = 2.3522
+                self.assertEqual(persist.local_timezone_zone, "Europe/Paris")
+                finder.assert_not_called()
+            finally:
+                if persist._flush_timer is not None:
+                    persist._flush_timer.cancel()
+                PersistentData._instance = saved
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
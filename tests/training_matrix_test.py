@@ -0,0 +1,126 @@
+"""tests.training_matrix_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Compact training matrix unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+import datetime as dt
+import numpy as np
+import pandas as pd
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+from scheduler import training_matrix as tm
+from scheduler.model import LightModel
+from scheduler.features import FeatureEngineer
+from scheduler.feature_sets import FeatureSet
+from lightlib.config import ConfigLoader
+
+
+class TestTrainingMatrix(unittest.TestCase):
+    """Test dtype compaction and float32 matrix building."""
+
+    def test_compact_frame_dtypes(self):
+        """Columns are downcast only where the values fit."""
+        df = pd.DataFrame({
+            "flag": [0, 1, 1],
+            "interval": [0, 143, 1439],
+            "big": [0, 1, 2 ** 20],
+            "nullable": pd.array([1, None, 3], dtype="Int64"),
+            "clean_nullable": pd.array([1, 2, 3], dtype="Int64"),
+            "ratio": [0.5, 0.25, 1.0],
+            "when": pd.date_range("2025-01-01", periods=3),
+        })
+        tm.compact_frame(df)
+        self.assertEqual(df["flag"].dtype, np.uint8)
+        self.assertEqual(df["interval"].dtype, np.int16)
+        self.assertEqual(df["big"].dtype, np.int64)
+        self.assertEqual(df["nullable"].dtype, "Int64")
+        self.assertEqual(df["clean_nullable"].dtype, np.uint8)
+        self.assertEqual(df["ratio"].dtype, np.float32)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["when"]))
+
+    def test_feature_matrix(self):
+        """The matrix is contiguous float32 with NA mapped to NaN."""
+        df = pd.DataFrame({"a": [1, 2], "b": pd.array([None, 4],
+                                                      dtype="Int64")})
+        matrix = tm.feature_matrix(df, ["b", "a"])
+        self.assertEqual(matrix.dtype, np.float32)
+        self.assertTrue(matrix.flags["C_CONTIGUOUS"])
+        self.assertTrue(np.isnan(matrix[0, 0]))
+        np.testing.assert_array_equal(matrix[:, 1], [1, 2])
+        np.testing.assert_array_equal(
+            tm.label_vector(pd.Series([0, 3, None])), [0, 1, 0])
+
+    def test_class_weight(self):
+        """ONs are weighted by the imbalance and boost when enabled."""
+        self.assertEqual(tm.class_weight(10, 90, 1.0), 9.0)
+        self.assertEqual(tm.class_weight(10, 90, 2.0), 18.0)
+        self.assertEqual(tm.class_weight(10, 90, None), 1.0)
+        self.assertEqual(tm.class_weight(0, 90, 2.0), 1.0)
+
+
+class TestLeanTraining(unittest.TestCase):
+    """Train the model end to end on compact data."""
+
+    def test_train_and_predict(self):
+        """A model trained from compact matrices predicts a schedule."""
+        start = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+        ts = pd.date_range(start, periods=6 * 144, freq="10min")
+        df = pd.DataFrame({"timestamp": ts})
+        df["date"] = df["timestamp"].dt.date
+        df["activity_pin"] = ((ts.hour >= 18) & (ts.hour < 21)).astype(int)
+
+        features = FeatureEngineer()
+        features.set_config(db=MagicMock(), interval_minutes=10,
+                            schedule_cache={})
+        model = LightModel()
+        model.set_config(db=MagicMock(), interval_minutes=10,
+                         min_confidence=0.5, features=features)
+        model.set_feature_set(FeatureSet.MINIMAL)
+        model._prepare_training_data = MagicMock(return_value=(
+            df, pd.DataFrame(columns=[
+                "date", "interval_number", "was_correct", "false_positive",
+                "false_negative", "confidence"])))
+
+        with patch.object(ConfigLoader, "enable_model_validation", False), \
+             patch.object(ConfigLoader, "model_file", ""):
+            model.train_model(days_history=6)
+        self.assertIsNotNone(model.model)
+
+        day = df[df["date"] == df["date"].iloc[0]][["date", "timestamp"]]
+        predictions, _ = model._predict_schedule(
+            features._create_base_features(day))
+        self.assertEqual(predictions[18 * 6], 1)
+        self.assertEqual(predictions[6 * 6], 0)
+
+    def test_training_params(self):
+        """Params for fitting add the config's min_data_in_leaf."""
+        model = LightModel()
+        model.model_params["scale_pos_weight"] = 3.0
+        with patch.object(ConfigLoader, "min_data_in_leaf", 7), \
+             patch.object(ConfigLoader, "boost_enable", False):
+            params = model.training_params()
+            self.assertIsNone(model.on_boost)
+        self.assertEqual(params["min_data_in_leaf"], 7)
+        self.assertNotIn("scale_pos_weight", params)
+        self.assertEqual(params["num_leaves"],
+                         model.model_params["num_leaves"])
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
@@ -0,0 +1,155 @@
+"""tests.tuning_test.
+
+Copyright (c) 2025 Will Bickerstaff
+Licensed under the MIT License.
+See LICENSE file in the root directory of this project.
+
+Description: Hyperparameter search unit testing
+Author: Will Bickerstaff
+Version: 0.1
+"""
+
+import unittest
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import json
+import tempfile
+import numpy as np
+import util
+
+# Set up logging ONCE for the entire test module
+util.setup_test_logging()
+
+base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(base_path)
+
+from scheduler import tuning
+from scheduler.feature_sets import FeatureSet
+
+
+class TestTuning(unittest.TestCase):
+    """Test the time-series CV search harness."""
+
+    BASE_PARAMS = {'objective': 'binary', 'metric': 'auc', 'verbose': -1,
+                   'min_data_in_leaf': 5}
+
+    def _synthetic_data(self, rows=1200):
+        """Activity driven mostly by the first feature."""
+        rng = np.random.default_rng(1)
+        x = rng.random((rows, 3))
+        y = (x[:, 0] + rng.normal(0, 0.1, rows) > 0.7).astype(np.int8)
+        return x, y
+
+    def test_folds_never_see_the_future(self):
+        """Each fold validates on rows after everything it trains on."""
+        folds = tuning.time_series_folds(100, n_folds=4)
+        self.assertEqual(len(folds), 4)
+        self.assertEqual(folds[0][0], 50)
+        self.assertEqual(folds[-1][1], 100)
+        for (train_end, val_end), nxt in zip(folds, folds[1:]):
+            self.assertLess(train_end, val_end)
+            self.assertEqual(val_end, nxt[0])
+
+    def test_folds_too_few_rows(self):
+        """No folds are produced when there is nothing to validate on."""
+        self.assertEqual(tuning.time_series_folds(1), [])
+        self.assertEqual(tuning.time_series_folds(3, n_folds=4), [])
+
+    def test_roc_auc(self):
+        """AUC matches known values and is undefined for one class."""
+        self.assertEqual(tuning.roc_auc([0, 0, 1, 1], [0.1, 0.2, 0.8, 0.9]),
+                         1.0)
+        self.assertEqual(tuning.roc_auc([0, 1, 0, 1], [0.5] * 4), 0.5)
+        self.assertIsNone(tuning.roc_auc([1, 1], [0.2, 0.3]))
+
+    def test_sample_grid(self):
+        """Random search samples distinct combinations reproducibly."""
+        space = {"a": [1, 2, 3], "b": [4, 5]}
+        self.assertEqual(len(tuning.expand_grid(space)), 6)
+        sample = tuning.sample_grid(space, 3, seed=7)
+        self.assertEqual(len(sample), 3)
+        self.assertEqual(sample, tuning.sample_grid(space, 3, seed=7))
+        self.assertEqual(len(tuning.sample_grid(space, 0)), 6)
+
+    def test_serial_and_parallel_agree(self):
+        """Workers using shared memory score the same as a serial run."""
+        x, y = self._synthetic_data()
+        candidates = [{"num_leaves": 7}, {"num_leaves": 15}]
+        serial = tuning.HyperparameterSearch(
+            x, y, self.BASE_PARAMS, n_folds=3, boost_rounds=30)
+        best_serial = serial.run(candidates, workers=1)
+        parallel = tuning.HyperparameterSearch(
+            x, y, self.BASE_PARAMS, n_folds=3, boost_rounds=30)
+        best_parallel = parallel.run(candidates, workers=2)
+
+        self.assertIsNotNone(best_serial)
+        self.assertGreater(best_serial["score"], 0.8)
+        self.assertEqual(best_serial["params"], best_parallel["params"])
+        self.assertAlmostEqual(best_serial["score"], best_parallel["score"])
+
+    def test_trials_weighted_as_training(self):
+        """Trials use the ON boost and share the CPUs between workers."""
+        x, y = self._synthetic_data()
+        search = tuning.HyperparameterSearch(
+            x, y, self.BASE_PARAMS, n_folds=2, boost_rounds=5,
+            on_boost=2.0)
+        folds = []
+        train = tuning.lgb.train
+
+        def record(params, train_data, **kwargs):
+            folds.append((dict(params), train_data.get_label()))
+            return train(params, train_data, **kwargs)
+
+        # Threads stand in for worker processes so lgb.train can be patched
+        with patch.object(tuning, "ProcessPoolExecutor",
+                          ThreadPoolExecutor), \
+                patch.object(tuning.os, "cpu_count", return_value=8), \
+                patch.object(tuning.lgb, "train", side_effect=record):
+            search.run([{"num_leaves": 7}], workers=4)
+
+        self.assertEqual(len(folds), 2)
+        for params, labels in folds:
+            num_on = int(labels.sum())
+            self.assertAlmostEqual(params["scale_pos_weight"],
+                                   2.0 * (labels.size - num_on) / num_on)
+            self.assertEqual(params["min_data_in_leaf"], 5)
+            self.assertEqual(params["num_threads"], 2)
+
+    def test_save_and_load_filters_keys(self):
+        """Only tunable keys are loaded back from the persisted file."""
+        result = {"params": {"num_leaves": 15, "objective": "regression"},
+                  "score": 0.9, "best_iteration": 40, "folds": 3}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tuned.json")
+            tuning.save_tuned_params(path, result, FeatureSet.COUNT)
+            with open(path) as f:
+                self.assertEqual(json.load(f)["feature_set"], "COUNT")
+            self.assertEqual(tuning.load_tuned_params(path),
+                             {"num_leaves": 15})
+            self.assertEqual(tuning.load_tuned_params(
+                os.path.join(tmp, "missing.json")), {})
+
+    def test_load_checks_feature_set(self):
+        """Params tuned on another feature set are not loaded."""
+        result = {"params": {"num_leaves": 15}, "score": 0.9,
+                  "best_iteration": 40, "folds": 3}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tuned.json")
+            tuning.save_tuned_params(path, result, FeatureSet.COUNT)
+            self.assertEqual(
+                tuning.load_tuned_params(path, FeatureSet.COUNT),
+                {"num_leaves": 15})
+            with self.assertLogs(level="INFO"):
+                self.assertEqual(
+                    tuning.load_tuned_params(path, FeatureSet.DEFAULT), {})
+
+    def test_search_space_covers_tunable_params(self):
+        """Every tunable parameter is searched."""
+        self.assertEqual(set(tuning.DEFAULT_SEARCH_SPACE),
+                         set(tuning.TUNABLE_PARAMS))
+
+
+if __name__ == '__main__':
+    unittest.main(testRunner=util.LoggingTestRunner(verbosity=2))
@@ -43,8 +43,8 @@ class TestUSBManager(unittest.TestCase):
             handler.flush()  # Make sure log entries are written
 
     @patch('lightlib.USBManager.os')  # patches 'os' module in USBManager.py
-    @patch('lightlib.USBManager.ConfigLoader.validate_config_file',
-           return_value=True)
+    @patch('lightlib.USBManager.ConfigLoader.compile_file',
+           return_value=MagicMock(valid=True))
     @patch('builtins.open', new_callable=mock_open)
     @patch('shutil.copy2')
     def test_config_copy(self, mock_copy2, mock_file, mock_validate, mock_os):
@@ -69,8 +69,11 @@ class TestUSBManager(unittest.TestCase):
     @patch.object(USBFileManager, 'replace_config_with_usb', return_value=True)
     @patch('lightlib.USBManager.os.path.ismount', return_value=True)
     @patch('lightlib.USBManager.os.listdir', return_value=["mockfile"])
+    @patch('lightlib.USBManager.ConfigLoader.reload',
+           return_value={"GPS": {"baudrate"}})
     def test_usb_check_triggers_config_reload(
-            self, mock_listdir, mock_ismount, mock_replace, mock_datetime):
+            self, mock_reload, mock_listdir, mock_ismount, mock_replace,
+            mock_datetime):
         """Test usb_check raises ConfigReloaded when config is replaced."""
         try:
             """Check a new config triggers a config file reload."""
@@ -82,14 +85,28 @@ class TestUSBManager(unittest.TestCase):
         except ConfigReloaded:
             logging.info("Config reloaded as expected.")
 
+    @patch('lightlib.USBManager.datetime_to_iso',
+           return_value="2025-04-08T122218")
+    @patch.object(USBFileManager, 'replace_config_with_usb', return_value=True)
+    @patch('lightlib.USBManager.os.path.ismount', return_value=True)
+    @patch('lightlib.USBManager.os.listdir', return_value=["mockfile"])
+    @patch('lightlib.USBManager.ConfigLoader.reload',
+           return_value={"FALLBACK": {"action"}})
+    def test_usb_check_applies_live_changes(
+            self, mock_reload, mock_listdir, mock_ismount, mock_replace,
+            mock_datetime):
+        """Changes that can be applied in place don't restart."""
+        self.usb_manager.usb_check()
+        mock_reload.assert_called_once()
+
     @patch('lightlib.USBManager.USBFileManager.replace_config_with_usb',
            return_value=False)
     @patch.object(USBFileManager, 'backup_files_to_usb')
     def test_replace_config_with_usb_validation_failure(self, mock_backup,
                                                         mock_replace):
         """Check config file is not replaced if validation fails."""
-        with patch('lightlib.config.ConfigLoader.validate_config_file',
-                   return_value=False):
+        with patch('lightlib.config.ConfigLoader.compile_file',
+                   return_value=MagicMock(valid=False)):
             result = self.usb_manager.replace_config_with_usb(
                 'mock_config.ini')
             # Verify replace_config_with_usb returns False if config
@@ -97,8 +114,8 @@ class TestUSBManager(unittest.TestCase):
             self.assertFalse(result)
 
     @patch('lightlib.USBManager.os')  # patches 'os' module in USBManager.py
-    @patch('lightlib.USBManager.ConfigLoader.validate_config_file',
-           return_value=True)
+    @patch('lightlib.USBManager.ConfigLoader.compile_file',
+           return_value=MagicMock(valid=True))
     @patch('builtins.open', new_callable=mock_open)
     @patch('shutil.copy2')
     @patch('lightlib.USBManager.datetime_to_iso')  # Mocking datetime_to_iso
@@ -166,8 +183,8 @@ class TestUSBManager(unittest.TestCase):
 
     @patch('lightlib.USBManager.warn_and_wait',
            return_value=CANCEL_CONFIRM.CANCEL)
-    @patch('lightlib.USBManager.ConfigLoader.validate_config_file',
-           return_value=True)
+    @patch('lightlib.USBManager.ConfigLoader.compile_file',
+           return_value=MagicMock(valid=True))
     @patch('lightlib.USBManager.os.path.isfile', return_value=True)
     @patch('shutil.copy2')
     def test__user_cancels_config_copy(
@@ -36,7 +36,7 @@ class TestUSBManager(unittest.TestCase):
         self.mount_point = os.path.join("mock", "mount", "point")
         self.usb_manager = USBFileManager(mount_point=self.mount_point)
 
-    @patch('lightlib.USBManager.ConfigLoader.validate_config_file', return_value=True)
+    @patch('lightlib.USBManager.ConfigLoader.compile_file', return_value=MagicMock(valid=True))
     @patch('builtins.open', new_callable=MagicMock)
     @patch('shutil.copy2')
     @patch('lightlib.USBManager.os')  # patches 'os' module in USBManager.py